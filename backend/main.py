@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Request, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import OAuth2PasswordBearer
@@ -6,12 +6,12 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from backend import models
 from backend import schemas
 from backend.database import SessionLocal, engine
 from backend.auth import get_current_user
-from backend.routers import auth, domains, emails, databases, customers, email_accounts, ssl, import_router, dns, ftp, tasks, logs, service_plans, reseller_plans, users, resellers, settings, reports, ssh, subdomains, database_management, backup, vendors, monitoring, software, files, webhooks, integrations
+from backend.routers import auth, domains, emails, databases, customers, email_accounts, ssl, import_router, dns, ftp, tasks, logs, service_plans, reseller_plans, users, resellers, settings, reports, ssh, subdomains, database_management, backup, vendors, monitoring, software, files, file_system, webhooks, integrations, php, web_server, traffic
 from backend.middleware import ErrorHandlerMiddleware, RequestLoggingMiddleware, ValidationErrorHandlerMiddleware, LanguageMiddleware, AuthMiddleware
 import os
 from dotenv import load_dotenv
@@ -19,6 +19,12 @@ from backend.utils.i18n import get_translation, get_language_from_request
 from backend.services.backup_service import start_backup_scheduler
 from backend.services.ssl_service import start_ssl_renewal_scheduler
 from backend.services.monitoring_service import start_monitoring_scheduler
+from backend.services.dns_service import start_dns_verification_scheduler
+from backend.services.php_service import start_php_pool_autosize_scheduler
+from backend.services.traffic_service import start_traffic_ingest_scheduler
+from backend.services.domain_log_service import domain_log_writer
+from backend.services.file_system_service import FileSystemService
+from backend.utils.directory_cache import InvalidListingRequest
 import logging
 
 load_dotenv()
@@ -143,22 +149,50 @@ def read_email_accounts(
 # File management routes
 @app.get("/api/files/")
 def list_files(
+    domain_id: int,
     path: str = "/",
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = "name",
+    order: str = "asc",
+    pattern: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    # Implement file listing logic
-    return {"message": "File listing endpoint"}
+    """Dizin içeriğini sayfalı listele"""
+    try:
+        return FileSystemService(db).list_directory(
+            domain_id=domain_id,
+            path=path,
+            cursor=cursor,
+            limit=limit,
+            sort=sort,
+            order=order,
+            pattern=pattern
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except InvalidListingRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @app.post("/api/files/upload")
 def upload_file(
-    file: UploadFile,
+    domain_id: int,
     path: str,
+    file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    # Implement file upload logic
-    return {"message": "File upload endpoint"}
+    """Küçük dosyaları tek istekte yükle; büyük dosyalar için /api/file-system/{domain_id}/uploads kullanılmalı"""
+    try:
+        saved_path = FileSystemService(db).save_file(domain_id, path, file.file)
+        return {"message": "File uploaded successfully", "path": saved_path}
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 # Include routers with rate limits
 app.include_router(
@@ -338,6 +372,19 @@ app.include_router(
     dependencies=[Depends(rate_limit("5/minute"))]
 )
 
+# Routerların kendi /api/file-system öneki var
+app.include_router(
+    file_system.router,
+    tags=["file-system"],
+    dependencies=[Depends(rate_limit("30/minute"))]
+)
+
+# Parçalı yüklemenin her parçası ayrı bir istek; router geneli sınır uygulanmaz
+app.include_router(
+    file_system.upload_router,
+    tags=["file-system"]
+)
+
 app.include_router(
     webhooks.router,
     prefix="/api",
@@ -352,6 +399,27 @@ app.include_router(
     dependencies=[Depends(rate_limit("5/minute"))]
 )
 
+app.include_router(
+    php.router,
+    prefix="/api",
+    tags=["php"],
+    dependencies=[Depends(rate_limit("10/minute"))]
+)
+
+app.include_router(
+    web_server.router,
+    prefix="/api",
+    tags=["web-server"],
+    dependencies=[Depends(rate_limit("10/minute"))]
+)
+
+app.include_router(
+    traffic.router,
+    prefix="/api",
+    tags=["traffic"],
+    dependencies=[Depends(rate_limit("30/minute"))]
+)
+
 @app.get("/")
 @rate_limit("5/minute")
 async def root(request: Request):
@@ -362,10 +430,18 @@ async def root(request: Request):
         "version": "1.0.0"
     }
 
+@app.on_event("shutdown")
+def flush_domain_logs():
+    """Kuyrukta bekleyen domain loglarını kapanmadan önce yaz"""
+    domain_log_writer.close()
+
 # Zamanlayıcıları başlat
 start_backup_scheduler()
 start_ssl_renewal_scheduler()
 start_monitoring_scheduler()
+start_dns_verification_scheduler()
+start_php_pool_autosize_scheduler()
+start_traffic_ingest_scheduler()
 
 if __name__ == "__main__":
     import uvicorn
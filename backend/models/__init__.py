@@ -6,6 +6,13 @@ from backend.models.ssh_server import SSHServer
 from backend.models.file_permission import FilePermission
 from backend.models.service_plan import ServicePlan
 from backend.models.notification_page import NotificationPage
+from backend.models.file_upload import FileUpload
+from backend.models.ssl_certificate import SSLCertificate
+from backend.models.php_pool_metric import PHPPoolMetric
+from backend.models.vhost_settings import VhostSettings
+from backend.models.traffic_stat import TrafficStat
+from backend.models.log_offset import LogOffset
+from backend.models.domain_log import DomainLog
 
 __all__ = [
     'User',
@@ -15,5 +22,12 @@ __all__ = [
     'SSHServer',
     'FilePermission',
     'ServicePlan',
-    'NotificationPage'
+    'NotificationPage',
+    'FileUpload',
+    'SSLCertificate',
+    'PHPPoolMetric',
+    'VhostSettings',
+    'TrafficStat',
+    'LogOffset',
+    'DomainLog'
 ] 
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from backend.database import Base
+
+class DomainLog(Base):
+    __tablename__ = "domain_logs"
+
+    id = Column(Integer, primary_key=True, index=True)  # Canlı akışta imleç olarak kullanılır
+    domain_id = Column(Integer, ForeignKey("domains.id"), index=True)
+    type = Column(String(50))
+    message = Column(Text)
+    source = Column(String(100))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    # İlişkiler
+    domain = relationship("Domain")
+
+    __table_args__ = (
+        # İmleçten sonraki kayıtlar: domain_id = ? AND id > ?
+        Index("ix_domain_logs_domain_id_id", "domain_id", "id"),
+    )
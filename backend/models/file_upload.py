@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from backend.database import Base
+
+class FileUpload(Base):
+    __tablename__ = "file_uploads"
+
+    id = Column(String(32), primary_key=True)  # İstemciye verilen yükleme kimliği
+    domain_id = Column(Integer, ForeignKey("domains.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    target_path = Column(String(1024))
+    part_path = Column(String(1024))
+    length = Column(BigInteger)
+    offset = Column(BigInteger, default=0)
+    status = Column(String(20), default="in_progress")  # in_progress, completed, cancelled
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # İlişkiler
+    domain = relationship("Domain")
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger
+from sqlalchemy.sql import func
+from backend.database import Base
+
+class LogOffset(Base):
+    __tablename__ = "log_offsets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String(512), unique=True, index=True)
+    inode = Column(BigInteger, nullable=True)
+    offset = Column(BigInteger, default=0)  # Son işlenen tam satırın sonu
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
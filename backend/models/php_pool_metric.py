@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from backend.database import Base
+
+class PHPPoolMetric(Base):
+    __tablename__ = "php_pool_metrics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain_id = Column(Integer, ForeignKey("domains.id"), nullable=True, index=True)
+    pool = Column(String(255))
+    php_version = Column(String(10))
+    process_manager = Column(String(20), nullable=True)
+
+    # Anlık değerler
+    listen_queue = Column(Integer, default=0)
+    max_listen_queue = Column(Integer, default=0)
+    active_processes = Column(Integer, default=0)
+    idle_processes = Column(Integer, default=0)
+    total_processes = Column(Integer, default=0)
+
+    # Önceki örnekten bu yana farklar
+    requests = Column(Integer, default=0)
+    max_children_reached = Column(Integer, default=0)
+    slow_requests = Column(Integer, default=0)
+
+    saturated = Column(Boolean, default=False, index=True)
+    saturation_reasons = Column(String(255), nullable=True)
+    error = Column(String(255), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+
+    # İlişkiler
+    domain = relationship("Domain")
+
+    __table_args__ = (
+        # Havuz başına zaman serisi sorguları
+        Index("ix_php_pool_metrics_pool_created_at", "pool", "created_at"),
+    )
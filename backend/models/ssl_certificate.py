@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, BigInteger, Text, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from backend.database import Base
+
+class SSLCertificate(Base):
+    __tablename__ = "ssl_certificates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain_id = Column(Integer, ForeignKey("domains.id"), index=True)
+    type = Column(String(20), default="letsencrypt")
+    status = Column(String(20), default="pending")  # pending, active, renewed, failed, expired
+    is_wildcard = Column(Boolean, default=False)
+    issued_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True, index=True)
+    renewed_at = Column(DateTime, nullable=True)
+    renewed_by = Column(Integer, ForeignKey("ssl_certificates.id"), nullable=True)
+    path = Column(String(1024), nullable=True)
+    key_path = Column(String(1024), nullable=True)
+
+    # Sertifika dosyasından okunan bilgiler (envanter tarafından güncellenir)
+    subject = Column(String(255), nullable=True)
+    issuer = Column(String(255), nullable=True)
+    san = Column(Text, nullable=True)  # Virgülle ayrılmış DNS isimleri
+    fingerprint = Column(String(64), nullable=True, index=True)  # SHA-256, hex
+    file_mtime = Column(BigInteger, nullable=True)  # Son okunan dosyanın mtime değeri (ns)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # İlişkiler
+    domain = relationship("Domain")
+
+    __table_args__ = (
+        # Yenileme taraması ve panolar: durum + bitiş tarihine göre sıralı erişim
+        Index("ix_ssl_certificates_status_expires_at", "status", "expires_at"),
+    )
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, BigInteger, Float, JSON, UniqueConstraint
+from sqlalchemy.orm import relationship
+from backend.database import Base
+
+class TrafficStat(Base):
+    __tablename__ = "traffic_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain_id = Column(Integer, ForeignKey("domains.id"), index=True)
+    minute = Column(DateTime, index=True)  # UTC dakika başı
+
+    requests = Column(Integer, default=0)
+    bytes = Column(BigInteger, default=0)
+    status_2xx = Column(Integer, default=0)
+    status_3xx = Column(Integer, default=0)
+    status_4xx = Column(Integer, default=0)
+    status_5xx = Column(Integer, default=0)
+    status_other = Column(Integer, default=0)
+
+    top_urls = Column(JSON, default=list)  # [[yol, istek], ...]
+    top_ips = Column(JSON, default=list)
+    latency_histogram = Column(JSON, default=list)  # access_log.LATENCY_BUCKETS kovaları
+    upstream_p50 = Column(Float, nullable=True)  # ms
+    upstream_p95 = Column(Float, nullable=True)
+
+    # İlişkiler
+    domain = relationship("Domain")
+
+    __table_args__ = (
+        UniqueConstraint("domain_id", "minute", name="uq_traffic_stats_domain_minute"),
+    )
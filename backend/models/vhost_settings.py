@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from backend.database import Base
+
+class VhostSettings(Base):
+    __tablename__ = "vhost_settings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain_id = Column(Integer, ForeignKey("domains.id"), unique=True, index=True)
+    options = Column(JSON, default=dict)  # Varsayılanlardan farklı vhost performans seçenekleri
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # İlişkiler
+    domain = relationship("Domain")
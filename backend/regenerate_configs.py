@@ -0,0 +1,40 @@
+"""Tüm nginx vhost ve PHP-FPM havuz dosyalarını şablondan yeniden üretir.
+
+Kullanım: python -m backend.regenerate_configs [--dry-run] [--diff] [--no-pools]
+"""
+import sys
+import logging
+from backend.database import SessionLocal
+from backend.services.web_server_service import WebServerService
+from backend.services.php_service import PHPService
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def print_summary(title, result):
+    print(f"{title}: {len(result['created'])} created, {len(result['updated'])} updated, "
+          f"{len(result['removed'])} removed, {result['unchanged']} unchanged, {len(result['errors'])} errors")
+    for label in ("created", "updated", "removed"):
+        for path in result[label]:
+            print(f"  {label[0].upper()} {path}")
+    for name, error in result["errors"].items():
+        print(f"  ! {name}: {error}")
+    if result.get("diff"):
+        print(result["diff"])
+
+
+def main():
+    args = sys.argv[1:]
+    dry_run = "--dry-run" in args
+    with_diff = "--diff" in args
+    db = SessionLocal()
+    try:
+        print_summary("nginx", WebServerService(db).regenerate_nginx_vhosts(dry_run, with_diff))
+        if "--no-pools" not in args:
+            print_summary("php-fpm", PHPService(db).regenerate_pools(dry_run, with_diff))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Optional
+from typing import List, Dict, Literal, Optional
 from ..database import get_db
-from ..services.dns_service import DNSService
+from ..services.dns_service import DNSService, fleet_verification
+from ..utils.zone_file import ZoneParseError
 from ..models import DNSRecord, SPFRecord, DKIMRecord, DMARCRecord, DNSType
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError, parse_obj_as
 from datetime import datetime
+import io
+import json
+import os
+import tempfile
 
 router = APIRouter(
     prefix="/api/dns",
     tags=["dns"]
 )
 
+MAX_ZONE_SIZE = int(os.getenv("MAX_ZONE_SIZE", str(10 * 1024 * 1024)))
+
 # Request Models
 class DNSRecordCreate(BaseModel):
     name: str
@@ -43,6 +52,23 @@ class DMARCRecordCreate(BaseModel):
     report_aggregate: Optional[str] = None
     report_forensic: Optional[str] = None
 
+class DNSChange(BaseModel):
+    action: Literal["create", "update", "delete"]
+    record_id: Optional[int] = None
+    name: Optional[str] = None
+    type: Optional[DNSType] = None
+    content: Optional[str] = None
+    ttl: Optional[int] = None
+    priority: Optional[int] = None
+
+class DNSChangeSetRequest(BaseModel):
+    changes: List[DNSChange]
+
+class MailRecordsCreate(BaseModel):
+    spf: Optional[SPFRecordCreate] = None
+    dkim: Optional[DKIMRecordCreate] = None
+    dmarc: Optional[DMARCRecordCreate] = None
+
 # Response Models
 class DNSRecordResponse(BaseModel):
     id: int
@@ -99,6 +125,24 @@ class DMARCRecordResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class DNSChangeSetResponse(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+
+class MailRecordsResponse(BaseModel):
+    spf: Optional[SPFRecordResponse] = None
+    dkim: Optional[DKIMRecordResponse] = None
+    dmarc: Optional[DMARCRecordResponse] = None
+
+class ZoneImportResponse(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    unchanged: int
+    dry_run: bool
+    changes: Optional[Dict[str, List[Dict]]] = None
+
 class DNSVerificationResponse(BaseModel):
     spf: Dict
     dkim: Dict
@@ -261,15 +305,207 @@ def create_dmarc_record(
             detail=str(e)
         )
 
+@router.post("/changes/{domain_id}", response_model=DNSChangeSetResponse)
+def apply_dns_changes(
+    domain_id: int,
+    request: DNSChangeSetRequest,
+    db: Session = Depends(get_db)
+):
+    """Birden fazla DNS değişikliğini tek seri artışıyla uygula"""
+    for change in request.changes:
+        if change.action == "create" and (not change.name or not change.type or change.content is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Create changes require name, type and content"
+            )
+        if change.action in ("update", "delete") and change.record_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{change.action.capitalize()} changes require record_id"
+            )
+        if change.action == "update" and change.content is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Update changes require content"
+            )
+
+    service = DNSService(db)
+    try:
+        return service.apply_changes(domain_id, [change.dict() for change in request.changes])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.post("/mail/{domain_id}", response_model=MailRecordsResponse)
+def provision_mail_records(
+    domain_id: int,
+    request: MailRecordsCreate,
+    db: Session = Depends(get_db)
+):
+    """SPF, DKIM ve DMARC kayıtlarını tek seferde oluştur"""
+    service = DNSService(db)
+    try:
+        return service.provision_mail_records(
+            domain_id=domain_id,
+            spf=request.spf.dict() if request.spf else None,
+            dkim=request.dkim.dict() if request.dkim else None,
+            dmarc=request.dmarc.dict() if request.dmarc else None
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/zone/{domain_id}")
+def export_zone(
+    domain_id: int,
+    format: str = Query("bind", regex="^(bind|json)$"),
+    db: Session = Depends(get_db)
+):
+    """Zone kayıtlarını BIND zone dosyası ya da JSON olarak dışa aktar"""
+    service = DNSService(db)
+    try:
+        if format == "json":
+            return service.export_zone(domain_id)
+        lines = service.export_zone_file(domain_id)
+        return StreamingResponse(lines, media_type="text/plain; charset=utf-8")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.put("/zone/{domain_id}", response_model=ZoneImportResponse)
+async def import_zone(
+    domain_id: int,
+    request: Request,
+    replace: bool = True,
+    dry_run: bool = False,
+    db: Session = Depends(get_db)
+):
+    """BIND zone dosyası ya da JSON kayıt listesini içe aktar; yalnızca fark uygulanır"""
+    # Gövde belleğe alınmadan diske taşan geçici dosyaya yazılır
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > MAX_ZONE_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Zone file too large"
+                )
+            spool.write(chunk)
+        spool.seek(0)
+
+        zone_file = None
+        records = None
+        if request.headers.get("content-type", "").startswith("application/json"):
+            try:
+                records = [r.dict() for r in parse_obj_as(List[DNSRecordCreate], json.load(spool))]
+            except (ValueError, ValidationError) as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+        else:
+            zone_file = io.TextIOWrapper(spool, encoding="utf-8", errors="strict")
+
+        service = DNSService(db)
+        return await run_in_threadpool(
+            service.import_zone,
+            domain_id,
+            zone_file=zone_file,
+            records=records,
+            replace=replace,
+            dry_run=dry_run
+        )
+    except (ZoneParseError, UnicodeDecodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    finally:
+        spool.close()
+
+@router.get("/propagation/{domain_id}")
+async def check_propagation(
+    domain_id: int,
+    nameserver: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Kayıtların tüm isim sunucularına yayılıp yayılmadığını kontrol et"""
+    service = DNSService(db)
+    try:
+        return await service.check_propagation(domain_id, nameservers=nameserver)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/verify/fleet")
+def get_fleet_verification(
+    only_failing: bool = False
+):
+    """Son toplu DNS doğrulamasının sonuçlarını getir"""
+    results = fleet_verification["results"]
+    if only_failing:
+        results = {
+            name: result for name, result in results.items()
+            if any(check["status"] != "valid" for check in result.values())
+        }
+    return {
+        "checked_at": fleet_verification["checked_at"],
+        "duration": fleet_verification["duration"],
+        "total": len(fleet_verification["results"]),
+        "results": results
+    }
+
 @router.get("/verify/{domain_id}", response_model=DNSVerificationResponse)
-def verify_dns_records(
+async def verify_dns_records(
     domain_id: int,
     db: Session = Depends(get_db)
 ):
     """DNS kayıtlarını doğrula"""
     service = DNSService(db)
     try:
-        return service.verify_dns_records(domain_id)
+        return await service.verify_dns_records(domain_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
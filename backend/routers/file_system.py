@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Header, Response
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+import json
+import queue
+from urllib.parse import quote
+import threading
 from ..database import get_db
 from ..services.file_system_service import FileSystemService
+from ..services.dedup_service import DedupService
+from ..services.upload_service import (
+    UploadService, UploadOffsetMismatch, UploadChecksumMismatch, UploadTooLarge, InvalidUploadChecksum
+)
+from ..auth import get_current_user
+from ..utils.archive import archive_format
+from ..utils.directory_cache import InvalidListingRequest
 from ..models import FilePermission
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/file-system", tags=["file-system"])
+# Yükleme parçası istekleri; çok sayıda PATCH gönderildiğinden ayrı sınırla bağlanır
+upload_router = APIRouter(prefix="/api/file-system", tags=["file-system"])
 
 class FilePermissionCreate(BaseModel):
     path: str
@@ -25,6 +40,32 @@ class FilePermissionResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class ExtractRequest(BaseModel):
+    source_path: str
+    destination_path: str
+    workers: int = 1
+    stream: bool = False
+
+class DedupCompactRequest(BaseModel):
+    domain_ids: Optional[List[int]] = None
+    allow_hardlinks: bool = False
+
+class UploadCreate(BaseModel):
+    path: str
+    length: int
+    overwrite: bool = False
+
+class UploadResponse(BaseModel):
+    id: str
+    domain_id: int
+    target_path: str
+    length: int
+    offset: int
+    status: str
+
+    class Config:
+        orm_mode = True
+
 @router.post("/{domain_id}/setup", status_code=status.HTTP_201_CREATED)
 def setup_domain_directory(domain_id: int, db: Session = Depends(get_db)):
     """Domain için dosya sistemi yapılandırması oluştur"""
@@ -68,4 +109,267 @@ def get_file_permissions(domain_id: int, path: str, db: Session = Depends(get_db
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+@router.get("/{domain_id}/list", response_model=Dict[str, Any])
+def list_directory(
+    domain_id: int,
+    path: str = "/",
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = Query("name", regex="^(name|size|modified|type)$"),
+    order: str = Query("asc", regex="^(asc|desc)$"),
+    pattern: Optional[str] = None,
+    file_type: str = Query("all", regex="^(all|file|directory)$"),
+    show_hidden: bool = True,
+    stream: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Dizin içeriğini listele"""
+    service = FileSystemService(db)
+    try:
+        if stream:
+            # Sıralama olmadan, satır satır JSON (NDJSON) olarak akıt
+            entries = service.stream_directory(domain_id, path, pattern, file_type, show_hidden)
+            first = next(entries, None)
+            return StreamingResponse(
+                _ndjson(first, entries),
+                media_type="application/x-ndjson"
+            )
+        return service.list_directory(
+            domain_id=domain_id,
+            path=path,
+            cursor=cursor,
+            limit=limit,
+            sort=sort,
+            order=order,
+            pattern=pattern,
+            file_type=file_type,
+            show_hidden=show_hidden
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except InvalidListingRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _ndjson(first, entries):
+    if first is None:
+        return
+    yield json.dumps(first) + "\n"
+    for entry in entries:
+        yield json.dumps(entry) + "\n"
+
+# Parçalı yükleme (tus benzeri protokol)
+@router.post("/{domain_id}/uploads", response_model=UploadResponse, status_code=status.HTTP_201_CREATED)
+def create_upload(
+    domain_id: int,
+    request: UploadCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Yeni yükleme oturumu oluştur"""
+    service = UploadService(db)
+    try:
+        upload = service.create_upload(
+            domain_id=domain_id,
+            user_id=current_user.id,
+            path=request.path,
+            length=request.length,
+            overwrite=request.overwrite
+        )
+        response.headers["Location"] = f"/api/file-system/uploads/{upload.id}"
+        response.headers["Upload-Offset"] = str(upload.offset)
+        return upload
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except FileExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@upload_router.head("/uploads/{upload_id}")
+def get_upload_offset(upload_id: str, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Yüklemenin kaldığı offseti döndür"""
+    try:
+        upload = UploadService(db).get_upload(upload_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(headers={
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length),
+        "Cache-Control": "no-store"
+    })
+
+@upload_router.get("/uploads/{upload_id}", response_model=UploadResponse)
+def get_upload(upload_id: str, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Yükleme durumunu getir"""
+    try:
+        return UploadService(db).get_upload(upload_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@upload_router.patch("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def append_upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(...),
+    upload_checksum: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Yüklemeye yeni bir parça ekle; gövde multipart olmadan doğrudan diske akar"""
+    service = UploadService(db)
+    try:
+        upload = await service.append_chunk(
+            upload_id=upload_id,
+            offset=upload_offset,
+            chunks=request.stream(),
+            checksum=upload_checksum,
+            user_id=current_user.id
+        )
+    except ClientDisconnect:
+        # Yazılabilen kısım kaydedildi, istemci HEAD ile offseti sorgulayıp devam eder
+        raise HTTPException(status_code=400, detail="Client disconnected")
+    except InvalidUploadChecksum as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadChecksumMismatch as e:
+        raise HTTPException(status_code=460, detail=str(e))
+    except UploadOffsetMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={"Upload-Offset": str(upload.offset)}
+    )
+
+@upload_router.delete("/uploads/{upload_id}")
+def cancel_upload(upload_id: str, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Yüklemeyi iptal et"""
+    try:
+        UploadService(db).cancel_upload(upload_id, current_user.id)
+        return {"message": "Upload cancelled"}
+    except UploadOffsetMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/{domain_id}/extract")
+def extract_archive(domain_id: int, request: ExtractRequest, db: Session = Depends(get_db)):
+    """Arşivi çıkar; stream=true ise üye bazında ilerlemeyi NDJSON olarak akıt"""
+    service = FileSystemService(db)
+    workers = max(1, min(request.workers, 8))
+
+    if not request.stream:
+        try:
+            return service.extract_archive(domain_id, request.source_path, request.destination_path, workers)
+        except PermissionError as e:
+            raise HTTPException(status_code=403, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # Sınırlı kuyruk: istemci yavaş okursa çıkarma da yavaşlar
+    events = queue.Queue(maxsize=1000)
+    cancelled = threading.Event()
+
+    def emit(event):
+        # İstemci bağlantıyı kapatırsa kuyruk boşalmaz; bekleme iptalle sona erer
+        while not cancelled.is_set():
+            try:
+                events.put(event, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def progress(name, size, index, total):
+        emit({"member": name, "bytes": size, "index": index, "total": total})
+
+    def run():
+        try:
+            result = service.extract_archive(
+                domain_id, request.source_path, request.destination_path, workers, progress, cancelled
+            )
+            emit({"done": True, **result})
+        except Exception as e:
+            emit({"done": False, "error": str(e)})
+        finally:
+            emit(None)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    def stream():
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    break
+                yield json.dumps(event) + "\n"
+        finally:
+            # Yarıda kalan çıkarma durdurulur, oluşturulan dosyalar temizlenir
+            cancelled.set()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/{domain_id}/download")
+def download_archive(
+    domain_id: int,
+    path: str,
+    format: str = Query("zip", regex="^(zip|tar\\.gz|tar)$"),
+    store: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Seçilen dizini anında arşivleyip istemciye akıt"""
+    service = FileSystemService(db)
+    try:
+        filename, chunks = service.archive_stream(domain_id, path, format, store)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    # store=true ile tar.gz sıkıştırılmadan düz tar olarak gönderilir
+    format = archive_format(format, store)
+    media_type = "application/zip" if format == "zip" else "application/x-tar"
+    if format == "tar.gz":
+        media_type = "application/gzip"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
+
+@router.get("/dedup/report", response_model=Dict[str, Any])
+def dedup_report(
+    domain_ids: Optional[List[int]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Domainler arası yinelenen dosya raporu"""
+    try:
+        return DedupService(db).scan(domain_ids, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/dedup/compact", response_model=Dict[str, Any])
+def dedup_compact(request: DedupCompactRequest, db: Session = Depends(get_db)):
+    """Yinelenen dosyaları birleştir (isteğe bağlı)"""
+    try:
+        return DedupService(db).compact(request.domain_ids, request.allow_hardlinks)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 import os
 import shutil
 import xml.etree.ElementTree as ET
-import tarfile
 import zipfile
 import json
+import tempfile
 from datetime import datetime
 from ..database import get_db
+from ..auth import get_current_user
 from ..models import Customer, Domain, EmailAccount, Database, SSL
+from ..services.upload_service import UploadService
+from ..utils.archive import ArchiveExtractor
 from sqlalchemy.orm import Session
 import logging
 
@@ -19,19 +23,24 @@ logger = logging.getLogger(__name__)
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-async def process_cpanel_import(file_path: str, db: Session):
+IMPORT_MAX_EXTRACTED_SIZE = int(os.getenv("IMPORT_MAX_EXTRACTED_SIZE", str(100 * 1024 ** 3)))
+IMPORT_MAX_MEMBERS = int(os.getenv("IMPORT_MAX_MEMBERS", "2000000"))
+IMPORT_EXTRACT_WORKERS = int(os.getenv("IMPORT_EXTRACT_WORKERS", "4"))
+
+async def process_cpanel_import(file_path: str, db: Session, work_dir: str = UPLOAD_DIR):
     """cPanel dışa aktarma dosyasını işle"""
     try:
-        # Dosya türünü belirle
-        if file_path.endswith('.tar.gz'):
-            with tarfile.open(file_path, 'r:gz') as tar:
-                tar.extractall(path=UPLOAD_DIR)
-        elif file_path.endswith('.zip'):
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(UPLOAD_DIR)
+        # Arşivi üye üye, boyut ve üye sayısı sınırlarıyla çıkar
+        extractor = ArchiveExtractor(
+            max_total_size=IMPORT_MAX_EXTRACTED_SIZE,
+            max_members=IMPORT_MAX_MEMBERS,
+            workers=IMPORT_EXTRACT_WORKERS
+        )
+        result = await run_in_threadpool(extractor.extract, file_path, work_dir)
+        logger.info(f"cPanel arşivi çıkarıldı: {result['members']} üye, {result['bytes']} bayt")
 
         # cPanel yapılandırma dosyasını bul
-        config_file = os.path.join(UPLOAD_DIR, 'cpanel.json')
+        config_file = os.path.join(work_dir, 'cpanel.json')
         if not os.path.exists(config_file):
             raise HTTPException(status_code=400, detail="Geçersiz cPanel dışa aktarma dosyası")
 
@@ -175,41 +184,67 @@ async def process_plesk_import(file_path: str, db: Session):
 
 @router.post("/import")
 async def import_data(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    type: str = "cpanel"
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = None,
+    type: str = "cpanel",
+    current_user = Depends(get_current_user)
 ):
-    """Dışa aktarma dosyasını içe aktar"""
+    """Dışa aktarma dosyasını içe aktar
+
+    Büyük arşivler önce /api/file-system/{domain_id}/uploads ile parçalı
+    yüklenip `upload_id` ile verilebilir; bu durumda dosya yeniden kopyalanmaz.
+    """
+    work_dir = None
     try:
+        # Veritabanı bağlantısını al
+        db = next(get_db())
+
+        if upload_id:
+            try:
+                upload = UploadService(db).get_upload(upload_id, current_user.id)
+            except ValueError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            if upload.status != "completed":
+                raise HTTPException(status_code=400, detail="Yükleme henüz tamamlanmadı")
+            file_path = upload.target_path
+            filename = os.path.basename(file_path)
+        elif file is not None:
+            filename = file.filename
+        else:
+            raise HTTPException(status_code=400, detail="Dosya veya upload_id gerekli")
+
         # Dosya uzantısını kontrol et
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if type == "cpanel" and file_ext not in ['.tar.gz', '.zip']:
-            raise HTTPException(status_code=400, detail="Geçersiz dosya formatı. TAR.GZ veya ZIP dosyası yükleyin.")
-        elif type == "plesk" and file_ext not in ['.xml', '.zip']:
+        lower_name = filename.lower()
+        if type == "cpanel" and not lower_name.endswith(('.tar.gz', '.tar.zst', '.zip')):
+            raise HTTPException(status_code=400, detail="Geçersiz dosya formatı. TAR.GZ, TAR.ZST veya ZIP dosyası yükleyin.")
+        elif type == "plesk" and not lower_name.endswith(('.xml', '.zip')):
             raise HTTPException(status_code=400, detail="Geçersiz dosya formatı. XML veya ZIP dosyası yükleyin.")
 
-        # Dosyayı kaydet
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Her içe aktarma kendi çalışma dizinini kullanır; eşzamanlı işlemler çakışmaz
+        work_dir = tempfile.mkdtemp(dir=UPLOAD_DIR)
 
-        # Veritabanı bağlantısını al
-        db = next(get_db())
+        if not upload_id:
+            # Dosyayı kaydet
+            file_path = os.path.join(work_dir, os.path.basename(filename))
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer, 1024 * 1024)
 
         # İçe aktarma işlemini başlat
         if type == "cpanel":
-            success = await process_cpanel_import(file_path, db)
+            success = await process_cpanel_import(file_path, db, work_dir)
         else:
             success = await process_plesk_import(file_path, db)
 
-        # Geçici dosyaları temizle
-        background_tasks.add_task(lambda: os.remove(file_path))
-        background_tasks.add_task(lambda: shutil.rmtree(UPLOAD_DIR, ignore_errors=True))
-
         return JSONResponse(
             content={"success": success, "message": "İçe aktarma başarıyla tamamlandı"}
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"İçe aktarma hatası: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Geçici dosyalar (çıkarılmış arşiv dahil) hata durumunda da temizlenir
+        if work_dir:
+            await run_in_threadpool(shutil.rmtree, work_dir, True)
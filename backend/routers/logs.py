@@ -1,17 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from typing import List, Optional
+from ..database import get_db, SessionLocal
 from .. import models, schemas
 from ..auth import get_current_user
+from ..utils.log_broker import LAGGED, DeliveryTracker, log_broker
+from ..utils.batch_writer import WriterBusy
+from ..services.domain_log_service import domain_log_writer
+import os
 import asyncio
-import json
-from datetime import datetime, timedelta
+from datetime import datetime
 
 router = APIRouter()
 
-# WebSocket bağlantılarını tutacak sözlük
-active_connections = {}
+# Yeniden bağlanan istemciye imleçten sonra gönderilecek en fazla kayıt
+BACKLOG_LIMIT = 1000
+
+# Toplu uç noktada istek başına en fazla kayıt
+BULK_LIMIT = 5000
+
+# Geç commit edilen kayıtlar için imlecin altında yeniden okunan kimlik aralığı
+REORDER_WINDOW = int(os.getenv("LOG_STREAM_REORDER_WINDOW", "1000"))
+
+def _log_event(log: models.DomainLog) -> dict:
+    return jsonable_encoder(schemas.DomainLog.from_orm(log))
+
+def _load_backlog(domain_id: int, cursor: Optional[int], limit: int = BACKLOG_LIMIT) -> List[dict]:
+    """İmleçten sonraki kayıtlar (imleç yoksa son 100 kayıt), eskiden yeniye"""
+    db = SessionLocal()
+    try:
+        query = db.query(models.DomainLog).filter(models.DomainLog.domain_id == domain_id)
+        if cursor is None:
+            logs = query.order_by(models.DomainLog.id.desc()).limit(100).all()[::-1]
+        else:
+            logs = query.filter(models.DomainLog.id > cursor)\
+                .order_by(models.DomainLog.id)\
+                .limit(limit)\
+                .all()
+        return [_log_event(log) for log in logs]
+    finally:
+        db.close()
 
 @router.get("/domains/{domain_id}/logs", response_model=List[schemas.DomainLog])
 def get_domain_logs(
@@ -64,39 +94,100 @@ def create_domain_log(
     db.commit()
     db.refresh(db_log)
     
-    # WebSocket bağlantılarına yeni log'u gönder
-    if domain_id in active_connections:
-        for connection in active_connections[domain_id]:
-            asyncio.create_task(connection.send_json(db_log.dict()))
+    # Aboneler yalnızca yeni kaydı alır
+    log_broker.publish(domain_id, _log_event(db_log))
     
     return db_log
 
+@router.post("/logs/bulk", status_code=202)
+def create_domain_logs_bulk(
+    payload: schemas.DomainLogBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Queue many domain log entries for buffered multi-row insertion.
+
+    Kayıtlar arka plandaki yazıcıya verilir ve gruplar halinde yazılır;
+    yazıcı kuyruğu doluysa 503 ve Retry-After döner.
+    """
+    if len(payload.entries) > BULK_LIMIT:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_LIMIT} entries per request")
+    if not payload.entries:
+        return {"accepted": 0, "pending": domain_log_writer.pending}
+
+    domain_ids = {entry.domain_id for entry in payload.entries}
+    existing = {domain_id for (domain_id,) in db.query(models.Domain.id).filter(models.Domain.id.in_(domain_ids))}
+    missing = sorted(domain_ids - existing)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Domains not found: {missing}")
+
+    try:
+        accepted = domain_log_writer.submit([entry.dict() for entry in payload.entries])
+    except WriterBusy as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Log writer is busy, retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    return {"accepted": accepted, "pending": domain_log_writer.pending}
+
 @router.websocket("/ws/domains/{domain_id}/logs")
-async def websocket_endpoint(websocket: WebSocket, domain_id: int, db: Session = Depends(get_db)):
-    """WebSocket endpoint for real-time log updates"""
+async def websocket_endpoint(websocket: WebSocket, domain_id: int, cursor: Optional[int] = None):
+    """WebSocket endpoint for real-time log updates.
+
+    İlk mesaj imleçten sonraki kayıtları (imleç yoksa son 100 kaydı)
+    içerir; ardından yalnızca yeni kayıtlar gönderilir. Her mesaj eskiden
+    yeniye sıralı bir listedir; istemci son aldığı `id` değerini `cursor`
+    parametresiyle vererek kaldığı yerden devam eder.
+
+    Kimlikler commit sırasına göre artmayabilir: toplu yazım sürerken tek
+    kayıt eklenirse küçük kimlikli kayıtlar daha sonra görünür. Bağlantı
+    açıkken bunlar da gönderilir (bkz. DeliveryTracker); ancak yeniden
+    bağlanırken verilen imlecin altında sonradan commit edilen kayıtlar
+    gönderilmez.
+    """
     await websocket.accept()
-    
-    # Bağlantıyı kaydet
-    if domain_id not in active_connections:
-        active_connections[domain_id] = []
-    active_connections[domain_id].append(websocket)
-    
-    try:
-        while True:
-            # Son 100 log'u gönder
-            logs = db.query(models.DomainLog)\
-                .filter(models.DomainLog.domain_id == domain_id)\
-                .order_by(models.DomainLog.created_at.desc())\
-                .limit(100)\
-                .all()
-            
-            await websocket.send_json([log.dict() for log in logs])
-            
-            # Bağlantıyı canlı tut
-            await asyncio.sleep(1)
-            
-    except WebSocketDisconnect:
-        # Bağlantı koptuğunda listeyi güncelle
-        active_connections[domain_id].remove(websocket)
-        if not active_connections[domain_id]:
-            del active_connections[domain_id] 
\ No newline at end of file
+
+    # Önce abone olunur, sonra geçmiş okunur; aradaki kayıtlar ayıklanır
+    async with log_broker.subscribe(domain_id) as subscription:
+        tracker = DeliveryTracker(cursor, REORDER_WINDOW)
+
+        async def send(events: List[dict]) -> None:
+            events = tracker.fresh(events)
+            if not events:
+                return
+            await websocket.send_json(events)
+            tracker.mark(events)
+
+        backlog = await run_in_threadpool(_load_backlog, domain_id, cursor)
+        if cursor is None:
+            await websocket.send_json(backlog)
+            tracker.mark(backlog)
+        else:
+            await send(backlog)
+
+        receive = asyncio.ensure_future(websocket.receive())
+        get = asyncio.ensure_future(subscription.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait({receive, get}, return_when=asyncio.FIRST_COMPLETED)
+                # Olaylar önce gönderilir; aynı anda gelen istemci mesajı onları düşürmez
+                if get in done:
+                    events = get.result()
+                    if events is LAGGED:
+                        # Kuyruk taştı; kaçırılan ve geç commit edilen kayıtlar veritabanından okunur
+                        events = await run_in_threadpool(
+                            _load_backlog, domain_id, tracker.floor, BACKLOG_LIMIT + REORDER_WINDOW
+                        )
+                    await send(events)
+                    get = asyncio.ensure_future(subscription.get())
+                if receive in done:
+                    if receive.result()["type"] == "websocket.disconnect":
+                        break
+                    # İstemci mesajları (ping) yok sayılır
+                    receive = asyncio.ensure_future(websocket.receive())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receive.cancel()
+            get.cancel()
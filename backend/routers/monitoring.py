@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database import get_db
-from ..models import ServerMetric, SecurityAlert, IPBlock, SystemUpdate, MalwareScan, MalwareThreat
+from ..models import ServerMetric, SecurityAlert, IPBlock, SystemUpdate, MalwareScan, MalwareThreat, PHPPoolMetric
 from ..auth import get_current_user
 from ..services.monitoring_service import MonitoringService
 from pydantic import BaseModel
@@ -114,10 +115,68 @@ async def get_metrics(
     
     return query.order_by(ServerMetric.created_at.desc()).all()
 
+class PHPPoolMetricResponse(BaseModel):
+    id: int
+    domain_id: Optional[int]
+    pool: str
+    php_version: str
+    process_manager: Optional[str]
+    listen_queue: int
+    max_listen_queue: int
+    active_processes: int
+    idle_processes: int
+    total_processes: int
+    requests: int
+    max_children_reached: int
+    slow_requests: int
+    saturated: bool
+    saturation_reasons: Optional[str]
+    error: Optional[str]
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+@router.get("/php-pools", response_model=List[PHPPoolMetricResponse])
+async def get_php_pools(
+    saturated_only: bool = False,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Her PHP-FPM havuzunun son metriğini getir"""
+    since = datetime.utcnow() - timedelta(hours=1)
+    latest = db.query(func.max(PHPPoolMetric.id)).filter(
+        PHPPoolMetric.created_at >= since
+    ).group_by(PHPPoolMetric.php_version, PHPPoolMetric.pool)
+    query = db.query(PHPPoolMetric).filter(PHPPoolMetric.id.in_(latest))
+
+    if saturated_only:
+        query = query.filter(PHPPoolMetric.saturated == True)
+
+    return query.order_by(PHPPoolMetric.listen_queue.desc(), PHPPoolMetric.pool).all()
+
+@router.get("/php-pools/{pool}/metrics", response_model=List[PHPPoolMetricResponse])
+async def get_php_pool_metrics(
+    pool: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """PHP-FPM havuzunun metrik zaman serisini getir"""
+    query = db.query(PHPPoolMetric).filter(PHPPoolMetric.pool == pool)
+
+    if start_time:
+        query = query.filter(PHPPoolMetric.created_at >= start_time)
+    if end_time:
+        query = query.filter(PHPPoolMetric.created_at <= end_time)
+
+    return query.order_by(PHPPoolMetric.created_at.desc()).all()
+
 @router.get("/alerts/{server_id}", response_model=List[SecurityAlertResponse])
 async def get_alerts(
     server_id: int,
-    status: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
     severity: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
@@ -125,8 +184,8 @@ async def get_alerts(
     """Güvenlik uyarılarını getir"""
     query = db.query(SecurityAlert).filter(SecurityAlert.server_id == server_id)
     
-    if status:
-        query = query.filter(SecurityAlert.status == status)
+    if status_filter:
+        query = query.filter(SecurityAlert.status == status_filter)
     if severity:
         query = query.filter(SecurityAlert.severity == severity)
     
@@ -201,7 +260,7 @@ async def unblock_ip(
 @router.get("/updates/{server_id}", response_model=List[SystemUpdateResponse])
 async def get_updates(
     server_id: int,
-    status: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
     update_type: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
@@ -209,8 +268,8 @@ async def get_updates(
     """Sistem güncellemelerini getir"""
     query = db.query(SystemUpdate).filter(SystemUpdate.server_id == server_id)
     
-    if status:
-        query = query.filter(SystemUpdate.status == status)
+    if status_filter:
+        query = query.filter(SystemUpdate.status == status_filter)
     if update_type:
         query = query.filter(SystemUpdate.update_type == update_type)
     
@@ -247,15 +306,15 @@ async def install_update(
 @router.get("/malware-scans/{server_id}", response_model=List[MalwareScanResponse])
 async def get_malware_scans(
     server_id: int,
-    status: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """Malware taramalarını getir"""
     query = db.query(MalwareScan).filter(MalwareScan.server_id == server_id)
     
-    if status:
-        query = query.filter(MalwareScan.status == status)
+    if status_filter:
+        query = query.filter(MalwareScan.status == status_filter)
     
     return query.order_by(MalwareScan.started_at.desc()).all()
 
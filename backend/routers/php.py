@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Dict, Literal, Optional
+from ..database import get_db
+from ..auth import get_current_user
+from ..services.php_service import PHPService
+from pydantic import BaseModel
+
+router = APIRouter(
+    prefix="/api/php",
+    tags=["php"]
+)
+
+class PerformanceProfileRequest(BaseModel):
+    policy: Literal["development", "balanced", "immutable"] = "balanced"
+    dry_run: bool = False
+
+class PerformanceProfileResponse(BaseModel):
+    version: str
+    policy: str
+    domains: int
+    files: int
+    bytes: int
+    settings: Dict[str, str]
+    changed: bool
+    reload: Optional[Dict]
+
+class OPcacheStatusResponse(BaseModel):
+    version: str
+    enabled: bool
+    hit_rate: Optional[float] = None
+    hits: int = 0
+    misses: int = 0
+    memory_used_percent: Optional[float] = None
+    memory_wasted_percent: Optional[float] = None
+    cached_scripts: int = 0
+    keys_used_percent: Optional[float] = None
+    interned_strings_used_percent: Optional[float] = None
+    oom_restarts: int = 0
+    hash_restarts: int = 0
+    realpath_cache_used: Optional[int] = None
+    realpath_cache_limit: Optional[str] = None
+
+@router.post("/{version}/performance-profile", response_model=PerformanceProfileResponse)
+async def apply_performance_profile(
+    version: str,
+    request: PerformanceProfileRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """PHP sürümü için OPcache/realpath cache profilini hesapla ve uygula"""
+    try:
+        service = PHPService(db)
+        # Doküman köklerini taramak uzun sürebilir
+        return await run_in_threadpool(service.apply_performance_profile, version, request.policy, request.dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/{version}/opcache-status", response_model=OPcacheStatusResponse)
+def get_opcache_status(
+    version: str,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """OPcache isabet oranı ve doluluk durumunu getir"""
+    try:
+        service = PHPService(db)
+        return service.get_opcache_status(version)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
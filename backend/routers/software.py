@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Dict, Optional
 from ..database import get_db
 from ..services.software_service import SoftwareService
+from ..utils.service_control import reload_timings
 from ..models import SoftwareVersion, PHPConfiguration, DatabaseServer, WebServer
 from pydantic import BaseModel
 from datetime import datetime
@@ -76,6 +77,11 @@ class VersionUpdateRequest(BaseModel):
 class ConfigUpdateRequest(BaseModel):
     config: Dict
 
+@router.get("/reload-stats")
+def get_reload_stats():
+    """Servislerin reload/restart sürelerini getir"""
+    return reload_timings.snapshot()
+
 @router.get("/versions/{server_id}", response_model=List[SoftwareVersionResponse])
 def get_software_versions(server_id: int, db: Session = Depends(get_db)):
     """Sunucudaki yazılım versiyonlarını getir"""
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database import get_db
 from .. import models, schemas
 from ..auth import get_current_user
+import asyncio
 import subprocess
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 from ..services.ssl_service import SSLService
+from ..services.web_server_service import WebServerService
+from ..utils.cert_inventory import certificate_inventory
+from ..utils.reload_coordinator import get_reload_coordinator
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -15,6 +19,9 @@ router = APIRouter(
     tags=["ssl"]
 )
 
+WEB_SERVER_TYPE = os.getenv("WEB_SERVER_TYPE", "nginx")
+ACME_WEBROOT = os.getenv("ACME_WEBROOT", "/var/www/letsencrypt")
+
 class CertificateRequest(BaseModel):
     domain_id: int
     is_wildcard: bool = False
@@ -33,8 +40,45 @@ class CertificateResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class InventoryCertificate(CertificateResponse):
+    subject: Optional[str]
+    issuer: Optional[str]
+    san: Optional[str]
+    fingerprint: Optional[str]
+
+class ExpiringCertificatesResponse(BaseModel):
+    total: int
+    certificates: List[InventoryCertificate]
+
+@router.get("/inventory", response_model=ExpiringCertificatesResponse)
+def list_expiring_certificates(
+    within_days: int = Query(30, ge=0, le=3650),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Süresi yaklaşan sertifikaları bitiş tarihine göre listele"""
+    return SSLService(db).list_expiring(within_days, limit, offset)
+
+@router.get("/inventory/summary")
+def inventory_summary(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Sertifikaların bitiş tarihine göre dağılımı"""
+    return SSLService(db).inventory_summary()
+
+@router.post("/inventory/sync")
+def sync_inventory(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Sertifika dosyalarındaki değişiklikleri veritabanına işle"""
+    return SSLService(db).sync_inventory()
+
 @router.post("/request", response_model=CertificateResponse)
-async def request_certificate(
+def request_certificate(
     request: CertificateRequest,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
@@ -44,7 +88,7 @@ async def request_certificate(
     return ssl_service.request_certificate(request.domain_id, request.is_wildcard)
 
 @router.post("/{cert_id}/renew", response_model=CertificateResponse)
-async def renew_certificate(
+def renew_certificate(
     cert_id: int,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
@@ -53,7 +97,7 @@ async def renew_certificate(
     ssl_service = SSLService(db)
     success = ssl_service.renew_certificate(cert_id)
     if success:
-        return db.query(models.SSL).filter(models.SSL.id == cert_id).first()
+        return db.query(models.SSLCertificate).filter(models.SSLCertificate.id == cert_id).first()
     raise HTTPException(status_code=500, detail="Renewal failed")
 
 @router.get("/{cert_id}/status")
@@ -73,7 +117,7 @@ async def list_certificates(
     current_user = Depends(get_current_user)
 ):
     """Domain sertifikalarını listele"""
-    return db.query(models.SSL).filter(models.SSL.domain_id == domain_id).all()
+    return db.query(models.SSLCertificate).filter(models.SSLCertificate.domain_id == domain_id).all()
 
 @router.delete("/{cert_id}")
 async def delete_certificate(
@@ -82,15 +126,16 @@ async def delete_certificate(
     current_user = Depends(get_current_user)
 ):
     """Sertifikayı sil"""
-    cert = db.query(models.SSL).filter(models.SSL.id == cert_id).first()
+    cert = db.query(models.SSLCertificate).filter(models.SSLCertificate.id == cert_id).first()
     if not cert:
         raise HTTPException(status_code=404, detail="Certificate not found")
 
     try:
-        if os.path.exists(cert.certificate_path):
-            os.remove(cert.certificate_path)
-        if os.path.exists(cert.private_key_path):
-            os.remove(cert.private_key_path)
+        if cert.path and os.path.exists(cert.path):
+            os.remove(cert.path)
+            certificate_inventory.invalidate(cert.path)
+        if cert.key_path and os.path.exists(cert.key_path):
+            os.remove(cert.key_path)
         db.delete(cert)
         db.commit()
         return {"message": "Certificate deleted successfully"}
@@ -114,7 +159,7 @@ async def install_ssl(
             "certbot",
             "certonly",
             "--webroot",
-            "-w", "/var/www/html",  # Web root dizini
+            "-w", ACME_WEBROOT,  # Vhost'ların /.well-known/acme-challenge/ için sunduğu dizin
             "-d", domain.name,
             "--agree-tos",
             "--email", current_user.email,
@@ -126,23 +171,37 @@ async def install_ssl(
         
         if result.returncode == 0:
             # SSL sertifikasını veritabanına kaydet
-            ssl_cert = models.SSL(
+            cert_path = f"/etc/letsencrypt/live/{domain.name}/fullchain.pem"
+            info = certificate_inventory.get(cert_path)
+            ssl_cert = models.SSLCertificate(
                 domain_id=domain.id,
-                type="lets_encrypt",
+                type="letsencrypt",
                 status="active",
-                start_date=datetime.utcnow(),
-                expiry_date=datetime.utcnow() + timedelta(days=90),
-                certificate_path=f"/etc/letsencrypt/live/{domain.name}/fullchain.pem",
-                private_key_path=f"/etc/letsencrypt/live/{domain.name}/privkey.pem"
+                issued_at=info["not_before"],
+                expires_at=info["not_after"],
+                path=cert_path,
+                key_path=f"/etc/letsencrypt/live/{domain.name}/privkey.pem",
+                subject=info["subject"],
+                issuer=info["issuer"],
+                san=",".join(info["san"]),
+                fingerprint=info["fingerprint"],
+                file_mtime=info["mtime"]
             )
             db.add(ssl_cert)
             
             # Domain'in SSL durumunu güncelle
             domain.ssl_enabled = True
-            domain.ssl_expiry = ssl_cert.expiry_date
+            domain.ssl_expiry = ssl_cert.expires_at
             
             db.commit()
-            return {"message": "SSL certificate installed successfully"}
+
+            # İlk sertifikada vhost'a 443 dinleyicisi eklenir, ardından web sunucusu yeniden yüklenir
+            if WEB_SERVER_TYPE == "nginx":
+                await asyncio.to_thread(WebServerService(db).sync_nginx_certificate, domain)
+            reload = await asyncio.wrap_future(
+                get_reload_coordinator(WEB_SERVER_TYPE).request(f"certificate installed for {domain.name}")
+            )
+            return {"message": "SSL certificate installed successfully", "reload": reload}
         else:
             raise HTTPException(status_code=500, detail=f"SSL installation failed: {result.stderr}")
             
@@ -174,8 +233,9 @@ async def remove_ssl(
         
         if result.returncode == 0:
             # SSL sertifikasını veritabanından kaldır
-            ssl_cert = db.query(models.SSL).filter(models.SSL.domain_id == domain.id).first()
-            if ssl_cert:
+            for ssl_cert in db.query(models.SSLCertificate).filter(models.SSLCertificate.domain_id == domain.id).all():
+                if ssl_cert.path:
+                    certificate_inventory.invalidate(ssl_cert.path)
                 db.delete(ssl_cert)
             
             # Domain'in SSL durumunu güncelle
@@ -183,6 +243,12 @@ async def remove_ssl(
             domain.ssl_expiry = None
             
             db.commit()
+
+            if WEB_SERVER_TYPE == "nginx":
+                await asyncio.to_thread(WebServerService(db).sync_nginx_certificate, domain)
+            await asyncio.wrap_future(
+                get_reload_coordinator(WEB_SERVER_TYPE).request(f"certificate removed for {domain.name}")
+            )
             return {"message": "SSL certificate removed successfully"}
         else:
             raise HTTPException(status_code=500, detail=f"SSL removal failed: {result.stderr}")
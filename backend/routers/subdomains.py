@@ -6,7 +6,10 @@ from ..models import Subdomain, Domain, DNSRecord, DNSType
 from ..auth import get_current_user
 from pydantic import BaseModel
 from datetime import datetime
+from ..utils.reload_coordinator import get_reload_coordinator
+import asyncio
 import os
+import subprocess
 
 router = APIRouter(
     prefix="/api/subdomains",
@@ -95,9 +98,11 @@ async def create_subdomain(
         with open(conf_path, "w") as f:
             f.write(apache_conf)
 
-        # Siteyi aktifleştir
-        os.system(f"a2ensite {subdomain.name}.{domain.name}.conf")
-        os.system("systemctl reload apache2")
+        # Siteyi aktifleştir; reload eşzamanlı diğer değişikliklerle birleştirilir
+        subprocess.run(["a2ensite", f"{subdomain.name}.{domain.name}.conf"], check=True, capture_output=True)
+        await asyncio.wrap_future(
+            get_reload_coordinator("apache").request(f"subdomain {subdomain.name}.{domain.name} created")
+        )
 
         # Document root dizinini oluştur
         os.makedirs(subdomain.document_root, exist_ok=True)
@@ -149,9 +154,11 @@ async def delete_subdomain(
         # Apache konfigürasyonunu kaldır
         conf_path = f"/etc/apache2/sites-available/{subdomain.name}.{subdomain.domain.name}.conf"
         if os.path.exists(conf_path):
-            os.system(f"a2dissite {subdomain.name}.{subdomain.domain.name}.conf")
+            subprocess.run(["a2dissite", f"{subdomain.name}.{subdomain.domain.name}.conf"], check=True, capture_output=True)
             os.remove(conf_path)
-            os.system("systemctl reload apache2")
+            await asyncio.wrap_future(
+                get_reload_coordinator("apache").request(f"subdomain {subdomain.name}.{subdomain.domain.name} deleted")
+            )
 
         # DNS kaydını sil
         db.query(DNSRecord).filter(
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from ..database import get_db
+from ..auth import get_current_user
+from ..services.traffic_service import TrafficService
+from pydantic import BaseModel
+
+router = APIRouter(
+    prefix="/api/traffic",
+    tags=["traffic"]
+)
+
+class TopDomainResponse(BaseModel):
+    domain_id: int
+    domain: str
+    requests: int
+    bytes: int
+    status_5xx: int
+
+@router.get("/domains/{domain_id}")
+async def get_domain_traffic(
+    domain_id: int,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Domainin dakikalık trafik özetlerini getir (varsayılan son bir saat)"""
+    try:
+        return TrafficService(db).get_domain_traffic(domain_id, start_time, end_time)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.get("/top", response_model=List[TopDomainResponse])
+async def get_top_domains(
+    minutes: int = Query(60, ge=1, le=10080),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """En çok istek alan domainleri getir"""
+    return TrafficService(db).get_top_domains(minutes, limit)
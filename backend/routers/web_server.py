@@ -0,0 +1,148 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..database import get_db
+from ..auth import get_current_user
+from ..services.web_server_service import WebServerService
+from ..services.page_cache_service import PageCacheService
+from ..services.php_service import PHPService
+from ..utils.reload_coordinator import ConfigTestError
+from pydantic import BaseModel
+
+router = APIRouter(
+    prefix="/api/web-server",
+    tags=["web-server"]
+)
+
+class VhostOptions(BaseModel):
+    http2: Optional[bool] = None
+    gzip: Optional[bool] = None
+    gzip_static: Optional[bool] = None
+    brotli_static: Optional[bool] = None
+    static_expires: Optional[str] = None
+    static_extensions: Optional[List[str]] = None
+    fastcgi_cache: Optional[bool] = None
+    fastcgi_cache_valid: Optional[str] = None
+    fastcgi_cache_max_size: Optional[str] = None
+    fastcgi_cache_inactive: Optional[str] = None
+    upstream_keepalive: Optional[int] = None
+    client_max_body_size: Optional[str] = None
+
+class PageCacheToggle(BaseModel):
+    enabled: bool
+    valid: Optional[str] = None
+
+class RegenerateRequest(BaseModel):
+    dry_run: bool = False
+    pools: bool = True
+    diff: bool = False
+
+class PurgeRequest(BaseModel):
+    urls: List[str] = []
+    prefix: Optional[str] = None
+    all: bool = False
+
+@router.get("/vhosts/{domain_id}/options")
+def get_vhost_options(
+    domain_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Domainin nginx vhost performans seçeneklerini getir"""
+    return WebServerService(db).get_vhost_options(domain_id)
+
+@router.put("/vhosts/{domain_id}/options")
+async def update_vhost_options(
+    domain_id: int,
+    options: VhostOptions,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Vhost seçeneklerini güncelle; yapılandırma nginx -t ile doğrulanıp uygulanır"""
+    try:
+        service = WebServerService(db)
+        changes = options.dict(exclude_none=True)
+        return await run_in_threadpool(service.update_vhost_options, domain_id, changes)
+    except ConfigTestError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.output or str(e))
+    except ValueError as e:
+        detail = str(e)
+        code = status.HTTP_404_NOT_FOUND if detail == "Domain not found" else status.HTTP_400_BAD_REQUEST
+        raise HTTPException(status_code=code, detail=detail)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post("/regenerate")
+async def regenerate_configs(
+    request: RegenerateRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Tüm vhost ve havuz dosyalarını şablondan yeniden üret; tek test ve tek reload ile uygula"""
+    try:
+        result = {"nginx": await run_in_threadpool(
+            WebServerService(db).regenerate_nginx_vhosts, request.dry_run, request.diff
+        )}
+        if request.pools:
+            result["php_fpm"] = await run_in_threadpool(
+                PHPService(db).regenerate_pools, request.dry_run, request.diff
+            )
+        return result
+    except ConfigTestError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.output or str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.put("/vhosts/{domain_id}/cache")
+async def set_page_cache(
+    domain_id: int,
+    request: PageCacheToggle,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Domainin FastCGI sayfa önbelleğini aç/kapat"""
+    try:
+        service = PageCacheService(db)
+        return await run_in_threadpool(service.set_enabled, domain_id, request.enabled, request.valid)
+    except ConfigTestError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.output or str(e))
+    except ValueError as e:
+        detail = str(e)
+        code = status.HTTP_404_NOT_FOUND if detail == "Domain not found" else status.HTTP_400_BAD_REQUEST
+        raise HTTPException(status_code=code, detail=detail)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post("/vhosts/{domain_id}/cache/purge")
+async def purge_page_cache(
+    domain_id: int,
+    request: PurgeRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Önbellek girdilerini URL, önek ya da tamamı için temizle"""
+    if not request.urls and not request.prefix and not request.all:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Specify urls, prefix or all")
+    try:
+        service = PageCacheService(db)
+        return await run_in_threadpool(service.purge, domain_id, request.urls, request.prefix, request.all)
+    except ValueError as e:
+        detail = str(e)
+        code = status.HTTP_404_NOT_FOUND if detail == "Domain not found" else status.HTTP_400_BAD_REQUEST
+        raise HTTPException(status_code=code, detail=detail)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/vhosts/{domain_id}/cache/stats")
+async def get_page_cache_stats(
+    domain_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Sayfa önbelleği isabet oranını getir"""
+    try:
+        service = PageCacheService(db)
+        return await run_in_threadpool(service.stats, domain_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 from .models import CustomerStatus, CustomerPackage, DNSType
@@ -210,13 +210,19 @@ class Backup(BackupBase):
         orm_mode = True
 
 class DomainLogBase(BaseModel):
-    type: str
+    type: str = Field(..., max_length=50)
     message: str
-    source: str
+    source: str = Field(..., max_length=100)
 
 class DomainLogCreate(DomainLogBase):
     pass
 
+class DomainLogBulkEntry(DomainLogBase):
+    domain_id: int
+
+class DomainLogBulkCreate(BaseModel):
+    entries: List[DomainLogBulkEntry]
+
 class DomainLog(DomainLogBase):
     id: int
     domain_id: int
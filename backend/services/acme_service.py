@@ -0,0 +1,185 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import josepy
+from acme import challenges, client, crypto_util, messages
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+logger = logging.getLogger(__name__)
+
+LETSENCRYPT_DIRECTORY = "https://acme-v02.api.letsencrypt.org/directory"
+USER_AGENT = "depiar"
+
+# Dizin adresine göre yüklenmiş hesaplar: (anahtar, kayıt, dizin)
+_accounts: Dict[str, Tuple[josepy.JWKRSA, messages.RegistrationResource, messages.Directory]] = {}
+_accounts_lock = threading.Lock()
+
+
+def _verify_setting(value: Optional[str]):
+    """ACME_VERIFY_SSL: true, false ya da CA paketi yolu (ör. Pebble için)"""
+    if value is None or value.lower() in ("", "1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    return value
+
+
+def generate_private_key(key_size: int = 2048) -> bytes:
+    """PEM biçiminde yeni bir RSA özel anahtarı oluştur"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.TraditionalOpenSSL,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+def _write_private(path: str, data: bytes) -> None:
+    """Dosyayı yalnızca sahibi okuyabilecek şekilde atomik olarak yaz"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".acme.")
+    try:
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ACMEService:
+    """Kalıcı tek bir ACME hesabıyla sertifika alma.
+
+    Hesap anahtarı ve kayıt bilgisi dizin adresine özel bir klasörde saklanır
+    ve süreç boyunca bellekte tutulur; her sertifika için yeni hesap açılmaz.
+    Her çağrı kendi ClientV2 örneğini (ve nonce havuzunu) kullandığından
+    aynı hesap birden fazla iş parçacığında eşzamanlı kullanılabilir.
+    Dizin adresi ACME_DIRECTORY_URL ile değiştirilebilir (staging, Pebble).
+    """
+
+    def __init__(self, directory_url: Optional[str] = None, email: Optional[str] = None,
+                 account_dir: Optional[str] = None, webroot: Optional[str] = None):
+        self.directory_url = directory_url or os.getenv("ACME_DIRECTORY_URL", LETSENCRYPT_DIRECTORY)
+        self.email = email or os.getenv("ACME_EMAIL")
+        self.account_dir = account_dir or os.getenv("ACME_ACCOUNT_DIR", "/etc/depiar/acme")
+        self.webroot = webroot or os.getenv("ACME_WEBROOT", "/var/www/letsencrypt")
+        self.verify_ssl = _verify_setting(os.getenv("ACME_VERIFY_SSL"))
+        self.timeout = int(os.getenv("ACME_ORDER_TIMEOUT", "180"))
+
+    def _account_path(self) -> str:
+        digest = hashlib.sha256(self.directory_url.encode()).hexdigest()[:16]
+        return os.path.join(self.account_dir, digest)
+
+    def _network(self, key: josepy.JWKRSA, account: Optional[messages.RegistrationResource] = None) -> client.ClientNetwork:
+        return client.ClientNetwork(key, account=account, verify_ssl=self.verify_ssl, user_agent=USER_AGENT)
+
+    def _load_account(self):
+        """Hesabı bellekten, diskten ya da yeni kayıtla getir"""
+        with _accounts_lock:
+            account = _accounts.get(self.directory_url)
+            if account:
+                return account
+
+            path = self._account_path()
+            key_path = os.path.join(path, "private_key.pem")
+            regr_path = os.path.join(path, "regr.json")
+
+            if os.path.exists(key_path) and os.path.exists(regr_path):
+                with open(key_path, "rb") as f:
+                    key = josepy.JWKRSA.load(f.read())
+                with open(regr_path) as f:
+                    regr = messages.RegistrationResource.json_loads(f.read())
+                net = self._network(key, regr)
+                directory = client.ClientV2.get_directory(self.directory_url, net)
+            else:
+                os.makedirs(path, mode=0o700, exist_ok=True)
+                key_pem = generate_private_key()
+                key = josepy.JWKRSA.load(key_pem)
+                net = self._network(key)
+                directory = client.ClientV2.get_directory(self.directory_url, net)
+                acme_client = client.ClientV2(directory, net)
+                regr = acme_client.new_account(messages.NewRegistration.from_data(
+                    email=self.email,
+                    terms_of_service_agreed=True
+                ))
+                # Dosyalar yalnızca kayıt başarılı olduktan sonra yazılır
+                _write_private(key_path, key_pem)
+                _write_private(regr_path, regr.json_dumps().encode())
+                logger.info(f"Registered ACME account {regr.uri} at {self.directory_url}")
+
+            account = (key, regr, directory)
+            _accounts[self.directory_url] = account
+            return account
+
+    def client(self) -> client.ClientV2:
+        """Kayıtlı hesapla yeni bir ACME istemcisi oluştur"""
+        key, regr, directory = self._load_account()
+        return client.ClientV2(directory, self._network(key, regr))
+
+    def issue(self, domains: List[str], key_pem: Optional[bytes] = None,
+              dns_publisher: Optional[Callable[[List[Tuple[str, str]]], Callable[[], None]]] = None) -> Tuple[bytes, bytes]:
+        """Sertifika al ve (özel anahtar, fullchain) PEM çiftini döndür.
+
+        Joker karakterli isimler DNS-01 ile doğrulanır; bunun için
+        `dns_publisher` TXT kayıtlarını (isim, değer) yayınlayıp bir temizleme
+        fonksiyonu döndürmelidir. Diğer isimler HTTP-01 kullanır.
+        """
+        key_pem = key_pem or generate_private_key()
+        csr_pem = crypto_util.make_csr(key_pem, domains)
+        acme_client = self.client()
+        order = acme_client.new_order(csr_pem)
+
+        answers = []
+        dns_records = []
+        cleanups = []
+        try:
+            for authz in order.authorizations:
+                identifier = authz.body.identifier.value
+                wildcard = authz.body.wildcard or identifier.startswith("*.")
+                wanted = challenges.DNS01 if wildcard else challenges.HTTP01
+                challb = next((c for c in authz.body.challenges if isinstance(c.chall, wanted)), None)
+                if challb is None:
+                    raise RuntimeError(f"No {wanted.typ} challenge offered for {identifier}")
+
+                response, validation = challb.response_and_validation(acme_client.net.key)
+                if wanted is challenges.DNS01:
+                    dns_records.append((challb.chall.validation_domain_name(identifier.lstrip("*.")), validation))
+                else:
+                    cleanups.append(self._write_http_challenge(challb.chall.path, validation))
+                answers.append((challb, response))
+
+            # Tüm DNS-01 değerleri tek seferde yayınlanır
+            if dns_records:
+                if dns_publisher is None:
+                    raise RuntimeError("DNS-01 validation requires a DNS publisher")
+                cleanups.append(dns_publisher(dns_records))
+
+            for challb, response in answers:
+                acme_client.answer_challenge(challb, response)
+
+            deadline = datetime.now() + timedelta(seconds=self.timeout)
+            order = acme_client.poll_and_finalize(order, deadline)
+        finally:
+            for cleanup in cleanups:
+                try:
+                    cleanup()
+                except Exception as e:
+                    logger.warning(f"ACME challenge cleanup failed: {str(e)}")
+
+        return key_pem, order.fullchain_pem.encode()
+
+    def _write_http_challenge(self, path: str, validation: str) -> Callable[[], None]:
+        """HTTP-01 doğrulama dosyasını oluştur ve silme fonksiyonunu döndür"""
+        validation_path = os.path.join(self.webroot, path.lstrip("/"))
+        os.makedirs(os.path.dirname(validation_path), exist_ok=True)
+        with open(validation_path, "w") as f:
+            f.write(validation)
+        return lambda: os.remove(validation_path)
@@ -385,19 +385,21 @@ class BackupService:
 
 def start_backup_scheduler():
     """Yedekleme zamanlayıcısını başlat"""
+    scheduler = schedule.Scheduler()
+
     def run_scheduler():
         while True:
-            schedule.run_pending()
+            scheduler.run_pending()
             time.sleep(60)
 
     # Günlük yedekleme
-    schedule.every().day.at("03:00").do(cleanup_old_backups)
+    scheduler.every().day.at("03:00").do(cleanup_old_backups)
     
     # Haftalık yedekleme
-    schedule.every().monday.at("02:00").do(cleanup_old_backups)
+    scheduler.every().monday.at("02:00").do(cleanup_old_backups)
     
     # Aylık yedekleme
-    schedule.every().day.at("01:00").do(cleanup_old_backups)
+    scheduler.every().day.at("01:00").do(cleanup_old_backups)
 
     # Zamanlayıcıyı arka planda çalıştır
     scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
@@ -0,0 +1,75 @@
+import os
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from ..models import Domain
+from ..utils.dedup import find_duplicates, compact_group
+from .file_system_service import FileSystemService
+
+logger = logging.getLogger(__name__)
+
+class DedupService:
+    """Domainler arası yinelenen dosya raporu ve isteğe bağlı sıkıştırma"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.file_system = FileSystemService(db)
+        self.min_size = int(os.getenv("DEDUP_MIN_FILE_SIZE", "4096"))
+
+    def _domain_roots(self, domain_ids: Optional[List[int]] = None) -> Dict[str, str]:
+        """Taranacak domain kök dizinlerini getir"""
+        query = self.db.query(Domain)
+        if domain_ids:
+            query = query.filter(Domain.id.in_(domain_ids))
+
+        roots = {}
+        for domain in query.all():
+            root = os.path.join(self.file_system.web_root, domain.name)
+            if os.path.isdir(root):
+                roots[os.path.realpath(root)] = domain.name
+        return roots
+
+    def _domain_of(self, path: str, roots: Dict[str, str]) -> Optional[str]:
+        for root, name in roots.items():
+            if path.startswith(root + os.sep):
+                return name
+        return None
+
+    def scan(self, domain_ids: Optional[List[int]] = None, limit: int = 100) -> Dict:
+        """Yinelenen dosyaları bul ve kazanç raporu oluştur"""
+        roots = self._domain_roots(domain_ids)
+        groups = find_duplicates(roots.keys(), min_size=self.min_size)
+
+        per_domain = defaultdict(lambda: {"files": 0, "bytes": 0})
+        for group in groups:
+            for path in group["paths"][1:]:
+                domain_name = self._domain_of(path, roots)
+                if domain_name:
+                    per_domain[domain_name]["files"] += 1
+                    per_domain[domain_name]["bytes"] += group["size"]
+
+        return {
+            "domains_scanned": len(roots),
+            "duplicate_groups": len(groups),
+            "reclaimable_bytes": sum(g["reclaimable"] for g in groups),
+            "per_domain": dict(per_domain),
+            "groups": groups[:limit],
+        }
+
+    def compact(self, domain_ids: Optional[List[int]] = None, allow_hardlinks: bool = False) -> Dict:
+        """Yinelenen dosyaları reflink (ya da izin verilirse hard link) ile birleştir"""
+        roots = self._domain_roots(domain_ids)
+        groups = find_duplicates(roots.keys(), min_size=self.min_size)
+
+        totals = {"groups": len(groups), "reflinked": 0, "hardlinked": 0, "skipped": 0, "bytes": 0}
+        for group in groups:
+            result = compact_group(group["paths"], allow_hardlinks=allow_hardlinks)
+            for key in ("reflinked", "hardlinked", "skipped", "bytes"):
+                totals[key] += result[key]
+
+        logger.info(
+            f"Dedup compaction finished: {totals['reflinked']} reflinked, "
+            f"{totals['hardlinked']} hardlinked, {totals['skipped']} skipped, {totals['bytes']} bytes"
+        )
+        return totals
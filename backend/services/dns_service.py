@@ -1,13 +1,24 @@
 import logging
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator, TextIO
 from sqlalchemy.orm import Session
 from ..models import DNSRecord, SPFRecord, DKIMRecord, DMARCRecord, Domain, DNSType
 from ..utils.ssh import SSHManager
+from ..utils.zone_file import parse_zone, render_zone, diff_records, format_soa, read_soa_serial, wire_type
+from ..utils.dns_update import build_update, commit_changes, rdata_text
+from ..utils.zone_cache import ZoneModel, file_stamp, zone_cache, zone_file_lock, write_zone_file
+from ..utils.dns_resolver import AsyncDNSResolver, merge_selectors, verify_mail_records, verify_many
+from ..utils.dns_propagation import PropagationChecker, expected_rrset
+from ..database import SessionLocal
+import os
 import json
 import re
+import time
+import asyncio
+import threading
 import subprocess
-import dns.resolver
+import schedule
+import dns.rcode
 import dns.zone
 import dns.query
 import dns.tsigkeyring
@@ -15,20 +26,44 @@ import dns.update
 
 logger = logging.getLogger(__name__)
 
-class DNSService:
-    def __init__(self, db: Session):
-        self.db = db
-
-    def create_dns_record(self, domain_id: int, name: str, type: DNSType, content: str, 
-                         ttl: int = 3600, priority: Optional[int] = None) -> DNSRecord:
-        """DNS kaydı oluştur"""
-        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
-        if not domain:
-            raise ValueError("Domain not found")
-
-        # DNS kaydını oluştur
+class DNSChangeSet:
+    """Bir zone için toplu DNS değişikliği.
+
+    Eklenen, güncellenen ve silinen kayıtlar önce toplanır; `apply` tek bir
+    veritabanı işleminde kaydedilir ve DNS sunucusuna tek bir RFC2136
+    dynamic update mesajı gönderilir. BIND seri numarasını mesaj başına bir
+    kez artırdığından tüm değişiklik tek bir seri artışıyla yayınlanır.
+    `DNS_UPDATE_MODE=zonefile` ise bunun yerine zone dosyası bellekteki
+    modelden yeniden yazılır ve değişiklik başına bir kez `rndc reload`
+    çalıştırılır.
+    Etkilenen her (isim, tür) kümesi veritabanındaki güncel haliyle bütün
+    olarak değiştirilir; aynı isimdeki diğer kayıtlar ezilmez.
+    """
+
+    def __init__(self, service: "DNSService", domain: Domain):
+        self.service = service
+        self.db = service.db
+        self.domain = domain
+        self.created: List[DNSRecord] = []
+        self.updated: List[DNSRecord] = []
+        self.deleted: List[DNSRecord] = []
+        self._touched = set()
+
+    def __enter__(self) -> "DNSChangeSet":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.apply()
+        else:
+            self.db.rollback()
+        return False
+
+    def create(self, name: str, type: DNSType, content: str, ttl: int = 3600,
+               priority: Optional[int] = None) -> DNSRecord:
+        """Eklenecek kaydı değişikliğe ekle"""
         record = DNSRecord(
-            domain_id=domain_id,
+            domain_id=self.domain.id,
             name=name,
             type=type,
             content=content,
@@ -36,85 +71,277 @@ class DNSService:
             priority=priority
         )
         self.db.add(record)
-        self.db.commit()
-
-        # DNS sunucusunda kaydı güncelle
-        self._update_dns_server(domain.name, record)
-
+        self.created.append(record)
+        self._touched.add((name, wire_type(type)))
         return record
 
-    def update_dns_record(self, record_id: int, content: str, ttl: Optional[int] = None, 
-                         priority: Optional[int] = None) -> DNSRecord:
-        """DNS kaydını güncelle"""
-        record = self.db.query(DNSRecord).filter(DNSRecord.id == record_id).first()
-        if not record:
-            raise ValueError("DNS record not found")
-
-        # Kaydı güncelle
+    def update(self, record: DNSRecord, content: str, ttl: Optional[int] = None,
+               priority: Optional[int] = None) -> DNSRecord:
+        """Güncellenecek kaydı değişikliğe ekle"""
+        if record.domain_id != self.domain.id:
+            raise ValueError("DNS record does not belong to this domain")
         record.content = content
         if ttl is not None:
             record.ttl = ttl
         if priority is not None:
             record.priority = priority
         record.updated_at = datetime.utcnow()
+        self.updated.append(record)
+        self._touched.add((record.name, wire_type(record.type)))
+        return record
 
-        self.db.commit()
+    def delete(self, record: DNSRecord) -> None:
+        """Silinecek kaydı değişikliğe ekle"""
+        if record.domain_id != self.domain.id:
+            raise ValueError("DNS record does not belong to this domain")
+        self.db.delete(record)
+        self.deleted.append(record)
+        self._touched.add((record.name, wire_type(record.type)))
+
+    def __len__(self) -> int:
+        return len(self.created) + len(self.updated) + len(self.deleted)
+
+    def apply(self) -> Dict:
+        """Değişiklikleri tek işlem ve tek DNS mesajı ile uygula"""
+        if not self._touched:
+            return {"created": 0, "updated": 0, "deleted": 0}
+
+        def collect() -> Dict[tuple, List[Dict]]:
+            self.db.flush()
+
+            # Etkilenen kümelerin son hali
+            rrsets = {key: [] for key in self._touched}
+            records = self.db.query(DNSRecord).filter(DNSRecord.domain_id == self.domain.id).all()
+            for record in records:
+                key = (record.name, wire_type(record.type))
+                if key in rrsets:
+                    rrsets[key].append(self.service._record_dict(record))
+            return rrsets
+
+        if self.service.update_mode == "zonefile":
+            rrsets = {}
+            commit_changes(
+                self.db,
+                lambda: rrsets.update(collect()),
+                after_commit=lambda: self.service._write_zone(self.domain, rrsets),
+                # Bellekteki zone dosyaya yazılamayan değişiklikleri içerebilir
+                on_error=lambda: zone_cache.invalidate(self.domain.name)
+            )
+        else:
+            commit_changes(self.db, lambda: self.service._send_update(build_update(self.domain.name, collect())))
+
+        return {
+            "created": len(self.created),
+            "updated": len(self.updated),
+            "deleted": len(self.deleted)
+        }
 
-        # DNS sunucusunda kaydı güncelle
-        self._update_dns_server(record.domain.name, record)
 
-        return record
+class DNSService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.dns_server = os.getenv("DNS_UPDATE_SERVER", "127.0.0.1")
+        self.dns_timeout = float(os.getenv("DNS_UPDATE_TIMEOUT", "10"))
+        self.update_mode = os.getenv("DNS_UPDATE_MODE", "dynamic")
+        self.zone_dir = os.getenv("DNS_ZONE_DIR", "/etc/bind/zones")
+        self.primary_ns = os.getenv("DNS_PRIMARY_NS", "ns1.depiar.com.")
+        self.hostmaster = os.getenv("DNS_HOSTMASTER", "hostmaster.depiar.com.")
+        self.nameservers = [ns.strip() for ns in os.getenv("DNS_NAMESERVERS", self.primary_ns).split(",") if ns.strip()]
+
+    def change_set(self, domain_id: int) -> DNSChangeSet:
+        """Domain için toplu değişiklik başlat"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+        return DNSChangeSet(self, domain)
 
-    def delete_dns_record(self, record_id: int):
-        """DNS kaydını sil"""
+    def _get_record(self, record_id: int) -> DNSRecord:
         record = self.db.query(DNSRecord).filter(DNSRecord.id == record_id).first()
         if not record:
             raise ValueError("DNS record not found")
+        return record
 
-        # DNS sunucusundan kaydı sil
-        self._delete_dns_server_record(record.domain.name, record)
+    def create_dns_record(self, domain_id: int, name: str, type: DNSType, content: str, 
+                         ttl: int = 3600, priority: Optional[int] = None) -> DNSRecord:
+        """DNS kaydı oluştur"""
+        with self.change_set(domain_id) as changes:
+            record = changes.create(name, type, content, ttl, priority)
+        return record
 
-        # Veritabanından kaydı sil
-        self.db.delete(record)
-        self.db.commit()
+    def update_dns_record(self, record_id: int, content: str, ttl: Optional[int] = None, 
+                         priority: Optional[int] = None) -> DNSRecord:
+        """DNS kaydını güncelle"""
+        record = self._get_record(record_id)
+        with self.change_set(record.domain_id) as changes:
+            changes.update(record, content, ttl, priority)
+        return record
 
-    def create_spf_record(self, domain_id: int, mechanisms: List[str], qualifier: str = "+") -> SPFRecord:
-        """SPF kaydı oluştur"""
+    def delete_dns_record(self, record_id: int):
+        """DNS kaydını sil"""
+        record = self._get_record(record_id)
+        with self.change_set(record.domain_id) as changes:
+            changes.delete(record)
+
+    def apply_changes(self, domain_id: int, operations: List[Dict]) -> Dict:
+        """create/update/delete işlemlerinden oluşan listeyi tek seferde uygula"""
+        with self.change_set(domain_id) as changes:
+            for op in operations:
+                action = op.get("action")
+                if action == "create":
+                    changes.create(op["name"], op["type"], op["content"],
+                                   op.get("ttl") or 3600, op.get("priority"))
+                elif action == "update":
+                    changes.update(self._get_record(op["record_id"]), op["content"],
+                                   op.get("ttl"), op.get("priority"))
+                elif action == "delete":
+                    changes.delete(self._get_record(op["record_id"]))
+                else:
+                    raise ValueError(f"Unsupported change action: {action}")
+        return {
+            "created": len(changes.created),
+            "updated": len(changes.updated),
+            "deleted": len(changes.deleted)
+        }
+
+    def _record_dict(self, record: DNSRecord) -> Dict:
+        return {
+            "id": record.id,
+            "name": record.name,
+            "type": wire_type(record.type),
+            "content": record.content,
+            "ttl": record.ttl,
+            "priority": record.priority
+        }
+
+    def export_zone(self, domain_id: int) -> List[Dict]:
+        """Domain'in kayıtlarını sözlük listesi olarak döndür"""
         domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
         if not domain:
             raise ValueError("Domain not found")
+        records = self.db.query(DNSRecord).filter(DNSRecord.domain_id == domain_id)\
+            .order_by(DNSRecord.name, DNSRecord.type).all()
+        return [self._record_dict(record) for record in records]
 
-        # SPF kaydını oluştur
-        spf = SPFRecord(
-            domain_id=domain_id,
-            mechanisms=mechanisms,
-            qualifier=qualifier
-        )
-        self.db.add(spf)
-        self.db.commit()
+    def export_zone_file(self, domain_id: int) -> Iterator[str]:
+        """Domain'in kayıtlarını SOA kaydıyla birlikte BIND zone dosyası olarak üret"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+        # Zone henüz yazılmamışsa günün ilk seri numarası kullanılır
+        serial = self._current_serial(domain) or int(datetime.utcnow().strftime("%Y%m%d")) * 100
+        soa = format_soa(self.primary_ns, self.hostmaster, serial)
+        return render_zone(self.export_zone(domain_id), domain.name, soa=soa)
+
+    def import_zone(self, domain_id: int, zone_file: Optional[TextIO] = None,
+                    records: Optional[Iterable[Dict]] = None, replace: bool = True,
+                    dry_run: bool = False) -> Dict:
+        """Zone dosyası ya da kayıt listesini mevcut kayıtlarla karşılaştırıp farkı uygula.
+
+        Yalnızca değişen kayıtlar tek bir değişiklik kümesiyle yazılır; `replace`
+        kapalıysa içe aktarılan dosyada olmayan kayıtlar silinmez.
+        """
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
 
-        # DNS kaydını oluştur
-        content = f"v=spf1 {qualifier} {' '.join(mechanisms)}"
-        self.create_dns_record(
-            domain_id=domain_id,
-            name="@",
-            type=DNSType.SPF,
-            content=content
-        )
+        if zone_file is not None:
+            desired = parse_zone(zone_file, domain.name)
+        else:
+            desired = ({
+                "name": r["name"],
+                "type": wire_type(r["type"]),
+                "content": r["content"],
+                "ttl": r.get("ttl") or 3600,
+                "priority": r.get("priority")
+            } for r in records or [])
+
+        existing = self.db.query(DNSRecord).filter(DNSRecord.domain_id == domain_id).all()
+        by_id = {record.id: record for record in existing}
+        diff = diff_records((self._record_dict(r) for r in existing), desired)
+        if not replace:
+            diff["delete"] = []
+
+        summary = {
+            "created": len(diff["create"]),
+            "updated": len(diff["update"]),
+            "deleted": len(diff["delete"]),
+            "unchanged": diff["unchanged"],
+            "dry_run": dry_run
+        }
+        if dry_run:
+            summary["changes"] = {key: diff[key] for key in ("create", "update", "delete")}
+            return summary
+        if not (diff["create"] or diff["update"] or diff["delete"]):
+            return summary
+
+        with DNSChangeSet(self, domain) as changes:
+            for record in diff["create"]:
+                changes.create(record["name"], record["type"], record["content"],
+                               record["ttl"], record["priority"])
+            for record in diff["update"]:
+                current = by_id[record["id"]]
+                changes.update(current, current.content, record["ttl"])
+            for record in diff["delete"]:
+                changes.delete(by_id[record["id"]])
+
+        return summary
 
+    def create_spf_record(self, domain_id: int, mechanisms: List[str], qualifier: str = "+") -> SPFRecord:
+        """SPF kaydı oluştur"""
+        with self.change_set(domain_id) as changes:
+            spf = self._add_spf(changes, mechanisms, qualifier)
         return spf
 
     def create_dkim_record(self, domain_id: int, selector: str, public_key: str, 
                           algorithm: str = "rsa-sha256", key_type: str = "rsa", 
                           key_size: int = 2048) -> DKIMRecord:
         """DKIM kaydı oluştur"""
-        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
-        if not domain:
-            raise ValueError("Domain not found")
+        with self.change_set(domain_id) as changes:
+            dkim = self._add_dkim(changes, selector, public_key, algorithm, key_type, key_size)
+        return dkim
+
+    def create_dmarc_record(self, domain_id: int, policy: str = "none", 
+                           subdomain_policy: str = "none", percentage: int = 100,
+                           report_aggregate: Optional[str] = None,
+                           report_forensic: Optional[str] = None) -> DMARCRecord:
+        """DMARC kaydı oluştur"""
+        with self.change_set(domain_id) as changes:
+            dmarc = self._add_dmarc(changes, policy, subdomain_policy, percentage,
+                                    report_aggregate, report_forensic)
+        return dmarc
 
-        # DKIM kaydını oluştur
+    def provision_mail_records(self, domain_id: int, spf: Optional[Dict] = None,
+                               dkim: Optional[Dict] = None, dmarc: Optional[Dict] = None) -> Dict:
+        """SPF, DKIM ve DMARC kayıtlarını tek değişiklikte oluştur"""
+        result = {}
+        with self.change_set(domain_id) as changes:
+            if spf is not None:
+                result["spf"] = self._add_spf(changes, **spf)
+            if dkim is not None:
+                result["dkim"] = self._add_dkim(changes, **dkim)
+            if dmarc is not None:
+                result["dmarc"] = self._add_dmarc(changes, **dmarc)
+        return result
+
+    def _add_spf(self, changes: DNSChangeSet, mechanisms: List[str], qualifier: str = "+") -> SPFRecord:
+        """SPF kaydını değişikliğe ekle"""
+        spf = SPFRecord(
+            domain_id=changes.domain.id,
+            mechanisms=mechanisms,
+            qualifier=qualifier
+        )
+        self.db.add(spf)
+
+        content = f"v=spf1 {qualifier} {' '.join(mechanisms)}"
+        changes.create(name="@", type=DNSType.SPF, content=content)
+        return spf
+
+    def _add_dkim(self, changes: DNSChangeSet, selector: str, public_key: str,
+                  algorithm: str = "rsa-sha256", key_type: str = "rsa",
+                  key_size: int = 2048) -> DKIMRecord:
+        """DKIM kaydını değişikliğe ekle"""
         dkim = DKIMRecord(
-            domain_id=domain_id,
+            domain_id=changes.domain.id,
             selector=selector,
             public_key=public_key,
             algorithm=algorithm,
@@ -122,31 +349,18 @@ class DNSService:
             key_size=key_size
         )
         self.db.add(dkim)
-        self.db.commit()
 
-        # DNS kaydını oluştur
         content = f"v=DKIM1; k={key_type}; p={public_key}"
-        self.create_dns_record(
-            domain_id=domain_id,
-            name=f"{selector}._domainkey",
-            type=DNSType.TXT,
-            content=content
-        )
-
+        changes.create(name=f"{selector}._domainkey", type=DNSType.TXT, content=content)
         return dkim
 
-    def create_dmarc_record(self, domain_id: int, policy: str = "none", 
-                           subdomain_policy: str = "none", percentage: int = 100,
-                           report_aggregate: Optional[str] = None,
-                           report_forensic: Optional[str] = None) -> DMARCRecord:
-        """DMARC kaydı oluştur"""
-        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
-        if not domain:
-            raise ValueError("Domain not found")
-
-        # DMARC kaydını oluştur
+    def _add_dmarc(self, changes: DNSChangeSet, policy: str = "none",
+                   subdomain_policy: str = "none", percentage: int = 100,
+                   report_aggregate: Optional[str] = None,
+                   report_forensic: Optional[str] = None) -> DMARCRecord:
+        """DMARC kaydını değişikliğe ekle"""
         dmarc = DMARCRecord(
-            domain_id=domain_id,
+            domain_id=changes.domain.id,
             policy=policy,
             subdomain_policy=subdomain_policy,
             percentage=percentage,
@@ -154,135 +368,154 @@ class DNSService:
             report_forensic=report_forensic
         )
         self.db.add(dmarc)
-        self.db.commit()
 
-        # DNS kaydını oluştur
         content = f"v=DMARC1; p={policy}; sp={subdomain_policy}; pct={percentage}"
         if report_aggregate:
             content += f"; rua=mailto:{report_aggregate}"
         if report_forensic:
             content += f"; ruf=mailto:{report_forensic}"
 
-        self.create_dns_record(
-            domain_id=domain_id,
-            name="_dmarc",
-            type=DNSType.TXT,
-            content=content
-        )
-
+        changes.create(name="_dmarc", type=DNSType.TXT, content=content)
         return dmarc
 
-    def verify_dns_records(self, domain_id: int) -> Dict:
-        """DNS kayıtlarını doğrula"""
+    async def verify_dns_records(self, domain_id: int, selectors: Optional[List[str]] = None) -> Dict:
+        """DNS kayıtlarını doğrula (tüm sorgular eşzamanlı)"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        # Domain için tanımlı DKIM seçicileri yaygın seçicilerden önce denenir
+        known = [r.selector for r in self.db.query(DKIMRecord).filter(DKIMRecord.domain_id == domain_id).all()]
+        selectors = selectors or merge_selectors(known)
+
+        resolver = AsyncDNSResolver(timeout=float(os.getenv("DNS_QUERY_TIMEOUT", "2")))
+        return await verify_mail_records(resolver, domain.name, selectors)
+
+    async def check_propagation(self, domain_id: int, nameservers: Optional[List[str]] = None,
+                                rrsets: Optional[Iterable[tuple]] = None) -> Dict:
+        """Kayıtların tüm yetkili isim sunucularına yayılıp yayılmadığını kontrol et.
+
+        `rrsets` verilirse yalnızca bu (isim, tür) kümeleri kontrol edilir.
+        """
         domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
         if not domain:
             raise ValueError("Domain not found")
 
-        results = {
-            "spf": self._verify_spf(domain.name),
-            "dkim": self._verify_dkim(domain.name),
-            "dmarc": self._verify_dmarc(domain.name)
+        wanted = set(rrsets) if rrsets is not None else None
+        values = {}
+        for record in self.db.query(DNSRecord).filter(DNSRecord.domain_id == domain_id).all():
+            key = (record.name, wire_type(record.type))
+            if wanted is None or key in wanted:
+                values.setdefault(key, []).append(rdata_text(self._record_dict(record)))
+        expected = {
+            (name, rdtype): expected_rrset(domain.name, rdtype, texts)
+            for (name, rdtype), texts in values.items()
         }
 
-        return results
+        checker = PropagationChecker(timeout=float(os.getenv("DNS_QUERY_TIMEOUT", "2")))
+        return await checker.check(domain.name, expected, nameservers)
 
-    def _update_dns_server(self, domain_name: str, record: DNSRecord):
-        """DNS sunucusunda kaydı güncelle"""
+    def _zone_path(self, domain: Domain) -> str:
+        return os.path.join(self.zone_dir, f"{domain.name}.db")
+
+    def _current_serial(self, domain: Domain) -> int:
+        """Mevcut zone dosyasındaki seri numarası (dosya yoksa 0)"""
         try:
-            # DNS sunucusu yapılandırmasını al
-            # Bu kısım DNS sunucunuzun yapılandırmasına göre değişebilir
-            # Örnek olarak BIND için:
-            zone = dns.zone.from_file(f"/etc/bind/zones/{domain_name}.db", domain_name)
-            update = dns.update.Update(domain_name)
-            
-            if record.type in [DNSType.A, DNSType.AAAA, DNSType.CNAME]:
-                update.replace(record.name, record.ttl, record.type, record.content)
-            elif record.type == DNSType.MX:
-                update.replace(record.name, record.ttl, record.type, 
-                             f"{record.priority} {record.content}")
-            else:  # TXT, SPF, DKIM, DMARC
-                update.replace(record.name, record.ttl, record.type, 
-                             f'"{record.content}"')
-
-            dns.query.tcp(update, "localhost")
-            
-        except Exception as e:
-            logger.error(f"Failed to update DNS server: {str(e)}")
-            raise
+            with open(self._zone_path(domain), encoding="utf-8") as f:
+                return read_soa_serial(f) or 0
+        except (OSError, ValueError):
+            return 0
+
+    def _load_zone(self, domain: Domain) -> ZoneModel:
+        """Zone modelini veritabanından oluştur; seri numarası mevcut dosyadan devam eder"""
+        records = self.db.query(DNSRecord).filter(DNSRecord.domain_id == domain.id).all()
+        return ZoneModel(domain.name, [self._record_dict(r) for r in records], serial=self._current_serial(domain))
+
+    def _write_zone(self, domain: Domain, rrsets: Dict[tuple, List[Dict]]) -> None:
+        """Değişen kümeleri bellekteki zone'a uygula, dosyayı yaz ve zone'u yeniden yükle.
+
+        Dosya başka bir worker tarafından yazılmışsa önbellekteki model
+        eskimiştir; bu durumda zone veritabanından yeniden oluşturulur.
+        """
+        path = self._zone_path(domain)
+        with zone_file_lock(path):
+            zone = zone_cache.get(domain.name, lambda: self._load_zone(domain), stamp=file_stamp(path))
+            with zone.lock:
+                for (name, rdtype), records in rrsets.items():
+                    zone.set_rrset(name, rdtype, records)
+                zone.bump_serial()
+                write_zone_file(path, zone.render(self.primary_ns, self.hostmaster, self.nameservers))
+                zone.stamp = file_stamp(path)
+                self._reload_zone(domain.name)
+
+    def _reload_zone(self, zone_name: str) -> None:
+        """Yalnızca değişen zone'u yeniden yükle"""
+        result = subprocess.run(
+            ["rndc", "reload", zone_name],
+            capture_output=True,
+            text=True,
+            timeout=self.dns_timeout
+        )
+        if result.returncode != 0:
+            logger.error(f"rndc reload {zone_name} failed: {result.stderr.strip()}")
+            raise RuntimeError(f"Zone reload failed: {result.stderr.strip() or result.stdout.strip()}")
 
-    def _delete_dns_server_record(self, domain_name: str, record: DNSRecord):
-        """DNS sunucusundan kaydı sil"""
+    def _send_update(self, update: dns.update.Update) -> None:
+        """Dynamic update mesajını DNS sunucusuna gönder"""
         try:
-            update = dns.update.Update(domain_name)
-            update.delete(record.name, record.type)
-            dns.query.tcp(update, "localhost")
+            response = dns.query.tcp(update, self.dns_server, timeout=self.dns_timeout)
+            if response.rcode() != dns.rcode.NOERROR:
+                raise RuntimeError(f"DNS update refused: {dns.rcode.to_text(response.rcode())}")
         except Exception as e:
-            logger.error(f"Failed to delete DNS record: {str(e)}")
+            logger.error(f"Failed to update DNS server: {str(e)}")
             raise
 
-    def _verify_spf(self, domain_name: str) -> Dict:
-        """SPF kaydını doğrula"""
-        try:
-            spf_records = dns.resolver.resolve(domain_name, "TXT")
-            for record in spf_records:
-                if record.strings[0].decode().startswith("v=spf1"):
-                    return {
-                        "status": "valid",
-                        "record": record.strings[0].decode()
-                    }
-            return {
-                "status": "missing",
-                "message": "No SPF record found"
-            }
-        except Exception as e:
-            return {
-                "status": "error",
-                "message": str(e)
-            }
 
-    def _verify_dkim(self, domain_name: str) -> Dict:
-        """DKIM kaydını doğrula"""
-        try:
-            # DKIM selector'ları için yaygın değerler
-            selectors = ["default", "mail", "selector1", "selector2"]
-            for selector in selectors:
-                try:
-                    dkim_records = dns.resolver.resolve(f"{selector}._domainkey.{domain_name}", "TXT")
-                    for record in dkim_records:
-                        if "v=DKIM1" in record.strings[0].decode():
-                            return {
-                                "status": "valid",
-                                "selector": selector,
-                                "record": record.strings[0].decode()
-                            }
-                except dns.resolver.NXDOMAIN:
-                    continue
-            return {
-                "status": "missing",
-                "message": "No DKIM record found"
-            }
-        except Exception as e:
-            return {
-                "status": "error",
-                "message": str(e)
-            }
+# Son toplu doğrulamanın sonuçları (domain adı -> sonuç)
+fleet_verification = {"checked_at": None, "duration": None, "results": {}}
+
+
+def verify_all_domains(db: Session, concurrency: Optional[int] = None) -> Dict:
+    """Tüm aktif domainlerin SPF/DKIM/DMARC kayıtlarını eşzamanlı doğrula"""
+    concurrency = concurrency or int(os.getenv("DNS_VERIFY_CONCURRENCY", "200"))
+    domains = [name for (name,) in db.query(Domain.name).filter(Domain.is_active == True).all()]
+    # Domainlere özel DKIM seçicileri tek sorguyla okunur
+    domain_selectors = {}
+    rows = db.query(Domain.name, DKIMRecord.selector).join(DKIMRecord, DKIMRecord.domain_id == Domain.id)\
+        .filter(Domain.is_active == True).order_by(DKIMRecord.id)
+    for name, selector in rows:
+        domain_selectors.setdefault(name, []).append(selector)
 
-    def _verify_dmarc(self, domain_name: str) -> Dict:
-        """DMARC kaydını doğrula"""
+    started = time.monotonic()
+    results = asyncio.run(verify_many(domains, concurrency=concurrency, domain_selectors=domain_selectors))
+    duration = time.monotonic() - started
+
+    fleet_verification.update(checked_at=datetime.utcnow(), duration=duration, results=results)
+    failing = sum(1 for r in results.values() if any(v["status"] != "valid" for v in r.values()))
+    logger.info(f"Verified DNS records of {len(domains)} domains in {duration:.1f}s, {failing} with issues")
+    return fleet_verification
+
+
+def start_dns_verification_scheduler():
+    """DNS doğrulama zamanlayıcısını başlat"""
+    scheduler = schedule.Scheduler()
+
+    def run_verification():
+        db = SessionLocal()
         try:
-            dmarc_records = dns.resolver.resolve(f"_dmarc.{domain_name}", "TXT")
-            for record in dmarc_records:
-                if "v=DMARC1" in record.strings[0].decode():
-                    return {
-                        "status": "valid",
-                        "record": record.strings[0].decode()
-                    }
-            return {
-                "status": "missing",
-                "message": "No DMARC record found"
-            }
+            verify_all_domains(db)
         except Exception as e:
-            return {
-                "status": "error",
-                "message": str(e)
-            } 
\ No newline at end of file
+            logger.error(f"Fleet DNS verification failed: {str(e)}")
+        finally:
+            db.close()
+
+    def run_scheduler():
+        while True:
+            scheduler.run_pending()
+            time.sleep(60)
+
+    # Varsayılan olarak her 30 dakikada bir
+    scheduler.every(int(os.getenv("DNS_VERIFY_INTERVAL", "30"))).minutes.do(run_verification)
+
+    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
+    scheduler_thread.start()
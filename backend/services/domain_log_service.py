@@ -0,0 +1,82 @@
+import os
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from ..models import Domain, DomainLog
+from ..database import SessionLocal
+from .. import schemas
+from ..utils.batch_writer import BatchWriter
+from ..utils.log_broker import log_broker
+
+logger = logging.getLogger(__name__)
+
+
+def write_domain_logs(rows: List[Dict]) -> Optional[Tuple[Set[int], int]]:
+    """Kayıtları tek çok satırlı INSERT ve tek işlemle yaz.
+
+    Canlı akışı izlenen domainler varsa (domain kimlikleri, yazımdan önceki
+    en büyük kimlik) döner; yayın `publish_domain_logs` ile commit'ten sonra
+    ayrı yapılır, böylece yayın hatası yazılmış grubun yeniden denenmesine yol açmaz.
+    Denetimle yazım arasında silinen domainin kayıtları yazıcı tarafından ayıklanır.
+    """
+    db = SessionLocal()
+    try:
+        # Kuyruğa alındıktan sonra silinen domainlerin kayıtları yazılamaz
+        domain_ids = {row["domain_id"] for row in rows}
+        existing = {domain_id for domain_id, in db.query(Domain.id).filter(Domain.id.in_(domain_ids))}
+        if existing != domain_ids:
+            kept = [row for row in rows if row["domain_id"] in existing]
+            logger.warning(
+                f"Dropping {len(rows) - len(kept)} log rows of deleted domains {sorted(domain_ids - existing)}"
+            )
+            rows = kept
+            if not rows:
+                return None
+        watched = {domain_id for domain_id in existing if log_broker.wants(domain_id)}
+        before = 0
+        if watched:
+            before = db.query(func.max(DomainLog.id)).scalar() or 0
+        db.execute(DomainLog.__table__.insert(), rows)
+        db.commit()
+        return (watched, before) if watched else None
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def publish_domain_logs(rows: List[Dict], written: Optional[Tuple[Set[int], int]]) -> None:
+    """Yazılan grubun izlenen domainlere ait satırlarını abonelere yayınla.
+
+    Çok satırlı INSERT eklenen satırların kimliklerini döndürmediğinden yeni
+    satırlar tek sorguyla geri okunur. Başka bir worker'ın aynı anda yazdığı
+    satırlar iki kez yayınlanabilir; istemciler kayıtları imleçle ayıkladığından
+    bu zararsızdır.
+    """
+    if not written:
+        return
+    watched, before = written
+    db = SessionLocal()
+    try:
+        logs = db.query(DomainLog).filter(
+            DomainLog.domain_id.in_(watched),
+            DomainLog.id > before
+        ).order_by(DomainLog.id).limit(len(rows) * 2).all()
+        for log in logs:
+            log_broker.publish(log.domain_id, jsonable_encoder(schemas.DomainLog.from_orm(log)))
+    finally:
+        db.close()
+
+
+domain_log_writer = BatchWriter(
+    write_domain_logs,
+    max_batch=int(os.getenv("DOMAIN_LOG_BATCH_SIZE", "500")),
+    max_delay=float(os.getenv("DOMAIN_LOG_BATCH_DELAY", "1.0")),
+    max_pending=int(os.getenv("DOMAIN_LOG_MAX_PENDING", "20000")),
+    name="domain-log-writer",
+    retry_on=(OperationalError,),
+    after_flush=publish_domain_logs
+)
@@ -10,6 +10,7 @@ from ..models import FilePermission, FileOperation, FileSearch, DirectoryRestric
 from ..utils.ssh import SSHManager
 import json
 import re
+import shlex
 import stat
 
 logger = logging.getLogger(__name__)
@@ -202,12 +203,13 @@ class FileService:
             self.db.add(operation)
             self.db.commit()
 
-            # Dosyayı çıkart
+            # Dosyayı uzak sunucuda çıkart; yollar kabuğa tırnaklanarak verilir
+            source, destination = shlex.quote(source_path), shlex.quote(destination_path)
             if source_path.endswith(".zip"):
-                unzip_cmd = f"unzip {source_path} -d {destination_path}"
+                unzip_cmd = f"unzip {source} -d {destination}"
                 ssh.execute_command(unzip_cmd)
             elif source_path.endswith(".tar.gz"):
-                tar_cmd = f"tar -xzf {source_path} -C {destination_path}"
+                tar_cmd = f"tar -xzf {source} -C {destination}"
                 ssh.execute_command(tar_cmd)
 
             # İşlemi tamamla
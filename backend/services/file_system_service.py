@@ -3,10 +3,15 @@ import pwd
 import grp
 import shutil
 import logging
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, BinaryIO, Iterator, Optional
 from sqlalchemy.orm import Session
 from ..models import Domain, FilePermission
+from ..utils.directory_cache import directory_cache, iter_directory, matches_filter
+from ..utils.archive import ArchiveExtractor, ProgressCallback, archive_format, stream_archive
+from typing import Tuple
 import subprocess
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +23,8 @@ class FileSystemService:
             "files": "644",
             "directories": "755"
         }
+        self.max_extracted_size = int(os.getenv("MAX_EXTRACTED_SIZE", str(20 * 1024 ** 3)))
+        self.max_archive_members = int(os.getenv("MAX_ARCHIVE_MEMBERS", "500000"))
 
     def setup_domain_directory(self, domain_id: int) -> None:
         """Domain için dosya sistemi yapılandırması oluştur"""
@@ -162,4 +169,117 @@ phpinfo();
             }
         except Exception as e:
             logger.error(f"Failed to get file permissions: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+
+    def resolve_path(self, domain: Domain, path: str) -> str:
+        """Domain köküne göre göreli yolu mutlak yola çevir, dışına çıkılmasını engelle"""
+        domain_root = os.path.realpath(os.path.join(self.web_root, domain.name))
+        full_path = os.path.realpath(os.path.join(domain_root, path.lstrip("/")))
+        if full_path != domain_root and not full_path.startswith(domain_root + os.sep):
+            raise PermissionError("Path is outside of the domain root")
+        return full_path
+
+    def list_directory(self, domain_id: int, path: str = "/", cursor: Optional[str] = None,
+                       limit: int = 100, sort: str = "name", order: str = "asc",
+                       pattern: Optional[str] = None, file_type: str = "all",
+                       show_hidden: bool = True) -> Dict[str, Any]:
+        """Dizin içeriğini sıralı ve sayfalı listele"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        full_path = self.resolve_path(domain, path)
+        if not os.path.isdir(full_path):
+            raise ValueError("Directory not found")
+
+        page = directory_cache.list_page(
+            full_path,
+            cursor=cursor,
+            limit=limit,
+            sort=sort,
+            order=order,
+            pattern=pattern,
+            file_type=file_type,
+            show_hidden=show_hidden
+        )
+        page["path"] = path
+        return page
+
+    def stream_directory(self, domain_id: int, path: str = "/", pattern: Optional[str] = None,
+                         file_type: str = "all", show_hidden: bool = True) -> Iterator[Dict[str, Any]]:
+        """Dizin içeriğini önbelleğe almadan, scandir sırasıyla akış halinde döndür"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        full_path = self.resolve_path(domain, path)
+        if not os.path.isdir(full_path):
+            raise ValueError("Directory not found")
+
+        for entry in iter_directory(full_path):
+            if matches_filter(entry, pattern, file_type, show_hidden):
+                yield entry
+
+    def save_file(self, domain_id: int, path: str, source: BinaryIO, buffer_size: int = 1024 * 1024) -> str:
+        """Akıştaki içeriği hedef yola geçici dosya üzerinden atomik olarak yaz"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        full_path = self.resolve_path(domain, path)
+        target_dir = os.path.dirname(full_path)
+        if not os.path.isdir(target_dir):
+            raise ValueError("Target directory not found")
+
+        fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=f".{os.path.basename(full_path)}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(source, f, buffer_size)
+            os.chmod(tmp_path, int(self.default_permissions["files"], 8))
+            os.replace(tmp_path, full_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        directory_cache.invalidate(target_dir)
+        return full_path
+
+    def extract_archive(self, domain_id: int, source_path: str, destination_path: str,
+                        workers: int = 1, progress: Optional[ProgressCallback] = None,
+                        cancelled: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Domain içindeki bir arşivi yine domain içindeki bir dizine çıkar"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        source = self.resolve_path(domain, source_path)
+        destination = self.resolve_path(domain, destination_path)
+        if not os.path.isfile(source):
+            raise ValueError("Archive not found")
+
+        extractor = ArchiveExtractor(
+            max_total_size=self.max_extracted_size,
+            max_members=self.max_archive_members,
+            workers=workers,
+            progress=progress,
+            cancelled=cancelled
+        )
+        result = extractor.extract(source, destination)
+        directory_cache.invalidate(destination)
+        return result
+
+    def archive_stream(self, domain_id: int, path: str, fmt: str = "zip",
+                       store: bool = False) -> Tuple[str, Iterator[bytes]]:
+        """Dizini geçici dosya oluşturmadan arşivleyip akış olarak döndür"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        full_path = self.resolve_path(domain, path)
+        if not os.path.exists(full_path):
+            raise ValueError("Path not found")
+
+        name = os.path.basename(full_path.rstrip(os.sep)) or domain.name
+        filename = f"{name}.{archive_format(fmt, store)}"
+        return filename, stream_archive(full_path, fmt=fmt, store=store)
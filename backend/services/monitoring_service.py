@@ -12,6 +12,8 @@ import time
 import json
 import requests
 from ..utils.ssh import SSHManager
+from ..database import SessionLocal
+from .php_service import PHPService
 
 logger = logging.getLogger(__name__)
 
@@ -279,22 +281,28 @@ class MonitoringService:
 
 def start_monitoring_scheduler():
     """İzleme zamanlayıcısını başlat"""
+    scheduler = schedule.Scheduler()
+
     def run_scheduler():
+        ensure_pool_status_paths()
         while True:
-            schedule.run_pending()
+            scheduler.run_pending()
             time.sleep(60)
 
     # Her 5 dakikada bir metrik topla
-    schedule.every(5).minutes.do(collect_all_metrics)
+    scheduler.every(5).minutes.do(collect_all_metrics)
     
+    # PHP-FPM havuz metriklerini topla (varsayılan her dakika)
+    scheduler.every(int(os.getenv("PHP_POOL_METRICS_INTERVAL", "1"))).minutes.do(collect_all_pool_metrics)
+
     # Her saat güvenlik kontrolü yap
-    schedule.every().hour.do(check_all_security)
+    scheduler.every().hour.do(check_all_security)
     
     # Her gün güncelleme kontrolü yap
-    schedule.every().day.at("03:00").do(check_all_updates)
+    scheduler.every().day.at("03:00").do(check_all_updates)
     
     # Her hafta malware taraması yap
-    schedule.every().monday.at("02:00").do(scan_all_malware)
+    scheduler.every().monday.at("02:00").do(scan_all_malware)
 
     # Zamanlayıcıyı arka planda çalıştır
     scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
@@ -314,6 +322,26 @@ def collect_all_metrics():
     
     db.close()
 
+def ensure_pool_status_paths():
+    """Eski havuz dosyalarına status yolunu başlangıçta bir kez ekle"""
+    db = SessionLocal()
+    try:
+        PHPService(db).ensure_status_paths()
+    except Exception as e:
+        logger.error(f"Failed to enable PHP-FPM status paths: {str(e)}")
+    finally:
+        db.close()
+
+def collect_all_pool_metrics():
+    """Yerel PHP-FPM havuzlarının status metriklerini topla"""
+    db = SessionLocal()
+    try:
+        PHPService(db).collect_pool_metrics()
+    except Exception as e:
+        logger.error(f"Failed to collect PHP-FPM pool metrics: {str(e)}")
+    finally:
+        db.close()
+
 def check_all_security():
     """Tüm sunucuların güvenlik kontrolünü yap"""
     db = Session()
@@ -0,0 +1,75 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from ..models import Domain
+from .web_server_service import WebServerService
+from ..utils.nginx_vhost import FASTCGI_CACHE_LEVELS
+from ..utils.page_cache import (
+    cache_status_counts, hit_ratio, purge_all, purge_keys, purge_prefix, url_keys
+)
+
+logger = logging.getLogger(__name__)
+
+class PageCacheService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.web_server = WebServerService(db)
+        self.cache_dir = self.web_server.fastcgi_cache_dir
+        self.log_dir = os.getenv("NGINX_LOG_DIR", "/var/log/nginx")
+
+    def _get_domain(self, domain_id: int) -> Domain:
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+        return domain
+
+    def _zone_dir(self, domain: Domain) -> str:
+        return os.path.join(self.cache_dir, domain.name)
+
+    def set_enabled(self, domain_id: int, enabled: bool, valid: Optional[str] = None) -> Dict[str, Any]:
+        """Domainin FastCGI sayfa önbelleğini aç/kapat"""
+        options = {"fastcgi_cache": enabled}
+        if valid:
+            options["fastcgi_cache_valid"] = valid
+        return self.web_server.update_vhost_options(domain_id, options)
+
+    def purge(self, domain_id: int, urls: Optional[List[str]] = None, prefix: Optional[str] = None,
+              everything: bool = False) -> Dict[str, Any]:
+        """Önbellek girdilerini anahtar üzerinden sil; nginx yeniden yüklenmez.
+
+        URL'ler için dosya yolu anahtarın md5'inden doğrudan hesaplanır.
+        Önek temizliği önbellek dizinini tarar, tamamı ise dizini bir kerede
+        boşaltır.
+        """
+        domain = self._get_domain(domain_id)
+        root = self._zone_dir(domain)
+        hosts = [domain.name, f"www.{domain.name}"]
+        result = {"domain": domain.name, "removed": 0}
+
+        if everything:
+            purge_all(root)
+            result["purged_all"] = True
+            logger.info(f"Purged entire page cache for {domain.name}")
+            return result
+
+        for url in urls or []:
+            result["removed"] += purge_keys(root, url_keys(url, hosts), FASTCGI_CACHE_LEVELS)
+        if prefix:
+            if not prefix.startswith("/"):
+                raise ValueError("Prefix must start with /")
+            scan = purge_prefix(root, prefix)
+            result["removed"] += scan["removed"]
+            result["scanned"] = scan["scanned"]
+        return result
+
+    def stats(self, domain_id: int) -> Dict[str, Any]:
+        """Access log'daki önbellek durum alanından isabet oranını hesapla"""
+        domain = self._get_domain(domain_id)
+        counts = cache_status_counts(os.path.join(self.log_dir, f"{domain.name}-access.log"))
+        return {
+            "domain": domain.name,
+            "enabled": self.web_server.get_vhost_options(domain_id)["fastcgi_cache"],
+            "hit_ratio": hit_ratio(counts),
+            "counts": counts
+        }
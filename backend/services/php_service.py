@@ -1,14 +1,42 @@
 import os
+import time
+import asyncio
 import subprocess
 import logging
-from typing import List, Dict, Any
+import threading
+import schedule
+from datetime import timedelta
+from typing import List, Dict, Any, Iterator, Tuple
 from sqlalchemy.orm import Session
-from ..models import PHPConfiguration, Domain
+from ..models import PHPConfiguration, Domain, PHPPoolMetric
+from ..database import SessionLocal
 import yaml
+from ..utils.reload_coordinator import ConfigTestError, get_reload_coordinator
+from ..utils.service_control import ServiceController, service_profile
+from ..utils.config_sync import ConfigChangeSet, render_all
+from ..utils.fpm_sizing import (
+    DEFAULT_WORKER_MEMORY, MB, OndemandPolicy, memory_total, read_pm_settings, request_rates,
+    sample_pool_memory, size_pools, update_pool_config
+)
+from ..utils.fastcgi import FastCGIError, fastcgi_get, fetch_many, saturation
+from ..utils.opcache import (
+    OPCACHE_STATUS_SCRIPT, compute_profile, count_php_files, parse_status_body, render_ini
+)
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Boşta kalan siteler ondemand'a düşer, yoğunlaşanlar geri yükseltilir
+pool_policy = OndemandPolicy(
+    idle_rate=float(os.getenv("PHP_FPM_IDLE_RATE", "0.05")),
+    busy_rate=float(os.getenv("PHP_FPM_BUSY_RATE", "0.5")),
+    idle_samples=int(os.getenv("PHP_FPM_IDLE_SAMPLES", "4")),
+    settle_samples=int(os.getenv("PHP_FPM_SETTLE_SAMPLES", "4"))
+)
+
+# Havuz başına son FPM status örneği (birikimli sayaçların farkı için)
+_last_pool_status: Dict[str, Dict] = {}
+
 class PHPService:
     def __init__(self, db: Session):
         self.db = db
@@ -16,6 +44,17 @@ class PHPService:
         self.php_fpm_pool_dir = "/etc/php/{version}/fpm/pool.d"
         self.php_fpm_conf_dir = "/etc/php/{version}/fpm"
         self.php_ini_dir = "/etc/php/{version}/fpm/conf.d"
+        self.idle_timeout = int(os.getenv("PHP_FPM_IDLE_TIMEOUT", "10"))
+        self.status_path = os.getenv("PHP_FPM_STATUS_PATH", "/fpm-status")
+        self.opcache_status_script = os.getenv(
+            "PHP_OPCACHE_STATUS_SCRIPT", "/usr/local/share/panel/opcache-status.php"
+        )
+        web_server_type = os.getenv("WEB_SERVER_TYPE", "nginx")
+        self.access_log_pattern = os.getenv(
+            "PHP_POOL_ACCESS_LOG",
+            "/var/log/nginx/{domain}-access.log" if web_server_type == "nginx"
+            else "/var/log/apache2/{domain}-access.log"
+        )
 
     def create_php_config(self, domain_id: int, version: str) -> PHPConfiguration:
         """Domain için PHP yapılandırması oluştur"""
@@ -43,8 +82,8 @@ class PHPService:
         self.db.commit()
         self.db.refresh(php_config)
 
-        # PHP-FPM'i yeniden başlat
-        self._restart_php_fpm(version)
+        # PHP-FPM'i graceful olarak yeniden yükle
+        self._reload_php_fpm(version)
 
         return php_config
 
@@ -66,8 +105,8 @@ class PHPService:
         self.db.commit()
         self.db.refresh(config)
 
-        # PHP-FPM'i yeniden başlat
-        self._restart_php_fpm(config.version)
+        # PHP-FPM'i graceful olarak yeniden yükle
+        self._reload_php_fpm(config.version)
 
         return config
 
@@ -79,11 +118,10 @@ group = {domain.name}
 listen = /run/php/php{version}-fpm-{domain.name}.sock
 listen.owner = www-data
 listen.group = www-data
-pm = dynamic
+pm = ondemand
 pm.max_children = 5
-pm.start_servers = 2
-pm.min_spare_servers = 1
-pm.max_spare_servers = 3
+pm.process_idle_timeout = {self.idle_timeout}s
+pm.status_path = {self.status_path}
 php_admin_value[upload_max_filesize] = 32M
 php_admin_value[post_max_size] = 32M
 php_admin_value[memory_limit] = 256M
@@ -91,6 +129,249 @@ php_admin_value[max_execution_time] = 30
 php_admin_value[max_input_vars] = 3000
 """
 
+    def regenerate_pools(self, dry_run: bool = False, with_diff: bool = False) -> Dict[str, Any]:
+        """Tüm aktif domainlerin havuz dosyalarını şablondan yeniden üret.
+
+        Otomatik boyutlandırmanın yazdığı pm.* ayarları korunur. Domainin PHP
+        sürümü değişmişse eski sürümdeki havuz dosyası kaldırılır. Etkilenen
+        her sürüm önce test edilir, hata olursa tüm değişiklikler geri alınır;
+        ardından her sürüm bir kez reload edilir.
+        """
+        domains = {d.name: d for d in self.db.query(Domain).filter(Domain.is_active == True)}
+        existing = {}
+        for version in self.php_versions:
+            pool_dir = self.php_fpm_pool_dir.format(version=version)
+            for name in domains:
+                path = os.path.join(pool_dir, f"{name}.conf")
+                if os.path.exists(path):
+                    existing.setdefault(name, []).append(path)
+
+        def render(domain: Domain) -> str:
+            config = self._generate_pool_config(domain, domain.php_version)
+            current = os.path.join(self.php_fpm_pool_dir.format(version=domain.php_version), f"{domain.name}.conf")
+            previous = existing.get(domain.name, [])
+            source = current if current in previous else (previous[0] if previous else None)
+            if source:
+                with open(source, "r") as f:
+                    config = update_pool_config(config, read_pm_settings(f.read()))
+            return config
+
+        rendered, errors = render_all(domains, render, int(os.getenv("CONFIG_RENDER_WORKERS", "8")))
+        desired = {
+            os.path.join(self.php_fpm_pool_dir.format(version=domains[name].php_version), f"{name}.conf"): config
+            for name, config in rendered.items()
+        }
+        # Hatalı üretilen domainlerin dosyalarına dokunulmaz
+        stale = [path for name, paths in existing.items() if name in rendered for path in paths]
+        changes = ConfigChangeSet(desired, remove=stale)
+        for name, error in errors.items():
+            logger.error(f"Failed to render PHP-FPM pool for {name}: {error}")
+
+        result = changes.summary(with_diff)
+        result.update({"errors": errors, "reloads": []})
+        if dry_run or not changes.changed:
+            return result
+
+        versions = sorted({
+            version for version in self.php_versions
+            for path in changes.created + changes.updated + changes.removed
+            if os.path.dirname(path) == self.php_fpm_pool_dir.format(version=version)
+        })
+        changes.apply()
+        try:
+            for version in versions:
+                ServiceController().test(service_profile(f"php{version}-fpm"))
+        except ConfigTestError as e:
+            logger.error(f"PHP-FPM configuration test failed after regeneration: {e.output}")
+            changes.rollback()
+            raise
+
+        result["reloads"] = [self._reload_php_fpm(version) for version in versions]
+        return result
+
+    def _memory_budget(self) -> int:
+        """PHP-FPM işçilerine ayrılan sunucu geneli bellek bütçesi (bayt)"""
+        budget = os.getenv("PHP_FPM_MEMORY_BUDGET_MB")
+        if budget:
+            return int(budget) * MB
+        return int(memory_total() * float(os.getenv("PHP_FPM_MEMORY_FRACTION", "0.6")))
+
+    def autosize_pools(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Havuzları ölçülen işçi belleği ve istek hızına göre boyutlandır.
+
+        Tüm sürümlerin havuzları aynı bellek bütçesini paylaşır. İstek hızı
+        henüz ölçülemeyen havuzlar değiştirilmez, mevcut en kötü durum
+        kullanımları bütçeden düşülür. Değişen her PHP sürümü için tek bir
+        graceful reload yapılır.
+        """
+        memory = sample_pool_memory()
+        budget = self._memory_budget()
+        saturated = self._saturated_pools(
+            timedelta(minutes=int(os.getenv("PHP_POOL_AUTOSIZE_INTERVAL", "15")))
+        )
+
+        pools = {}
+        samples = {}
+        skipped = 0
+        for version, name, path in self._pool_files():
+            with open(path, "r") as f:
+                config = f.read()
+            current = read_pm_settings(config)
+            workers = memory.get(name, [])
+            rate = request_rates.sample(self.access_log_pattern.format(domain=name))
+            if rate is None:
+                # Ölçülemeyen havuzun en kötü durum kullanımı için yer ayır
+                worker = sum(workers) // len(workers) if workers else DEFAULT_WORKER_MEMORY
+                budget -= int(current.get("pm.max_children", "5")) * worker
+                skipped += 1
+                continue
+            key = f"{version}/{name}"
+            pools[key] = (version, name, path, config, current)
+            samples[key] = {
+                "rate": rate,
+                "memory": workers,
+                "mode": current.get("pm"),
+                "max_children": int(current.get("pm.max_children", "0")),
+                "saturated": name in saturated
+            }
+
+        sized = size_pools(
+            samples,
+            max(budget, 0),
+            request_time=float(os.getenv("PHP_FPM_REQUEST_TIME", "0.2")),
+            idle_timeout=self.idle_timeout,
+            policy=pool_policy,
+            min_children=int(os.getenv("PHP_FPM_MIN_CHILDREN", "5")),
+            max_growth=float(os.getenv("PHP_FPM_MAX_GROWTH", "2.0"))
+        )
+
+        changed = {}
+        versions = set()
+        released = 0
+        for key, settings in sized.items():
+            version, name, path, config, current = pools[key]
+            current.pop("pm.max_requests", None)
+            if current == settings:
+                continue
+            changed[key] = settings
+            if settings["pm"] == "ondemand" and current.get("pm") != "ondemand":
+                # Boşta bekleyen işçiler idle timeout sonunda sonlanır
+                released += sum(samples[key]["memory"])
+            if not dry_run:
+                self._write_pool_config(version, f"{name}.conf", update_pool_config(config, settings))
+                versions.add(version)
+
+        # Her sürüm için değişiklikler tek reload ile uygulanır
+        reloads = [self._reload_php_fpm(version) for version in sorted(versions)]
+
+        if changed:
+            logger.info(f"Resized {len(changed)} PHP-FPM pools")
+        return {
+            "budget": max(budget, 0),
+            "changed": changed,
+            "unchanged": len(sized) - len(changed),
+            "skipped": skipped,
+            "ondemand": sum(1 for settings in sized.values() if settings["pm"] == "ondemand"),
+            "released_memory": released,
+            "reloads": reloads
+        }
+
+    def _pool_files(self) -> Iterator[Tuple[str, str, str]]:
+        """Aktif domainlerin havuz dosyaları: (sürüm, havuz adı, yol)"""
+        domains = [name for (name,) in self.db.query(Domain.name).filter(Domain.is_active == True)]
+        for version in self.php_versions:
+            pool_dir = self.php_fpm_pool_dir.format(version=version)
+            for name in domains:
+                path = os.path.join(pool_dir, f"{name}.conf")
+                if os.path.exists(path):
+                    yield version, name, path
+
+    def _saturated_pools(self, window: timedelta) -> set:
+        """Son `window` içinde doygun görülen havuz adları"""
+        since = datetime.utcnow() - window
+        rows = self.db.query(PHPPoolMetric.pool).filter(
+            PHPPoolMetric.saturated == True,
+            PHPPoolMetric.created_at >= since
+        ).distinct()
+        return {pool for (pool,) in rows}
+
+    def ensure_status_paths(self) -> List[str]:
+        """pm.status_path içermeyen havuzlara ekle; değişen sürümleri tek reload ile uygula"""
+        versions = set()
+        for version, name, path in self._pool_files():
+            with open(path, "r") as f:
+                config = f.read()
+            if "pm.status_path" in config:
+                continue
+            self._write_pool_config(version, f"{name}.conf",
+                                    config.rstrip("\n") + f"\npm.status_path = {self.status_path}\n")
+            versions.add(version)
+        for version in sorted(versions):
+            self._reload_php_fpm(version)
+        return sorted(versions)
+
+    def collect_pool_metrics(self) -> Dict[str, Any]:
+        """Tüm havuzların FPM status çıktısını paralel topla ve kaydet.
+
+        Havuzlarda pm.status_path bulunmalıdır; yeni havuzlar şablondan bu
+        ayarla üretilir, eski havuzlar zamanlayıcı başlarken `ensure_status_paths`
+        ile bir kez güncellenir.
+        """
+        pools = list(self._pool_files())
+        sockets = {
+            f"{version}/{name}": f"/run/php/php{version}-fpm-{name}.sock"
+            for version, name, _ in pools
+        }
+        statuses = asyncio.run(fetch_many(
+            sockets,
+            self.status_path,
+            timeout=float(os.getenv("PHP_FPM_STATUS_TIMEOUT", "5")),
+            concurrency=int(os.getenv("PHP_FPM_STATUS_CONCURRENCY", "50"))
+        ))
+        domain_ids = dict(self.db.query(Domain.name, Domain.id).filter(
+            Domain.name.in_([name for _, name, _ in pools])
+        )) if pools else {}
+
+        metrics = []
+        saturated = []
+        for key, status in statuses.items():
+            version, name = key.split("/", 1)
+            metric = PHPPoolMetric(domain_id=domain_ids.get(name), pool=name, php_version=version)
+            if "error" in status:
+                metric.error = status["error"][:255]
+                _last_pool_status.pop(key, None)
+            else:
+                result = saturation(status, _last_pool_status.get(key))
+                _last_pool_status[key] = status
+                metric.process_manager = status.get("process_manager")
+                metric.listen_queue = status.get("listen_queue", 0)
+                metric.max_listen_queue = status.get("max_listen_queue", 0)
+                metric.active_processes = status.get("active_processes", 0)
+                metric.idle_processes = status.get("idle_processes", 0)
+                metric.total_processes = status.get("total_processes", 0)
+                metric.requests = result["deltas"]["accepted_conn"]
+                metric.max_children_reached = result["deltas"]["max_children_reached"]
+                metric.slow_requests = result["deltas"]["slow_requests"]
+                metric.saturated = result["saturated"]
+                metric.saturation_reasons = ", ".join(result["reasons"]) or None
+                if result["saturated"]:
+                    saturated.append(name)
+            metrics.append(metric)
+
+        self.db.bulk_save_objects(metrics)
+        # Eski örnekleri temizle
+        retention = datetime.utcnow() - timedelta(days=int(os.getenv("PHP_POOL_METRIC_RETENTION_DAYS", "7")))
+        self.db.query(PHPPoolMetric).filter(PHPPoolMetric.created_at < retention).delete(synchronize_session=False)
+        self.db.commit()
+
+        if saturated:
+            logger.warning(f"Saturated PHP-FPM pools: {', '.join(saturated)}")
+        return {
+            "pools": len(statuses),
+            "errors": sum(1 for status in statuses.values() if "error" in status),
+            "saturated": saturated
+        }
+
     def _write_pool_config(self, version: str, pool_name: str, config: str) -> None:
         """PHP-FPM havuz yapılandırmasını kaydet"""
         pool_path = os.path.join(
@@ -124,16 +405,16 @@ php_admin_value[max_input_vars] = 3000
             for key, value in current_settings.items():
                 f.write(f"{key} = {value}\n")
 
-    def _restart_php_fpm(self, version: str) -> None:
-        """PHP-FPM'i yeniden başlat"""
+    def _reload_php_fpm(self, version: str) -> Dict[str, Any]:
+        """PHP-FPM'i graceful olarak yeniden yükle (php-fpm -t, ardından USR2).
+
+        Çalışan istekler tamamlanır; aynı anda gelen değişiklikler tek bir
+        reload ile uygulanır.
+        """
         try:
-            subprocess.run(
-                ["systemctl", "restart", f"php{version}-fpm"],
-                check=True,
-                capture_output=True
-            )
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to restart PHP-FPM: {e.stderr.decode()}")
+            return get_reload_coordinator(f"php{version}-fpm").reload()
+        except Exception as e:
+            logger.error(f"Failed to reload PHP-FPM {version}: {str(e)}")
             raise
 
     def get_available_versions(self) -> List[str]:
@@ -154,4 +435,101 @@ php_admin_value[max_input_vars] = 3000
             }
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to get PHP info: {e.stderr}")
-            raise 
\ No newline at end of file
+            raise
+
+    def apply_performance_profile(self, version: str, policy: str = "balanced",
+                                  dry_run: bool = False) -> Dict[str, Any]:
+        """Sürümün OPcache ve realpath cache ayarlarını dosya sayısına göre yaz.
+
+        Bu sürümü kullanan domainlerin doküman köklerindeki PHP dosyaları
+        sayılır; ayarlar conf.d altındaki ayrı bir dosyaya yazılır, böylece
+        custom.ini'deki kullanıcı ayarlarına dokunulmaz.
+        """
+        if version not in self.php_versions:
+            raise ValueError("PHP version not found")
+
+        domains = [name for pool_version, name, _ in self._pool_files() if pool_version == version]
+        counts = count_php_files(f"/var/www/{name}/public_html" for name in domains)
+        settings = compute_profile(counts["files"], counts["bytes"], policy)
+
+        ini_path = os.path.join(self.php_ini_dir.format(version=version), "99-performance.ini")
+        content = render_ini(settings)
+        changed = True
+        if os.path.exists(ini_path):
+            with open(ini_path, "r") as f:
+                changed = f.read() != content
+
+        reload = None
+        if changed and not dry_run:
+            with open(ini_path, "w") as f:
+                f.write(content)
+            # OPcache paylaşımlı belleği yalnızca ana süreç yeniden yüklenince yeniden boyutlanır
+            reload = self._reload_php_fpm(version)
+
+        return {
+            "version": version,
+            "policy": policy,
+            "domains": len(domains),
+            "files": counts["files"],
+            "bytes": counts["bytes"],
+            "settings": settings,
+            "changed": changed,
+            "reload": reload
+        }
+
+    def _ensure_status_script(self) -> None:
+        if os.path.exists(self.opcache_status_script):
+            return
+        os.makedirs(os.path.dirname(self.opcache_status_script), exist_ok=True)
+        with open(self.opcache_status_script, "w") as f:
+            f.write(OPCACHE_STATUS_SCRIPT)
+        os.chmod(self.opcache_status_script, 0o644)
+
+    def get_opcache_status(self, version: str) -> Dict[str, Any]:
+        """OPcache isabet oranı ve doluluk bilgisini FPM üzerinden al.
+
+        CLI'nin OPcache'i ayrı olduğundan durum, sürümün havuzlarından biri
+        üzerinden FastCGI ile çalıştırılan küçük bir betikle okunur; aynı
+        ana süreçteki tüm havuzlar aynı paylaşımlı belleği kullanır.
+        """
+        if version not in self.php_versions:
+            raise ValueError("PHP version not found")
+
+        sockets = [
+            f"/run/php/php{version}-fpm-{name}.sock"
+            for pool_version, name, _ in self._pool_files() if pool_version == version
+        ]
+        sockets = [path for path in sockets if os.path.exists(path)]
+        if not sockets:
+            raise ValueError("No running PHP-FPM pool for this version")
+
+        self._ensure_status_script()
+        response = asyncio.run(fastcgi_get(sockets[0], self.opcache_status_script, timeout=5.0))
+        if response["status"] != 200:
+            raise FastCGIError(f"OPcache status script returned HTTP {response['status']}")
+        return dict(parse_status_body(response["body"]), version=version)
+
+
+def start_php_pool_autosize_scheduler():
+    """PHP-FPM havuz boyutlandırma zamanlayıcısını başlat"""
+    scheduler = schedule.Scheduler()
+
+    def run_autosize():
+        db = SessionLocal()
+        try:
+            PHPService(db).autosize_pools()
+        except Exception as e:
+            logger.error(f"PHP-FPM pool autosize failed: {str(e)}")
+        finally:
+            db.close()
+
+    def run_scheduler():
+        while True:
+            scheduler.run_pending()
+            time.sleep(60)
+
+    # İstek hızı iki çalışma arasındaki günlük büyümesinden ölçülür
+    scheduler.every(int(os.getenv("PHP_POOL_AUTOSIZE_INTERVAL", "15"))).minutes.do(run_autosize)
+
+    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
+    scheduler_thread.start()
@@ -0,0 +1,84 @@
+import os
+import zlib
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from ..models import SSLCertificate
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class CertificateRenewalEngine:
+    """Sertifikaları sınırlı bir iş parçacığı havuzunda paralel yenile.
+
+    Her sertifikanın yenileme zamanı, süresinin dolmasına `window` kala
+    başlayan aralığın ilk üçte ikisine kimliğinden türetilen sabit bir
+    kaymayla yayılır. Aynı gün alınmış yüzlerce sertifika böylece aynı gece
+    yenilenmez ve ACME hız sınırlarına takılmaz; son üçte bir yeniden deneme
+    payı olarak kalır. Tüm iş parçacıkları tek ACME hesabını paylaşır.
+    Yenileme işi `renew(db, cert_id)` ile verilir; bir sertifikanın hatası
+    diğerlerini durdurmaz, sonuçta `failed` altında raporlanır.
+    """
+
+    def __init__(self, renew: Callable[[Session, int], Any], session_factory=SessionLocal,
+                 max_workers: Optional[int] = None, window_days: Optional[int] = None,
+                 max_per_run: Optional[int] = None):
+        self.renew = renew
+        self.session_factory = session_factory
+        self.max_workers = max_workers or int(os.getenv("ACME_RENEWAL_WORKERS", "4"))
+        self.window = timedelta(days=window_days or int(os.getenv("ACME_RENEWAL_WINDOW_DAYS", "30")))
+        self.max_per_run = max_per_run or int(os.getenv("ACME_MAX_RENEWALS_PER_RUN", "200"))
+
+    def renewal_time(self, cert: SSLCertificate) -> datetime:
+        """Sertifikanın planlanan yenileme zamanı"""
+        window = self.window
+        if cert.issued_at:
+            # Kısa ömürlü sertifikalarda (ör. Pebble, 6 günlük sertifikalar) pencere ömrün üçte biri
+            window = min(window, (cert.expires_at - cert.issued_at) / 3)
+        fraction = (zlib.crc32(str(cert.id).encode()) % 1000) / 1000
+        return cert.expires_at - window + window * (2 / 3) * fraction
+
+    def due_certificates(self, db: Session, now: Optional[datetime] = None) -> List[int]:
+        """Yenileme zamanı gelmiş sertifikalar, süresi en yakın olan önce"""
+        now = now or datetime.utcnow()
+        certs = db.query(SSLCertificate).filter(
+            SSLCertificate.status == "active",
+            SSLCertificate.expires_at < now + self.window
+        ).order_by(SSLCertificate.expires_at).all()
+        return [cert.id for cert in certs if self.renewal_time(cert) <= now][:self.max_per_run]
+
+    def _renew(self, cert_id: int) -> None:
+        # Her iş parçacığı kendi oturumunu kullanır
+        db = self.session_factory()
+        try:
+            self.renew(db, cert_id)
+        finally:
+            db.close()
+
+    def run(self) -> Dict:
+        """Zamanı gelen sertifikaları yenile"""
+        db = self.session_factory()
+        try:
+            cert_ids = self.due_certificates(db)
+        finally:
+            db.close()
+
+        result = {"due": len(cert_ids), "renewed": 0, "failed": {}}
+        if not cert_ids:
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="acme-renewal") as pool:
+            futures = {pool.submit(self._renew, cert_id): cert_id for cert_id in cert_ids}
+            for future in as_completed(futures):
+                cert_id = futures[future]
+                try:
+                    future.result()
+                    result["renewed"] += 1
+                except Exception as e:
+                    logger.error(f"Certificate renewal failed for certificate {cert_id}: {str(e)}")
+                    result["failed"][cert_id] = str(e)
+
+        logger.info(f"Renewed {result['renewed']} of {result['due']} due certificates")
+        return result
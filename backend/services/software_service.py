@@ -6,6 +6,7 @@ from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 from ..models import SoftwareVersion, PHPConfiguration, DatabaseServer, WebServer, SSHServer
 from ..utils.ssh import SSHManager
+from ..utils.service_control import ServiceController, ssh_runner
 import json
 import re
 
@@ -229,9 +230,10 @@ class SoftwareService:
         self.db.add(php_config)
         self.db.commit()
 
-        # PHP-FPM'i yeniden başlat
+        # PHP-FPM'i graceful olarak yeniden yükle
         ssh = SSHManager(server.host, server.port, server.username, server.password)
-        ssh.execute_command("systemctl restart php-fpm")
+        service = f"php{php_config.version}-fpm" if php_config.version else "php-fpm"
+        self._reload_service(ssh, server, service)
 
         return php_config
 
@@ -256,9 +258,9 @@ class SoftwareService:
         self.db.add(db_config)
         self.db.commit()
 
-        # MySQL'i yeniden başlat
+        # MySQL yapılandırmayı yalnızca yeniden başlatıldığında okur
         ssh = SSHManager(server.host, server.port, server.username, server.password)
-        ssh.execute_command("systemctl restart mysql")
+        self._reload_service(ssh, server, "mysql")
 
         return db_config
 
@@ -283,15 +285,20 @@ class SoftwareService:
         self.db.add(web_config)
         self.db.commit()
 
-        # Web sunucusunu yeniden başlat
+        # Web sunucusunu graceful olarak yeniden yükle
         ssh = SSHManager(server.host, server.port, server.username, server.password)
-        if web_config.type == "apache":
-            ssh.execute_command("systemctl restart apache2")
-        else:
-            ssh.execute_command("systemctl restart nginx")
+        self._reload_service(ssh, server, "apache" if web_config.type == "apache" else "nginx")
 
         return web_config
 
+    def _reload_service(self, ssh: SSHManager, server: SSHServer, service: str) -> Dict:
+        """Uzak sunucudaki servisi yapılandırma testinden sonra reload ile yeniden yükle"""
+        try:
+            return ServiceController(ssh_runner(ssh), host=server.host).reload(service)
+        except Exception as e:
+            logger.error(f"Failed to reload {service} on {server.host}: {str(e)}")
+            raise
+
     def _update_software_version(
         self,
         server: SSHServer,
@@ -2,26 +2,37 @@ import os
 import subprocess
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+import time
+import asyncio
+import threading
+import schedule
+from typing import Dict, List, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from ..models import Domain, SSLCertificate
-import acme
-import josepy
-from acme import client
-from acme import messages
-from acme import challenges
-import OpenSSL
-import requests
+from ..database import SessionLocal
+from .acme_service import ACMEService
+from .dns_service import DNSService
+from .renewal_service import CertificateRenewalEngine
+from ..utils.cert_inventory import certificate_inventory, expiry_bucket
+from ..utils.reload_coordinator import get_reload_coordinator
+from ..utils.ocsp import OCSPStapler
 
 logger = logging.getLogger(__name__)
 
+ocsp_stapler = OCSPStapler(
+    os.getenv("OCSP_STAPLING_DIR", "/etc/nginx/ocsp"),
+    timeout=float(os.getenv("OCSP_TIMEOUT", "10"))
+)
+
 class SSLService:
     def __init__(self, db: Session):
         self.db = db
-        self.acme_directory = "https://acme-v02.api.letsencrypt.org/directory"
+        self.acme = ACMEService()
         self.cert_root = "/etc/ssl/certs"
         self.key_root = "/etc/ssl/private"
-        self.webroot = "/var/www/letsencrypt"
+        self.dns_propagation_timeout = int(os.getenv("ACME_DNS_PROPAGATION_TIMEOUT", "120"))
+        self.web_server_type = os.getenv("WEB_SERVER_TYPE", "nginx")
 
     def request_certificate(self, domain_id: int, is_wildcard: bool = False) -> SSLCertificate:
         """SSL sertifikası talep et"""
@@ -40,38 +51,15 @@ class SSLService:
         self.db.commit()
 
         try:
-            # ACME istemcisini oluştur
-            acme_client = self._create_acme_client()
-
             # Domain listesini hazırla
             domains = [domain.name]
             if is_wildcard:
                 domains.append(f"*.{domain.name}")
 
-            # Sertifika talebi oluştur
-            order = acme_client.new_order(domains)
-
-            # HTTP-01 doğrulaması
-            for auth in order.authorizations:
-                challenge = auth.body.challenges[0]
-                response = challenge.response(acme_client.net.key)
-                
-                # Doğrulama dosyasını oluştur
-                self._create_validation_file(
-                    domain.name,
-                    challenge.path,
-                    response.validation
-                )
-
-                # Doğrulamayı tamamla
-                acme_client.answer_challenge(challenge, response)
-
-            # Sertifikayı finalize et
-            order.finalize()
-
-            # Sertifikayı indir
-            cert_pem = order.fullchain_pem
-            key_pem = order.private_key_pem
+            key_pem, cert_pem = self.acme.issue(
+                domains,
+                dns_publisher=lambda records: self._publish_dns_challenge(domain, records)
+            )
 
             # Sertifika dosyalarını kaydet
             cert_path = os.path.join(self.cert_root, f"{domain.name}.pem")
@@ -79,17 +67,20 @@ class SSLService:
 
             with open(cert_path, "wb") as f:
                 f.write(cert_pem)
-            with open(key_path, "wb") as f:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
                 f.write(key_pem)
 
-            # Sertifika bilgilerini güncelle
+            # Sertifika bilgilerini güncelle; geçerlilik süresi sertifikanın kendisinden okunur
             cert.status = "active"
-            cert.issued_at = datetime.utcnow()
-            cert.expires_at = datetime.utcnow() + timedelta(days=90)
             cert.path = cert_path
             cert.key_path = key_path
+            self._apply_inventory(cert, certificate_inventory.get(cert_path))
             self.db.commit()
 
+            # Toplu yenilemelerde tüm sertifikalar tek bir reload ile devreye girer
+            get_reload_coordinator(self.web_server_type).request(f"certificate issued for {domain.name}")
+
             return cert
 
         except Exception as e:
@@ -127,75 +118,190 @@ class SSLService:
             raise ValueError("Certificate not found")
 
         try:
-            # Sertifika dosyasını oku
-            with open(cert.path, "rb") as f:
-                cert_data = f.read()
-
-            # Sertifika bilgilerini çıkar
-            x509 = OpenSSL.crypto.load_certificate(OpenSSL.crypto.FILETYPE_PEM, cert_data)
-            
+            # Dosya değişmediyse önbellekteki ayrıştırılmış bilgiler kullanılır
+            info = certificate_inventory.get(cert.path)
             return {
-                "subject": x509.get_subject().CN,
-                "issuer": x509.get_issuer().CN,
-                "not_before": datetime.strptime(x509.get_notBefore().decode(), "%Y%m%d%H%M%SZ"),
-                "not_after": datetime.strptime(x509.get_notAfter().decode(), "%Y%m%d%H%M%SZ"),
-                "serial": x509.get_serial_number(),
-                "version": x509.get_version()
+                "subject": info["subject"],
+                "issuer": info["issuer"],
+                "san": info["san"],
+                "not_before": info["not_before"],
+                "not_after": info["not_after"],
+                "serial": info["serial"],
+                "fingerprint": info["fingerprint"],
+                "expiry": expiry_bucket(info["not_after"])
             }
 
         except Exception as e:
             logger.error(f"Certificate status check failed: {str(e)}")
             raise
 
-    def _create_acme_client(self) -> client.ClientV2:
-        """ACME istemcisi oluştur"""
-        # Özel anahtar oluştur
-        key = josepy.JWKRSA(key=acme.jose.util.openssl_crypto.generate_private_key("rsa"))
+    def sync_inventory(self) -> Dict:
+        """Sertifika dosyalarındaki bilgileri veritabanına işle (yalnızca değişen dosyalar)"""
+        result = {"checked": 0, "updated": 0, "missing": 0}
+        certs = self.db.query(SSLCertificate).filter(
+            SSLCertificate.status == "active",
+            SSLCertificate.path.isnot(None)
+        ).yield_per(1000)
 
-        # ACME hesabı oluştur
-        net = acme.client.ClientNetwork(key)
-        directory = messages.Directory.from_json(net.get(self.acme_directory).json())
-        client = client.ClientV2(directory, net)
+        for cert in certs:
+            result["checked"] += 1
+            try:
+                info = certificate_inventory.get(cert.path)
+            except FileNotFoundError:
+                result["missing"] += 1
+                continue
+            except Exception as e:
+                logger.warning(f"Cannot parse certificate {cert.path}: {str(e)}")
+                continue
 
-        # Hesabı kaydet
-        client.new_account(messages.NewRegistration.from_data(
-            email="admin@example.com",
-            terms_of_service_agreed=True
-        ))
+            if cert.file_mtime == info["mtime"]:
+                continue
+            self._apply_inventory(cert, info)
+            result["updated"] += 1
 
-        return client
+        self.db.commit()
+        return result
 
-    def _create_validation_file(self, domain: str, path: str, content: str):
-        """Doğrulama dosyası oluştur"""
-        validation_path = os.path.join(self.webroot, path.lstrip("/"))
-        os.makedirs(os.path.dirname(validation_path), exist_ok=True)
-        
-        with open(validation_path, "w") as f:
-            f.write(content)
+    def refresh_ocsp_staples(self, force: bool = False) -> Dict:
+        """Aktif sertifikaların OCSP yanıtlarını süreleri dolmadan yenile.
 
-def start_ssl_renewal_scheduler():
-    """SSL yenileme zamanlayıcısını başlat"""
-    def check_certificates():
-        db = Session()
-        ssl_service = SSLService(db)
-        
-        # 30 günden az kalan sertifikaları yenile
-        cutoff_date = datetime.utcnow() + timedelta(days=30)
-        certs = db.query(SSLCertificate).filter(
-            SSLCertificate.expires_at < cutoff_date,
-            SSLCertificate.status == "active"
-        ).all()
+        nginx `ssl_stapling_file` içeriğini yalnızca yapılandırma yüklenirken
+        okuduğundan, yanıtı değişen tüm sertifikalar için tek bir reload
+        istenir.
+        """
+        result = {"updated": 0, "fresh": 0, "skipped": 0, "failed": 0}
+        certs = self.db.query(SSLCertificate).filter(
+            SSLCertificate.status == "active",
+            SSLCertificate.path.isnot(None)
+        ).yield_per(1000)
 
         for cert in certs:
             try:
-                ssl_service.renew_certificate(cert.id)
+                outcome = ocsp_stapler.refresh(cert.domain.name, cert.path, force=force)
+            except Exception as e:
+                logger.warning(f"OCSP refresh failed for certificate {cert.id}: {str(e)}")
+                outcome = {"status": "failed"}
+            result[outcome["status"]] += 1
+
+        if result["updated"]:
+            get_reload_coordinator(self.web_server_type).request(f"{result['updated']} OCSP responses refreshed")
+        return result
+
+    def _apply_inventory(self, cert: SSLCertificate, info: Dict) -> None:
+        cert.subject = info["subject"]
+        cert.issuer = info["issuer"]
+        cert.san = ",".join(info["san"])
+        cert.fingerprint = info["fingerprint"]
+        cert.issued_at = info["not_before"]
+        cert.expires_at = info["not_after"]
+        cert.file_mtime = info["mtime"]
+
+    def list_expiring(self, within_days: int = 30, limit: int = 100, offset: int = 0) -> Dict:
+        """Süresi yaklaşan aktif sertifikalar ((status, expires_at) indeksi ile)"""
+        cutoff = datetime.utcnow() + timedelta(days=within_days)
+        query = self.db.query(SSLCertificate).filter(
+            SSLCertificate.status == "active",
+            SSLCertificate.expires_at < cutoff
+        )
+        total = query.count()
+        certs = query.order_by(SSLCertificate.expires_at).offset(offset).limit(limit).all()
+        return {"total": total, "certificates": certs}
+
+    def inventory_summary(self) -> Dict:
+        """Aktif sertifikaların bitiş tarihine göre dağılımı"""
+        now = datetime.utcnow()
+        base = self.db.query(func.count(SSLCertificate.id)).filter(SSLCertificate.status == "active")
+        expired = base.filter(SSLCertificate.expires_at < now).scalar()
+        critical = base.filter(SSLCertificate.expires_at >= now,
+                               SSLCertificate.expires_at < now + timedelta(days=7)).scalar()
+        warning = base.filter(SSLCertificate.expires_at >= now + timedelta(days=7),
+                              SSLCertificate.expires_at < now + timedelta(days=30)).scalar()
+        total = base.scalar()
+        return {
+            "total": total,
+            "expired": expired,
+            "critical": critical,
+            "warning": warning,
+            "ok": total - expired - critical - warning,
+            "next_expiry": self.db.query(func.min(SSLCertificate.expires_at)).filter(
+                SSLCertificate.status == "active",
+                SSLCertificate.expires_at >= now
+            ).scalar()
+        }
+
+    def _publish_dns_challenge(self, domain: Domain, records: List[Tuple[str, str]]):
+        """DNS-01 TXT kayıtlarını tek değişiklikle yayınla ve temizleme fonksiyonunu döndür"""
+        dns_service = DNSService(self.db)
+        suffix = f".{domain.name}"
+        with dns_service.change_set(domain.id) as changes:
+            created = [
+                changes.create(name[:-len(suffix)] if name.endswith(suffix) else "@", "TXT", value, ttl=60)
+                for name, value in records
+            ]
+
+        # Doğrulama, tüm isim sunucuları yeni kaydı sunmadan başlatılmamalı; yalnızca
+        # _acme-challenge kümesine bakılır, zone'daki ilgisiz kayıtlar doğrulamayı bekletmez
+        challenge_rrsets = {(record.name, "TXT") for record in created}
+        deadline = time.monotonic() + self.dns_propagation_timeout
+        while time.monotonic() < deadline:
+            try:
+                propagation = asyncio.run(dns_service.check_propagation(domain.id, rrsets=challenge_rrsets))
+                if propagation["propagated"]:
+                    break
             except Exception as e:
-                logger.error(f"Certificate renewal failed for {cert.domain.name}: {str(e)}")
+                logger.warning(f"Propagation check failed for {domain.name}: {str(e)}")
+            time.sleep(5)
 
-        db.close()
+        def cleanup():
+            with dns_service.change_set(domain.id) as changes:
+                for record in created:
+                    changes.delete(record)
+
+        return cleanup
+
+def start_ssl_renewal_scheduler():
+    """SSL yenileme zamanlayıcısını başlat"""
+    scheduler = schedule.Scheduler()
+
+    engine = CertificateRenewalEngine(lambda db, cert_id: SSLService(db).renew_certificate(cert_id))
+
+    def check_certificates():
+        try:
+            engine.run()
+        except Exception as e:
+            logger.error(f"Certificate renewal run failed: {str(e)}")
+
+    def sync_inventory():
+        db = SessionLocal()
+        try:
+            SSLService(db).sync_inventory()
+        except Exception as e:
+            logger.error(f"Certificate inventory sync failed: {str(e)}")
+        finally:
+            db.close()
+
+    def run_scheduler():
+        while True:
+            scheduler.run_pending()
+            time.sleep(60)
+
+    # Yenilemeler gün içine yayılsın diye her saat kontrol et
+    scheduler.every().hour.do(check_certificates)
+
+    # Elle değiştirilen sertifika dosyalarını günde bir kez veritabanına işle
+    scheduler.every().day.at("01:30").do(sync_inventory)
+
+    def refresh_ocsp():
+        db = SessionLocal()
+        try:
+            SSLService(db).refresh_ocsp_staples()
+        except Exception as e:
+            logger.error(f"OCSP staple refresh failed: {str(e)}")
+        finally:
+            db.close()
 
-    # Her gün kontrol et
-    schedule.every().day.at("02:00").do(check_certificates)
+    # OCSP yanıtları geçerlilik sürelerinin yarısında yenilenir; kontrol saatlik
+    scheduler.every().hour.do(refresh_ocsp)
 
     # Zamanlayıcıyı arka planda çalıştır
     scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
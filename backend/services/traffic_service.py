@@ -0,0 +1,219 @@
+import os
+import time
+import logging
+import threading
+import schedule
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models import Domain, TrafficStat, LogOffset
+from ..database import SessionLocal
+from ..utils.access_log import (
+    LATENCY_BUCKETS, LogTail, aggregate, domain_for_log, merge_top, parse_lines, percentile
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TrafficService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.log_dirs = [d for d in os.getenv(
+            "ACCESS_LOG_DIRS", "/var/log/nginx:/var/log/apache2"
+        ).split(":") if d]
+        self.retention = timedelta(days=int(os.getenv("TRAFFIC_STATS_RETENTION_DAYS", "7")))
+        self.tail = LogTail(int(os.getenv("ACCESS_LOG_MAX_READ_MB", "64")) * 1024 * 1024)
+
+    def _log_files(self, domains: Dict[str, int]) -> Dict[str, int]:
+        """Günlük dizinlerini bir kez listele; dosya yolu -> domain id (alt alan adları ana domaine)"""
+        files = {}
+        for directory in self.log_dirs:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                domain = domain_for_log(name, domains)
+                if domain:
+                    files[os.path.join(directory, name)] = domains[domain]
+        return files
+
+    def ingest(self) -> Dict[str, Any]:
+        """Tüm domain günlüklerinin yeni satırlarını işleyip dakikalık özetlere ekle"""
+        domains = {name: domain_id for domain_id, name in
+                   self.db.query(Domain.id, Domain.name).filter(Domain.is_active == True)}
+        files = self._log_files(domains)
+        offsets = {o.path: o for o in self.db.query(LogOffset).filter(LogOffset.path.in_(list(files)))}
+
+        lines_total = 0
+        minutes: Dict[int, Dict[datetime, List[Dict]]] = {}
+        for path, domain_id in files.items():
+            state = offsets.get(path)
+            try:
+                lines, inode, offset = self.tail.read(
+                    path, state.inode if state else None, state.offset if state else 0
+                )
+            except OSError as e:
+                logger.warning(f"Failed to read access log {path}: {str(e)}")
+                continue
+            if state is None:
+                state = offsets[path] = LogOffset(path=path)
+                self.db.add(state)
+            state.inode, state.offset = inode, offset
+            lines_total += len(lines)
+            for minute, bucket in aggregate(parse_lines(lines)).items():
+                minutes.setdefault(domain_id, {}).setdefault(minute, []).append(bucket)
+
+        rows = self._store(minutes)
+        # Konumlar özetlerle aynı işlemde kaydedilir; satırlar iki kez sayılmaz
+        self.db.commit()
+        return {"files": len(files), "lines": lines_total, "minutes": rows, "pruned": self.prune()}
+
+    def _store(self, minutes: Dict[int, Dict[datetime, List[Dict]]]) -> int:
+        if not minutes:
+            return 0
+        since = min(minute for per_domain in minutes.values() for minute in per_domain)
+        existing = {
+            (row.domain_id, row.minute): row for row in self.db.query(TrafficStat).filter(
+                TrafficStat.domain_id.in_(list(minutes)),
+                TrafficStat.minute >= since
+            )
+        }
+        count = 0
+        for domain_id, per_domain in minutes.items():
+            for minute, buckets in per_domain.items():
+                row = existing.get((domain_id, minute))
+                if row is None:
+                    row = TrafficStat(
+                        domain_id=domain_id, minute=minute, requests=0, bytes=0,
+                        status_2xx=0, status_3xx=0, status_4xx=0, status_5xx=0, status_other=0,
+                        top_urls=[], top_ips=[], latency_histogram=[0] * (len(LATENCY_BUCKETS) + 1)
+                    )
+                    self.db.add(row)
+                for bucket in buckets:
+                    self._merge(row, bucket)
+                count += 1
+        return count
+
+    def _merge(self, row: TrafficStat, bucket: Dict) -> None:
+        row.requests += bucket["requests"]
+        row.bytes += bucket["bytes"]
+        for status_class, value in bucket["status"].items():
+            column = f"status_{status_class}"
+            setattr(row, column, getattr(row, column) + value)
+        # JSON sütunları yeniden atanır; yerinde değişiklik SQLAlchemy tarafından izlenmez
+        row.top_urls = merge_top(row.top_urls, bucket["urls"])
+        row.top_ips = merge_top(row.top_ips, bucket["ips"])
+        histogram = [a + b for a, b in zip(row.latency_histogram or [0] * len(bucket["latency"]), bucket["latency"])]
+        row.latency_histogram = histogram
+        row.upstream_p50 = percentile(histogram, 0.5)
+        row.upstream_p95 = percentile(histogram, 0.95)
+
+    def prune(self) -> int:
+        """Saklama süresini aşan dakikalık özetleri sil"""
+        cutoff = datetime.utcnow() - self.retention
+        deleted = self.db.query(TrafficStat).filter(TrafficStat.minute < cutoff).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+    def get_domain_traffic(self, domain_id: int, start_time: Optional[datetime] = None,
+                           end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """Domainin dakikalık trafik serisi ve dönem toplamları"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        end_time = end_time or datetime.utcnow()
+        start_time = start_time or end_time - timedelta(hours=1)
+        rows = self.db.query(TrafficStat).filter(
+            TrafficStat.domain_id == domain_id,
+            TrafficStat.minute >= start_time,
+            TrafficStat.minute <= end_time
+        ).order_by(TrafficStat.minute).all()
+
+        histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        urls: Dict[str, int] = {}
+        ips: Dict[str, int] = {}
+        for row in rows:
+            histogram = [a + b for a, b in zip(histogram, row.latency_histogram or histogram)]
+            for path, count in row.top_urls or []:
+                urls[path] = urls.get(path, 0) + count
+            for ip, count in row.top_ips or []:
+                ips[ip] = ips.get(ip, 0) + count
+
+        return {
+            "domain": domain.name,
+            "start_time": start_time,
+            "end_time": end_time,
+            "totals": {
+                "requests": sum(row.requests for row in rows),
+                "bytes": sum(row.bytes for row in rows),
+                "status_2xx": sum(row.status_2xx for row in rows),
+                "status_3xx": sum(row.status_3xx for row in rows),
+                "status_4xx": sum(row.status_4xx for row in rows),
+                "status_5xx": sum(row.status_5xx for row in rows),
+                "upstream_p50": percentile(histogram, 0.5),
+                "upstream_p95": percentile(histogram, 0.95),
+                "top_urls": sorted(urls.items(), key=lambda item: -item[1])[:20],
+                "top_ips": sorted(ips.items(), key=lambda item: -item[1])[:20],
+            },
+            "series": [
+                {
+                    "minute": row.minute,
+                    "requests": row.requests,
+                    "bytes": row.bytes,
+                    "status_2xx": row.status_2xx,
+                    "status_3xx": row.status_3xx,
+                    "status_4xx": row.status_4xx,
+                    "status_5xx": row.status_5xx,
+                    "upstream_p50": row.upstream_p50,
+                    "upstream_p95": row.upstream_p95,
+                }
+                for row in rows
+            ],
+        }
+
+    def get_top_domains(self, minutes: int = 60, limit: int = 20) -> List[Dict[str, Any]]:
+        """Son dönemde en çok istek alan domainler"""
+        since = datetime.utcnow() - timedelta(minutes=minutes)
+        rows = self.db.query(
+            Domain.id, Domain.name,
+            func.sum(TrafficStat.requests).label("requests"),
+            func.sum(TrafficStat.bytes).label("bytes"),
+            func.sum(TrafficStat.status_5xx).label("status_5xx")
+        ).join(TrafficStat, TrafficStat.domain_id == Domain.id).filter(
+            TrafficStat.minute >= since
+        ).group_by(Domain.id, Domain.name).order_by(func.sum(TrafficStat.requests).desc()).limit(limit)
+        return [
+            {"domain_id": row.id, "domain": row.name, "requests": int(row.requests or 0),
+             "bytes": int(row.bytes or 0), "status_5xx": int(row.status_5xx or 0)}
+            for row in rows
+        ]
+
+
+def start_traffic_ingest_scheduler():
+    """Erişim günlüğü işleme zamanlayıcısını başlat"""
+    # Kendi iş listesi: global listeyi çalıştıran diğer zamanlayıcı iş
+    # parçacıkları bu işleri aynı anda ikinci kez başlatamaz
+    scheduler = schedule.Scheduler()
+
+    def run_ingest():
+        db = SessionLocal()
+        try:
+            TrafficService(db).ingest()
+        except Exception as e:
+            logger.error(f"Access log ingestion failed: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def run_scheduler():
+        while True:
+            scheduler.run_pending()
+            time.sleep(60)
+
+    scheduler.every(int(os.getenv("ACCESS_LOG_INGEST_INTERVAL", "1"))).minutes.do(run_ingest)
+
+    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
+    scheduler_thread.start()
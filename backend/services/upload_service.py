@@ -0,0 +1,274 @@
+import os
+import asyncio
+import base64
+import errno
+import hashlib
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterator, Optional, Set
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from ..models import Domain, FileUpload
+from ..utils.directory_cache import directory_cache
+from .file_system_service import FileSystemService
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_CHECKSUMS = ("md5", "sha1", "sha256")
+
+
+class UploadOffsetMismatch(ValueError):
+    """İstemcinin gönderdiği offset sunucudaki ile uyuşmuyor"""
+
+
+class UploadLocked(UploadOffsetMismatch):
+    """Yüklemeye başka bir istek yazıyor"""
+
+
+class UploadChecksumMismatch(ValueError):
+    """Parça sağlama toplamı doğrulanamadı"""
+
+
+class InvalidUploadChecksum(ValueError):
+    """Upload-Checksum başlığı çözülemedi ya da algoritma desteklenmiyor"""
+
+
+class UploadTooLarge(ValueError):
+    """Yükleme izin verilen ya da beyan edilen boyutu aşıyor"""
+
+
+# Bu süreçte parça yazılmakta olan yüklemeler
+_active_uploads: Set[str] = set()
+_active_lock = threading.Lock()
+
+
+@contextmanager
+def _claim(upload_id: str) -> Iterator[None]:
+    """Aynı yüklemeye eşzamanlı yazımı engelle (süreç içi)"""
+    with _active_lock:
+        if upload_id in _active_uploads:
+            raise UploadLocked("Upload is locked by another request")
+        _active_uploads.add(upload_id)
+    try:
+        yield
+    finally:
+        with _active_lock:
+            _active_uploads.discard(upload_id)
+
+
+class UploadService:
+    """Parçalı ve devam ettirilebilir dosya yükleme (tus benzeri protokol).
+
+    Veri, hedef dosyanın bulunduğu dizindeki bir `.part` dosyasına doğrudan
+    yazılır ve yükleme tamamlandığında aynı dosya sistemi içinde yeniden
+    adlandırılır; ara bir kopya ya da bellek tamponu oluşmaz.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.file_system = FileSystemService(db)
+        self.max_upload_size = int(os.getenv("MAX_UPLOAD_SIZE", str(20 * 1024 ** 3)))  # 20 GB
+        self.stale_after = timedelta(hours=24)
+
+    def create_upload(self, domain_id: int, user_id: int, path: str, length: int,
+                      overwrite: bool = False) -> FileUpload:
+        """Yeni bir yükleme oturumu oluştur"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        if length < 0 or length > self.max_upload_size:
+            raise UploadTooLarge(f"Upload length must be between 0 and {self.max_upload_size} bytes")
+
+        target_path = self.file_system.resolve_path(domain, path)
+        target_dir = os.path.dirname(target_path)
+        if not os.path.isdir(target_dir):
+            raise ValueError("Target directory not found")
+        if os.path.exists(target_path) and not overwrite:
+            raise FileExistsError("Target file already exists")
+
+        upload_id = uuid.uuid4().hex
+        part_path = os.path.join(target_dir, f".{os.path.basename(target_path)}.{upload_id}.part")
+
+        fd = os.open(part_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            # Yer ayır: disk doluysa yükleme başlamadan hata alınır ve parçalanma azalır
+            if length and hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(fd, 0, length)
+                except OSError as e:
+                    if e.errno == errno.ENOSPC:
+                        raise
+        except OSError:
+            os.close(fd)
+            os.remove(part_path)
+            raise
+        else:
+            os.close(fd)
+
+        upload = FileUpload(
+            id=upload_id,
+            domain_id=domain_id,
+            user_id=user_id,
+            target_path=target_path,
+            part_path=part_path,
+            length=length,
+            offset=0,
+            status="in_progress"
+        )
+        self.db.add(upload)
+        self.db.commit()
+
+        if length == 0:
+            self._finalize(upload)
+
+        return upload
+
+    def get_upload(self, upload_id: str, user_id: Optional[int] = None) -> FileUpload:
+        """Yükleme oturumunu getir; user_id verilirse yalnızca o kullanıcınınkini"""
+        query = self.db.query(FileUpload).filter(FileUpload.id == upload_id)
+        if user_id is not None:
+            query = query.filter(FileUpload.user_id == user_id)
+        upload = query.first()
+        if not upload:
+            raise ValueError("Upload not found")
+        return upload
+
+    def _lock_upload(self, upload_id: str, user_id: Optional[int]) -> FileUpload:
+        """Yükleme satırını kilitleyerek oku; kilit yazım sonunda commit ile bırakılır.
+
+        Diğer worker'lardaki eşzamanlı PATCH istekleri beklemeden reddedilir.
+        """
+        query = self.db.query(FileUpload).filter(FileUpload.id == upload_id)
+        if user_id is not None:
+            query = query.filter(FileUpload.user_id == user_id)
+        try:
+            upload = query.with_for_update(nowait=True).first()
+        except OperationalError:
+            self.db.rollback()
+            raise UploadLocked("Upload is locked by another request")
+        if not upload:
+            self.db.rollback()
+            raise ValueError("Upload not found")
+        return upload
+
+    @staticmethod
+    def _write(f, data: bytes, hasher) -> None:
+        f.write(data)
+        if hasher:
+            hasher.update(data)
+
+    async def append_chunk(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes],
+                           checksum: Optional[str] = None, user_id: Optional[int] = None) -> FileUpload:
+        """Verilen offsetten itibaren gelen parçayı doğrudan diske yaz.
+
+        Disk ve veritabanı işlemleri olay döngüsünü bloklamamak için iş
+        parçacığında yapılır. Offset, yükleme kilitlendikten sonra denetlenir.
+        """
+        hasher, expected_digest = self._parse_checksum(checksum)
+
+        with _claim(upload_id):
+            upload = await asyncio.to_thread(self._lock_upload, upload_id, user_id)
+            if upload.status != "in_progress" or offset != upload.offset:
+                await asyncio.to_thread(self.db.rollback)
+                if upload.status != "in_progress":
+                    raise UploadOffsetMismatch(f"Upload is {upload.status}")
+                raise UploadOffsetMismatch(f"Expected offset {upload.offset}, got {offset}")
+
+            written = 0
+            completed_chunk = False
+            f = await asyncio.to_thread(open, upload.part_path, "r+b")
+            try:
+                f.seek(offset)
+                async for data in chunks:
+                    if not data:
+                        continue
+                    if offset + written + len(data) > upload.length:
+                        raise UploadTooLarge("Chunk exceeds declared upload length")
+                    await asyncio.to_thread(self._write, f, data, hasher)
+                    written += len(data)
+                completed_chunk = True
+            finally:
+                if hasher and (not completed_chunk or hasher.digest() != expected_digest):
+                    # Doğrulanamayan veri kabul edilmez, offset eski haline döner
+                    written = 0
+                # Bağlantı koparsa yazılabilen kısım korunur; istemci HEAD ile devam eder
+                upload.offset = offset + written
+                upload.updated_at = datetime.utcnow()
+                await asyncio.to_thread(self._close_and_commit, f)
+
+            if hasher and hasher.digest() != expected_digest:
+                raise UploadChecksumMismatch("Chunk checksum mismatch")
+
+            if upload.offset == upload.length:
+                await asyncio.to_thread(self._finalize, upload)
+
+        return upload
+
+    def _close_and_commit(self, f) -> None:
+        try:
+            f.close()
+        finally:
+            self.db.commit()
+
+    def cancel_upload(self, upload_id: str, user_id: Optional[int] = None) -> None:
+        """Yüklemeyi iptal et ve geçici dosyayı sil"""
+        with _claim(upload_id):
+            upload = self.get_upload(upload_id, user_id)
+            if upload.status == "in_progress" and os.path.exists(upload.part_path):
+                os.remove(upload.part_path)
+            upload.status = "cancelled"
+            self.db.commit()
+
+    def cleanup_stale_uploads(self) -> int:
+        """Uzun süredir ilerlemeyen yüklemeleri temizle"""
+        cutoff = datetime.utcnow() - self.stale_after
+        stale = self.db.query(FileUpload).filter(
+            FileUpload.status == "in_progress",
+            FileUpload.created_at < cutoff
+        ).all()
+
+        removed = 0
+        for upload in stale:
+            if upload.updated_at and upload.updated_at >= cutoff:
+                continue
+            try:
+                if os.path.exists(upload.part_path):
+                    os.remove(upload.part_path)
+                upload.status = "cancelled"
+                removed += 1
+            except OSError as e:
+                logger.error(f"Failed to remove stale upload {upload.id}: {str(e)}")
+
+        self.db.commit()
+        return removed
+
+    def _finalize(self, upload: FileUpload) -> None:
+        """Tamamlanan yüklemeyi hedef yola taşı"""
+        with open(upload.part_path, "r+b") as f:
+            # Dosya boyutu beyan edilen uzunlukla birebir aynı olmalı
+            f.truncate(upload.length)
+            os.fsync(f.fileno())
+        os.replace(upload.part_path, upload.target_path)
+        directory_cache.invalidate(os.path.dirname(upload.target_path))
+
+        upload.status = "completed"
+        upload.completed_at = datetime.utcnow()
+        self.db.commit()
+
+    def _parse_checksum(self, checksum: Optional[str]):
+        """`<algoritma> <base64>` biçimindeki Upload-Checksum başlığını çöz"""
+        if not checksum:
+            return None, None
+        try:
+            algorithm, encoded = checksum.strip().split(" ", 1)
+            digest = base64.b64decode(encoded.strip(), validate=True)
+        except Exception:
+            raise InvalidUploadChecksum("Invalid Upload-Checksum header")
+        algorithm = algorithm.lower()
+        if algorithm not in SUPPORTED_CHECKSUMS:
+            raise InvalidUploadChecksum(f"Unsupported checksum algorithm: {algorithm}")
+        return hashlib.new(algorithm), digest
@@ -1,10 +1,15 @@
 import os
 import subprocess
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from ..models import WebServer, Domain
+from ..models import WebServer, Domain, VhostSettings
 import yaml
+from ..utils.reload_coordinator import ConfigTestError, get_reload_coordinator
+from ..utils.service_control import ServiceController, service_profile
+from ..utils.nginx_vhost import DEFAULT_OPTIONS, merge_options, render_log_format, render_nginx_vhost
+from ..utils.config_sync import ConfigChangeSet, render_all
+from .ssl_service import ocsp_stapler
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -18,6 +23,10 @@ class WebServerService:
         self.apache_conf_dir = "/etc/apache2"
         self.apache_sites_dir = "/etc/apache2/sites-available"
         self.apache_sites_enabled = "/etc/apache2/sites-enabled"
+        self.fastcgi_cache_dir = os.getenv("NGINX_FASTCGI_CACHE_DIR", "/var/cache/nginx/fastcgi")
+        self.certificate_dir = "/etc/letsencrypt/live"
+        self.acme_webroot = os.getenv("ACME_WEBROOT", "/var/www/letsencrypt")
+        self.render_workers = int(os.getenv("CONFIG_RENDER_WORKERS", "8"))
 
     def create_virtual_host(self, domain_id: int, server_type: str = "nginx") -> WebServer:
         """Domain için virtual host oluştur"""
@@ -31,8 +40,7 @@ class WebServerService:
         if server_type == "nginx":
             config = self._generate_nginx_config(domain)
             config_path = os.path.join(self.nginx_sites_dir, f"{domain.name}.conf")
-            self._write_config(config_path, config)
-            self._enable_site(domain.name, "nginx")
+            self._install_nginx_config(domain.name, config)
         elif server_type == "apache":
             config = self._generate_apache_config(domain)
             config_path = os.path.join(self.apache_sites_dir, f"{domain.name}.conf")
@@ -55,40 +63,157 @@ class WebServerService:
         self.db.commit()
         self.db.refresh(web_server)
 
-        # Web sunucusunu yeniden başlat
-        self._restart_server(server_type)
+        # Web sunucusunu yeniden yükle (eşzamanlı değişikliklerle birlikte)
+        self._reload_server(server_type)
 
         return web_server
 
-    def _generate_nginx_config(self, domain: Domain) -> str:
+    def get_vhost_options(self, domain_id: int) -> Dict[str, Any]:
+        """Domainin varsayılanlarla birleştirilmiş vhost seçeneklerini getir"""
+        settings = self.db.query(VhostSettings).filter(VhostSettings.domain_id == domain_id).first()
+        return merge_options(settings.options if settings else None)
+
+    def update_vhost_options(self, domain_id: int, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Vhost seçeneklerini güncelle, yapılandırmayı test edip uygula"""
+        domain = self.db.query(Domain).filter(Domain.id == domain_id).first()
+        if not domain:
+            raise ValueError("Domain not found")
+
+        settings = self.db.query(VhostSettings).filter(VhostSettings.domain_id == domain_id).first()
+        if not settings:
+            settings = VhostSettings(domain_id=domain_id, options={})
+            self.db.add(settings)
+        # Yalnızca varsayılandan farklı değerler saklanır
+        merged = merge_options(dict(settings.options or {}, **options))
+        settings.options = {k: v for k, v in merged.items() if v != DEFAULT_OPTIONS[k]}
+
+        try:
+            self._install_nginx_config(domain.name, self._generate_nginx_config(domain, settings.options))
+        except Exception:
+            self.db.rollback()
+            raise
+        self.db.commit()
+
+        self._reload_server("nginx")
+        return merged
+
+    def sync_nginx_certificate(self, domain: Domain) -> None:
+        """Sertifika eklenip kaldırıldığında vhost'un 443 dinleyicisini güncelle"""
+        if os.path.exists(os.path.join(self.nginx_sites_dir, f"{domain.name}.conf")):
+            self._install_nginx_config(domain.name, self._generate_nginx_config(domain))
+
+    def regenerate_nginx_vhosts(self, dry_run: bool = False, with_diff: bool = False) -> Dict[str, Any]:
+        """Tüm aktif domainlerin vhost dosyalarını şablondan yeniden üret.
+
+        Yapılandırmalar paralel üretilir, yalnızca içeriği değişen dosyalar
+        yazılır; ardından tek bir nginx -t ve tek bir reload yapılır. Test
+        başarısız olursa grubun tüm değişiklikleri geri alınır.
+        """
+        domains = {d.name: d for d in self.db.query(Domain).filter(Domain.is_active == True)}
+        settings = {s.domain_id: s.options for s in self.db.query(VhostSettings)}
+
+        def render(domain: Domain) -> str:
+            return self._generate_nginx_config(domain, settings.get(domain.id) or {})
+
+        rendered, errors = render_all(domains, render, self.render_workers)
+        desired = {os.path.join(self.nginx_sites_dir, f"{name}.conf"): config for name, config in rendered.items()}
+        changes = ConfigChangeSet(desired)
+        for name, error in errors.items():
+            logger.error(f"Failed to render nginx config for {name}: {error}")
+
+        result = changes.summary(with_diff)
+        result.update({"errors": errors, "reload": None})
+        if dry_run or not changes.changed:
+            return result
+
+        self._ensure_log_format()
+        created_links = []
+        changes.apply()
+        for path in changes.created:
+            name = os.path.basename(path)[:-len(".conf")]
+            if not os.path.lexists(os.path.join(self.nginx_sites_enabled, f"{name}.conf")):
+                self._enable_site(name, "nginx")
+                created_links.append(os.path.join(self.nginx_sites_enabled, f"{name}.conf"))
+        try:
+            ServiceController().test(service_profile("nginx"))
+        except ConfigTestError as e:
+            logger.error(f"nginx configuration test failed after regeneration: {e.output}")
+            changes.rollback()
+            for link in created_links:
+                os.remove(link)
+            raise
+
+        result["reload"] = self._reload_server("nginx")
+        logger.info(f"Regenerated nginx vhosts: {len(changes.created)} created, "
+                    f"{len(changes.updated)} updated, {len(changes.unchanged)} unchanged")
+        return result
+
+    def _generate_nginx_config(self, domain: Domain, options: Optional[Dict[str, Any]] = None) -> str:
         """Nginx virtual host yapılandırması oluştur"""
-        return f"""server {{
-    listen 80;
-    server_name {domain.name} www.{domain.name};
-    root /var/www/{domain.name}/public_html;
-    index index.php index.html index.htm;
-
-    location / {{
-        try_files $uri $uri/ /index.php?$query_string;
-    }}
-
-    location ~ \.php$ {{
-        include snippets/fastcgi-php.conf;
-        fastcgi_pass unix:/run/php/php{domain.php_version}-fpm-{domain.name}.sock;
-    }}
-
-    location ~ /\.ht {{
-        deny all;
-    }}
-
-    # SSL yapılandırması
-    listen 443 ssl;
-    ssl_certificate /etc/letsencrypt/live/{domain.name}/fullchain.pem;
-    ssl_certificate_key /etc/letsencrypt/live/{domain.name}/privkey.pem;
-    ssl_protocols TLSv1.2 TLSv1.3;
-    ssl_ciphers HIGH:!aNULL:!MD5;
-}}
-"""
+        if options is None:
+            settings = self.db.query(VhostSettings).filter(VhostSettings.domain_id == domain.id).first()
+            options = settings.options if settings else None
+        return render_nginx_vhost(
+            domain.name,
+            domain.php_version,
+            options,
+            stapling_include=ocsp_stapler.include_pattern(domain.name),
+            cache_root=self.fastcgi_cache_dir,
+            certificate=self._certificate_paths(domain.name),
+            acme_webroot=self.acme_webroot
+        )
+
+    def _certificate_paths(self, name: str) -> Optional[Tuple[str, str]]:
+        """Sertifika zinciri ve anahtarı diskteyse yollarını döndür"""
+        fullchain = os.path.join(self.certificate_dir, name, "fullchain.pem")
+        private_key = os.path.join(self.certificate_dir, name, "privkey.pem")
+        if os.path.exists(fullchain) and os.path.exists(private_key):
+            return fullchain, private_key
+        return None
+
+    def _ensure_log_format(self) -> None:
+        """Vhost'ların kullandığı günlük biçimini conf.d altında tanımla"""
+        path = os.path.join(self.nginx_conf_dir, "conf.d", "panel-log-format.conf")
+        content = render_log_format()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                if f.read() == content:
+                    return
+        self._write_config(path, content)
+
+    def _install_nginx_config(self, domain_name: str, config: str) -> None:
+        """Yapılandırmayı yaz ve etkinleştirmeden önce nginx -t ile doğrula.
+
+        Test başarısız olursa önceki dosya geri yüklenir (yeni domainde dosya
+        ve bağlantı kaldırılır); çalışan yapılandırma hiçbir zaman bozuk
+        bir vhost ile bırakılmaz.
+        """
+        config_path = os.path.join(self.nginx_sites_dir, f"{domain_name}.conf")
+        target = os.path.join(self.nginx_sites_enabled, f"{domain_name}.conf")
+        self._ensure_log_format()
+
+        previous = None
+        if os.path.exists(config_path):
+            with open(config_path, "r") as f:
+                previous = f.read()
+        if previous == config:
+            self._enable_site(domain_name, "nginx")
+            return
+
+        created_link = not os.path.lexists(target)
+        self._write_config(config_path, config)
+        self._enable_site(domain_name, "nginx")
+        try:
+            ServiceController().test(service_profile("nginx"))
+        except ConfigTestError as e:
+            logger.error(f"nginx configuration test failed for {domain_name}: {e.output}")
+            if previous is None:
+                os.remove(config_path)
+            else:
+                self._write_config(config_path, previous)
+            if created_link:
+                os.remove(target)
+            raise
 
     def _generate_apache_config(self, domain: Domain) -> str:
         """Apache virtual host yapılandırması oluştur"""
@@ -152,15 +277,16 @@ class WebServerService:
         if not os.path.exists(target):
             os.symlink(source, target)
 
-    def _restart_server(self, server_type: str) -> None:
-        """Web sunucusunu yeniden başlat"""
+    def _reload_server(self, server_type: str) -> Dict:
+        """Web sunucusunu graceful olarak yeniden yükle.
+
+        Aynı anda yapılan değişiklikler tek bir yapılandırma testi ve tek bir
+        reload ile uygulanır; çağrı, içinde bulunduğu grubun sonucunu bekler.
+        """
         try:
-            if server_type == "nginx":
-                subprocess.run(["systemctl", "restart", "nginx"], check=True)
-            else:
-                subprocess.run(["systemctl", "restart", "apache2"], check=True)
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to restart {server_type}: {e.stderr.decode()}")
+            return get_reload_coordinator(server_type).reload()
+        except ConfigTestError as e:
+            logger.error(f"{server_type} configuration test failed: {e.output}")
             raise
 
     def _get_server_version(self, server_type: str) -> str:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Göreli içe aktarım kullanan servisler paket adıyla yüklenir (backend.services...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
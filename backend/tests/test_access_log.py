@@ -0,0 +1,65 @@
+import os
+from datetime import datetime
+from utils.access_log import (
+    LATENCY_BUCKETS, LogTail, aggregate, domain_for_log, merge_top, parse_lines, percentile
+)
+
+COMBINED = (b'203.0.113.5 - - [10/Oct/2024:13:55:36 +0200] "GET /blog/post?id=1 HTTP/1.1" 200 2326 '
+            b'"https://example.com/" "Mozilla/5.0 (X11; Linux x86_64)"')
+PANEL = (b'198.51.100.7 - bob [10/Oct/2024:11:56:01 +0000] "POST /wp-login.php HTTP/2.0" 502 - "-" '
+         b'"curl/8.0" "-" 0.350 0.340')
+CACHED = (b'198.51.100.7 - - [10/Oct/2024:11:56:59 +0000] "GET / HTTP/2.0" 200 512 "-" "-" "HIT" 0.001 -')
+
+def test_parse_combined_and_panel_lines():
+    records = list(parse_lines([COMBINED, PANEL, CACHED, b"garbage", b""]))
+    assert len(records) == 3
+    # Saat dilimi UTC'ye çevrilir ve dakikaya yuvarlanır
+    assert records[0] == (datetime(2024, 10, 10, 11, 55), "203.0.113.5", "/blog/post", 200, 2326, None)
+    assert records[1][2:] == ("/wp-login.php", 502, 0, 340.0)
+    assert records[2][5] == 1.0
+
+def test_aggregate_per_minute():
+    minutes = aggregate(parse_lines([COMBINED, PANEL, CACHED, PANEL]))
+    assert sorted(minutes) == [datetime(2024, 10, 10, 11, 55), datetime(2024, 10, 10, 11, 56)]
+    bucket = minutes[datetime(2024, 10, 10, 11, 56)]
+    assert bucket["requests"] == 3 and bucket["bytes"] == 512
+    assert bucket["status"]["5xx"] == 2 and bucket["status"]["2xx"] == 1
+    assert bucket["ips"]["198.51.100.7"] == 3
+    assert percentile(bucket["latency"], 0.5) == 500.0
+    assert percentile(bucket["latency"], 0.1) == 1.0
+    assert percentile([0] * (len(LATENCY_BUCKETS) + 1), 0.5) is None
+
+def test_merge_top_keeps_most_frequent():
+    merged = merge_top([["/a", 5], ["/b", 1]], {"/b": 10, "/c": 2}, limit=2)
+    assert merged == [["/b", 11], ["/a", 5]]
+
+def test_tail_resumes_and_follows_rotation(tmp_path):
+    path = str(tmp_path / "example.com-access.log")
+    with open(path, "wb") as f:
+        f.write(b"one\ntwo\npart")
+    tail = LogTail()
+    lines, inode, offset = tail.read(path, None, 0)
+    assert lines == [b"one", b"two"] and offset == 8
+
+    with open(path, "ab") as f:
+        f.write(b"ial\n")
+    lines, inode, offset = tail.read(path, inode, offset)
+    assert lines == [b"partial"]
+
+    # logrotate: eski dosya .1 olur, kalan satırları okunur
+    with open(path, "ab") as f:
+        f.write(b"late\n")
+    os.rename(path, path + ".1")
+    with open(path, "wb") as f:
+        f.write(b"fresh\n")
+    lines, new_inode, offset = tail.read(path, inode, offset)
+    assert lines == [b"late", b"fresh"]
+    assert new_inode != inode and offset == 6
+
+def test_domain_for_log():
+    domains = {"example.com", "shop.example.org"}
+    assert domain_for_log("example.com-access.log", domains) == "example.com"
+    assert domain_for_log("blog.example.com-access.log", domains) == "example.com"
+    assert domain_for_log("shop.example.org-access.log", domains) == "shop.example.org"
+    assert domain_for_log("example.com-error.log", domains) is None
+    assert domain_for_log("other.net-access.log", domains) is None
@@ -0,0 +1,185 @@
+import io
+import os
+import tarfile
+import threading
+import zipfile
+import pytest
+from utils.archive import (
+    ArchiveExtractor, ArchiveLimitExceeded, ExtractionCancelled, UnsafeArchiveMember, archive_format, stream_archive
+)
+
+def _make_zip(path, files):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+
+def _make_tar_gz(path, files):
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+FILES = {
+    "public_html/index.php": b"<?php echo 1;",
+    "public_html/wp-content/big.bin": b"a" * 300_000,
+    "cpanel.json": b"{}",
+}
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_extract_zip(tmp_path, workers):
+    archive = tmp_path / "site.zip"
+    _make_zip(archive, FILES)
+    events = []
+
+    extractor = ArchiveExtractor(workers=workers, buffer_size=64 * 1024,
+                                 progress=lambda name, size, index, total: events.append((name, size, total)))
+    result = extractor.extract(str(archive), str(tmp_path / "out"))
+
+    assert result["members"] == 3
+    assert result["bytes"] == sum(len(d) for d in FILES.values())
+    assert (tmp_path / "out" / "public_html" / "wp-content" / "big.bin").read_bytes() == FILES["public_html/wp-content/big.bin"]
+    assert sorted(e[0] for e in events) == sorted(FILES)
+    assert all(e[2] == 3 for e in events)
+
+def test_extract_tar_gz(tmp_path):
+    archive = tmp_path / "backup.tar.gz"
+    _make_tar_gz(archive, FILES)
+
+    result = ArchiveExtractor().extract(str(archive), str(tmp_path / "out"))
+
+    assert result["format"] == "tar.gz"
+    assert (tmp_path / "out" / "cpanel.json").read_bytes() == b"{}"
+
+def test_extract_tar_zst(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    plain = tmp_path / "backup.tar"
+    with tarfile.open(plain, "w") as tar:
+        for name, data in FILES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    archive = tmp_path / "backup.tar.zst"
+    archive.write_bytes(zstandard.ZstdCompressor().compress(plain.read_bytes()))
+
+    result = ArchiveExtractor(buffer_size=64 * 1024).extract(str(archive), str(tmp_path / "out"))
+
+    assert result["format"] == "tar.zst" and result["members"] == 3
+    for name, data in FILES.items():
+        assert (tmp_path / "out" / name).read_bytes() == data
+
+def test_cancelled_extraction_removes_created_files(tmp_path):
+    archive = tmp_path / "site.zip"
+    _make_zip(archive, {f"public_html/f{i}.txt": b"x" for i in range(10)})
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "keep.txt").write_bytes(b"existing")
+    cancelled = threading.Event()
+
+    def progress(name, size, index, total):
+        if index == 3:
+            cancelled.set()
+
+    with pytest.raises(ExtractionCancelled):
+        ArchiveExtractor(progress=progress, cancelled=cancelled).extract(str(archive), str(out))
+    # Yalnızca bu çıkarmanın oluşturdukları silinir
+    assert os.listdir(out) == ["keep.txt"]
+
+def test_path_traversal_rejected(tmp_path):
+    archive = tmp_path / "evil.tar.gz"
+    _make_tar_gz(archive, {"../escape.txt": b"x"})
+
+    with pytest.raises(UnsafeArchiveMember):
+        ArchiveExtractor().extract(str(archive), str(tmp_path / "out"))
+    assert not (tmp_path / "escape.txt").exists()
+
+def test_member_replaces_existing_symlink_instead_of_writing_through(tmp_path):
+    private = tmp_path / "private"
+    private.mkdir()
+    (private / "config.php").write_bytes(b"secret")
+    out = tmp_path / "out"
+    out.mkdir()
+    os.symlink(private / "config.php", out / "link.php")
+    archive = tmp_path / "site.tar.gz"
+    _make_tar_gz(archive, {"link.php": b"PWNED"})
+
+    ArchiveExtractor().extract(str(archive), str(out))
+
+    assert (private / "config.php").read_bytes() == b"secret"
+    assert not os.path.islink(out / "link.php")
+    assert (out / "link.php").read_bytes() == b"PWNED"
+
+def test_archive_symlink_followed_by_file_of_same_name(tmp_path):
+    archive = tmp_path / "site.tar"
+    with tarfile.open(archive, "w") as tar:
+        for name, data in (("b", b"original"), ("a", None), ("a", b"replaced")):
+            info = tarfile.TarInfo(name)
+            if data is None:
+                info.type = tarfile.SYMTYPE
+                info.linkname = "b"
+                tar.addfile(info)
+            else:
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+    out = tmp_path / "out"
+
+    ArchiveExtractor().extract(str(archive), str(out))
+
+    assert (out / "b").read_bytes() == b"original"
+    assert not os.path.islink(out / "a")
+    assert (out / "a").read_bytes() == b"replaced"
+
+def test_member_under_symlinked_directory_outside_is_rejected(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    out = tmp_path / "out"
+    out.mkdir()
+    os.symlink(outside, out / "dir")
+    archive = tmp_path / "site.tar.gz"
+    _make_tar_gz(archive, {"dir/file.txt": b"x"})
+
+    with pytest.raises(UnsafeArchiveMember):
+        ArchiveExtractor().extract(str(archive), str(out))
+    assert os.listdir(outside) == []
+
+def test_size_limit_enforced_on_written_bytes(tmp_path):
+    archive = tmp_path / "bomb.tar.gz"
+    _make_tar_gz(archive, {"zeros.bin": b"\0" * 1_000_000})
+
+    with pytest.raises(ArchiveLimitExceeded):
+        ArchiveExtractor(max_total_size=100_000).extract(str(archive), str(tmp_path / "out"))
+    assert not os.path.exists(tmp_path / "out" / "zeros.bin")
+
+def test_member_limit(tmp_path):
+    archive = tmp_path / "many.zip"
+    _make_zip(archive, {f"f{i}.txt": b"x" for i in range(10)})
+
+    with pytest.raises(ArchiveLimitExceeded):
+        ArchiveExtractor(max_members=5).extract(str(archive), str(tmp_path / "out"))
+
+@pytest.mark.parametrize("fmt,store", [("zip", False), ("zip", True), ("tar.gz", False), ("tar.gz", True)])
+def test_stream_archive_round_trip(tmp_path, fmt, store):
+    source = tmp_path / "site"
+    # Sıkıştırılamayan içerik: çıktının birden fazla parçaya bölünmesi gerekir
+    files = dict(FILES, **{"public_html/wp-content/big.bin": os.urandom(300_000)})
+    for name, data in files.items():
+        (source / name).parent.mkdir(parents=True, exist_ok=True)
+        (source / name).write_bytes(data)
+
+    chunks = list(stream_archive(str(source), fmt=fmt, store=store, chunk_size=16 * 1024, max_chunks=2))
+    assert len(chunks) > 1
+
+    archive = tmp_path / f"download.{archive_format(fmt, store)}"
+    archive.write_bytes(b"".join(chunks))
+    ArchiveExtractor().extract(str(archive), str(tmp_path / "out"))
+
+    for name, data in files.items():
+        assert (tmp_path / "out" / "site" / name).read_bytes() == data
+
+def test_stream_archive_stops_when_client_disconnects(tmp_path):
+    (tmp_path / "big.bin").write_bytes(os.urandom(2_000_000))
+
+    stream = stream_archive(str(tmp_path), fmt="zip", store=True, chunk_size=16 * 1024, max_chunks=2)
+    next(stream)
+    # Üreteç kapatılınca yazıcı iş parçacığı durmalı, hata fırlatılmamalı
+    stream.close()
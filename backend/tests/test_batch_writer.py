@@ -0,0 +1,122 @@
+import time
+import threading
+import pytest
+from utils.batch_writer import BatchWriter, WriterBusy
+
+def test_flushes_by_size_and_by_time():
+    batches = []
+    writer = BatchWriter(batches.append, max_batch=3, max_delay=0.2)
+    writer.submit([{"n": i} for i in range(7)])
+    deadline = time.monotonic() + 2
+    while sum(len(b) for b in batches) < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert writer.stats["written"] == 7 and writer.stats["batches"] == 3
+
+def test_close_flushes_pending_rows():
+    batches = []
+    writer = BatchWriter(batches.append, max_batch=100, max_delay=60)
+    writer.submit([{"n": 1}, {"n": 2}])
+    writer.close()
+    assert batches == [[{"n": 1}, {"n": 2}]]
+    with pytest.raises(RuntimeError):
+        writer.submit([{"n": 3}])
+
+def test_back_pressure_when_database_is_slow():
+    release = threading.Event()
+    written = []
+
+    def slow_flush(rows):
+        release.wait(5)
+        written.extend(rows)
+
+    writer = BatchWriter(slow_flush, max_batch=2, max_delay=0, max_pending=4)
+    writer.submit([{"n": i} for i in range(4)])
+    with pytest.raises(WriterBusy):
+        writer.submit([{"n": 4}], timeout=0.1)
+    assert writer.stats["rejected"] == 1
+
+    release.set()
+    writer.submit([{"n": 5}], timeout=2)
+    writer.close()
+    assert [row["n"] for row in written] == [0, 1, 2, 3, 5]
+
+def test_failed_batches_are_retried():
+    calls = []
+
+    def flaky(rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise ConnectionError("database unavailable")
+
+    writer = BatchWriter(flaky, max_batch=10, max_delay=0)
+    writer.submit([{"n": 1}])
+    deadline = time.monotonic() + 3
+    while writer.stats["written"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert calls == [1, 1] and writer.stats["failures"] == 1
+
+def _wait_idle(writer, timeout=3):
+    deadline = time.monotonic() + timeout
+    while writer.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_unwritable_rows_are_isolated_and_dropped():
+    written = []
+
+    def flush(rows):
+        if any(row["n"] == 3 for row in rows):
+            raise ValueError("data too long")
+        written.extend(row["n"] for row in rows)
+
+    writer = BatchWriter(flush, max_batch=8, max_delay=0)
+    writer.submit([{"n": n} for n in range(8)])
+    _wait_idle(writer)
+    writer.close()
+    assert written == [0, 1, 2, 4, 5, 6, 7]
+    assert writer.stats["dropped"] == 1 and writer.stats["written"] == 7 and writer.stats["failures"] == 0
+
+def test_transient_error_retries_only_the_failed_part():
+    written = []
+    failed = []
+
+    def flush(rows):
+        if any(row["n"] == 0 for row in rows):
+            raise ValueError("bad row")
+        if len(rows) == 2 and not failed:
+            failed.append(rows)
+            raise ConnectionError("database unavailable")
+        written.extend(row["n"] for row in rows)
+
+    writer = BatchWriter(flush, max_batch=4, max_delay=0)
+    writer.submit([{"n": n} for n in range(4)])
+    _wait_idle(writer)
+    writer.close()
+    # Yeniden denemede daha önce yazılan parça tekrar yazılmaz
+    assert written == [1, 2, 3]
+    assert writer.stats["failures"] == 1 and writer.stats["dropped"] == 1
+
+@pytest.mark.parametrize("error", [ConnectionError("server has gone away"), ValueError("bad payload")])
+def test_post_write_failure_does_not_rewrite_committed_rows(error):
+    written = []
+    published = []
+
+    def flush(rows):
+        written.extend(row["n"] for row in rows)
+        return len(rows)
+
+    def after_flush(rows, result):
+        published.append(result)
+        raise error
+
+    writer = BatchWriter(flush, max_batch=4, max_delay=0, after_flush=after_flush)
+    writer.submit([{"n": n} for n in range(4)])
+    _wait_idle(writer)
+    writer.close()
+    # Yayın hatası ne yeniden denemeye ne de grubun bölünmesine yol açar
+    assert written == [0, 1, 2, 3]
+    assert published == [4]
+    assert writer.stats["written"] == 4
+    assert writer.stats["failures"] == 0 and writer.stats["dropped"] == 0
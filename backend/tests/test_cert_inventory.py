@@ -0,0 +1,60 @@
+import os
+from datetime import datetime, timedelta
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from utils import cert_inventory
+from utils.cert_inventory import CertificateInventory, expiry_bucket
+
+def _write_cert(path, names, days=90):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, names[0])])
+    now = datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Test CA")]))
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=days))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(n) for n in names]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    return cert
+
+def test_parses_once_until_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "example.com.pem"
+    cert = _write_cert(path, ["example.com", "www.example.com"])
+
+    calls = []
+    parse = cert_inventory.parse_certificate
+    monkeypatch.setattr(cert_inventory, "parse_certificate", lambda data: calls.append(1) or parse(data))
+
+    inventory = CertificateInventory()
+    info = inventory.get(str(path))
+    assert inventory.get(str(path)) is info
+    assert len(calls) == 1
+
+    assert info["subject"] == "example.com"
+    assert info["issuer"] == "Test CA"
+    assert info["san"] == ["example.com", "www.example.com"]
+    assert info["fingerprint"] == cert.fingerprint(hashes.SHA256()).hex()
+
+    # Yenilenen sertifika: mtime değişir, dosya yeniden ayrıştırılır
+    _write_cert(path, ["example.com"], days=10)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    renewed = inventory.get(str(path))
+    assert len(calls) == 2
+    assert renewed["san"] == ["example.com"]
+    assert expiry_bucket(renewed["not_after"]) == "warning"
+
+def test_expiry_bucket():
+    now = datetime(2024, 1, 1)
+    assert expiry_bucket(now - timedelta(days=1), now) == "expired"
+    assert expiry_bucket(now + timedelta(days=3), now) == "critical"
+    assert expiry_bucket(now + timedelta(days=60), now) == "ok"
+    assert expiry_bucket(None, now) == "unknown"
@@ -0,0 +1,171 @@
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("acme")
+
+from acme import messages
+from cryptography import x509
+
+from backend.services import acme_service
+from backend.services.acme_service import ACMEService
+from backend.services.renewal_service import CertificateRenewalEngine
+
+WORKERS = 3
+
+
+class StubACMEClient:
+    """ClientV2 yerine geçen, ağa çıkmayan ACME istemcisi"""
+
+    registrations = 0
+    failing = set()
+    started = 0
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    all_started = threading.Event()
+
+    def __init__(self, directory, net):
+        self.net = net
+
+    @classmethod
+    def reset(cls, failing=()):
+        cls.registrations = cls.started = cls.active = cls.peak = 0
+        cls.failing = set(failing)
+        cls.all_started = threading.Event()
+
+    @classmethod
+    def get_directory(cls, url, net):
+        return messages.Directory({})
+
+    def new_account(self, registration):
+        with self.lock:
+            type(self).registrations += 1
+        return messages.RegistrationResource(body=messages.Registration(), uri="https://acme.test/acct/1")
+
+    def new_order(self, csr_pem):
+        csr = x509.load_pem_x509_csr(csr_pem)
+        names = csr.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        return SimpleNamespace(authorizations=[], names=names.get_values_for_type(x509.DNSName))
+
+    def poll_and_finalize(self, order, deadline):
+        cls = type(self)
+        with cls.lock:
+            cls.started += 1
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            if cls.started >= WORKERS:
+                cls.all_started.set()
+        try:
+            # İlk grup tamamen başlamadan hiçbir sipariş bitmez: yenilemeler sıralıysa bu bekleme zaman aşımına düşer
+            cls.all_started.wait(5)
+            if order.names[0] in cls.failing:
+                raise messages.Error(typ="urn:ietf:params:acme:error:rejectedIdentifier",
+                                     detail=f"{order.names[0]} rejected")
+            return SimpleNamespace(fullchain_pem=f"chain for {order.names[0]}")
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+class FakeQuery:
+    def __init__(self, certs):
+        self.certs = certs
+
+    def filter(self, *criteria):
+        return self
+
+    def order_by(self, *columns):
+        return self
+
+    def all(self):
+        return self.certs
+
+
+class FakeSession:
+    def __init__(self, certs):
+        self.certs = certs
+        self.closed = False
+
+    def query(self, model):
+        return FakeQuery(self.certs)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def acme(tmp_path, monkeypatch):
+    StubACMEClient.reset()
+    monkeypatch.setattr(acme_service, "_accounts", {})
+    monkeypatch.setattr(acme_service.client, "ClientV2", StubACMEClient)
+    return ACMEService(directory_url="https://acme.test/directory", account_dir=str(tmp_path / "acme"),
+                       webroot=str(tmp_path / "webroot"))
+
+
+def _engine(acme, certs, issued):
+    sessions = []
+
+    def session_factory():
+        sessions.append(FakeSession(certs))
+        return sessions[-1]
+
+    def renew(db, cert_id):
+        key_pem, chain = acme.issue([f"site{cert_id}.test"])
+        issued[cert_id] = (db, chain)
+
+    engine = CertificateRenewalEngine(renew, session_factory=session_factory, max_workers=WORKERS,
+                                      window_days=30)
+    return engine, sessions
+
+
+def _due_certs(count):
+    now = datetime.utcnow()
+    return [SimpleNamespace(id=cert_id, issued_at=now - timedelta(days=89), expires_at=now + timedelta(days=1))
+            for cert_id in range(1, count + 1)]
+
+
+def test_due_certificates_renew_in_parallel_on_one_account(acme):
+    issued = {}
+    engine, sessions = _engine(acme, _due_certs(6), issued)
+
+    result = engine.run()
+
+    assert result == {"due": 6, "renewed": 6, "failed": {}}
+    assert StubACMEClient.peak == WORKERS
+    assert StubACMEClient.registrations == 1
+    assert issued[4][1] == b"chain for site4.test"
+    # Her yenileme kendi oturumunu kullanır ve kapatır
+    assert len({id(db) for db, _ in issued.values()}) == 6
+    assert all(session.closed for session in sessions)
+
+
+def test_account_is_reused_across_runs_and_restarts(acme, monkeypatch):
+    issued = {}
+    engine, _ = _engine(acme, _due_certs(3), issued)
+
+    engine.run()
+    engine.run()
+    assert StubACMEClient.registrations == 1
+
+    # Süreç yeniden başlamış gibi: hesap diskten yüklenir, yeni kayıt açılmaz
+    monkeypatch.setattr(acme_service, "_accounts", {})
+    engine.run()
+    assert StubACMEClient.registrations == 1
+    assert acme.client().net.account.uri == "https://acme.test/acct/1"
+
+
+def test_failed_renewal_does_not_stop_the_others(acme):
+    StubACMEClient.reset(failing={"site2.test", "site5.test"})
+    issued = {}
+    engine, _ = _engine(acme, _due_certs(6), issued)
+
+    result = engine.run()
+
+    assert result["due"] == 6
+    assert result["renewed"] == 4
+    assert sorted(result["failed"]) == [2, 5]
+    assert "site2.test rejected" in result["failed"][2]
+    assert sorted(issued) == [1, 3, 4, 6]
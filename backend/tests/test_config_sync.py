@@ -0,0 +1,47 @@
+import os
+from utils.config_sync import ConfigChangeSet, content_hash, render_all
+
+def test_render_all_collects_errors_without_stopping():
+    def render(value):
+        if value < 0:
+            raise ValueError("negative")
+        return f"value {value}\n"
+
+    items = {f"site{i}": i for i in range(20)}
+    items["broken"] = -1
+    rendered, errors = render_all(items, render, workers=4)
+    assert len(rendered) == 20 and rendered["site3"] == "value 3\n"
+    assert errors == {"broken": "negative"}
+
+def test_changeset_writes_only_changed_files(tmp_path):
+    same = tmp_path / "same.conf"
+    old = tmp_path / "old.conf"
+    stale = tmp_path / "stale.conf"
+    same.write_text("a\n")
+    old.write_text("b\n")
+    stale.write_text("c\n")
+    mtime = os.stat(same).st_mtime_ns
+
+    desired = {str(same): "a\n", str(old): "b2\n", str(tmp_path / "new.conf"): "d\n"}
+    changes = ConfigChangeSet(desired, remove=[str(stale), str(tmp_path / "missing.conf")])
+    assert changes.created == [str(tmp_path / "new.conf")]
+    assert changes.updated == [str(old)]
+    assert changes.removed == [str(stale)]
+    assert changes.summary()["unchanged"] == 1
+    assert "-b\n+b2\n" in changes.diff()
+
+    changes.apply()
+    assert old.read_text() == "b2\n" and (tmp_path / "new.conf").read_text() == "d\n"
+    assert not stale.exists()
+    assert os.stat(same).st_mtime_ns == mtime
+
+    changes.rollback()
+    assert old.read_text() == "b\n" and stale.read_text() == "c\n"
+    assert not (tmp_path / "new.conf").exists()
+
+def test_unchanged_set_is_noop(tmp_path):
+    path = tmp_path / "site.conf"
+    path.write_text("x\n")
+    changes = ConfigChangeSet({str(path): "x\n"})
+    assert not changes.changed
+    assert content_hash("x\n") != content_hash("y\n")
@@ -0,0 +1,43 @@
+import os
+from utils.dedup import find_duplicates, compact_group
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+def test_find_duplicates_across_domains(tmp_path):
+    core = os.urandom(200_000)
+    _write(tmp_path / "a.com" / "wp-includes" / "core.php", core)
+    _write(tmp_path / "b.com" / "wp-includes" / "core.php", core)
+    # Aynı boyut ve aynı baş/son, farklı orta kısım
+    almost = bytearray(core)
+    almost[100_000] ^= 0xFF
+    _write(tmp_path / "c.com" / "wp-includes" / "core.php", bytes(almost))
+    _write(tmp_path / "c.com" / "small.txt", b"tiny")
+
+    groups = find_duplicates([str(tmp_path / d) for d in ("a.com", "b.com", "c.com")])
+
+    assert len(groups) == 1
+    assert groups[0]["copies"] == 2
+    assert groups[0]["reclaimable"] == 200_000
+    assert all("c.com" not in p for p in groups[0]["paths"])
+
+def test_hardlinked_files_are_not_reported(tmp_path):
+    _write(tmp_path / "a" / "x.bin", os.urandom(10_000))
+    (tmp_path / "b").mkdir()
+    os.link(tmp_path / "a" / "x.bin", tmp_path / "b" / "x.bin")
+
+    assert find_duplicates([str(tmp_path)]) == []
+
+def test_compact_group_keeps_content(tmp_path):
+    data = os.urandom(50_000)
+    _write(tmp_path / "a" / "f.js", data)
+    _write(tmp_path / "b" / "f.js", data)
+
+    result = compact_group([str(tmp_path / "a" / "f.js"), str(tmp_path / "b" / "f.js")], allow_hardlinks=True)
+
+    # Reflink desteklenmeyen dosya sistemlerinde hard link kullanılır
+    assert result["reflinked"] + result["hardlinked"] == 1
+    assert (tmp_path / "b" / "f.js").read_bytes() == data
+    if result["hardlinked"]:
+        assert find_duplicates([str(tmp_path)]) == []
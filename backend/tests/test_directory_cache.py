@@ -0,0 +1,78 @@
+import os
+import pytest
+from utils.directory_cache import DirectoryStatCache, InvalidListingRequest, decode_cursor
+
+@pytest.fixture
+def sample_dir(tmp_path):
+    # Birkaç dosya ve dizin oluştur
+    for i in range(25):
+        (tmp_path / f"file{i:02d}.txt").write_bytes(b"x" * i)
+    (tmp_path / "assets").mkdir()
+    (tmp_path / ".htaccess").write_text("deny")
+    return tmp_path
+
+def test_directories_listed_first(sample_dir):
+    cache = DirectoryStatCache()
+    page = cache.list_page(str(sample_dir), limit=5)
+
+    assert page["total"] == 27
+    assert page["entries"][0]["name"] == "assets"
+    assert page["entries"][0]["is_dir"] == True
+
+@pytest.mark.parametrize("sort", ["name", "size", "modified", "type"])
+def test_directories_lead_in_descending_order(sample_dir, sort):
+    (sample_dir / "zz-dir").mkdir()
+    cache = DirectoryStatCache()
+    entries = cache.list_page(str(sample_dir), sort=sort, order="desc", limit=100)["entries"]
+
+    assert [e["is_dir"] for e in entries[:2]] == [True, True]
+    assert not any(e["is_dir"] for e in entries[2:])
+    if sort == "name":
+        assert [e["name"] for e in entries[:3]] == ["zz-dir", "assets", "file24.txt"]
+
+def test_cursor_pagination_covers_all_entries(sample_dir):
+    cache = DirectoryStatCache()
+    names = []
+    cursor = None
+    while True:
+        page = cache.list_page(str(sample_dir), cursor=cursor, limit=10)
+        names.extend(e["name"] for e in page["entries"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(names) == 27
+    assert len(set(names)) == 27
+
+def test_sort_and_filter(sample_dir):
+    cache = DirectoryStatCache()
+    page = cache.list_page(str(sample_dir), sort="size", order="desc", file_type="file",
+                           pattern="file*", limit=3)
+
+    assert [e["name"] for e in page["entries"]] == ["file24.txt", "file23.txt", "file22.txt"]
+    assert page["total"] == 25
+
+    hidden = cache.list_page(str(sample_dir), show_hidden=False)
+    assert ".htaccess" not in [e["name"] for e in hidden["entries"]]
+
+def test_cache_invalidated_on_directory_change(sample_dir):
+    cache = DirectoryStatCache()
+    first = cache.get(str(sample_dir))
+    assert cache.get(str(sample_dir)) is first
+
+    (sample_dir / "new.txt").write_text("new")
+    # Bazı dosya sistemlerinde mtime çözünürlüğü düşük olabilir
+    st = os.stat(sample_dir)
+    os.utime(sample_dir, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    second = cache.get(str(sample_dir))
+    assert second is not first
+    assert "new.txt" in [e["name"] for e in second.entries]
+
+def test_invalid_cursor(sample_dir):
+    with pytest.raises(InvalidListingRequest):
+        decode_cursor("not-a-cursor")
+
+    cache = DirectoryStatCache()
+    with pytest.raises(InvalidListingRequest):
+        cache.list_page(str(sample_dir), sort="owner")
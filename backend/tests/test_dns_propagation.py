@@ -0,0 +1,114 @@
+import asyncio
+import struct
+import pytest
+
+pytest.importorskip("dns.asyncquery")
+
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rrset
+import dns.zone
+from utils.dns_propagation import PropagationChecker, expected_rrset, parse_nameserver
+
+ZONE = """
+@    3600 IN SOA ns1.example.com. hostmaster.example.com. {serial} 3600 900 1209600 300
+@    3600 IN NS  ns1.example.com.
+@    3600 IN A   {address}
+big  3600 IN TXT {txt}
+"""
+
+BIG_TXT = " ".join(f'"{"k" * 200}{i}"' for i in range(4))
+
+
+class LocalNameserver:
+    """UDP ve TCP üzerinden yetkili yanıt veren küçük test isim sunucusu"""
+
+    def __init__(self, serial, address):
+        text = ZONE.format(serial=serial, address=address, txt=BIG_TXT)
+        self.zone = dns.zone.from_text(text, origin="example.com.", relativize=False)
+
+    def answer(self, wire: bytes, max_size: int) -> bytes:
+        query = dns.message.from_wire(wire)
+        response = dns.message.make_response(query)
+        response.flags |= dns.flags.AA
+        question = query.question[0]
+        rdataset = self.zone.get_rdataset(question.name, question.rdtype)
+        if rdataset is not None:
+            response.answer.append(dns.rrset.from_rdata_list(question.name, rdataset.ttl, list(rdataset)))
+        data = response.to_wire()
+        if len(data) > max_size:
+            # Yanıt sığmazsa boş ve TC bayraklı yanıt gönderilir
+            response.answer = []
+            response.flags |= dns.flags.TC
+            data = response.to_wire()
+        return data
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        server = self
+
+        class Protocol(asyncio.DatagramProtocol):
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def datagram_received(self, data, addr):
+                self.transport.sendto(server.answer(data, 512), addr)
+
+        self.udp, _ = await loop.create_datagram_endpoint(Protocol, local_addr=("127.0.0.1", 0))
+        port = self.udp.get_extra_info("sockname")[1]
+
+        async def handle(reader, writer):
+            size = struct.unpack("!H", await reader.readexactly(2))[0]
+            data = self.answer(await reader.readexactly(size), 65535)
+            writer.write(struct.pack("!H", len(data)) + data)
+            await writer.drain()
+            writer.close()
+
+        self.tcp = await asyncio.start_server(handle, "127.0.0.1", port)
+        return f"127.0.0.1:{port}"
+
+    def close(self):
+        self.udp.close()
+        self.tcp.close()
+
+
+async def _check(servers, expected):
+    specs = [await server.start() for server in servers]
+    try:
+        return await PropagationChecker(timeout=2).check("example.com", expected, specs)
+    finally:
+        for server in servers:
+            server.close()
+
+def _expected(address):
+    return {
+        ("@", "A"): expected_rrset("example.com", "A", [address]),
+        ("big", "TXT"): expected_rrset("example.com", "TXT", [BIG_TXT]),
+        ("gone", "A"): set(),
+    }
+
+def test_all_servers_in_sync():
+    servers = [LocalNameserver(2024010101, "192.0.2.1"), LocalNameserver(2024010101, "192.0.2.1")]
+    report = asyncio.run(_check(servers, _expected("192.0.2.1")))
+
+    assert report["propagated"]
+    assert report["serial"] == 2024010101
+    assert all(ns["mismatches"] == [] for ns in report["nameservers"])
+
+def test_lagging_server_is_reported():
+    servers = [LocalNameserver(2024010102, "192.0.2.2"), LocalNameserver(2024010101, "192.0.2.1")]
+    report = asyncio.run(_check(servers, _expected("192.0.2.2")))
+
+    assert not report["propagated"]
+    assert report["serial"] == 2024010102
+    assert len(report["lagging"]) == 1
+    stale = [ns for ns in report["nameservers"] if not ns["in_sync"]][0]
+    assert stale["serial"] == 2024010101
+    assert stale["mismatches"][0]["served"] == ["192.0.2.1"]
+
+def test_parse_nameserver():
+    assert parse_nameserver("192.0.2.1") == ("192.0.2.1", 53)
+    assert parse_nameserver("127.0.0.1:5353") == ("127.0.0.1", 5353)
+    assert parse_nameserver("[::1]:5353") == ("::1", 5353)
+    assert parse_nameserver("ns1.example.com") == ("ns1.example.com", 53)
@@ -0,0 +1,89 @@
+import asyncio
+import time
+import pytest
+
+pytest.importorskip("dns.asyncresolver")
+
+from utils.dns_resolver import AsyncDNSResolver, DNSCache, verify_mail_records, verify_many
+
+RECORDS = {
+    ("example.com", "TXT"): ["google-site-verification=x", "v=spf1 include:_spf.example.net -all"],
+    ("_dmarc.example.com", "TXT"): ["v=DMARC1; p=reject"],
+    ("mail._domainkey.example.com", "TXT"): ["v=DKIM1; k=rsa; p=" + "A" * 400],
+    ("custom.org", "TXT"): ["v=spf1 mx -all"],
+    ("_dmarc.custom.org", "TXT"): ["v=DMARC1; p=none"],
+    ("s2024._domainkey.custom.org", "TXT"): ["v=DKIM1; k=ed25519; p=" + "B" * 43],
+}
+
+class FakeResolver(AsyncDNSResolver):
+    """Ağa çıkmadan sabit yanıtlar döndüren çözümleyici"""
+
+    def __init__(self, delay=0.05, **kwargs):
+        super().__init__(cache=DNSCache(), **kwargs)
+        self.delay = delay
+        self.queries = []
+
+    async def _query(self, key):
+        self.queries.append(key)
+        await asyncio.sleep(self.delay)
+        values = RECORDS.get(key, [])
+        self.cache.put(key, values, 300)
+        return values
+
+def test_cache_respects_ttl(monkeypatch):
+    cache = DNSCache(max_ttl=100)
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    cache.put(("a.com", "TXT"), ["x"], 3600)
+    cache.put(("b.com", "TXT"), [], 10)
+    assert cache.get(("a.com", "TXT")) == ["x"]
+    assert cache.get(("b.com", "TXT")) == []
+
+    now[0] += 50
+    assert cache.get(("b.com", "TXT")) is None
+    # max_ttl üst sınırı uygulanır
+    now[0] += 60
+    assert cache.get(("a.com", "TXT")) is None
+
+def test_verify_mail_records_runs_lookups_concurrently():
+    resolver = FakeResolver(delay=0.1)
+
+    started = time.monotonic()
+    result = asyncio.run(verify_mail_records(resolver, "example.com"))
+    elapsed = time.monotonic() - started
+
+    assert result["spf"]["record"].startswith("v=spf1")
+    assert result["dmarc"]["status"] == "valid"
+    assert result["dkim"]["status"] == "valid" and result["dkim"]["selector"] == "mail"
+    # 6 sorgu sırayla 0.6 sn sürerdi
+    assert elapsed < 0.3
+
+def test_identical_queries_are_coalesced_and_cached():
+    resolver = FakeResolver()
+
+    async def run():
+        await asyncio.gather(*(resolver.resolve_txt("example.com") for _ in range(20)))
+        await resolver.resolve_txt("example.com")
+
+    asyncio.run(run())
+    assert resolver.queries == [("example.com", "TXT")]
+
+def test_verify_many_reports_missing_records():
+    resolver = FakeResolver(delay=0)
+    results = asyncio.run(verify_many(["example.com", "empty.org"], concurrency=2, resolver=resolver))
+
+    assert results["empty.org"]["spf"]["status"] == "missing"
+    assert results["empty.org"]["dkim"]["status"] == "missing"
+    assert results["example.com"]["spf"]["status"] == "valid"
+
+def test_verify_many_uses_per_domain_selectors():
+    resolver = FakeResolver(delay=0)
+    results = asyncio.run(verify_many(["example.com", "custom.org"], concurrency=2, resolver=resolver,
+                                      domain_selectors={"custom.org": ["s2024"]}))
+
+    assert results["custom.org"]["dkim"]["status"] == "valid"
+    assert results["custom.org"]["dkim"]["selector"] == "s2024"
+    # Özel seçicisi olmayan domain yaygın seçicilerle denenir
+    assert results["example.com"]["dkim"]["selector"] == "mail"
+    assert ("s2024._domainkey.example.com", "TXT") not in resolver.queries
@@ -0,0 +1,78 @@
+import dns.rdatatype
+import pytest
+
+from utils.dns_update import build_update, commit_changes, rdata_text
+
+
+def _record(type, content, ttl=3600, priority=None):
+    return {"type": type, "content": content, "ttl": ttl, "priority": priority}
+
+
+def test_change_set_is_one_update_message():
+    rrsets = {
+        ("www", "A"): [_record("A", "192.0.2.1", 300), _record("A", "192.0.2.2", 600)],
+        ("@", "MX"): [_record("MX", "mail.example.com.", priority=10)],
+        ("old", "CNAME"): [],
+    }
+    update = build_update("example.com", rrsets)
+
+    # Küme başına bir silme, kalan kayıtlar için birer ekleme; hepsi tek mesajda
+    deleted = {(str(rrset.name), dns.rdatatype.to_text(rrset.rdtype)) for rrset in update.update if not len(rrset)}
+    added = sorted((str(rrset.name), rrset.ttl, rdata.to_text()) for rrset in update.update for rdata in rrset)
+    assert deleted == {("www", "A"), ("@", "MX"), ("old", "CNAME")}
+    assert added == [("@", 3600, "10 mail"), ("www", 300, "192.0.2.1"), ("www", 300, "192.0.2.2")]
+    assert str(update.origin) == "example.com."
+
+
+def test_txt_like_records_are_quoted():
+    key = "v=DKIM1; k=rsa; p=" + "A" * 400
+    update = build_update("example.com", {
+        ("default._domainkey", "TXT"): [_record("DKIM", key)],
+        ("@", "TXT"): [_record("SPF", 'v=spf1 include:"x" -all')],
+    })
+    texts = {str(rrset.name): list(rrset)[0] for rrset in update.update if len(rrset)}
+    assert b"".join(texts["default._domainkey"].strings) == key.encode()
+    assert all(len(chunk) <= 255 for chunk in texts["default._domainkey"].strings)
+    assert texts["@"].strings == (b'v=spf1 include:"x" -all',)
+
+    assert rdata_text(_record("SRV", "5 443 sip.example.com.", priority=1)) == "1 5 443 sip.example.com."
+    assert rdata_text(_record("A", "192.0.2.1")) == "192.0.2.1"
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+
+def test_failed_publish_rolls_back():
+    db = FakeSession()
+
+    def refuse():
+        raise RuntimeError("DNS update refused: REFUSED")
+
+    with pytest.raises(RuntimeError):
+        commit_changes(db, refuse, after_commit=lambda: db.calls.append("write"))
+    assert db.calls == ["rollback"]
+
+    commit_changes(db, lambda: None)
+    assert db.calls == ["rollback", "commit"]
+
+
+def test_zone_file_is_written_after_commit():
+    db = FakeSession()
+    invalidated = []
+    commit_changes(db, after_commit=lambda: db.calls.append("write"))
+    assert db.calls == ["commit", "write"]
+
+    def fail():
+        raise RuntimeError("Zone reload failed")
+
+    with pytest.raises(RuntimeError):
+        commit_changes(db, after_commit=fail, on_error=lambda: invalidated.append(True))
+    assert db.calls == ["commit", "write", "commit"] and invalidated == [True]
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import struct
+from utils.fastcgi import FCGI_END_REQUEST, FCGI_PARAMS, FCGI_STDIN, FCGI_STDOUT, _HEADER, fetch_many, saturation
+
+STATUS = {
+    "pool": "example.com", "process manager": "dynamic", "start time": 1700000000,
+    "accepted conn": 120, "listen queue": 0, "max listen queue": 3, "idle processes": 2,
+    "active processes": 1, "total processes": 3, "max children reached": 1, "slow requests": 0,
+}
+
+def _decode_params(data):
+    params = {}
+    i = 0
+    while i < len(data):
+        lengths = []
+        for _ in range(2):
+            if data[i] < 128:
+                lengths.append(data[i])
+                i += 1
+            else:
+                lengths.append(struct.unpack("!I", data[i:i + 4])[0] & 0x7FFFFFFF)
+                i += 4
+        name = data[i:i + lengths[0]].decode()
+        i += lengths[0]
+        params[name] = data[i:i + lengths[1]].decode()
+        i += lengths[1]
+    return params
+
+async def _fpm(reader, writer):
+    params = b""
+    while True:
+        _, record_type, request_id, length, padding = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+        content = (await reader.readexactly(length + padding))[:length]
+        if record_type == FCGI_PARAMS:
+            params += content
+        if record_type == FCGI_STDIN and not content:
+            break
+    request = _decode_params(params)
+    if request["SCRIPT_NAME"] == "/fpm-status" and request["QUERY_STRING"] == "json":
+        body = b"Content-type: application/json\r\n\r\n" + json.dumps(STATUS).encode()
+    else:
+        body = b"Status: 404 Not Found\r\nContent-type: text/plain\r\n\r\nFile not found."
+    # Gövde birden fazla kayda bölünerek gönderilir
+    for i in range(0, len(body), 64):
+        chunk = body[i:i + 64]
+        writer.write(_HEADER.pack(1, FCGI_STDOUT, request_id, len(chunk), 0) + chunk)
+    writer.write(_HEADER.pack(1, FCGI_END_REQUEST, request_id, 8, 0) + b"\0" * 8)
+    await writer.drain()
+    writer.close()
+
+def test_fetch_many_reads_status_over_unix_socket(tmp_path):
+    socket_path = str(tmp_path / "php-fpm.sock")
+
+    async def run():
+        server = await asyncio.start_unix_server(_fpm, socket_path)
+        async with server:
+            return (
+                await fetch_many({"8.1/example.com": socket_path, "8.1/missing.org": str(tmp_path / "none.sock")}),
+                await fetch_many({"8.1/example.com": socket_path}, status_path="/status")
+            )
+
+    results, wrong_path = asyncio.run(run())
+    status = results["8.1/example.com"]
+    assert status["pool"] == "example.com"
+    assert status["accepted_conn"] == 120
+    assert status["max_children_reached"] == 1
+    assert "error" in results["8.1/missing.org"]
+    assert "HTTP 404" in wrong_path["8.1/example.com"]["error"]
+
+def test_saturation_uses_counter_deltas():
+    first = {"start_time": 1, "accepted_conn": 100, "max_children_reached": 4, "slow_requests": 0, "listen_queue": 0}
+    # İlk örnekte birikimli sayaç doygunluk sayılmaz
+    assert saturation(first)["saturated"] is False
+
+    second = dict(first, accepted_conn=160, max_children_reached=5)
+    result = saturation(second, first)
+    assert result["deltas"]["accepted_conn"] == 60
+    assert result["reasons"] == ["max children reached"]
+
+    third = dict(second, accepted_conn=170, listen_queue=2)
+    assert saturation(third, second)["reasons"] == ["listen queue"]
+
+    # Havuz yeniden başladıysa sayaçlar sıfırdan sayılır
+    restarted = dict(first, start_time=2, accepted_conn=10, max_children_reached=0)
+    assert saturation(restarted, third)["deltas"]["accepted_conn"] == 10
@@ -0,0 +1,144 @@
+from utils.fpm_sizing import (
+    MB, OndemandPolicy, RequestRateSampler, read_pm_settings, sample_pool_memory, size_pools, update_pool_config
+)
+
+POOL = """[example.com]
+user = example.com
+listen = /run/php/php8.1-fpm-example.com.sock
+pm = dynamic
+pm.max_children = 5
+pm.start_servers = 2
+pm.min_spare_servers = 1
+pm.max_spare_servers = 3
+pm.max_requests = 500
+php_admin_value[memory_limit] = 256M
+"""
+
+def _process(proc, pid, title, pss_kb=None, rss_kb=None):
+    pid_dir = proc / str(pid)
+    pid_dir.mkdir()
+    (pid_dir / "cmdline").write_bytes(title.encode() + b"\0")
+    if pss_kb is not None:
+        (pid_dir / "smaps_rollup").write_text(f"Rss: {pss_kb * 2} kB\nPss: {pss_kb} kB\n")
+    (pid_dir / "status").write_text(f"Name: php-fpm\nVmRSS: {rss_kb or 0} kB\n")
+
+def test_sample_pool_memory(tmp_path):
+    _process(tmp_path, 10, "php-fpm: master process (/etc/php/8.1/fpm/php-fpm.conf)", 20000)
+    _process(tmp_path, 11, "php-fpm: pool example.com", pss_kb=30000)
+    _process(tmp_path, 12, "php-fpm: pool example.com", rss_kb=50000)
+    _process(tmp_path, 13, "php-fpm: pool other.org", pss_kb=10000)
+
+    pools = sample_pool_memory(str(tmp_path))
+    assert sorted(pools["example.com"]) == [30000 * 1024, 50000 * 1024]
+    assert pools["other.org"] == [10000 * 1024]
+    assert len(pools) == 2
+
+def test_request_rate_sampler(tmp_path):
+    log = tmp_path / "access.log"
+    log.write_text("a\n" * 10)
+    now = [0.0]
+    sampler = RequestRateSampler(clock=lambda: now[0])
+
+    assert sampler.sample(str(log)) is None
+    with open(log, "a") as f:
+        f.write("b\n" * 120)
+    now[0] = 60.0
+    assert sampler.sample(str(log)) == 2.0
+
+    # Döndürülmüş günlük baştan okunur
+    log.write_text("c\n" * 30)
+    now[0] = 90.0
+    assert sampler.sample(str(log)) == 1.0
+
+def test_size_pools_fits_budget():
+    samples = {
+        "busy": {"rate": 100.0, "memory": [40 * MB] * 4},
+        "medium": {"rate": 20.0, "memory": [60 * MB]},
+        "idle": {"rate": 0.0, "memory": []},
+    }
+    # Bütçe bolsa talepler max_growth katına kadar büyür, boş havuz en az min_children alır
+    sized = size_pools(samples, budget=10 * 1024 * MB)
+    assert sized["busy"] == {"pm": "static", "pm.max_children": "60"}
+    assert sized["medium"]["pm"] == "dynamic"
+    assert sized["medium"]["pm.max_children"] == "12"
+    assert sized["idle"]["pm"] == "ondemand"
+    assert sized["idle"]["pm.max_children"] == "5"
+
+    budget = 1000 * MB
+    sized = size_pools(samples, budget=budget)
+    memory = {"busy": 40 * MB, "medium": 60 * MB, "idle": 64 * MB}
+    used = sum(int(s["pm.max_children"]) * memory[n] for n, s in sized.items())
+    assert used <= budget
+    assert int(sized["busy"]["pm.max_children"]) > int(sized["medium"]["pm.max_children"]) >= 1
+
+def test_update_pool_config_replaces_pm_lines():
+    config = update_pool_config(POOL, {"pm": "ondemand", "pm.max_children": "4", "pm.process_idle_timeout": "10s"})
+    assert read_pm_settings(config) == {
+        "pm": "ondemand", "pm.max_children": "4", "pm.process_idle_timeout": "10s", "pm.max_requests": "500"
+    }
+    assert "php_admin_value[memory_limit] = 256M" in config
+    assert config.index("pm = ondemand") < config.index("php_admin_value")
+
+def test_ondemand_policy_hysteresis():
+    policy = OndemandPolicy(idle_rate=0.05, busy_rate=0.5, idle_samples=3)
+
+    # Yoğun havuz tek bir sessiz örneklemede düşürülmez
+    assert policy.choose("site", 0.0, 8, "dynamic") == "dynamic"
+    assert policy.choose("site", 0.0, 8, "dynamic") == "dynamic"
+    assert policy.choose("site", 0.0, 8, "dynamic") == "ondemand"
+
+    # Eşikler arasındaki hız mevcut modu korur
+    assert policy.choose("site", 0.2, 8, "ondemand") == "ondemand"
+    assert policy.choose("site", 0.6, 8, "ondemand") == "dynamic"
+    assert policy.choose("site", 0.2, 8, "dynamic") == "dynamic"
+    assert policy.choose("site", 0.0, 20, "dynamic") == "static"
+
+    assert policy.choose("big", 5.0, 20, "ondemand") == "static"
+    assert policy.choose("tiny", 5.0, 2, "dynamic") == "dynamic"
+
+def test_small_busy_pool_keeps_resident_mode():
+    policy = OndemandPolicy(idle_rate=0.05, busy_rate=0.5, idle_samples=2)
+    samples = {"tiny": {"rate": 2.0, "memory": [40 * MB], "mode": "dynamic", "max_children": 1}}
+
+    # Küçük boyut tek başına ondemand'a düşürmez
+    sized = size_pools(samples, budget=1024 * MB, policy=policy, min_children=1, max_growth=1.0)
+    assert sized["tiny"]["pm"] == "dynamic"
+    assert sized["tiny"]["pm.max_children"] == "1"
+
+    samples["tiny"]["rate"] = 0.0
+    assert size_pools(samples, budget=1024 * MB, policy=policy, min_children=1)["tiny"]["pm"] == "dynamic"
+    assert size_pools(samples, budget=1024 * MB, policy=policy, min_children=1)["tiny"]["pm"] == "ondemand"
+
+def test_saturated_pool_is_promoted_and_grown():
+    samples = {"shop": {"rate": 0.1, "memory": [50 * MB], "mode": "ondemand", "max_children": 4, "saturated": True}}
+    sized = size_pools(samples, budget=4096 * MB, policy=OndemandPolicy())
+    assert sized["shop"]["pm"] == "dynamic"
+    assert sized["shop"]["pm.max_children"] == "5"
+
+def test_low_rate_pool_gets_minimum_and_spare_budget():
+    samples = {"blog": {"rate": 3.0, "memory": [48 * MB] * 2, "mode": "dynamic", "max_children": 5}}
+    sized = size_pools(samples, budget=8 * 1024 * MB)
+    assert sized["blog"]["pm"] == "dynamic"
+    assert sized["blog"]["pm.max_children"] == "5"
+
+    samples["blog"]["rate"] = 12.0
+    sized = size_pools(samples, budget=8 * 1024 * MB, min_children=2, max_growth=3.0)
+    assert sized["blog"]["pm.max_children"] == "12"
+
+    # Büyüme bütçeyle sınırlı
+    sized = size_pools(samples, budget=8 * 48 * MB, min_children=2, max_growth=3.0)
+    assert sized["blog"]["pm.max_children"] == "8"
+
+def test_saturated_growth_is_kept_until_pool_settles():
+    policy = OndemandPolicy(settle_samples=3)
+    sample = {"rate": 3.0, "memory": [50 * MB], "mode": "dynamic", "max_children": 8, "saturated": True}
+    sized = size_pools({"shop": sample}, budget=8 * 1024 * MB, policy=policy)
+    assert sized["shop"]["pm.max_children"] == "9"
+
+    # Büyütülen değer doygunluk kalktıktan hemen sonra geri alınmaz
+    sample.update(max_children=9, saturated=False)
+    for _ in range(2):
+        sized = size_pools({"shop": sample}, budget=8 * 1024 * MB, policy=policy)
+        assert sized["shop"]["pm.max_children"] == "9"
+    sized = size_pools({"shop": sample}, budget=8 * 1024 * MB, policy=policy)
+    assert sized["shop"]["pm.max_children"] == "5"
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from utils.log_broker import LAGGED, DeliveryTracker, InProcessBroker
+
+def test_publish_reaches_only_topic_subscribers():
+    async def run():
+        broker = InProcessBroker()
+        async with broker.subscribe(1) as first, broker.subscribe(2) as second:
+            broker.publish(1, {"id": 10})
+            broker.publish(1, {"id": 11})
+            assert await first.get() == [{"id": 10}, {"id": 11}]
+            assert second.queue.empty()
+        assert broker.subscriber_count(1) == 0
+        # Abone yokken yayın hiçbir şey yapmaz
+        broker.publish(1, {"id": 12})
+
+    asyncio.run(run())
+
+def test_publish_from_worker_thread():
+    async def run():
+        broker = InProcessBroker()
+        async with broker.subscribe("5") as subscription:
+            thread = threading.Thread(target=broker.publish, args=(5, {"id": 1}))
+            thread.start()
+            events = await asyncio.wait_for(subscription.get(), 1)
+            thread.join()
+            return events
+
+    assert asyncio.run(run()) == [{"id": 1}]
+
+def test_slow_subscriber_is_marked_lagged():
+    async def run():
+        broker = InProcessBroker(max_queue=2)
+        async with broker.subscribe(1) as subscription:
+            for i in range(5):
+                broker.publish(1, {"id": i})
+            assert await subscription.get() is LAGGED
+            broker.publish(1, {"id": 6})
+            assert await subscription.get() == [{"id": 6}]
+
+    asyncio.run(run())
+
+def test_tracker_skips_sent_and_old_events():
+    tracker = DeliveryTracker(cursor=4, window=10)
+    events = [{"id": 3}, {"id": 5}, {"id": None, "message": "tail"}]
+    assert tracker.fresh(events) == [{"id": 5}, {"id": None, "message": "tail"}]
+    tracker.mark(tracker.fresh(events))
+    assert tracker.fresh([{"id": 5}, {"id": 6}]) == [{"id": 6}]
+
+def test_tracker_delivers_late_committed_rows():
+    tracker = DeliveryTracker(window=100)
+    tracker.mark([{"id": 1}, {"id": 2}])
+    # Toplu yazım 3-5'i ayırdı ama tek kayıt (6) önce commit edildi
+    tracker.mark([{"id": 6}])
+    assert tracker.fresh([{"id": 3}, {"id": 4}, {"id": 5}, {"id": 6}]) == [{"id": 3}, {"id": 4}, {"id": 5}]
+    assert tracker.floor == 0
+
+    tracker.mark([{"id": 500}])
+    assert tracker.floor == 400 and tracker.fresh([{"id": 7}]) == []
@@ -0,0 +1,64 @@
+import pytest
+from utils.nginx_vhost import identifier, merge_options, render_nginx_vhost
+
+def test_default_vhost():
+    config = render_nginx_vhost(
+        "example.com", "8.1", stapling_include="/etc/nginx/ocsp/example.com.stapling*.conf",
+        certificate=("/etc/letsencrypt/live/example.com/fullchain.pem", "/etc/letsencrypt/live/example.com/privkey.pem")
+    )
+
+    assert "upstream php_example_com {" in config
+    assert "server unix:/run/php/php8.1-fpm-example.com.sock;" in config
+    assert "keepalive 8;" in config
+    assert "fastcgi_pass php_example_com;" in config
+    assert "fastcgi_keep_conn on;" in config
+    assert "listen 443 ssl http2;" in config
+    assert "ssl_certificate /etc/letsencrypt/live/example.com/fullchain.pem;" in config
+    assert "gzip_static on;" in config
+    assert "expires 30d;" in config
+    assert "include /etc/nginx/ocsp/example.com.stapling*.conf;" in config
+    # Önbellek varsayılan olarak kapalı
+    assert "fastcgi_cache" not in config.replace("fastcgi_keep_conn", "")
+    assert config.count("{") == config.count("}")
+
+def test_fastcgi_microcache():
+    config = render_nginx_vhost("shop.example.com", "8.2", {"fastcgi_cache": True, "fastcgi_cache_valid": "5s"})
+
+    assert "fastcgi_cache_path /var/cache/nginx/fastcgi/shop.example.com levels=1:2 keys_zone=shop_example_com:10m" in config
+    assert "fastcgi_cache shop_example_com;" in config
+    assert "fastcgi_cache_valid 200 301 302 5s;" in config
+    assert 'fastcgi_cache_key "$scheme$request_method$host$request_uri";' in config
+    assert "fastcgi_cache_bypass $skip_cache;" in config
+
+def test_options_can_disable_features():
+    config = render_nginx_vhost("example.com", "8.1", {
+        "http2": False, "gzip": False, "gzip_static": False, "static_expires": "off", "upstream_keepalive": 0
+    }, certificate=("/etc/ssl/certs/example.com.pem", "/etc/ssl/private/example.com.key"))
+    assert "listen 443 ssl;" in config
+    assert "gzip" not in config
+    assert "expires" not in config
+    assert "keepalive" not in config and "fastcgi_keep_conn" not in config
+
+def test_vhost_without_certificate_serves_http_only():
+    config = render_nginx_vhost("example.com", "8.1", stapling_include="/etc/nginx/ocsp/example.com.stapling*.conf",
+                                acme_webroot="/srv/acme")
+
+    assert "listen 80;" in config
+    assert "443" not in config
+    assert "ssl_" not in config
+    assert "stapling" not in config
+    assert "location ^~ /.well-known/acme-challenge/ {" in config
+    assert "root /srv/acme;" in config
+    # ACME yolu PHP'ye ya da statik dosya kurallarına düşmeden önce eşleşir
+    assert config.index("acme-challenge") < config.index("location / {")
+    assert config.count("{") == config.count("}")
+
+def test_merge_options_validates():
+    assert merge_options({"static_expires": "7d"})["static_expires"] == "7d"
+    for options in ({"unknown": 1}, {"http2": "yes"}, {"static_expires": "7 days; evil"},
+                    {"client_max_body_size": "1g;"}, {"static_extensions": ["js|.*"]}):
+        with pytest.raises(ValueError):
+            merge_options(options)
+
+def test_identifier():
+    assert identifier("xn--bcher-kva.example-site.com") == "xn__bcher_kva_example_site_com"
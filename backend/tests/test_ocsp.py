@@ -0,0 +1,147 @@
+import pytest
+from datetime import datetime, timedelta
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509 import ocsp
+from cryptography.x509.oid import AuthorityInformationAccessOID, ExtendedKeyUsageOID, NameOID
+from utils.ocsp import OCSPStapler, refresh_time
+
+OCSP_URL = "http://ocsp.test.local"
+
+def _name(cn):
+    return x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, cn)])
+
+def _chain(tmp_path, with_ocsp=True):
+    now = datetime.utcnow()
+    ca_key = ec.generate_private_key(ec.SECP256R1())
+    ca = (
+        x509.CertificateBuilder()
+        .subject_name(_name("Test CA")).issuer_name(_name("Test CA"))
+        .public_key(ca_key.public_key()).serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=365))
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(ca_key, hashes.SHA256())
+    )
+    key = ec.generate_private_key(ec.SECP256R1())
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(_name("example.com")).issuer_name(ca.subject)
+        .public_key(key.public_key()).serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=90))
+    )
+    if with_ocsp:
+        builder = builder.add_extension(x509.AuthorityInformationAccess([
+            x509.AccessDescription(AuthorityInformationAccessOID.OCSP, x509.UniformResourceIdentifier(OCSP_URL))
+        ]), critical=False)
+    leaf = builder.sign(ca_key, hashes.SHA256())
+    path = tmp_path / "fullchain.pem"
+    path.write_bytes(leaf.public_bytes(serialization.Encoding.PEM) + ca.public_bytes(serialization.Encoding.PEM))
+    return str(path), leaf, ca, ca_key
+
+def _issued_cert(ca, ca_key, cn, ocsp_signing=False, not_after=None):
+    """CA'nın imzaladığı (isteğe bağlı olarak OCSP imzalama yetkili) sertifika ve anahtarı"""
+    now = datetime.utcnow()
+    key = ec.generate_private_key(ec.SECP256R1())
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(_name(cn)).issuer_name(ca.subject)
+        .public_key(key.public_key()).serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=2)).not_valid_after(not_after or now + timedelta(days=30))
+    )
+    if ocsp_signing:
+        builder = builder.add_extension(x509.ExtendedKeyUsage([ExtendedKeyUsageOID.OCSP_SIGNING]), critical=False)
+    return builder.sign(ca_key, hashes.SHA256()), key
+
+class Responder:
+    def __init__(self, leaf, ca, ca_key, validity=timedelta(days=4), signer=None):
+        self.leaf, self.ca, self.ca_key, self.validity = leaf, ca, ca_key, validity
+        # Yetkilendirilmiş yanıtlayıcı: (sertifika, anahtar); yoksa CA imzalar
+        self.signer = signer
+        self.calls = 0
+
+    def __call__(self, url, request_der, timeout):
+        self.calls += 1
+        assert url == OCSP_URL
+        request = ocsp.load_der_ocsp_request(request_der)
+        assert request.serial_number == self.leaf.serial_number
+        now = datetime.utcnow()
+        builder = ocsp.OCSPResponseBuilder().add_response(
+            self.leaf, self.ca, hashes.SHA1(), ocsp.OCSPCertStatus.GOOD,
+            now - timedelta(minutes=5), now + self.validity, None, None
+        )
+        if self.signer:
+            signer_cert, signer_key = self.signer
+            builder = builder.responder_id(ocsp.OCSPResponderEncoding.HASH, signer_cert).certificates([signer_cert])
+        else:
+            signer_key = self.ca_key
+            builder = builder.responder_id(ocsp.OCSPResponderEncoding.HASH, self.ca)
+        response = builder.sign(signer_key, hashes.SHA256())
+        return response.public_bytes(serialization.Encoding.DER)
+
+def test_refresh_writes_staple_and_snippet(tmp_path):
+    cert_path, leaf, ca, ca_key = _chain(tmp_path)
+    responder = Responder(leaf, ca, ca_key)
+    stapler = OCSPStapler(str(tmp_path / "ocsp"), fetcher=responder)
+
+    result = stapler.refresh("example.com", cert_path)
+    assert result["status"] == "updated" and result["new"]
+    assert result["cert_status"] == "good"
+    assert (tmp_path / "ocsp" / "example.com.ocsp").read_bytes()
+    snippet = (tmp_path / "ocsp" / "example.com.stapling.conf").read_text()
+    assert "ssl_stapling_file " + stapler.staple_path("example.com") in snippet
+
+    # Yenileme zamanı gelmeden responder'a tekrar gidilmez, yeni stapler diskteki yanıtı kullanır
+    assert stapler.refresh("example.com", cert_path)["status"] == "fresh"
+    restarted = OCSPStapler(str(tmp_path / "ocsp"), fetcher=responder)
+    assert restarted.refresh("example.com", cert_path)["status"] == "fresh"
+    assert responder.calls == 1
+
+    later = datetime.utcnow() + timedelta(days=3)
+    assert restarted.refresh("example.com", cert_path, now=later)["status"] == "updated"
+    assert responder.calls == 2
+
+def test_rejects_response_signed_by_other_key(tmp_path):
+    cert_path, leaf, ca, _ = _chain(tmp_path)
+    stapler = OCSPStapler(str(tmp_path / "ocsp"), fetcher=Responder(leaf, ca, ec.generate_private_key(ec.SECP256R1())))
+
+    result = stapler.refresh("example.com", cert_path)
+    assert result["status"] == "failed"
+    assert not (tmp_path / "ocsp" / "example.com.stapling.conf").exists()
+
+def test_delegated_responder_with_ocsp_signing_is_accepted(tmp_path):
+    cert_path, leaf, ca, ca_key = _chain(tmp_path)
+    signer = _issued_cert(ca, ca_key, "Test OCSP Responder", ocsp_signing=True)
+    stapler = OCSPStapler(str(tmp_path / "ocsp"), fetcher=Responder(leaf, ca, ca_key, signer=signer))
+
+    result = stapler.refresh("example.com", cert_path)
+    assert result["status"] == "updated" and result["cert_status"] == "good"
+
+def test_rejects_leaf_certificate_as_responder(tmp_path):
+    # Aynı CA'dan alınmış başka bir müşterinin sertifikası OCSP imzalama yetkisi taşımaz
+    cert_path, leaf, ca, ca_key = _chain(tmp_path)
+    customer = _issued_cert(ca, ca_key, "customer.example.net")
+    stapler = OCSPStapler(str(tmp_path / "ocsp"), fetcher=Responder(leaf, ca, ca_key, signer=customer))
+
+    result = stapler.refresh("example.com", cert_path)
+    assert result["status"] == "failed"
+    assert "not authorized for OCSP signing" in result["error"]
+    assert not (tmp_path / "ocsp" / "example.com.stapling.conf").exists()
+
+def test_rejects_expired_responder_certificate(tmp_path):
+    cert_path, leaf, ca, ca_key = _chain(tmp_path)
+    signer = _issued_cert(ca, ca_key, "Test OCSP Responder", ocsp_signing=True,
+                          not_after=datetime.utcnow() - timedelta(days=1))
+    stapler = OCSPStapler(str(tmp_path / "ocsp"), fetcher=Responder(leaf, ca, ca_key, signer=signer))
+
+    assert stapler.refresh("example.com", cert_path)["status"] == "failed"
+
+def test_certificate_without_responder_is_skipped(tmp_path):
+    cert_path, *_ = _chain(tmp_path, with_ocsp=False)
+    stapler = OCSPStapler(str(tmp_path / "ocsp"), fetcher=lambda *a: pytest.fail("should not fetch"))
+    assert stapler.refresh("example.com", cert_path)["status"] == "skipped"
+
+def test_refresh_time():
+    start = datetime(2024, 1, 1)
+    assert refresh_time(start, start + timedelta(days=4)) == start + timedelta(days=2)
+    assert refresh_time(start, start + timedelta(hours=3)) == start + timedelta(hours=1)
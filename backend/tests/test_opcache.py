@@ -0,0 +1,57 @@
+import json
+import pytest
+from utils.opcache import compute_profile, count_php_files, max_accelerated_files, parse_status_body
+
+def test_count_php_files(tmp_path):
+    site = tmp_path / "example.com" / "public_html"
+    (site / "wp-includes").mkdir(parents=True)
+    (site / "index.php").write_text("<?php echo 1;")
+    (site / "wp-includes" / "load.php").write_text("<?php // " + "x" * 100)
+    (site / "style.css").write_text("body {}")
+    (site / "linked").symlink_to(site / "wp-includes")
+
+    counts = count_php_files([str(site), str(tmp_path / "missing")])
+    assert counts["files"] == 2
+    assert counts["bytes"] == len("<?php echo 1;") + len("<?php // ") + 100
+
+def test_max_accelerated_files_uses_opcache_primes():
+    assert max_accelerated_files(100) == 16229
+    assert max_accelerated_files(30000) == 65407
+    assert max_accelerated_files(10 ** 7) == 1048793
+
+def test_compute_profile():
+    small = compute_profile(500, 5 * 1024 * 1024, "balanced")
+    assert small["opcache.memory_consumption"] == "128"
+    assert small["opcache.validate_timestamps"] == "1"
+    assert small["realpath_cache_size"] == "4096K"
+
+    large = compute_profile(200000, 400 * 1024 * 1024, "immutable")
+    assert int(large["opcache.memory_consumption"]) >= 1000
+    assert large["opcache.max_accelerated_files"] == "524521"
+    assert large["opcache.validate_timestamps"] == "0"
+    assert large["realpath_cache_size"] == "65536K"
+
+    with pytest.raises(ValueError):
+        compute_profile(1, 1, "fast")
+
+def test_parse_status_body():
+    body = json.dumps({
+        "status": {
+            "opcache_enabled": True,
+            "memory_usage": {"used_memory": 60, "free_memory": 30, "wasted_memory": 10},
+            "interned_strings_usage": {"buffer_size": 200, "used_memory": 50},
+            "opcache_statistics": {"hits": 990, "misses": 10, "num_cached_scripts": 400,
+                                   "num_cached_keys": 500, "max_cached_keys": 1000, "oom_restarts": 1},
+        },
+        "realpath_cache_size": 12345,
+        "realpath_cache_limit": "4096K",
+    }).encode()
+
+    report = parse_status_body(body)
+    assert report["hit_rate"] == 99.0
+    assert report["memory_used_percent"] == 70.0
+    assert report["memory_wasted_percent"] == 10.0
+    assert report["keys_used_percent"] == 50.0
+    assert report["interned_strings_used_percent"] == 25.0
+    assert report["oom_restarts"] == 1
+    assert parse_status_body(b'{"status": false}') == {"enabled": False}
@@ -0,0 +1,59 @@
+import os
+from utils.page_cache import (
+    cache_key, cache_path, cache_status_counts, hit_ratio, purge_all, purge_keys, purge_prefix, url_keys
+)
+
+def _cache_entry(root, key, body=b"<html></html>"):
+    path = cache_path(str(root), key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        # nginx önbellek dosyası: ikili başlık, KEY satırı, yanıt başlıkları ve gövde
+        f.write(b"\x05\x00\x00\x00" + b"\x00" * 40 + f"\nKEY: {key}\n".encode() + b"Status: 200\r\n\r\n" + body)
+    return path
+
+def test_cache_path_matches_nginx_layout():
+    # nginx: levels=1:2 -> son karakter / önceki iki karakter / md5
+    key = "httpsGETexample.com/"
+    path = cache_path("/cache", key)
+    digest = os.path.basename(path)
+    assert path == f"/cache/{digest[-1]}/{digest[-3:-1]}/{digest}"
+
+def test_url_keys():
+    keys = url_keys("/blog/post/", ["example.com", "www.example.com"])
+    assert len(keys) == 8
+    assert "httpsGETexample.com/blog/post/" in keys
+    assert "httpHEADwww.example.com/blog/post/" in keys
+    assert url_keys("https://Example.com/a?b=1", []) == [
+        "httpGETexample.com/a?b=1", "httpHEADexample.com/a?b=1",
+        "httpsGETexample.com/a?b=1", "httpsHEADexample.com/a?b=1",
+    ]
+
+def test_purge_by_key_and_prefix(tmp_path):
+    page = _cache_entry(tmp_path, cache_key("https", "GET", "example.com", "/about/"))
+    post = _cache_entry(tmp_path, cache_key("https", "GET", "example.com", "/blog/first/"))
+    other = _cache_entry(tmp_path, cache_key("https", "GET", "example.com", "/blogroll/"))
+    home = _cache_entry(tmp_path, cache_key("http", "GET", "example.com", "/"))
+
+    assert purge_keys(str(tmp_path), url_keys("/about/", ["example.com"])) == 1
+    assert not os.path.exists(page)
+
+    assert purge_prefix(str(tmp_path), "/blog/") == {"scanned": 3, "removed": 1}
+    assert not os.path.exists(post)
+    assert os.path.exists(other) and os.path.exists(home)
+
+    purge_all(str(tmp_path / "missing"))
+    zone = tmp_path
+    purge_all(str(zone))
+    assert os.path.isdir(zone) and not os.path.exists(home)
+
+def test_hit_ratio_from_access_log(tmp_path):
+    log = tmp_path / "example.com-access.log"
+    line = '1.2.3.4 - - [10/Oct/2024:13:55:36 +0000] "GET / HTTP/1.1" 200 512 "-" "curl/8" "{}" 0.005 {}\n'
+    log.write_text(
+        line.format("HIT", "-") * 6 + line.format("MISS", "0.120") * 2 + line.format("BYPASS", "0.090")
+        + line.format("", "-") + line.format("STALE", "0.010, 0.020")
+    )
+    counts = cache_status_counts(str(log))
+    assert counts["HIT"] == 6 and counts["MISS"] == 2 and counts["BYPASS"] == 1
+    assert counts["NONE"] == 1 and counts["STALE"] == 1
+    assert hit_ratio(counts) == 77.78
@@ -0,0 +1,72 @@
+import subprocess
+import threading
+import time
+import pytest
+from utils.reload_coordinator import ConfigTestError, ReloadCoordinator
+
+class FakeRunner:
+    def __init__(self, test_returncode=0, delay=0.0):
+        self.commands = []
+        self.test_returncode = test_returncode
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, command):
+        with self.lock:
+            self.commands.append(command[-1])
+        time.sleep(self.delay)
+        returncode = self.test_returncode if command[-1] == "-t" else 0
+        return subprocess.CompletedProcess(command, returncode, "", "emerg: unknown directive" if returncode else "")
+
+def _coordinator(runner, **kwargs):
+    return ReloadCoordinator("nginx", ["nginx", "-t"], ["systemctl", "reload", "nginx"],
+                             runner=runner, **kwargs)
+
+def test_concurrent_requests_share_one_reload():
+    runner = FakeRunner()
+    coordinator = _coordinator(runner, debounce=0.1)
+
+    futures = [coordinator.request(f"vhost {i}") for i in range(50)]
+    results = [f.result(timeout=5) for f in futures]
+
+    assert runner.commands == ["-t", "nginx"]
+    assert all(r["batch_size"] == 50 for r in results)
+    assert coordinator.stats == {"requests": 50, "reloads": 1, "failures": 0}
+
+def test_config_test_failure_reported_to_every_caller():
+    runner = FakeRunner(test_returncode=1)
+    coordinator = _coordinator(runner, debounce=0.05)
+
+    futures = [coordinator.request() for _ in range(3)]
+    for future in futures:
+        with pytest.raises(ConfigTestError) as e:
+            future.result(timeout=5)
+        assert "unknown directive" in e.value.output
+    # Test başarısızsa reload yapılmaz
+    assert runner.commands == ["-t"]
+
+def test_requests_during_reload_go_to_next_batch():
+    runner = FakeRunner(delay=0.2)
+    coordinator = _coordinator(runner, debounce=0.01)
+
+    first = coordinator.request()
+    time.sleep(0.1)  # ilk grup test ediliyor
+    second = coordinator.request()
+
+    assert first.result(timeout=5)["batch_size"] == 1
+    assert second.result(timeout=5)["batch_size"] == 1
+    assert coordinator.stats["reloads"] == 2
+
+def test_max_delay_bounds_debounce():
+    runner = FakeRunner()
+    coordinator = _coordinator(runner, debounce=0.2, max_delay=0.3)
+
+    started = time.monotonic()
+    first = coordinator.request()
+    # Sürekli gelen istekler grubu max_delay'den fazla geciktiremez
+    while not first.done() and time.monotonic() - started < 2:
+        coordinator.request()
+        time.sleep(0.05)
+
+    first.result(timeout=5)
+    assert time.monotonic() - started < 0.6
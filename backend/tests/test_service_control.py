@@ -0,0 +1,72 @@
+import subprocess
+import pytest
+from utils.service_control import (
+    ConfigTestError, ReloadTimings, ServiceController, service_profile, ssh_runner
+)
+
+class FakeRunner:
+    def __init__(self, returncodes=None, active=True):
+        self.commands = []
+        self.returncodes = returncodes or {}
+        self.active = active
+
+    def __call__(self, command):
+        self.commands.append(" ".join(command))
+        if command[:2] == ["systemctl", "is-active"]:
+            returncode = 0 if self.active else 3
+        else:
+            returncode = self.returncodes.get(" ".join(command), 0)
+        return subprocess.CompletedProcess(command, returncode, "", "error" if returncode else "")
+
+def test_reload_tests_config_first():
+    runner = FakeRunner()
+    timings = ReloadTimings()
+    result = ServiceController(runner, timings=timings).reload("nginx")
+
+    assert runner.commands == ["nginx -t", "systemctl reload nginx"]
+    assert result["action"] == "reload"
+    assert timings.snapshot()["local/nginx"]["count"] == 1
+
+def test_config_test_failure_leaves_service_untouched():
+    runner = FakeRunner({"php-fpm8.1 -t": 1})
+    timings = ReloadTimings()
+    with pytest.raises(ConfigTestError):
+        ServiceController(runner, timings=timings).reload("php8.1-fpm")
+
+    assert runner.commands == ["php-fpm8.1 -t"]
+    assert timings.snapshot()["local/php8.1-fpm"]["failures"] == 1
+
+def test_falls_back_to_next_reload_path():
+    runner = FakeRunner({"apachectl graceful": 127})
+    result = ServiceController(runner, timings=ReloadTimings()).reload("apache2")
+
+    assert runner.commands[-1] == "systemctl reload apache2"
+    assert result["action"] == "reload"
+
+def test_running_service_is_never_restarted():
+    runner = FakeRunner({"systemctl reload nginx": 1, "nginx -s reload": 1})
+    with pytest.raises(RuntimeError):
+        ServiceController(runner, timings=ReloadTimings()).reload("nginx")
+    assert "systemctl restart nginx" not in runner.commands
+
+def test_restart_only_when_needed():
+    # Servis çalışmıyorsa reload başarısız olur; restart ile başlatılır
+    runner = FakeRunner({"systemctl reload nginx": 1, "nginx -s reload": 1}, active=False)
+    assert ServiceController(runner, timings=ReloadTimings()).reload("nginx")["action"] == "restart"
+
+    # MySQL yapılandırmayı reload ile okumaz
+    runner = FakeRunner()
+    assert ServiceController(runner, timings=ReloadTimings()).reload("mysql")["action"] == "restart"
+    assert runner.commands == ["systemctl restart mysql"]
+
+def test_ssh_runner_quotes_arguments():
+    class FakeSSH:
+        def execute_command(self, command):
+            self.command = command
+            return 0, "ok", ""
+
+    ssh = FakeSSH()
+    profile = service_profile("php8.2-fpm")
+    result = ssh_runner(ssh)(profile.reload_commands[1])
+    assert result.returncode == 0
+    assert ssh.command == "pkill -USR2 -o -f 'php-fpm: master process .*php/8.2'"
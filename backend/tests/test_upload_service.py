@@ -0,0 +1,113 @@
+import asyncio
+import base64
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import upload_service
+from backend.services.upload_service import (
+    InvalidUploadChecksum, UploadChecksumMismatch, UploadLocked, UploadOffsetMismatch, UploadService
+)
+
+
+class FakeQuery:
+    def __init__(self, upload):
+        self.upload = upload
+
+    def filter(self, *criteria):
+        return self
+
+    def with_for_update(self, **kwargs):
+        return self
+
+    def first(self):
+        return self.upload
+
+
+class FakeSession:
+    def __init__(self, upload=None):
+        self.upload = upload
+        self.commits = 0
+        self.rollbacks = 0
+
+    def query(self, model):
+        return FakeQuery(self.upload)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def upload(tmp_path):
+    part = tmp_path / ".data.bin.abc.part"
+    part.write_bytes(b"")
+    return SimpleNamespace(
+        id="abc", user_id=1, target_path=str(tmp_path / "data.bin"), part_path=str(part),
+        length=10, offset=0, status="in_progress", updated_at=None, completed_at=None
+    )
+
+
+async def _chunks(*parts, fail=False):
+    for part in parts:
+        yield part
+    if fail:
+        raise ConnectionError("client disconnected")
+
+
+def _append(service, offset, *parts, checksum=None, fail=False):
+    return asyncio.run(service.append_chunk("abc", offset, _chunks(*parts, fail=fail), checksum))
+
+
+def _checksum(data):
+    return "sha256 " + base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+def test_offset_mismatch_is_rejected(upload):
+    service = UploadService(FakeSession(upload))
+    with pytest.raises(UploadOffsetMismatch):
+        _append(service, 4, b"data")
+    assert upload.offset == 0 and service.db.rollbacks == 1
+
+
+def test_resume_after_disconnect_and_finalize(upload, tmp_path):
+    service = UploadService(FakeSession(upload))
+    with pytest.raises(ConnectionError):
+        _append(service, 0, b"0123", fail=True)
+    # Kopmadan önce yazılan kısım korunur
+    assert upload.offset == 4 and upload.status == "in_progress"
+
+    _append(service, 4, b"456", b"789")
+    assert upload.offset == 10 and upload.status == "completed"
+    assert (tmp_path / "data.bin").read_bytes() == b"0123456789"
+    assert not (tmp_path / ".data.bin.abc.part").exists()
+
+
+def test_checksum_mismatch_discards_chunk(upload):
+    service = UploadService(FakeSession(upload))
+    with pytest.raises(UploadChecksumMismatch):
+        _append(service, 0, b"01234", checksum=_checksum(b"other"))
+    assert upload.offset == 0
+
+    _append(service, 0, b"01234", checksum=_checksum(b"01234"))
+    assert upload.offset == 5
+
+
+def test_invalid_checksum_header(upload):
+    service = UploadService(FakeSession(upload))
+    for header in ("sha256", "sha256 not-base64!", "crc32 AAAA"):
+        with pytest.raises(InvalidUploadChecksum):
+            _append(service, 0, b"0", checksum=header)
+    assert upload.offset == 0
+
+
+def test_concurrent_append_is_locked(upload):
+    service = UploadService(FakeSession(upload))
+    with upload_service._claim("abc"):
+        with pytest.raises(UploadLocked):
+            _append(service, 0, b"0")
+    _append(service, 0, b"0")
+    assert upload.offset == 1
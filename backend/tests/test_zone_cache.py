@@ -0,0 +1,84 @@
+import io
+import os
+from datetime import date
+from utils.zone_cache import ZoneCache, ZoneModel, file_stamp, write_zone_file, zone_file_lock
+from utils.zone_file import parse_zone, read_soa_serial
+
+RECORDS = [
+    {"name": "@", "type": "A", "content": "192.0.2.1", "ttl": 3600, "priority": None},
+    {"name": "@", "type": "MX", "content": "mail.example.com.", "ttl": 3600, "priority": 10},
+    {"name": "www", "type": "CNAME", "content": "example.com.", "ttl": 300, "priority": None},
+]
+
+def _render(zone):
+    return "".join(zone.render("ns1.example.net.", "hostmaster.example.net.", ["ns1.example.net."]))
+
+def test_render_parses_back():
+    zone = ZoneModel("example.com", RECORDS, serial=5)
+    text = _render(zone)
+
+    assert read_soa_serial(io.StringIO(text)) == 5
+    parsed = [r for r in parse_zone(io.StringIO(text), "example.com") if r["type"] != "NS"]
+    assert sorted((r["name"], r["type"], r["content"]) for r in parsed) == \
+        sorted((r["name"], r["type"], r["content"]) for r in RECORDS)
+
+def test_only_changed_rrset_is_rendered_again():
+    zone = ZoneModel("example.com", RECORDS)
+    _render(zone)
+    cached_a = zone._rendered[("@", "A")]
+
+    zone.set_rrset("www", "CNAME", [])
+    zone.set_rrset("api", "A", [{"name": "api", "type": "A", "content": "192.0.2.5", "ttl": 60, "priority": None}])
+    text = _render(zone)
+
+    assert zone._rendered[("@", "A")] is cached_a
+    assert "www" not in text and "api\t60\tIN\tA\t192.0.2.5" in text
+
+def test_serial_is_monotonic():
+    zone = ZoneModel("example.com", serial=0)
+    first = zone.bump_serial()
+    assert first == int(date.today().strftime("%Y%m%d")) * 100
+    assert zone.bump_serial() == first + 1
+
+    future = ZoneModel("example.com", serial=9999999999)
+    assert future.bump_serial() == 10000000000
+
+def test_cache_loads_once_and_invalidates():
+    cache = ZoneCache()
+    loads = []
+    loader = lambda: loads.append(1) or ZoneModel("example.com")
+
+    first = cache.get("example.com.", loader)
+    assert cache.get("EXAMPLE.com", loader) is first
+    cache.invalidate("example.com")
+    assert cache.get("example.com", loader) is not first
+    assert len(loads) == 2
+
+def test_write_zone_file_is_atomic(tmp_path):
+    path = tmp_path / "example.com.db"
+    path.write_text("old")
+    os.chmod(path, 0o640)
+
+    write_zone_file(str(path), ["new ", "zone\n"])
+
+    assert path.read_text() == "new zone\n"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["example.com.db"]
+
+def test_cache_reloads_zone_written_by_another_worker(tmp_path):
+    path = str(tmp_path / "example.com.db")
+    write_zone_file(path, ["first\n"])
+    cache = ZoneCache()
+    loads = []
+    loader = lambda: loads.append(1) or ZoneModel("example.com")
+
+    with zone_file_lock(path):
+        zone = cache.get("example.com", loader, stamp=file_stamp(path))
+        write_zone_file(path, _render(zone))
+        zone.stamp = file_stamp(path)
+    assert cache.get("example.com", loader, stamp=file_stamp(path)) is zone
+
+    # Başka bir worker dosyayı yeniden yazdı: önbellekteki model eskidi
+    write_zone_file(path, ["other\n"])
+    assert cache.get("example.com", loader, stamp=file_stamp(path)) is not zone
+    assert len(loads) == 2
@@ -0,0 +1,108 @@
+import io
+import time
+import pytest
+from utils.zone_file import (ZoneParseError, diff_records, format_soa, parse_ttl, parse_zone, quote_txt,
+                             read_soa_serial, render_zone)
+
+ZONE = """$ORIGIN example.com.
+$TTL 1h
+@       IN  SOA ns1.example.com. admin.example.com. (
+                2024010101 ; serial
+                3600 900 604800 300 )
+@       IN  A       192.0.2.1
+        IN  MX  10  mail.example.com.
+www     300 IN CNAME example.com.
+mail.example.com.   IN A 192.0.2.2
+sel._domainkey  IN TXT ( "v=DKIM1; k=rsa; "
+                         "p=MIIBIjAN" )
+_sip._tcp   IN SRV 10 5 5060 sip.example.com.
+$ORIGIN sub.example.com.
+api     IN  A   192.0.2.3
+"""
+
+def _parse(text):
+    return list(parse_zone(io.StringIO(text), "example.com"))
+
+def test_parse_zone():
+    records = _parse(ZONE)
+
+    assert [(r["name"], r["type"]) for r in records] == [
+        ("@", "A"), ("@", "MX"), ("www", "CNAME"), ("mail", "A"),
+        ("sel._domainkey", "TXT"), ("_sip._tcp", "SRV"), ("api.sub", "A"),
+    ]
+    assert records[0]["ttl"] == 3600
+    assert records[1]["priority"] == 10 and records[1]["content"] == "mail.example.com."
+    assert records[2]["ttl"] == 300
+    assert records[4]["content"] == "v=DKIM1; k=rsa; p=MIIBIjAN"
+    assert records[5]["priority"] == 10 and records[5]["content"] == "5 5060 sip.example.com."
+
+def test_parse_errors_report_line():
+    with pytest.raises(ZoneParseError) as e:
+        _parse("@ IN A 192.0.2.1\nbad IN BOGUS x\n")
+    assert e.value.line == 2
+
+    with pytest.raises(ZoneParseError):
+        _parse('@ IN TXT "unterminated\n')
+
+def test_ttl_units():
+    assert parse_ttl("1h30m") == 5400
+    assert parse_ttl("86400") == 86400
+
+def test_long_invalid_ttl_fails_fast():
+    started = time.perf_counter()
+    for value in ("1" * 5000 + "x", "1h" * 2000 + "hh"):
+        with pytest.raises(ValueError):
+            parse_ttl(value)
+    # Geri izleme üstel olsaydı 30 basamak bile saniyeler sürerdi
+    assert time.perf_counter() - started < 0.5
+    with pytest.raises(ZoneParseError):
+        _parse("@ " + "9" * 40 + "x IN A 192.0.2.1\n")
+
+def test_long_txt_round_trip():
+    content = "v=DKIM1; p=" + "A" * 600 + '"quoted"\\'
+    text = "".join(render_zone([{"name": "k._domainkey", "type": "TXT", "content": content,
+                                  "ttl": 3600, "priority": None}], "example.com"))
+
+    assert quote_txt(content).count('" "') == 2
+    assert _parse(text)[0]["content"] == content
+
+def test_diff_only_returns_delta():
+    existing = [
+        {"id": 1, "name": "@", "type": "A", "content": "192.0.2.1", "ttl": 3600, "priority": None},
+        {"id": 2, "name": "www", "type": "CNAME", "content": "example.com.", "ttl": 3600, "priority": None},
+        {"id": 3, "name": "old", "type": "A", "content": "192.0.2.9", "ttl": 3600, "priority": None},
+    ]
+    desired = _parse("@ IN A 192.0.2.1\nwww 300 IN CNAME example.com.\nnew IN A 192.0.2.4\n")
+
+    diff = diff_records(existing, desired)
+
+    assert diff["unchanged"] == 1
+    assert [r["name"] for r in diff["create"]] == ["new"]
+    assert [(r["id"], r["ttl"]) for r in diff["update"]] == [(2, 300)]
+    assert [r["id"] for r in diff["delete"]] == [3]
+
+def test_names_outside_zone_are_rejected():
+    with pytest.raises(ZoneParseError) as e:
+        _parse("@ IN A 192.0.2.1\nwww.example.org. IN A 192.0.2.5\n")
+    assert e.value.line == 2
+
+    with pytest.raises(ZoneParseError):
+        _parse("$ORIGIN example.org.\nwww IN A 192.0.2.5\n")
+
+def test_diff_matches_spf_with_txt():
+    existing = [{"id": 1, "name": "@", "type": "TXT", "content": "v=spf1 mx -all", "ttl": 3600, "priority": None}]
+    desired = _parse('@ IN SPF "v=spf1 mx -all"\n')
+
+    diff = diff_records(existing, desired)
+
+    assert diff["unchanged"] == 1
+    assert not (diff["create"] or diff["update"] or diff["delete"])
+
+def test_export_with_soa_round_trips():
+    records = [{"name": "@", "type": "A", "content": "192.0.2.1", "ttl": 3600, "priority": None}]
+    soa = format_soa("ns1.example.com.", "hostmaster.example.com.", 2024010105)
+    text = "".join(render_zone(records, "example.com", soa=soa))
+
+    assert "@\t3600\tIN\tSOA\tns1.example.com. hostmaster.example.com. 2024010105 3600 900 1209600 300" in text
+    assert read_soa_serial(io.StringIO(text)) == 2024010105
+    assert [(r["name"], r["type"]) for r in _parse(text)] == [("@", "A")]
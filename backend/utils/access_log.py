@@ -0,0 +1,180 @@
+import os
+import re
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Combined biçimi; panel biçiminin (nginx_vhost.LOG_FORMAT) ek alanları isteğe bağlıdır
+_LINE = re.compile(
+    rb'^(\S+) \S+ \S+ \[([^\]]+)\] "(?:[A-Z]+ )?([^ "?]*)[^"]*" (\d{3}) (\d+|-)'
+    rb'(?: "(?:[^"\\]|\\.)*" "(?:[^"\\]|\\.)*"(?: "(?:[A-Z]*|-)" ([\d.]+|-) ([\d.]+)?)?)?'
+)
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+
+# Yanıt süresi histogram sınırları (ms); yüzdelikler birleştirilebilir kalsın diye sabit kovalar
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000,
+                   5000, 10000, 30000, 60000)
+
+TOP_N = 20
+
+
+def _minute(value: bytes, cache: Dict[bytes, Optional[datetime]]) -> Optional[datetime]:
+    """"10/Oct/2024:13:55:36 +0000" -> UTC dakika başı; strptime yerine önbellekli ayrıştırma"""
+    key = value[:17] + value[20:]
+    if key in cache:
+        return cache[key]
+    try:
+        text = value.decode()
+        offset = int(text[21:24]) * 60 + int(text[21] + text[24:26])
+        minute = datetime(int(text[7:11]), _MONTHS[text[3:6]], int(text[0:2]),
+                          int(text[12:14]), int(text[15:17])) - timedelta(minutes=offset)
+    except (ValueError, KeyError, IndexError):
+        minute = None
+    cache[key] = minute
+    return minute
+
+
+def parse_lines(lines: Iterable[bytes]) -> Iterator[Tuple]:
+    """Satırları (dakika, ip, yol, durum, bayt, süre ms) olarak ayrıştır; uymayanları atla.
+
+    Süre olarak varsa upstream yanıt süresi, yoksa istek süresi kullanılır;
+    combined biçiminde süre alanı yoktur (None).
+    """
+    cache: Dict[bytes, Optional[datetime]] = {}
+    match = _LINE.match
+    for line in lines:
+        m = match(line)
+        if not m:
+            continue
+        minute = _minute(m.group(2), cache)
+        if minute is None:
+            continue
+        ip, _, path, status, size, request_time, upstream_time = m.groups()
+        duration = upstream_time or (request_time if request_time and request_time != b"-" else None)
+        yield (
+            minute,
+            ip.decode(errors="replace"),
+            path.decode(errors="replace") or "/",
+            int(status),
+            int(size) if size != b"-" else 0,
+            float(duration) * 1000 if duration else None,
+        )
+
+
+def latency_bucket(ms: float) -> int:
+    for index, edge in enumerate(LATENCY_BUCKETS):
+        if ms <= edge:
+            return index
+    return len(LATENCY_BUCKETS)
+
+
+def percentile(histogram: List[int], fraction: float) -> Optional[float]:
+    """Histogramdan yüzdelik (kovanın üst sınırı, ms)"""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = fraction * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            return float(LATENCY_BUCKETS[min(index, len(LATENCY_BUCKETS) - 1)])
+    return float(LATENCY_BUCKETS[-1])
+
+
+def _empty_bucket() -> Dict:
+    return {
+        "requests": 0, "bytes": 0,
+        "status": {"2xx": 0, "3xx": 0, "4xx": 0, "5xx": 0, "other": 0},
+        "urls": Counter(), "ips": Counter(),
+        "latency": [0] * (len(LATENCY_BUCKETS) + 1),
+    }
+
+
+def aggregate(records: Iterable[Tuple]) -> Dict[datetime, Dict]:
+    """Ayrıştırılmış kayıtları dakikaya göre topla"""
+    minutes: Dict[datetime, Dict] = {}
+    for minute, ip, path, status, size, duration in records:
+        bucket = minutes.get(minute)
+        if bucket is None:
+            bucket = minutes[minute] = _empty_bucket()
+        bucket["requests"] += 1
+        bucket["bytes"] += size
+        status_class = f"{status // 100}xx"
+        bucket["status"][status_class if status_class in bucket["status"] else "other"] += 1
+        bucket["urls"][path] += 1
+        bucket["ips"][ip] += 1
+        if duration is not None:
+            bucket["latency"][latency_bucket(duration)] += 1
+    return minutes
+
+
+def merge_top(stored: Optional[List], counter: Counter, limit: int = TOP_N) -> List:
+    """Saklanan ilk-N listesini yeni sayaçlarla birleştir.
+
+    Yalnızca ilk N tutulduğundan aynı dakikanın parçalı işlendiği
+    durumlarda sonuç yaklaşık olabilir.
+    """
+    merged = Counter(dict(stored or []))
+    merged.update(counter)
+    return [[key, count] for key, count in merged.most_common(limit)]
+
+
+class LogTail:
+    """Günlük dosyasını son okunan konumdan itibaren okur.
+
+    Yalnızca tam satırlar döndürülür; yarım kalan satır bir sonraki okumaya
+    bırakılır. Dosya döndürülmüşse (inode değişmiş) eski dosyanın `.1`
+    uzantılı kopyasındaki kalan satırlar önce okunur, ardından yeni dosyaya
+    baştan başlanır. Dosya küçülmüşse (truncate) baştan okunur.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+
+    def _read(self, path: str, offset: int, limit: int) -> Tuple[List[bytes], int]:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(limit)
+        end = data.rfind(b"\n")
+        if end < 0:
+            return [], offset
+        return data[:end].split(b"\n"), offset + end + 1
+
+    def read(self, path: str, inode: Optional[int], offset: int) -> Tuple[List[bytes], int, int]:
+        """Yeni satırları, güncel inode ve konumu döndür"""
+        st = os.stat(path)
+        lines: List[bytes] = []
+        if inode is not None and inode != st.st_ino:
+            rotated = f"{path}.1"
+            try:
+                if os.stat(rotated).st_ino == inode:
+                    lines, _ = self._read(rotated, offset, self.max_bytes)
+            except OSError:
+                pass
+            offset = 0
+        elif st.st_size < offset:
+            offset = 0
+        budget = max(self.max_bytes - sum(len(line) + 1 for line in lines), 0)
+        new_lines, offset = self._read(path, offset, budget) if budget else ([], offset)
+        return lines + new_lines, st.st_ino, offset
+
+
+def domain_for_log(filename: str, domains: Iterable[str]) -> Optional[str]:
+    """"blog.example.com-access.log" -> en uzun eşleşen domain adı (alt alan adları dahil)"""
+    if not filename.endswith("-access.log"):
+        return None
+    host = filename[:-len("-access.log")]
+    names = domains if isinstance(domains, (set, frozenset, dict)) else set(domains)
+    while host:
+        if host in names:
+            return host
+        if "." not in host:
+            return None
+        host = host.split(".", 1)[1]
+    return None
@@ -0,0 +1,486 @@
+import os
+import stat
+import tarfile
+import zipfile
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # tar.zst desteği isteğe bağlı
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024  # 1 MB
+
+# progress(üye adı, yazılan bayt, sıra numarası, toplam üye sayısı ya da None)
+ProgressCallback = Callable[[str, int, int, Optional[int]], None]
+
+
+class ArchiveLimitExceeded(ValueError):
+    """Arşiv boyut veya üye sayısı sınırlarını aşıyor"""
+
+
+class UnsafeArchiveMember(ValueError):
+    """Arşiv üyesi hedef dizinin dışına yazmaya çalışıyor"""
+
+
+class ExtractionCancelled(Exception):
+    """Çıkarma isteği iptal edildi (örn. istemci bağlantıyı kapattı)"""
+
+
+class _StreamCancelled(Exception):
+    """İstemci akışı okumayı bıraktı"""
+
+
+def detect_format(path: str) -> str:
+    """Arşiv biçimini dosya adından, gerekirse sihirli baytlardan belirle"""
+    name = path.lower()
+    if name.endswith(".zip"):
+        return "zip"
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith((".tar.zst", ".tzst")):
+        return "tar.zst"
+    if name.endswith(".tar"):
+        return "tar"
+
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(b"PK\x03\x04"):
+        return "zip"
+    if magic.startswith(b"\x1f\x8b"):
+        return "tar.gz"
+    if magic == b"\x28\xb5\x2f\xfd":
+        return "tar.zst"
+    raise ValueError(f"Unsupported archive format: {os.path.basename(path)}")
+
+
+def copy_stream(source: BinaryIO, target: BinaryIO, buffer: bytearray, limit: Optional[int] = None) -> int:
+    """Akışı tek bir yeniden kullanılan tampon ile kopyala, sınır aşılırsa dur"""
+    view = memoryview(buffer)
+    total = 0
+    while True:
+        n = source.readinto(buffer) if hasattr(source, "readinto") else _read_into(source, buffer)
+        if not n:
+            break
+        total += n
+        if limit is not None and total > limit:
+            raise ArchiveLimitExceeded("Archive member exceeds size limit")
+        target.write(view[:n])
+    return total
+
+
+def _read_into(source: BinaryIO, buffer: bytearray) -> int:
+    data = source.read(len(buffer))
+    buffer[:len(data)] = data
+    return len(data)
+
+
+class ArchiveExtractor:
+    """Zip, tar.gz ve tar.zst arşivlerini üye üye, sınırlı bellekle çıkar.
+
+    Tar arşivleri akış modunda okunur (geri sarma yok), zip arşivleri ise
+    isteğe bağlı olarak birden fazla iş parçacığıyla paralel çıkarılabilir.
+    Başlıklardaki boyutlara güvenilmez; sınırlar gerçekten yazılan bayta
+    göre uygulanır. `cancelled` olayı set edilirse çıkarma sonraki üyede
+    durur. Çıkarma hata ya da iptalle biterse bu çalışmada oluşturulan
+    dosya ve dizinler silinir; önceden var olan içeriğe dokunulmaz.
+    """
+
+    def __init__(self, max_total_size: int = 50 * 1024 ** 3, max_members: int = 1_000_000,
+                 max_member_size: Optional[int] = None, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 workers: int = 1, progress: Optional[ProgressCallback] = None,
+                 cancelled: Optional[threading.Event] = None):
+        self.max_total_size = max_total_size
+        self.max_members = max_members
+        self.max_member_size = max_member_size
+        self.buffer_size = buffer_size
+        self.workers = max(1, workers)
+        self.progress = progress
+        self.cancelled = cancelled
+        self._lock = threading.Lock()
+        self._written = 0
+        self._members = 0
+        self._created: List[str] = []
+
+    def extract(self, archive_path: str, destination: str) -> Dict:
+        """Arşivi hedef dizine çıkar"""
+        fmt = detect_format(archive_path)
+        self._written = 0
+        self._members = 0
+        self._created = []
+
+        try:
+            self._makedirs(destination)
+            destination = os.path.realpath(destination)
+            if fmt == "zip":
+                self._extract_zip(archive_path, destination)
+            else:
+                self._extract_tar(archive_path, destination, fmt)
+        except Exception:
+            self._cleanup()
+            raise
+
+        return {"format": fmt, "members": self._members, "bytes": self._written}
+
+    def _track(self, path: str) -> None:
+        """Henüz var olmayan yolu, oluşturulmadan önce kaydet"""
+        if not os.path.lexists(path):
+            with self._lock:
+                self._created.append(path)
+
+    def _makedirs(self, path: str) -> None:
+        missing = []
+        while path and not os.path.lexists(path):
+            missing.append(path)
+            path = os.path.dirname(path)
+        for directory in reversed(missing):
+            self._track(directory)
+        if missing:
+            os.makedirs(missing[0], exist_ok=True)
+
+    def _cleanup(self) -> None:
+        """Yarım kalan çıkarmada oluşturulanları sondan başa sil"""
+        for path in reversed(self._created):
+            try:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    os.rmdir(path)
+                else:
+                    os.remove(path)
+            except OSError:
+                pass
+        self._created = []
+
+    def _target_path(self, destination: str, name: str) -> str:
+        """Üye yolunu güvenli şekilde hedef dizine çöz.
+
+        Yalnızca üst dizin bağlantıları çözülür; üyenin kendisi bir bağlantıysa
+        onun gösterdiği yere değil, bağlantının yerine yazılır.
+        """
+        name = name.replace("\\", "/").lstrip("/")
+        target = os.path.normpath(os.path.join(destination, name))
+        if target == destination:
+            return target
+        parent = os.path.realpath(os.path.dirname(target))
+        if not target.startswith(destination + os.sep) or (
+                parent != destination and not parent.startswith(destination + os.sep)):
+            raise UnsafeArchiveMember(f"Unsafe archive member path: {name}")
+        return os.path.join(parent, os.path.basename(target))
+
+    def _count_member(self) -> int:
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise ExtractionCancelled("Extraction cancelled")
+        with self._lock:
+            self._members += 1
+            if self._members > self.max_members:
+                raise ArchiveLimitExceeded(f"Archive has more than {self.max_members} members")
+            return self._members
+
+    def _remaining(self) -> int:
+        with self._lock:
+            return self.max_total_size - self._written
+
+    def _add_written(self, size: int) -> None:
+        with self._lock:
+            self._written += size
+            if self._written > self.max_total_size:
+                raise ArchiveLimitExceeded("Archive exceeds total extracted size limit")
+
+    def _member_limit(self) -> int:
+        remaining = self._remaining()
+        if self.max_member_size is not None:
+            return min(remaining, self.max_member_size)
+        return remaining
+
+    def _write_member(self, source: BinaryIO, target: str, buffer: bytearray, mode: Optional[int] = None) -> int:
+        """Üyeyi geçici dosyaya yaz, tamamlanınca yerine taşı"""
+        self._makedirs(os.path.dirname(target))
+        self._track(target)
+        tmp_path = f"{target}.extracting"
+        if os.path.lexists(tmp_path):
+            os.unlink(tmp_path)
+        try:
+            # Geçici dosya bağlantı üzerinden açılamaz
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o644)
+            with os.fdopen(fd, "wb") as f:
+                size = copy_stream(source, f, buffer, self._member_limit())
+            if mode is not None:
+                os.chmod(tmp_path, mode & 0o777)
+            if os.path.islink(target):
+                # Var olan bağlantının gösterdiği dosya değil, bağlantının kendisi değiştirilir
+                os.unlink(target)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._add_written(size)
+        return size
+
+    def _report(self, name: str, size: int, index: int, total: Optional[int]) -> None:
+        if self.progress:
+            try:
+                self.progress(name, size, index, total)
+            except Exception as e:
+                logger.warning(f"Archive progress callback failed: {str(e)}")
+
+    def _extract_tar(self, archive_path: str, destination: str, fmt: str) -> None:
+        """Tar arşivini akış modunda çıkar"""
+        with open(archive_path, "rb") as raw:
+            if fmt == "tar.zst":
+                if zstandard is None:
+                    raise ValueError("tar.zst archives require the 'zstandard' package")
+                stream = zstandard.ZstdDecompressor().stream_reader(raw, read_size=self.buffer_size)
+                mode = "r|"
+            else:
+                stream = raw
+                mode = "r|gz" if fmt == "tar.gz" else "r|"
+
+            buffer = bytearray(self.buffer_size)
+            with tarfile.open(fileobj=stream, mode=mode, bufsize=self.buffer_size) as tar:
+                for member in tar:
+                    index = self._count_member()
+                    target = self._target_path(destination, member.name)
+
+                    if member.isdir():
+                        self._makedirs(target)
+                        continue
+                    if member.issym() or member.islnk():
+                        try:
+                            self._extract_link(member, target, destination)
+                        except UnsafeArchiveMember:
+                            # Örn. cPanel yedeklerindeki /home altını gösteren bağlantılar
+                            logger.warning(f"Skipping link pointing outside destination: {member.name}")
+                        continue
+                    if not member.isfile():
+                        # Aygıt dosyaları ve FIFO'lar çıkarılmaz
+                        logger.warning(f"Skipping special archive member: {member.name}")
+                        continue
+
+                    source = tar.extractfile(member)
+                    size = self._write_member(source, target, buffer, member.mode)
+                    if member.mtime:
+                        os.utime(target, (member.mtime, member.mtime))
+                    self._report(member.name, size, index, None)
+
+    def _extract_link(self, member: tarfile.TarInfo, target: str, destination: str) -> None:
+        """Bağlantıları yalnızca hedef dizin içini gösteriyorlarsa oluştur"""
+        if member.issym():
+            link_target = os.path.join(os.path.dirname(target), member.linkname)
+        else:
+            link_target = os.path.join(destination, member.linkname)
+        self._target_path(destination, os.path.relpath(os.path.realpath(link_target), destination))
+
+        self._makedirs(os.path.dirname(target))
+        if os.path.lexists(target):
+            os.remove(target)
+        self._track(target)
+        if member.issym():
+            os.symlink(member.linkname, target)
+        else:
+            os.link(os.path.realpath(link_target), target)
+
+    def _extract_zip(self, archive_path: str, destination: str) -> None:
+        """Zip arşivini çıkar; birden fazla iş parçacığı varsa üyeleri paylaştır"""
+        with zipfile.ZipFile(archive_path) as zf:
+            members = zf.infolist()
+
+        if len(members) > self.max_members:
+            raise ArchiveLimitExceeded(f"Archive has more than {self.max_members} members")
+        declared = sum(m.file_size for m in members)
+        if declared > self.max_total_size:
+            raise ArchiveLimitExceeded("Archive exceeds total extracted size limit")
+
+        # Yol kontrolleri yazmaya başlamadan önce yapılır
+        targets = [self._target_path(destination, m.filename) for m in members]
+        total = len(members)
+        work = list(zip(range(1, total + 1), members, targets))
+
+        if self.workers == 1 or total < 2:
+            self._extract_zip_members(archive_path, work, total)
+            return
+
+        # Her iş parçacığı kendi dosya tanıtıcısını açar; büyük üyeler dengeli dağıtılır
+        work.sort(key=lambda item: item[1].file_size, reverse=True)
+        batches: List[list] = [[] for _ in range(self.workers)]
+        for i, item in enumerate(work):
+            batches[i % self.workers].append(item)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._extract_zip_members, archive_path, batch, total)
+                       for batch in batches if batch]
+            for future in futures:
+                future.result()
+
+    def _extract_zip_members(self, archive_path: str, work: list, total: int) -> None:
+        buffer = bytearray(self.buffer_size)
+        with zipfile.ZipFile(archive_path) as zf:
+            for index, info, target in work:
+                self._count_member()
+                if info.is_dir():
+                    self._makedirs(target)
+                    continue
+
+                # Unix izinleri external_attr'ın üst 16 bitinde saklanır
+                mode = (info.external_attr >> 16) or None
+                if mode is not None and stat.S_ISLNK(mode):
+                    logger.warning(f"Skipping symlink zip member: {info.filename}")
+                    continue
+                with zf.open(info) as source:
+                    size = self._write_member(source, target, buffer, mode)
+                self._report(info.filename, size, index, total)
+
+
+class _QueueWriter:
+    """Arşiv yazıcısının çıktısını sabit boyutlu parçalar halinde kuyruğa aktarır.
+
+    Sadece write/flush sağlar; zipfile seek/tell olmadığını görünce veri
+    tanımlayıcılı (data descriptor) akış moduna geçer.
+    """
+
+    def __init__(self, chunks: "queue.Queue", chunk_size: int, cancelled: threading.Event):
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+        self.cancelled = cancelled
+        self.pending = bytearray()
+
+    def write(self, data) -> int:
+        if self.cancelled.is_set():
+            raise _StreamCancelled()
+        self.pending += data
+        if len(self.pending) >= self.chunk_size:
+            self._put(bytes(self.pending))
+            self.pending.clear()
+        return len(data)
+
+    def flush(self) -> None:
+        if self.pending:
+            self._put(bytes(self.pending))
+            self.pending.clear()
+
+    def _put(self, chunk) -> None:
+        # Kuyruk doluysa istemci okuyana kadar bekle; bellek kullanımı sınırlı kalır
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(chunk, timeout=1)
+                return
+            except queue.Full:
+                continue
+        raise _StreamCancelled()
+
+
+def _walk(root: str) -> Iterator[str]:
+    """Kökten başlayarak dizin ve dosya yollarını sırayla döndür"""
+    yield root
+    if not os.path.isdir(root) or os.path.islink(root):
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in dirnames:
+            yield os.path.join(dirpath, name)
+        for name in sorted(filenames):
+            yield os.path.join(dirpath, name)
+
+
+def _write_zip(root: str, out: _QueueWriter, store: bool, buffer_size: int) -> None:
+    base = os.path.dirname(root)
+    compression = zipfile.ZIP_STORED if store else zipfile.ZIP_DEFLATED
+    buffer = bytearray(buffer_size)
+
+    with zipfile.ZipFile(out, "w", compression=compression, allowZip64=True) as zf:
+        for path in _walk(root):
+            arcname = os.path.relpath(path, base)
+            if os.path.islink(path):
+                # Bağlantılar izlenmez; kök dışındaki dosyalar sızmasın
+                logger.warning(f"Skipping symlink while archiving: {path}")
+                continue
+            if os.path.isdir(path):
+                zf.writestr(zipfile.ZipInfo.from_file(path, arcname), b"")
+                continue
+            if not os.path.isfile(path):
+                continue
+
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compression
+            with open(path, "rb") as source, zf.open(info, "w") as target:
+                copy_stream(source, target, buffer)
+
+
+def _write_tar(root: str, out: _QueueWriter, store: bool, buffer_size: int) -> None:
+    base = os.path.dirname(root)
+    mode = "w|" if store else "w|gz"
+
+    with tarfile.open(fileobj=out, mode=mode, bufsize=buffer_size) as tar:
+        for path in _walk(root):
+            info = tar.gettarinfo(path, os.path.relpath(path, base))
+            if info is None:
+                # Soket vb. arşivlenemeyen dosya türleri
+                continue
+            if info.isfile():
+                with open(path, "rb") as source:
+                    tar.addfile(info, source)
+            else:
+                tar.addfile(info)
+
+
+def archive_format(fmt: str, store: bool) -> str:
+    """İstenen biçimin gerçekte üretilecek karşılığı: sıkıştırmasız tar.gz düz tar olur"""
+    return "tar" if fmt == "tar.gz" and store else fmt
+
+
+def stream_archive(root: str, fmt: str = "zip", store: bool = False,
+                   chunk_size: int = DEFAULT_BUFFER_SIZE, max_chunks: int = 8) -> Iterator[bytes]:
+    """Dizini geçici dosya oluşturmadan arşivleyip parça parça döndür.
+
+    Arşiv ayrı bir iş parçacığında yazılır; bellekte en fazla `max_chunks`
+    parça tutulur. `store=True` ise sıkıştırma yapılmaz (zaten sıkıştırılmış
+    içerik için); tar.gz bu durumda düz tar olarak üretilir.
+    """
+    fmt = archive_format(fmt, store)
+    if fmt == "zip":
+        writer = _write_zip
+    elif fmt in ("tar.gz", "tar"):
+        writer = _write_tar
+        store = store or fmt == "tar"
+    else:
+        raise ValueError(f"Unsupported archive format: {fmt}")
+
+    root = os.path.realpath(root)
+    chunks: "queue.Queue" = queue.Queue(maxsize=max_chunks)
+    cancelled = threading.Event()
+    done = object()
+
+    def produce():
+        out = _QueueWriter(chunks, chunk_size, cancelled)
+        try:
+            writer(root, out, store, chunk_size)
+            out.flush()
+            out._put(done)
+        except _StreamCancelled:
+            pass
+        except Exception as e:
+            logger.error(f"Archive streaming failed for {root}: {str(e)}")
+            try:
+                out._put(e)
+            except _StreamCancelled:
+                pass
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # İstemci bağlantıyı keserse yazıcı iş parçacığı bir sonraki yazmada durur
+        cancelled.set()
@@ -0,0 +1,160 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class WriterBusy(Exception):
+    """Yazıcı kuyruğu dolu; üretici daha sonra tekrar denemeli"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Write queue is full")
+        self.retry_after = retry_after
+
+
+class BatchWriter:
+    """Kayıtları boyut ve süreye göre toplayıp tek seferde yazan arka plan yazıcı.
+
+    Kuyruk `max_batch` kayda ulaştığında ya da ilk kayıt `max_delay`
+    saniyedir bekliyorsa `flush` çağrılır. Bekleyen kayıt sayısı
+    `max_pending` ile sınırlıdır: veritabanı yavaşsa ya da erişilemiyorsa
+    kuyruk dolar ve `submit` en fazla `timeout` saniye bekleyip `WriterBusy`
+    fırlatır (geri basınç). Yalnızca geçici hatalar (`retry_on`) kayıtlar
+    kaybolmadan artan aralıklarla yeniden denenir; diğer hatalarda grup
+    ikiye bölünerek yazılamayan kayıtlar ayıklanır, günlüğe yazılıp atılır.
+    `flush` bir grubu ya tamamen yazmalı ya da hiç yazmamalıdır (tek işlem).
+    Yazımdan sonraki işler (ör. yayın) `after_flush(part, sonuç)` içinde
+    yapılır: bu aşamadaki hatalar günlüğe yazılır, kalıcı olmuş grup yeniden
+    denenmez ve bölünmez.
+    """
+
+    def __init__(self, flush: Callable[[List[Dict]], Any], max_batch: int = 500,
+                 max_delay: float = 1.0, max_pending: int = 20000, name: str = "batch-writer",
+                 retry_on: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError),
+                 after_flush: Optional[Callable[[List[Dict], Any], None]] = None):
+        self.flush = flush
+        self.after_flush = after_flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.name = name
+        self.retry_on = retry_on
+        self._pending: List[Dict] = []
+        self._oldest: Optional[float] = None
+        self._in_flight = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"written": 0, "batches": 0, "failures": 0, "rejected": 0, "dropped": 0}
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name=self.name)
+            self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending) + self._in_flight
+
+    def submit(self, rows: List[Dict], timeout: float = 5.0) -> int:
+        """Kayıtları kuyruğa ekle; yer açılmazsa WriterBusy fırlat"""
+        if len(rows) > self.max_pending:
+            raise ValueError(f"Batch larger than the write queue ({self.max_pending})")
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Writer is closed")
+            self._start()
+            while len(self._pending) + self._in_flight + len(rows) > self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats["rejected"] += len(rows)
+                    raise WriterBusy(max(1, int(self.max_delay * 2)))
+                self._condition.wait(remaining)
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.extend(rows)
+            self._condition.notify_all()
+        return len(rows)
+
+    def _take(self) -> List[Dict]:
+        """Yazılacak sonraki grubu bekle ve al (kapanışta kalanlar hemen alınır)"""
+        with self._condition:
+            while True:
+                if self._pending:
+                    waited = time.monotonic() - self._oldest
+                    if len(self._pending) >= self.max_batch or waited >= self.max_delay or self._closed:
+                        break
+                    self._condition.wait(self.max_delay - waited)
+                elif self._closed:
+                    return []
+                else:
+                    self._condition.wait()
+            batch = self._pending[:self.max_batch]
+            self._pending = self._pending[self.max_batch:]
+            self._oldest = time.monotonic() if self._pending else None
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        delay = 0.5
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+            # Yazılmayı bekleyen parçalar; sıra korunsun diye sondan alınır
+            parts = [batch]
+            written = 0
+            while parts:
+                part = parts.pop()
+                try:
+                    result = self.flush(part)
+                except self.retry_on as e:
+                    parts.append(part)
+                    self.stats["failures"] += 1
+                    logger.error(f"{self.name} failed to write {len(part)} rows: {str(e)}")
+                    with self._condition:
+                        if self._closed:
+                            lost = sum(len(p) for p in parts) + len(self._pending)
+                            logger.error(f"{self.name} dropped {lost} rows on shutdown")
+                            self._in_flight = 0
+                            self._condition.notify_all()
+                            return
+                        self._condition.wait(delay)
+                    delay = min(delay * 2, 30)
+                except Exception as e:
+                    if len(part) == 1:
+                        self.stats["dropped"] += 1
+                        logger.error(f"{self.name} dropped unwritable row {part[0]!r}: {str(e)}")
+                        continue
+                    middle = len(part) // 2
+                    parts.append(part[middle:])
+                    parts.append(part[:middle])
+                else:
+                    written += len(part)
+                    delay = 0.5
+                    self._after_flush(part, result)
+            with self._condition:
+                self.stats["written"] += written
+                self.stats["batches"] += 1
+                self._in_flight = 0
+                self._condition.notify_all()
+
+    def _after_flush(self, part: List[Dict], result: Any) -> None:
+        if self.after_flush is None:
+            return
+        try:
+            self.after_flush(part, result)
+        except Exception as e:
+            logger.error(f"{self.name} post-write step failed for {len(part)} rows: {str(e)}")
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Bekleyen kayıtları yazıp iş parçacığını durdur"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,118 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.x509.oid import AuthorityInformationAccessOID, ExtensionOID, NameOID
+
+logger = logging.getLogger(__name__)
+
+
+def _common_name(name: x509.Name) -> Optional[str]:
+    attributes = name.get_attributes_for_oid(NameOID.COMMON_NAME)
+    return attributes[0].value if attributes else None
+
+
+def _validity(cert: x509.Certificate, attribute: str) -> datetime:
+    """Geçerlilik tarihini saat dilimsiz UTC olarak döndür (eski cryptography sürümleriyle uyumlu)"""
+    value = getattr(cert, f"{attribute}_utc", None)
+    if value is not None:
+        return value.replace(tzinfo=None)
+    return getattr(cert, attribute)
+
+
+def parse_certificate(data: bytes) -> Dict:
+    """PEM sertifikadan (zincirdeki ilk sertifika) envanter bilgilerini çıkar"""
+    cert = x509.load_pem_x509_certificate(data)
+
+    try:
+        san = cert.extensions.get_extension_for_oid(ExtensionOID.SUBJECT_ALTERNATIVE_NAME).value
+        names = san.get_values_for_type(x509.DNSName)
+    except x509.ExtensionNotFound:
+        names = []
+
+    ocsp_url = None
+    try:
+        aia = cert.extensions.get_extension_for_oid(ExtensionOID.AUTHORITY_INFORMATION_ACCESS).value
+        for description in aia:
+            if description.access_method == AuthorityInformationAccessOID.OCSP:
+                ocsp_url = description.access_location.value
+                break
+    except x509.ExtensionNotFound:
+        pass
+
+    return {
+        "subject": _common_name(cert.subject),
+        "issuer": _common_name(cert.issuer),
+        "san": names,
+        "not_before": _validity(cert, "not_valid_before"),
+        "not_after": _validity(cert, "not_valid_after"),
+        "serial": format(cert.serial_number, "x"),
+        "fingerprint": cert.fingerprint(hashes.SHA256()).hex(),
+        "ocsp_url": ocsp_url,
+    }
+
+
+class CertificateInventory:
+    """Dosya yoluna göre ayrıştırılmış sertifika önbelleği.
+
+    Her sertifika bir kez ayrıştırılır; dosyanın mtime ve boyutu değişmediği
+    sürece sonraki çağrılar yalnızca bir `stat` maliyetindedir.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Dict:
+        """Sertifika bilgilerini getir; dosya değiştiyse yeniden ayrıştır"""
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                return entry[1]
+
+        with open(path, "rb") as f:
+            info = parse_certificate(f.read())
+        info["mtime"] = st.st_mtime_ns
+
+        with self._lock:
+            self._entries[path] = (signature, info)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return info
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+certificate_inventory = CertificateInventory()
+
+
+def expiry_bucket(not_after: Optional[datetime], now: Optional[datetime] = None) -> str:
+    """Bitiş tarihini pano gruplarından birine yerleştir"""
+    if not_after is None:
+        return "unknown"
+    days = (not_after - (now or datetime.utcnow())).total_seconds() / 86400
+    if days < 0:
+        return "expired"
+    if days < 7:
+        return "critical"
+    if days < 30:
+        return "warning"
+    return "ok"
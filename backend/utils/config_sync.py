@@ -0,0 +1,130 @@
+import os
+import difflib
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def render_all(items: Dict[str, object], render: Callable[[object], str],
+               workers: int = 8) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Yapılandırmaları paralel üret; (anahtar -> içerik, anahtar -> hata) döndür.
+
+    Bir öğenin hatası diğerlerini durdurmaz; hatalı öğenin dosyasına
+    dokunulmaz.
+    """
+    rendered: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+
+    def run(key: str):
+        try:
+            return key, render(items[key]), None
+        except Exception as e:
+            return key, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="config-render") as pool:
+        for key, content, error in pool.map(run, list(items)):
+            if error is None:
+                rendered[key] = content
+            else:
+                errors[key] = error
+    return rendered, errors
+
+
+def write_atomic(path: str, content: str) -> None:
+    """Dosyayı geçici dosyaya yazıp yerine taşı; okuyan süreç yarım dosya görmez"""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(content)
+    if os.path.exists(path):
+        st = os.stat(path)
+        os.chmod(tmp, st.st_mode & 0o7777)
+    os.replace(tmp, path)
+
+
+class ConfigChangeSet:
+    """Bir grup yapılandırma dosyasının istenen durumu.
+
+    Dosyalar içerik özetine göre karşılaştırılır; yalnızca değişenler
+    yazılır. `apply` önceki içerikleri saklar, böylece tek bir yapılandırma
+    testi başarısız olursa tüm grup `rollback` ile geri alınabilir.
+    """
+
+    def __init__(self, desired: Dict[str, str], remove: Iterable[str] = ()):
+        self.created: List[str] = []
+        self.updated: List[str] = []
+        self.unchanged: List[str] = []
+        self.removed: List[str] = []
+        self._desired = desired
+        self._previous: Dict[str, Optional[str]] = {}
+
+        for path, content in sorted(desired.items()):
+            current = _read(path)
+            self._previous[path] = current
+            if current is None:
+                self.created.append(path)
+            elif content_hash(current) != content_hash(content):
+                self.updated.append(path)
+            else:
+                self.unchanged.append(path)
+        for path in sorted(set(remove) - set(desired)):
+            current = _read(path)
+            if current is not None:
+                self._previous[path] = current
+                self.removed.append(path)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.created or self.updated or self.removed)
+
+    def apply(self) -> None:
+        for path in self.created + self.updated:
+            write_atomic(path, self._desired[path])
+        for path in self.removed:
+            os.remove(path)
+
+    def rollback(self) -> None:
+        """Uygulanan değişiklikleri geri al"""
+        for path in self.created:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        for path in self.updated + self.removed:
+            write_atomic(path, self._previous[path])
+
+    def diff(self, context: int = 1, max_lines: int = 200) -> str:
+        """Değişen dosyaların birleşik diff çıktısı (uzunsa kısaltılır)"""
+        lines: List[str] = []
+        for path in self.created + self.updated + self.removed:
+            before = (self._previous.get(path) or "").splitlines(keepends=True)
+            after = self._desired.get(path, "").splitlines(keepends=True)
+            lines.extend(difflib.unified_diff(before, after, f"a{path}", f"b{path}", n=context))
+        if len(lines) > max_lines:
+            lines = lines[:max_lines] + [f"... {len(lines) - max_lines} more lines\n"]
+        return "".join(lines)
+
+    def summary(self, with_diff: bool = False) -> Dict:
+        result = {
+            "created": self.created,
+            "updated": self.updated,
+            "removed": self.removed,
+            "unchanged": len(self.unchanged),
+        }
+        if with_diff:
+            result["diff"] = self.diff()
+        return result
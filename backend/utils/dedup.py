@@ -0,0 +1,180 @@
+import os
+import stat
+import errno
+import fcntl
+import filecmp
+import hashlib
+import logging
+import tempfile
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+PARTIAL_HASH_SIZE = 64 * 1024
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+def _iter_files(root: str, min_size: int) -> Iterator[Tuple[str, os.stat_result]]:
+    """Kök altındaki normal dosyaları bağlantıları izlemeden gez"""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            if st.st_size >= min_size:
+                                yield entry.path, st
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Cannot scan {current}: {str(e)}")
+
+
+def _hash_file(path: str, partial: bool) -> bytes:
+    """Dosyanın tamamının ya da baş ve sonunun özetini hesapla"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        if partial:
+            h.update(f.read(PARTIAL_HASH_SIZE))
+            size = os.fstat(f.fileno()).st_size
+            if size > 2 * PARTIAL_HASH_SIZE:
+                f.seek(size - PARTIAL_HASH_SIZE)
+                h.update(f.read(PARTIAL_HASH_SIZE))
+        else:
+            buffer = bytearray(HASH_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                h.update(view[:n])
+    return h.digest()
+
+
+def _group_by_hash(groups: Iterable[List[Tuple[str, os.stat_result]]], partial: bool) -> List[List[Tuple[str, os.stat_result]]]:
+    result = []
+    for group in groups:
+        by_hash = defaultdict(list)
+        for path, st in group:
+            try:
+                by_hash[_hash_file(path, partial)].append((path, st))
+            except OSError:
+                continue
+        result.extend(g for g in by_hash.values() if len({(st.st_dev, st.st_ino) for _, st in g}) > 1)
+    return result
+
+
+def find_duplicates(roots: Iterable[str], min_size: int = 4096) -> List[Dict]:
+    """Yinelenen dosyaları üç aşamada bul: boyut, kısmi özet, tam özet.
+
+    Her aşama bir öncekinde eşleşen adayları daraltır; dosyaların büyük
+    kısmı yalnızca stat ile elenir, tam okuma sadece son adaylar için yapılır.
+    Zaten aynı inode'u paylaşan (hard link) dosyalar tek kopya sayılır;
+    reflink ile paylaşılan bloklar stat ile görülemediğinden yeniden raporlanır.
+    """
+    # 1. aşama: aynı dosya sistemi ve aynı boyut
+    by_size = defaultdict(list)
+    for root in roots:
+        for path, st in _iter_files(root, min_size):
+            by_size[(st.st_dev, st.st_size)].append((path, st))
+
+    candidates = [g for g in by_size.values() if len({st.st_ino for _, st in g}) > 1]
+
+    # 2. aşama: baştan ve sondan 64 KB; 3. aşama: tüm içerik
+    candidates = _group_by_hash(candidates, partial=True)
+    duplicates = _group_by_hash(candidates, partial=False)
+
+    groups = []
+    for group in duplicates:
+        size = group[0][1].st_size
+        inodes = {(st.st_dev, st.st_ino) for _, st in group}
+        groups.append({
+            "size": size,
+            "copies": len(inodes),
+            "reclaimable": size * (len(inodes) - 1),
+            "paths": sorted(path for path, _ in group),
+        })
+
+    groups.sort(key=lambda g: g["reclaimable"], reverse=True)
+    return groups
+
+
+def reflink(source: str, target: str) -> None:
+    """Hedefi kaynakla disk bloklarını paylaşan bir kopya (reflink) olarak oluştur"""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _replace_with(source: str, target: str, mode: str) -> None:
+    """Hedefi kaynağın reflink ya da hard link kopyasıyla atomik olarak değiştir"""
+    target_stat = os.stat(target)
+    directory = os.path.dirname(target)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(target)}.dedup.")
+    os.close(fd)
+    try:
+        if mode == "reflink":
+            reflink(source, tmp_path)
+            # Sahiplik, izin ve zaman bilgileri hedef dosyadaki gibi kalır
+            os.chown(tmp_path, target_stat.st_uid, target_stat.st_gid)
+            os.chmod(tmp_path, stat.S_IMODE(target_stat.st_mode))
+            os.utime(tmp_path, ns=(target_stat.st_atime_ns, target_stat.st_mtime_ns))
+        else:
+            os.remove(tmp_path)
+            os.link(source, tmp_path)
+        os.replace(tmp_path, target)
+    except Exception:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def compact_group(paths: List[str], allow_hardlinks: bool = False) -> Dict:
+    """Bir yinelenen dosya grubunu ilk dosyayı kaynak alarak sıkıştır.
+
+    Reflink (btrfs, XFS) disk alanını paylaştırır ama her dosya kendi sayfa
+    önbelleğini korur ve bağımsız olarak değiştirilebilir. Hard link ise
+    sayfa önbelleğini de paylaştırır fakat bir kopyadaki değişiklik hepsini
+    etkiler; bu yüzden yalnızca açıkça istenirse ve sahip/izinler aynıysa
+    kullanılır.
+    """
+    source = paths[0]
+    source_stat = os.stat(source)
+    result = {"reflinked": 0, "hardlinked": 0, "skipped": 0, "bytes": 0}
+
+    for target in paths[1:]:
+        try:
+            target_stat = os.stat(target)
+            if (target_stat.st_dev, target_stat.st_ino) == (source_stat.st_dev, source_stat.st_ino):
+                continue
+            # Tarama ile sıkıştırma arasında dosya değişmiş olabilir
+            if target_stat.st_size != source_stat.st_size or not filecmp.cmp(source, target, shallow=False):
+                result["skipped"] += 1
+                continue
+
+            try:
+                _replace_with(source, target, "reflink")
+                result["reflinked"] += 1
+            except OSError as e:
+                if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV):
+                    raise
+                same_owner = (target_stat.st_uid, target_stat.st_gid, target_stat.st_mode) == \
+                    (source_stat.st_uid, source_stat.st_gid, source_stat.st_mode)
+                if not (allow_hardlinks and same_owner):
+                    result["skipped"] += 1
+                    continue
+                _replace_with(source, target, "hardlink")
+                result["hardlinked"] += 1
+
+            result["bytes"] += target_stat.st_size
+        except OSError as e:
+            logger.warning(f"Failed to deduplicate {target}: {str(e)}")
+            result["skipped"] += 1
+
+    return result
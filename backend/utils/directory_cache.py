@@ -0,0 +1,193 @@
+import os
+import stat
+import time
+import base64
+import fnmatch
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Sıralama anahtarları; yön ne olursa olsun dizinler dosyalardan önce gelir (bkz. sorted_entries)
+SORT_KEYS = {
+    "name": lambda e: (e["name"].lower(), e["name"]),
+    "size": lambda e: (e["size"], e["name"].lower()),
+    "modified": lambda e: (e["modified"], e["name"].lower()),
+    "type": lambda e: (os.path.splitext(e["name"])[1].lower(), e["name"].lower()),
+}
+
+
+class InvalidListingRequest(ValueError):
+    """Sıralama alanı, sıralama yönü ya da sayfalama imleci geçersiz"""
+
+
+def scan_entry(entry: os.DirEntry) -> Optional[Dict]:
+    """Tek bir scandir girdisinin stat bilgisini çıkar"""
+    try:
+        st = entry.stat(follow_symlinks=False)
+    except FileNotFoundError:
+        # Tarama sırasında silinmiş
+        return None
+
+    is_symlink = stat.S_ISLNK(st.st_mode)
+    is_dir = stat.S_ISDIR(st.st_mode)
+    if is_symlink:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=True)
+        except OSError:
+            is_dir = False
+
+    return {
+        "name": entry.name,
+        "is_dir": is_dir,
+        "is_symlink": is_symlink,
+        "size": st.st_size,
+        "modified": st.st_mtime,
+        "permissions": oct(st.st_mode & 0o777)[2:],
+        "uid": st.st_uid,
+        "gid": st.st_gid,
+    }
+
+
+def iter_directory(path: str) -> Iterator[Dict]:
+    """Dizini os.scandir ile sırasız ve akış halinde gez"""
+    with os.scandir(path) as it:
+        for entry in it:
+            info = scan_entry(entry)
+            if info is not None:
+                yield info
+
+
+def matches_filter(entry: Dict, pattern: Optional[str] = None, file_type: str = "all",
+                   show_hidden: bool = True) -> bool:
+    """Girdi filtre koşullarını sağlıyor mu"""
+    if not show_hidden and entry["name"].startswith("."):
+        return False
+    if file_type == "file" and entry["is_dir"]:
+        return False
+    if file_type == "directory" and not entry["is_dir"]:
+        return False
+    if pattern:
+        if any(c in pattern for c in "*?["):
+            return fnmatch.fnmatch(entry["name"].lower(), pattern.lower())
+        return pattern.lower() in entry["name"].lower()
+    return True
+
+
+def encode_cursor(offset: int, snapshot: int) -> str:
+    """Sayfalama imlecini oluştur"""
+    raw = f"{offset}:{snapshot}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Sayfalama imlecini çöz"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset, snapshot = base64.urlsafe_b64decode(padded.encode()).decode().split(":", 1)
+        return max(int(offset), 0), int(snapshot)
+    except Exception:
+        raise InvalidListingRequest("Invalid cursor")
+
+
+class _CachedDirectory:
+    """Tek bir dizinin önbelleğe alınmış stat bilgileri"""
+
+    def __init__(self, mtime_ns: int, entries: List[Dict]):
+        self.mtime_ns = mtime_ns
+        self.entries = entries
+        # (sort, order) -> sıralı liste; ilk istekte hesaplanır
+        self.sorted: Dict[Tuple[str, str], List[Dict]] = {}
+
+    def sorted_entries(self, sort: str, order: str) -> List[Dict]:
+        key = (sort, order)
+        if key not in self.sorted:
+            ordered = sorted(self.entries, key=SORT_KEYS[sort], reverse=(order == "desc"))
+            # Ters sıralama dizin önceliğini de çevirmesin diye dizinler ayrıca öne alınır
+            self.sorted[key] = [e for e in ordered if e["is_dir"]] + [e for e in ordered if not e["is_dir"]]
+        return self.sorted[key]
+
+
+class DirectoryStatCache:
+    """Dizin bazında stat önbelleği.
+
+    Her dizin bir kez os.scandir ile taranır ve dizinin mtime değeri
+    değiştiğinde (dosya ekleme, silme, yeniden adlandırma) geçersiz sayılır.
+    Dosya içeriği değişiklikleri dizin mtime'ını değiştirmediğinden boyut ve
+    tarih bilgisi en fazla `max_age` saniye eski olabilir.
+    """
+
+    def __init__(self, max_directories: int = 256, max_age: float = 30.0):
+        self.max_directories = max_directories
+        self.max_age = max_age
+        self._entries: "OrderedDict[str, Tuple[float, _CachedDirectory]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> _CachedDirectory:
+        """Dizinin güncel önbellek kaydını getir, gerekirse yeniden tara"""
+        path = os.path.realpath(path)
+        mtime_ns = os.stat(path).st_mtime_ns
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached:
+                loaded_at, directory = cached
+                if directory.mtime_ns == mtime_ns and now - loaded_at < self.max_age:
+                    self._entries.move_to_end(path)
+                    return directory
+
+        # Tarama kilit dışında yapılır; büyük dizinler diğer istekleri bekletmez
+        directory = _CachedDirectory(mtime_ns, list(iter_directory(path)))
+
+        with self._lock:
+            self._entries[path] = (now, directory)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_directories:
+                self._entries.popitem(last=False)
+
+        return directory
+
+    def invalidate(self, path: str) -> None:
+        """Dizinin önbellek kaydını sil"""
+        with self._lock:
+            self._entries.pop(os.path.realpath(path), None)
+
+    def clear(self) -> None:
+        """Tüm önbelleği temizle"""
+        with self._lock:
+            self._entries.clear()
+
+    def list_page(self, path: str, cursor: Optional[str] = None, limit: int = 100,
+                  sort: str = "name", order: str = "asc", pattern: Optional[str] = None,
+                  file_type: str = "all", show_hidden: bool = True) -> Dict:
+        """Dizinin bir sayfasını imleç ile döndür"""
+        if sort not in SORT_KEYS:
+            raise InvalidListingRequest(f"Unsupported sort field: {sort}")
+        if order not in ("asc", "desc"):
+            raise InvalidListingRequest(f"Unsupported sort order: {order}")
+
+        directory = self.get(path)
+        entries = directory.sorted_entries(sort, order)
+        if pattern or file_type != "all" or not show_hidden:
+            entries = [e for e in entries if matches_filter(e, pattern, file_type, show_hidden)]
+
+        offset, stale = 0, False
+        if cursor:
+            offset, snapshot = decode_cursor(cursor)
+            # Sayfalar arasında dizin değiştiyse istemci listeyi yenilemek isteyebilir
+            stale = snapshot != directory.mtime_ns
+
+        page = entries[offset:offset + limit]
+        next_offset = offset + len(page)
+        next_cursor = encode_cursor(next_offset, directory.mtime_ns) if next_offset < len(entries) else None
+
+        return {
+            "entries": page,
+            "total": len(entries),
+            "next_cursor": next_cursor,
+            "stale": stale,
+        }
+
+
+# Uygulama genelinde paylaşılan önbellek
+directory_cache = DirectoryStatCache()
@@ -0,0 +1,175 @@
+import time
+import asyncio
+import ipaddress
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import dns.asyncquery
+import dns.flags
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdata
+import dns.rdataclass
+import dns.rdatatype
+from .dns_resolver import AsyncDNSResolver
+
+logger = logging.getLogger(__name__)
+
+DNS_PORT = 53
+
+
+def parse_nameserver(spec: str) -> Tuple[str, int]:
+    """`ip`, `ip:port`, `[ipv6]:port` ya da `hostname` biçimindeki adresi çöz"""
+    spec = spec.strip()
+    if spec.startswith("["):
+        host, _, port = spec[1:].partition("]")
+        return host, int(port.lstrip(":") or DNS_PORT)
+    if spec.count(":") == 1:
+        host, port = spec.split(":")
+        return host, int(port)
+    return spec, DNS_PORT
+
+
+def _is_ip(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+
+def expected_rrset(zone: str, rdtype: str, values: Iterable[str]) -> Set:
+    """Zone dosyası biçimindeki değerleri karşılaştırılabilir rdata kümesine çevir"""
+    origin = dns.name.from_text(zone)
+    return {
+        dns.rdata.from_text(dns.rdataclass.IN, dns.rdatatype.from_text(rdtype), value, origin=origin)
+        for value in values
+    }
+
+
+class PropagationChecker:
+    """Bir zone'un tüm yetkili isim sunucularını aynı anda sorgular.
+
+    Sorgular özyinelemesiz (RD=0) gönderilir, yani her sunucunun kendi
+    yetkili verisi okunur. UDP yanıtı kesilirse (TC) TCP ile tekrarlanır.
+    SOA seri numarası en yüksek seriden geride olan ya da beklenen kayıt
+    kümesini sunmayan sunucular `lagging` olarak raporlanır.
+    """
+
+    def __init__(self, timeout: float = 2.0, max_queries_per_server: int = 20,
+                 resolver: Optional[AsyncDNSResolver] = None):
+        self.timeout = timeout
+        self.max_queries_per_server = max_queries_per_server
+        self.resolver = resolver
+
+    async def _query(self, host: str, port: int, qname: dns.name.Name, rdtype) -> dns.message.Message:
+        query = dns.message.make_query(qname, rdtype)
+        query.flags &= ~dns.flags.RD
+        response, _ = await dns.asyncquery.udp_with_fallback(query, host, timeout=self.timeout, port=port)
+        return response
+
+    async def resolve_nameservers(self, zone: str, nameservers: Optional[Iterable[str]] = None) -> List[Dict]:
+        """İsim sunucularını (verilmezse zone'un NS kayıtlarını) adreslere çöz"""
+        resolver = self.resolver or AsyncDNSResolver(timeout=self.timeout)
+        if nameservers is None:
+            nameservers = [ns.rstrip(".") for ns in await resolver.resolve(zone, "NS")]
+            if not nameservers:
+                raise ValueError(f"No NS records found for {zone}")
+
+        async def addresses(spec: str) -> List[Dict]:
+            host, port = parse_nameserver(spec)
+            if _is_ip(host):
+                return [{"name": spec, "address": host, "port": port}]
+            ipv4, ipv6 = await asyncio.gather(
+                resolver.resolve(host, "A"), resolver.resolve(host, "AAAA"), return_exceptions=True
+            )
+            result = []
+            for found in (ipv4, ipv6):
+                if isinstance(found, Exception):
+                    continue
+                result.extend({"name": host, "address": ip, "port": port} for ip in found)
+            if not result:
+                return [{"name": host, "address": None, "port": port}]
+            return result
+
+        servers = []
+        for found in await asyncio.gather(*(addresses(spec) for spec in nameservers)):
+            servers.extend(found)
+        return servers
+
+    async def _check_server(self, server: Dict, origin: dns.name.Name, expected: Dict[Tuple[str, str], Set]) -> Dict:
+        result = dict(server, serial=None, latency_ms=None, mismatches=[], error=None)
+        if not server["address"]:
+            result["error"] = "Nameserver address could not be resolved"
+            return result
+
+        semaphore = asyncio.Semaphore(self.max_queries_per_server)
+
+        async def query(name: dns.name.Name, rdtype):
+            async with semaphore:
+                return await self._query(server["address"], server["port"], name, rdtype)
+
+        try:
+            started = time.monotonic()
+            soa = await query(origin, dns.rdatatype.SOA)
+            result["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+            if soa.rcode() != dns.rcode.NOERROR:
+                raise RuntimeError(f"SOA query returned {dns.rcode.to_text(soa.rcode())}")
+            if not soa.flags & dns.flags.AA:
+                raise RuntimeError("Server is not authoritative for the zone")
+            rrset = soa.get_rrset(soa.answer, origin, dns.rdataclass.IN, dns.rdatatype.SOA)
+            if rrset is None:
+                raise RuntimeError("No SOA record in response")
+            result["serial"] = rrset[0].serial
+
+            keys = list(expected)
+            names = [dns.name.from_text(name, origin) if name != "@" else origin for name, _ in keys]
+            responses = await asyncio.gather(
+                *(query(qname, dns.rdatatype.from_text(rdtype)) for qname, (_, rdtype) in zip(names, keys)),
+                return_exceptions=True
+            )
+            for (name, rdtype), qname, response in zip(keys, names, responses):
+                if isinstance(response, Exception):
+                    result["mismatches"].append({"name": name, "type": rdtype, "error": str(response)})
+                    continue
+                answer = response.get_rrset(response.answer, qname, dns.rdataclass.IN,
+                                            dns.rdatatype.from_text(rdtype))
+                served = set(answer) if answer is not None else set()
+                if served != expected[(name, rdtype)]:
+                    result["mismatches"].append({
+                        "name": name,
+                        "type": rdtype,
+                        "expected": sorted(r.to_text() for r in expected[(name, rdtype)]),
+                        "served": sorted(r.to_text() for r in served)
+                    })
+        except Exception as e:
+            result["error"] = str(e) or e.__class__.__name__
+        return result
+
+    async def check(self, zone: str, expected: Optional[Dict[Tuple[str, str], Set]] = None,
+                    nameservers: Optional[Iterable[str]] = None) -> Dict:
+        """Zone'un tüm isim sunucularında yayılma durumunu kontrol et.
+
+        `expected` (isim, tür) -> rdata kümesi eşlemesidir; boş küme kaydın
+        silinmiş olması gerektiği anlamına gelir.
+        """
+        expected = expected or {}
+        origin = dns.name.from_text(zone)
+        servers = await self.resolve_nameservers(zone, nameservers)
+        results = await asyncio.gather(*(self._check_server(s, origin, expected) for s in servers))
+
+        serials = [r["serial"] for r in results if r["serial"] is not None]
+        latest = max(serials) if serials else None
+        lagging = []
+        for r in results:
+            r["in_sync"] = r["error"] is None and r["serial"] == latest and not r["mismatches"]
+            if not r["in_sync"]:
+                lagging.append(r["name"] if r["name"] == r["address"] else f"{r['name']} ({r['address']})")
+
+        return {
+            "zone": zone,
+            "serial": latest,
+            "propagated": bool(results) and not lagging,
+            "lagging": lagging,
+            "nameservers": results
+        }
@@ -0,0 +1,239 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import dns.asyncresolver
+import dns.exception
+import dns.rdatatype
+import dns.resolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DKIM_SELECTORS = ("default", "mail", "selector1", "selector2")
+
+
+class DNSCache:
+    """TTL'e uyan, iş parçacığı güvenli LRU önbellek.
+
+    Olumlu yanıtlar kaydın TTL'i kadar, NXDOMAIN/NODATA yanıtları zone'un
+    SOA minimum değeri (yoksa `negative_ttl`) kadar saklanır. Zaman aşımı ve
+    SERVFAIL gibi geçici hatalar önbelleğe alınmaz.
+    """
+
+    def __init__(self, max_entries: int = 50000, max_ttl: int = 3600, negative_ttl: int = 60):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[List[str]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple[str, str], values: List[str], ttl: int) -> None:
+        ttl = min(max(ttl, 0), self.max_ttl)
+        if ttl == 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Tüm olay döngüleri ve iş parçacıkları tarafından paylaşılan önbellek
+dns_cache = DNSCache(
+    max_entries=int(os.getenv("DNS_CACHE_SIZE", "50000")),
+    negative_ttl=int(os.getenv("DNS_NEGATIVE_TTL", "60"))
+)
+
+
+def _txt_value(rdata) -> str:
+    """TXT kaydının tüm karakter dizilerini birleştir (uzun DKIM anahtarları bölünür)"""
+    return b"".join(rdata.strings).decode("utf-8", errors="replace")
+
+
+def _negative_ttl(response, default: int) -> int:
+    """Olumsuz yanıtın saklanma süresi: yetki bölümündeki SOA minimum değeri"""
+    if response is not None:
+        for rrset in response.authority:
+            if rrset.rdtype == dns.rdatatype.SOA:
+                return min(rrset.ttl, rrset[0].minimum)
+    return default
+
+
+class AsyncDNSResolver:
+    """Eşzamanlı sorgular için asyncio çözümleyici.
+
+    Aynı (isim, tür) için aynı anda gelen sorgular tek bir ağ isteğinde
+    birleştirilir, toplam eşzamanlı sorgu sayısı sınırlanır ve her sorgu
+    `timeout` süresini aşamaz. Bir olay döngüsüne bağlıdır; farklı
+    döngülerde ayrı örnek oluşturulmalı, önbellek paylaşılabilir.
+    """
+
+    def __init__(self, nameservers: Optional[List[str]] = None, timeout: float = 2.0,
+                 max_concurrency: int = 256, cache: Optional[DNSCache] = None):
+        self.resolver = dns.asyncresolver.Resolver()
+        if nameservers:
+            self.resolver.nameservers = nameservers
+        self.resolver.timeout = timeout
+        self.resolver.lifetime = timeout
+        self.timeout = timeout
+        self.cache = cache if cache is not None else dns_cache
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def resolve(self, name: str, rdtype: str = "A") -> List[str]:
+        """Kayıtları metin olarak döndür; kayıt yoksa boş liste"""
+        key = (name.lower().rstrip("."), rdtype.upper())
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            values = await self._query(key)
+        except Exception as e:
+            future.set_exception(e)
+            # Bekleyen yoksa "exception was never retrieved" uyarısını önle
+            future.exception()
+            raise
+        except BaseException:
+            # Sorguyu başlatan iptal edildiyse bekleyenler askıda kalmamalı
+            future.cancel()
+            raise
+        else:
+            future.set_result(values)
+            return values
+        finally:
+            del self._inflight[key]
+
+    async def resolve_txt(self, name: str) -> List[str]:
+        return await self.resolve(name, "TXT")
+
+    async def _query(self, key: Tuple[str, str]) -> List[str]:
+        name, rdtype = key
+        async with self._semaphore:
+            try:
+                answer = await asyncio.wait_for(
+                    self.resolver.resolve(name, rdtype, raise_on_no_answer=False),
+                    timeout=self.timeout
+                )
+            except dns.resolver.NXDOMAIN as e:
+                responses = list(e.responses().values())
+                ttl = _negative_ttl(responses[0] if responses else None, self.cache.negative_ttl)
+                self.cache.put(key, [], ttl)
+                return []
+            except (asyncio.TimeoutError, dns.exception.Timeout):
+                raise TimeoutError(f"DNS query for {name} {rdtype} timed out")
+
+        if answer.rrset is None:
+            values = []
+            ttl = _negative_ttl(answer.response, self.cache.negative_ttl)
+        else:
+            if answer.rdtype == dns.rdatatype.TXT:
+                values = [_txt_value(rdata) for rdata in answer.rrset]
+            else:
+                values = [rdata.to_text() for rdata in answer.rrset]
+            ttl = answer.rrset.ttl
+
+        self.cache.put(key, values, ttl)
+        return values
+
+
+async def _find_record(resolver: AsyncDNSResolver, name: str, prefix: str) -> Dict:
+    """İsmin TXT kayıtları arasında verilen önekle başlayanı ara"""
+    try:
+        for value in await resolver.resolve_txt(name):
+            if value.startswith(prefix):
+                return {"status": "valid", "record": value}
+        return {"status": "missing"}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+async def verify_mail_records(resolver: AsyncDNSResolver, domain_name: str,
+                              selectors: Iterable[str] = DEFAULT_DKIM_SELECTORS) -> Dict:
+    """SPF, DMARC ve tüm DKIM seçicilerini aynı anda sorgula"""
+    selectors = list(selectors)
+    spf, dmarc, *dkim_results = await asyncio.gather(
+        _find_record(resolver, domain_name, "v=spf1"),
+        _find_record(resolver, f"_dmarc.{domain_name}", "v=DMARC1"),
+        *(_find_record(resolver, f"{selector}._domainkey.{domain_name}", "v=DKIM1")
+          for selector in selectors)
+    )
+
+    if spf["status"] == "missing":
+        spf["message"] = "No SPF record found"
+    if dmarc["status"] == "missing":
+        dmarc["message"] = "No DMARC record found"
+
+    # Seçiciler öncelik sırasıyla değerlendirilir
+    dkim = {"status": "missing", "message": "No DKIM record found"}
+    for selector, result in zip(selectors, dkim_results):
+        if result["status"] == "valid":
+            dkim = dict(result, selector=selector)
+            break
+        if result["status"] == "error" and dkim["status"] == "missing":
+            dkim = dict(result, selector=selector)
+
+    return {"spf": spf, "dkim": dkim, "dmarc": dmarc}
+
+
+def merge_selectors(known: Iterable[str], selectors: Iterable[str] = DEFAULT_DKIM_SELECTORS) -> List[str]:
+    """Domain için tanımlı seçiciler önce, ardından yaygın seçiciler (tekrarsız)"""
+    return list(dict.fromkeys(list(known) + list(selectors)))
+
+
+async def verify_many(domains: Iterable[str], selectors: Iterable[str] = DEFAULT_DKIM_SELECTORS,
+                      concurrency: int = 200, resolver: Optional[AsyncDNSResolver] = None,
+                      domain_selectors: Optional[Dict[str, Iterable[str]]] = None) -> Dict[str, Dict]:
+    """Çok sayıda domaini sınırlı eşzamanlılıkla doğrula.
+
+    `domain_selectors` domain adına göre o domainde tanımlı DKIM seçicileridir;
+    bunlar yaygın seçicilerden önce denenir.
+    """
+    resolver = resolver or AsyncDNSResolver(
+        timeout=float(os.getenv("DNS_QUERY_TIMEOUT", "2")),
+        max_concurrency=concurrency * 4
+    )
+    selectors = list(selectors)
+    domain_selectors = domain_selectors or {}
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {}
+
+    async def verify(domain_name: str):
+        wanted = merge_selectors(domain_selectors.get(domain_name, ()), selectors)
+        async with semaphore:
+            results[domain_name] = await verify_mail_records(resolver, domain_name, wanted)
+
+    await asyncio.gather(*(verify(name) for name in domains))
+    return results
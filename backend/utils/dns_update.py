@@ -0,0 +1,59 @@
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+import dns.update
+from .zone_file import PRIORITY_TYPES, quote_txt, wire_type
+
+logger = logging.getLogger(__name__)
+
+
+def rdata_text(record: Dict) -> str:
+    """Kaydın rdata metnini oluştur"""
+    rdtype = wire_type(record["type"])
+    if rdtype in PRIORITY_TYPES:
+        return f"{record.get('priority') or 0} {record['content']}"
+    if rdtype == "TXT":
+        # TXT karakter dizileri en fazla 255 bayt olabilir (DKIM anahtarları daha uzun)
+        return quote_txt(record["content"])
+    return record["content"]
+
+
+def build_update(origin: str, rrsets: Dict[Tuple[str, str], List[Dict]]) -> dns.update.Update:
+    """Değişen (isim, tür) kümelerinden tek bir RFC2136 update mesajı oluştur.
+
+    Kayıtları kalan küme bütün olarak değiştirilir (en küçük TTL ile), boş
+    kalan küme silinir.
+    """
+    update = dns.update.Update(origin)
+    for (name, rdtype), records in sorted(rrsets.items()):
+        if records:
+            ttl = min(record["ttl"] for record in records)
+            update.replace(name, ttl, rdtype, *[rdata_text(record) for record in records])
+        else:
+            update.delete(name, rdtype)
+    return update
+
+
+def commit_changes(db, publish: Optional[Callable[[], None]] = None,
+                   after_commit: Optional[Callable[[], None]] = None,
+                   on_error: Optional[Callable[[], None]] = None) -> None:
+    """Değişikliği yayınla ve veritabanı işlemini tamamla.
+
+    `publish` (dynamic update) commit'ten önce çalışır; başarısız olursa işlem
+    geri alınır. `after_commit` (zone dosyası) yalnızca commit başarılı
+    olduktan sonra çalışır, böylece veritabanına yazılmamış kayıtlar dosyaya
+    girmez; başarısız olursa `on_error` çağrılır.
+    """
+    try:
+        if publish is not None:
+            publish()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if after_commit is not None:
+        try:
+            after_commit()
+        except Exception:
+            if on_error is not None:
+                on_error()
+            raise
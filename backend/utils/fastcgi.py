@@ -0,0 +1,181 @@
+import json
+import struct
+import asyncio
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FCGI_VERSION = 1
+FCGI_BEGIN_REQUEST = 1
+FCGI_END_REQUEST = 3
+FCGI_PARAMS = 4
+FCGI_STDIN = 5
+FCGI_STDOUT = 6
+FCGI_STDERR = 7
+FCGI_RESPONDER = 1
+
+_HEADER = struct.Struct("!BBHHBx")
+
+# FPM status çıktısındaki alanlar -> sözlük anahtarları
+STATUS_FIELDS = {
+    "pool": "pool",
+    "process manager": "process_manager",
+    "start time": "start_time",
+    "accepted conn": "accepted_conn",
+    "listen queue": "listen_queue",
+    "max listen queue": "max_listen_queue",
+    "listen queue len": "listen_queue_len",
+    "idle processes": "idle_processes",
+    "active processes": "active_processes",
+    "total processes": "total_processes",
+    "max active processes": "max_active_processes",
+    "max children reached": "max_children_reached",
+    "slow requests": "slow_requests",
+}
+
+
+class FastCGIError(RuntimeError):
+    """FastCGI isteği başarısız oldu"""
+
+
+def _record(record_type: int, content: bytes = b"", request_id: int = 1) -> bytes:
+    return _HEADER.pack(FCGI_VERSION, record_type, request_id, len(content), 0) + content
+
+
+def _length(value: int) -> bytes:
+    return struct.pack("!B", value) if value < 128 else struct.pack("!I", value | 0x80000000)
+
+
+def encode_params(params: Dict[str, str]) -> bytes:
+    """FastCGI ad-değer çiftlerini kodla"""
+    data = b""
+    for name, value in params.items():
+        name, value = name.encode(), value.encode()
+        data += _length(len(name)) + _length(len(value)) + name + value
+    return data
+
+
+def build_request(params: Dict[str, str], request_id: int = 1) -> bytes:
+    body = encode_params(params)
+    return (
+        _record(FCGI_BEGIN_REQUEST, struct.pack("!HB5x", FCGI_RESPONDER, 0), request_id)
+        + _record(FCGI_PARAMS, body, request_id)
+        + _record(FCGI_PARAMS, b"", request_id)
+        + _record(FCGI_STDIN, b"", request_id)
+    )
+
+
+async def _read_response(reader: asyncio.StreamReader) -> bytes:
+    stdout = b""
+    stderr = b""
+    while True:
+        header = await reader.readexactly(_HEADER.size)
+        _, record_type, _, length, padding = _HEADER.unpack(header)
+        content = await reader.readexactly(length + padding)
+        content = content[:length]
+        if record_type == FCGI_STDOUT:
+            stdout += content
+        elif record_type == FCGI_STDERR:
+            stderr += content
+        elif record_type == FCGI_END_REQUEST:
+            break
+    if stderr:
+        logger.debug(f"FastCGI stderr: {stderr.decode(errors='replace')}")
+    return stdout
+
+
+async def fastcgi_get(socket_path: str, script: str, query: str = "", timeout: float = 5.0) -> Dict:
+    """Unix soketi üzerinden FastCGI GET isteği gönder; durum kodu, başlıklar ve gövdeyi döndür"""
+    params = {
+        "GATEWAY_INTERFACE": "FastCGI/1.0",
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": script,
+        "SCRIPT_FILENAME": script,
+        "REQUEST_URI": f"{script}?{query}" if query else script,
+        "QUERY_STRING": query,
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "CONTENT_LENGTH": "0",
+    }
+
+    async def request() -> bytes:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        try:
+            writer.write(build_request(params))
+            await writer.drain()
+            return await _read_response(reader)
+        finally:
+            writer.close()
+
+    try:
+        raw = await asyncio.wait_for(request(), timeout)
+    except asyncio.TimeoutError:
+        raise FastCGIError(f"FastCGI request to {socket_path} timed out")
+    except (OSError, asyncio.IncompleteReadError) as e:
+        raise FastCGIError(f"FastCGI request to {socket_path} failed: {str(e)}")
+
+    head, _, body = raw.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode(errors="replace").split("\r\n"):
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    status = int(headers.get("status", "200").split()[0])
+    return {"status": status, "headers": headers, "body": body}
+
+
+def parse_status(body: bytes) -> Dict:
+    """FPM status JSON çıktısını normalize et"""
+    data = json.loads(body)
+    return {key: data[field] for field, key in STATUS_FIELDS.items() if field in data}
+
+
+async def fetch_pool_status(socket_path: str, status_path: str = "/fpm-status", timeout: float = 5.0) -> Dict:
+    """Havuzun pm.status_path çıktısını al"""
+    response = await fastcgi_get(socket_path, status_path, "json", timeout)
+    if response["status"] != 200:
+        raise FastCGIError(f"FPM status returned HTTP {response['status']}")
+    return parse_status(response["body"])
+
+
+async def fetch_many(sockets: Dict[str, str], status_path: str = "/fpm-status", timeout: float = 5.0,
+                     concurrency: int = 50) -> Dict[str, Dict]:
+    """Birden çok havuzun durumunu paralel olarak topla; hatalar `error` anahtarıyla döner"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(name: str, socket_path: str):
+        async with semaphore:
+            try:
+                return name, await fetch_pool_status(socket_path, status_path, timeout)
+            except (FastCGIError, ValueError) as e:
+                return name, {"error": str(e)}
+
+    results = await asyncio.gather(*(fetch(name, path) for name, path in sockets.items()))
+    return dict(results)
+
+
+def saturation(status: Dict, previous: Optional[Dict] = None) -> Dict:
+    """Ardışık iki durum örneğinden dönem farklarını ve doygunluk bayrağını hesapla.
+
+    Sayaçlar havuz başladığından beri birikimlidir; havuz yeniden
+    başlatılmışsa (başlangıç zamanı değişmiş) fark yerine mevcut değer alınır.
+    Önceki örnek yoksa dönem bilinmediğinden farklar sıfırdır.
+    """
+    counters = ("accepted_conn", "max_children_reached", "slow_requests")
+    restarted = previous is not None and previous.get("start_time") != status.get("start_time")
+    deltas = {}
+    for key in counters:
+        current = status.get(key, 0)
+        if previous is None:
+            deltas[key] = 0
+        elif restarted:
+            deltas[key] = current
+        else:
+            deltas[key] = max(0, current - previous.get(key, 0))
+
+    reasons = []
+    if status.get("listen_queue", 0) > 0:
+        reasons.append("listen queue")
+    if deltas["max_children_reached"] > 0:
+        reasons.append("max children reached")
+    return {"deltas": deltas, "saturated": bool(reasons), "reasons": reasons}
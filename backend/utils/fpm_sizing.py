@@ -0,0 +1,296 @@
+import os
+import re
+import math
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# İşçi belleği ölçülemeyen havuzlar için varsayılan
+DEFAULT_WORKER_MEMORY = 64 * MB
+
+PM_KEYS = ("pm", "pm.max_children", "pm.start_servers", "pm.min_spare_servers",
+           "pm.max_spare_servers", "pm.process_idle_timeout", "pm.max_requests")
+
+_POOL_TITLE = re.compile(rb"^php-fpm: pool ([^\s\x00]+)")
+
+
+def _process_memory(pid_dir: str) -> Optional[int]:
+    """Sürecin bellek kullanımı (bayt).
+
+    smaps_rollup varsa PSS kullanılır: OPcache gibi paylaşılan sayfalar
+    işçiler arasında bölünür, böylece havuz toplamı gerçek kullanımı verir.
+    Yoksa VmRSS'e düşülür.
+    """
+    for name, field in (("smaps_rollup", b"Pss:"), ("status", b"VmRSS:")):
+        try:
+            with open(os.path.join(pid_dir, name), "rb") as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            continue
+    return None
+
+
+def sample_pool_memory(proc_root: str = "/proc") -> Dict[str, List[int]]:
+    """/proc üzerinden tek geçişte her havuzun işçi belleklerini topla"""
+    pools: Dict[str, List[int]] = {}
+    try:
+        entries = os.listdir(proc_root)
+    except OSError:
+        return pools
+
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        pid_dir = os.path.join(proc_root, entry)
+        try:
+            with open(os.path.join(pid_dir, "cmdline"), "rb") as f:
+                match = _POOL_TITLE.match(f.read())
+        except OSError:
+            continue  # süreç bu arada sonlanmış olabilir
+        if not match:
+            continue
+        memory = _process_memory(pid_dir)
+        if memory:
+            pools.setdefault(match.group(1).decode(), []).append(memory)
+    return pools
+
+
+def memory_total(proc_root: str = "/proc") -> int:
+    with open(os.path.join(proc_root, "meminfo"), "rb") as f:
+        for line in f:
+            if line.startswith(b"MemTotal:"):
+                return int(line.split()[1]) * 1024
+    raise ValueError("MemTotal not found in meminfo")
+
+
+class RequestRateSampler:
+    """Erişim günlüklerinin büyümesinden istek hızını ölçer.
+
+    Her örneklemede yalnızca son okumadan sonra eklenen baytlar okunup satır
+    sayılır; günlük döndürülmüşse (dosya küçülmüş ya da inode değişmiş)
+    baştan başlanır. İlk örneklemede hız bilinmez (None).
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._positions: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def sample(self, path: str) -> Optional[float]:
+        """Son örneklemeden bu yana saniyedeki istek sayısı"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        now = self.clock()
+        with self._lock:
+            previous = self._positions.get(path)
+            self._positions[path] = (st.st_ino, st.st_size, now)
+        if previous is None:
+            return None
+
+        inode, offset, sampled_at = previous
+        if inode != st.st_ino or st.st_size < offset:
+            offset = 0
+        lines = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            remaining = st.st_size - offset
+            while remaining > 0:
+                chunk = f.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                lines += chunk.count(b"\n")
+                remaining -= len(chunk)
+        elapsed = now - sampled_at
+        return lines / elapsed if elapsed > 0 else None
+
+
+request_rates = RequestRateSampler()
+
+
+def _children_for(demand: int, bound: int, scale: float, min_children: int) -> int:
+    """Ölçeklenmiş talep; doygunluktan gelen alt sınır yalnızca küçültülürken ölçeklenir"""
+    return max(min_children, int(bound * min(scale, 1.0)), int(demand * scale))
+
+
+class OndemandPolicy:
+    """Düşük trafikli havuzları ondemand moduna alan, histerezisli politika.
+
+    Havuz `idle_samples` ardışık örneklemede `idle_rate` altında kalırsa
+    ondemand'a düşürülür; ondemand havuz ancak `busy_rate` üstüne çıkınca
+    dynamic/static moda yükseltilir. İki eşik arasındaki hızlar mevcut modu
+    korur, böylece sınırdaki siteler her çalışmada mod değiştirmez. Mevcut
+    modu bilinmeyen havuzlar için karar doğrudan hıza göre verilir.
+
+    Doygunluk nedeniyle büyütülen havuzun max_children değeri, havuz
+    `settle_samples` ardışık örneklemede doygun görülmeyene kadar korunur;
+    aksi halde havuz her çalışmada küçülüp yeniden doygun hale gelirdi.
+    """
+
+    def __init__(self, idle_rate: float = 0.05, busy_rate: float = 0.5, idle_samples: int = 4,
+                 static_children: int = 16, settle_samples: int = 4):
+        self.idle_rate = idle_rate
+        self.busy_rate = busy_rate
+        self.idle_samples = idle_samples
+        self.static_children = static_children
+        self.settle_samples = settle_samples
+        self._idle_streak: Dict[str, int] = {}
+        self._held: Dict[str, int] = {}
+        self._calm_streak: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def hold(self, name: str, max_children: int, saturated: bool) -> int:
+        """Havuzun doygunluktan gelen max_children alt sınırı (yoksa 0)"""
+        with self._lock:
+            if saturated:
+                self._held[name] = max(self._held.get(name, 0), max_children + 1)
+                self._calm_streak[name] = 0
+                return self._held[name]
+            if name not in self._held:
+                return 0
+            streak = self._calm_streak.get(name, 0) + 1
+            if streak >= self.settle_samples:
+                del self._held[name]
+                self._calm_streak.pop(name, None)
+                return 0
+            self._calm_streak[name] = streak
+            return self._held[name]
+
+    def _resident_mode(self, max_children: int) -> str:
+        return "static" if max_children >= self.static_children else "dynamic"
+
+    def choose(self, name: str, rate: float, max_children: int, current: Optional[str] = None,
+               saturated: bool = False) -> str:
+        """Havuzun yeni pm modunu seç; doygun (kuyrukta bekleyen) havuz boşta sayılmaz"""
+        with self._lock:
+            streak = self._idle_streak.get(name, 0) + 1 if rate < self.idle_rate and not saturated else 0
+            self._idle_streak[name] = streak
+
+        # Mod yalnızca hız eşiklerine göre seçilir; boyut yalnızca static/dynamic ayrımını belirler
+        if current == "ondemand":
+            busy = rate >= self.busy_rate or saturated
+            return self._resident_mode(max_children) if busy else "ondemand"
+        if current in ("dynamic", "static"):
+            if streak >= self.idle_samples:
+                return "ondemand"
+            return self._resident_mode(max_children)
+        return "ondemand" if rate < self.idle_rate else self._resident_mode(max_children)
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._idle_streak.pop(name, None)
+            self._held.pop(name, None)
+            self._calm_streak.pop(name, None)
+
+
+def pm_settings(mode: str, max_children: int, idle_timeout: int = 10) -> Dict[str, str]:
+    """pm moduna uygun havuz ayarlarını üret"""
+    settings = {"pm": mode, "pm.max_children": str(max_children)}
+    if mode == "ondemand":
+        settings["pm.process_idle_timeout"] = f"{idle_timeout}s"
+    elif mode == "dynamic":
+        min_spare = max(1, max_children // 5)
+        max_spare = max(min_spare + 1, max_children // 2)
+        settings.update({
+            "pm.start_servers": str((min_spare + max_spare) // 2),
+            "pm.min_spare_servers": str(min_spare),
+            "pm.max_spare_servers": str(max_spare)
+        })
+    return settings
+
+
+def size_pools(samples: Dict[str, Dict], budget: int, request_time: float = 0.2,
+               headroom: float = 1.5, idle_timeout: int = 10,
+               policy: Optional[OndemandPolicy] = None, min_children: int = 5,
+               max_growth: float = 2.0) -> Dict[str, Dict[str, str]]:
+    """Havuzları sunucu geneli bellek bütçesine sığacak şekilde boyutlandır.
+
+    `samples` havuz adı -> {"rate": istek/sn, "memory": [işçi baytları],
+    "mode": mevcut pm modu, "max_children": mevcut değer, "saturated": FPM
+    status doygunluk bayrağı}; mod seçimi `policy` ile yapılır. Doygun
+    havuzların talebi en az mevcut max_children + 1 olur ve politika bu
+    değeri havuz bir süre doygun görülmeyene kadar korur.
+    Gereken eşzamanlılık Little yasasıyla (hız x ortalama istek süresi)
+    hesaplanır ve `headroom` ile büyütülür. Tüm havuzlar en kötü durumda
+    (max_children x işçi belleği) bütçeyi aşıyorsa talepler ortak bir
+    katsayıyla küçültülür; bütçe artıyorsa talepler en fazla `max_growth`
+    katına kadar büyütülür. Her havuz en az `min_children` işçi alır.
+    """
+    policy = policy or OndemandPolicy()
+    demands = {}
+    bounds = {}
+    worker_memory = {}
+    for name, sample in samples.items():
+        memory = sample.get("memory") or []
+        worker_memory[name] = sum(memory) // len(memory) if memory else DEFAULT_WORKER_MEMORY
+        demands[name] = max(1, math.ceil(sample["rate"] * request_time * headroom))
+        bounds[name] = policy.hold(name, sample.get("max_children", 0), sample.get("saturated", False))
+
+    def children(name: str, scale: float) -> int:
+        return _children_for(demands[name], bounds[name], scale, min_children)
+
+    def total(scale: float) -> int:
+        return sum(children(n, scale) * worker_memory[n] for n in demands)
+
+    scale = max(max_growth, 1.0)
+    if demands and total(scale) > budget:
+        low, high = (0.0, 1.0) if total(1.0) > budget else (1.0, scale)
+        for _ in range(40):
+            middle = (low + high) / 2
+            if total(middle) <= budget:
+                low = middle
+            else:
+                high = middle
+        scale = low
+        if total(scale) > budget:
+            logger.warning(f"PHP-FPM memory budget is smaller than {min_children} workers per pool")
+
+    result = {}
+    for name in demands:
+        count = children(name, scale)
+        mode = policy.choose(name, samples[name]["rate"], count, samples[name].get("mode"),
+                             samples[name].get("saturated", False))
+        result[name] = pm_settings(mode, count, idle_timeout)
+    return result
+
+
+def read_pm_settings(config: str) -> Dict[str, str]:
+    """Havuz yapılandırmasındaki pm.* ayarlarını oku"""
+    settings = {}
+    for line in config.splitlines():
+        if "=" not in line or line.lstrip().startswith((";", "#")):
+            continue
+        key, value = line.split("=", 1)
+        if key.strip() in PM_KEYS:
+            settings[key.strip()] = value.strip()
+    return settings
+
+
+def update_pool_config(config: str, settings: Dict[str, str]) -> str:
+    """pm.* satırlarını yeni ayarlarla değiştir; diğer satırlara dokunma.
+
+    `pm.max_requests` gibi ayarlarda olmayan anahtarlar korunur; moda ait
+    olmayan yedek sunucu ayarları kaldırılır.
+    """
+    managed = set(PM_KEYS) - {"pm.max_requests"}
+    lines = []
+    inserted = False
+    for line in config.splitlines():
+        key = line.split("=", 1)[0].strip() if "=" in line else None
+        if key in managed and not line.lstrip().startswith((";", "#")):
+            if not inserted:
+                lines.extend(f"{k} = {v}" for k, v in settings.items())
+                inserted = True
+            continue
+        lines.append(line)
+    if not inserted:
+        lines.extend(f"{k} = {v}" for k, v in settings.items())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,215 @@
+import os
+import json
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Abone kuyruğu taşarsa bu işaret döner; abone eksik kayıtları imleçten yeniden okur
+LAGGED = object()
+
+
+class Subscription:
+    """Tek bir WebSocket bağlantısının olay kuyruğu"""
+
+    def __init__(self, broker: "InProcessBroker", topic: str, max_queue: int):
+        self.broker = broker
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.lagged = False
+
+    def _offer(self, event: Dict) -> None:
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Yavaş istemci yayıncıyı bekletmez; kuyruk boşaltılıp yeniden eşitleme istenir
+            self.lagged = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+    async def get(self) -> Any:
+        """En az bir olayı bekle, birikenlerle birlikte liste olarak döndür (ya da LAGGED)"""
+        if self.lagged:
+            self.lagged = False
+            return LAGGED
+        events = [await self.queue.get()]
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        if self.lagged:
+            self.lagged = False
+            return LAGGED
+        return events
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Süreç içi yayın/abone dağıtıcısı.
+
+    Olaylar bir kez yayınlanır, her konunun abonelerine kuyruk üzerinden
+    dağıtılır. `publish` iş parçacığı güvenlidir: senkron uç noktalar
+    (threadpool) olay döngüsüne `call_soon_threadsafe` ile aktarır.
+    """
+
+    def __init__(self, max_queue: int = 1000):
+        self.max_queue = max_queue
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: Any) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self, str(topic), self.max_queue)
+        with self._lock:
+            self._topics.setdefault(subscription.topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[subscription.topic]
+
+    def subscriber_count(self, topic: Any) -> int:
+        with self._lock:
+            return len(self._topics.get(str(topic), ()))
+
+    def wants(self, topic: Any) -> bool:
+        """Konu için olay üretmeye değer mi (yerel abone var mı)"""
+        return self.subscriber_count(topic) > 0
+
+    def _deliver(self, topic: str, event: Dict) -> None:
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            subscription._offer(event)
+
+    def publish(self, topic: Any, event: Dict) -> None:
+        topic = str(topic)
+        if self._loop is None or not self.subscriber_count(topic):
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(topic, event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, topic, event)
+
+
+class RedisBroker(InProcessBroker):
+    """Birden çok worker için Redis pub/sub köprüsü.
+
+    Yayınlar yalnızca Redis'e gider; her worker'daki dinleyici iş parçacığı
+    kanallardan gelen olayları kendi yerel abonelerine dağıtır, böylece olay
+    hangi worker'da üretilirse üretilsin tüm bağlantılara bir kez ulaşır.
+    """
+
+    def __init__(self, url: str, prefix: str = "domain-logs", max_queue: int = 1000):
+        super().__init__(max_queue)
+        from redis import Redis  # yalnızca Redis dağıtıcısı seçildiğinde gerekir
+
+        self.prefix = prefix
+        self.client = Redis.from_url(url)
+        self._listener: Optional[threading.Thread] = None
+
+    def subscribe(self, topic: Any) -> Subscription:
+        subscription = super().subscribe(topic)
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._listen, daemon=True, name="log-broker")
+            self._listener.start()
+        return subscription
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{self.prefix}:*")
+                for message in pubsub.listen():
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    topic = channel[len(self.prefix) + 1:]
+                    if self.subscriber_count(topic):
+                        super().publish(topic, json.loads(message["data"]))
+            except Exception as e:
+                logger.error(f"Redis log broker connection lost: {str(e)}")
+                threading.Event().wait(1)
+
+    def wants(self, topic: Any) -> bool:
+        # Diğer worker'lardaki aboneler buradan görülemez
+        return True
+
+    def publish(self, topic: Any, event: Dict) -> None:
+        try:
+            self.client.publish(f"{self.prefix}:{topic}", json.dumps(event, default=str))
+        except Exception as e:
+            # Kaçırılan olaylar yeniden bağlanan istemcilerce imleçten okunur
+            logger.error(f"Failed to publish log event: {str(e)}")
+
+
+def create_log_broker() -> InProcessBroker:
+    """LOG_BROKER=redis ise Redis köprüsü, aksi halde süreç içi dağıtıcı"""
+    if os.getenv("LOG_BROKER", "memory") == "redis":
+        url = os.getenv("LOG_BROKER_REDIS_URL") or "redis://{}:{}/{}".format(
+            os.getenv("REDIS_HOST", "localhost"), os.getenv("REDIS_PORT", "6379"), os.getenv("REDIS_DB", "0")
+        )
+        return RedisBroker(url)
+    return InProcessBroker()
+
+
+class DeliveryTracker:
+    """Bir bağlantıya gönderilen kayıtları izleyip tekrarları ayıklar.
+
+    Kimlikler INSERT sırasında alınır, ancak işlemler farklı sırada commit
+    edilebilir (tek kayıt ile toplu yazım aynı anda): küçük kimlikli bir kayıt,
+    daha büyük kimlikli kayıt gönderildikten sonra görünür hale gelebilir.
+    Bu yüzden yalnızca en büyük kimliğe bakılmaz; son `window` kimlik
+    aralığında gönderilenler hatırlanır, bu aralıkta geç gelen kayıtlar da
+    iletilir. İstemcinin verdiği imleçten küçük kayıtlar gönderilmiş sayılır.
+    Kimliksiz olaylar (dosya izleyicileri) her zaman geçer.
+    """
+
+    def __init__(self, cursor: Optional[int] = None, window: int = 1000):
+        self.cursor = cursor or 0
+        self.window = window
+        self._base = self.cursor
+        self._sent: Set[int] = set()
+
+    @property
+    def floor(self) -> int:
+        """Bu kimlik ve altındaki kayıtlar artık beklenmez"""
+        return max(self._base, self.cursor - self.window)
+
+    def fresh(self, events: List[Dict]) -> List[Dict]:
+        """Henüz gönderilmemiş olaylar"""
+        floor = self.floor
+        return [
+            event for event in events
+            if event.get("id") is None or (event["id"] > floor and event["id"] not in self._sent)
+        ]
+
+    def mark(self, events: List[Dict]) -> None:
+        """Olayları gönderildi olarak işaretle"""
+        ids = [event["id"] for event in events if event.get("id") is not None]
+        if not ids:
+            return
+        self._sent.update(ids)
+        self.cursor = max(self.cursor, max(ids))
+        if len(self._sent) > self.window:
+            floor = self.floor
+            self._sent = {sent_id for sent_id in self._sent if sent_id > floor}
+
+
+log_broker = create_log_broker()
@@ -0,0 +1,221 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Domain başına ayarlanabilen performans seçenekleri ve varsayılanları
+DEFAULT_OPTIONS: Dict[str, Any] = {
+    "http2": True,
+    "gzip": True,
+    # Dağıtımda üretilmiş .gz/.br dosyaları varsa doğrudan sunulur
+    "gzip_static": True,
+    "brotli_static": False,  # ngx_brotli modülü gerektirir
+    "static_expires": "30d",
+    "static_extensions": ["css", "js", "mjs", "jpg", "jpeg", "png", "gif", "webp", "avif", "svg",
+                          "ico", "woff", "woff2", "ttf", "otf", "eot", "mp4", "webm", "pdf"],
+    "fastcgi_cache": False,
+    "fastcgi_cache_valid": "1s",  # mikro önbellek
+    "fastcgi_cache_max_size": "256m",
+    "fastcgi_cache_inactive": "10m",
+    "upstream_keepalive": 8,
+    "client_max_body_size": "32m",
+}
+
+GZIP_TYPES = ("text/plain text/css text/xml text/javascript application/javascript application/json "
+              "application/xml application/rss+xml application/atom+xml image/svg+xml font/ttf font/otf")
+
+# Önbellek anahtarı: purge işlemi aynı anahtarın md5'inden dosya yolunu hesaplar
+FASTCGI_CACHE_KEY = "$scheme$request_method$host$request_uri"
+FASTCGI_CACHE_LEVELS = "1:2"
+
+# Oturum açmış kullanıcılar, sepet ve yönetim sayfaları önbellekten sunulmaz (WordPress/WooCommerce)
+CACHE_BYPASS_COOKIES = "comment_author|wordpress_[a-f0-9]+|wp-postpass|wordpress_no_cache|wordpress_logged_in|woocommerce_items_in_cart|woocommerce_cart_hash|PHPSESSID"
+CACHE_BYPASS_URIS = "/wp-admin/|/wp-login.php|/xmlrpc.php|/wp-json/|/cart/|/checkout/|/my-account/|/feed/|sitemap(_index)?.xml"
+
+# Combined biçimine önbellek durumu ve süreler eklenir (isabet oranı ve günlük işleme için)
+LOG_FORMAT_NAME = "panel"
+LOG_FORMAT = ('$remote_addr - $remote_user [$time_local] "$request" $status $body_bytes_sent '
+              '"$http_referer" "$http_user_agent" "$upstream_cache_status" $request_time $upstream_response_time')
+
+_DURATION = re.compile(r"^\d+(ms|s|m|h|d|w|M|y)?$")
+_SIZE = re.compile(r"^\d+[kKmMgG]?$")
+_EXTENSION = re.compile(r"^[A-Za-z0-9]+$")
+
+
+def identifier(domain_name: str) -> str:
+    """Domain adından nginx upstream/zone adı üret"""
+    return re.sub(r"[^A-Za-z0-9_]", "_", domain_name)
+
+
+def merge_options(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Seçenekleri varsayılanlarla birleştir ve doğrula"""
+    merged = dict(DEFAULT_OPTIONS)
+    for key, value in (options or {}).items():
+        if key not in DEFAULT_OPTIONS:
+            raise ValueError(f"Unknown vhost option: {key}")
+        merged[key] = value
+
+    for key in ("http2", "gzip", "gzip_static", "brotli_static", "fastcgi_cache"):
+        if not isinstance(merged[key], bool):
+            raise ValueError(f"{key} must be a boolean")
+    for key in ("static_expires", "fastcgi_cache_valid", "fastcgi_cache_inactive"):
+        if merged[key] != "off" and not _DURATION.match(str(merged[key])):
+            raise ValueError(f"Invalid duration for {key}: {merged[key]}")
+    for key in ("fastcgi_cache_max_size", "client_max_body_size"):
+        if not _SIZE.match(str(merged[key])):
+            raise ValueError(f"Invalid size for {key}: {merged[key]}")
+    if not isinstance(merged["upstream_keepalive"], int) or merged["upstream_keepalive"] < 0:
+        raise ValueError("upstream_keepalive must be a non-negative integer")
+    if not all(isinstance(e, str) and _EXTENSION.match(e) for e in merged["static_extensions"]):
+        raise ValueError("Invalid static file extension")
+    return merged
+
+
+def _indent(lines: List[str], level: int = 1) -> List[str]:
+    return [("    " * level + line) if line else "" for line in lines]
+
+
+def _block(header: str, body: List[str]) -> List[str]:
+    return [f"{header} {{"] + _indent(body) + ["}"]
+
+
+def _php_location(name: str, options: Dict[str, Any]) -> List[str]:
+    body = [
+        "include snippets/fastcgi-php.conf;",
+        f"fastcgi_pass php_{identifier(name)};",
+    ]
+    if options["upstream_keepalive"]:
+        body.append("fastcgi_keep_conn on;")
+    if options["fastcgi_cache"]:
+        body += [
+            "",
+            f"fastcgi_cache {identifier(name)};",
+            f"fastcgi_cache_valid 200 301 302 {options['fastcgi_cache_valid']};",
+            "fastcgi_cache_use_stale error timeout updating http_500 http_503;",
+            "fastcgi_cache_background_update on;",
+            "fastcgi_cache_lock on;",
+            "fastcgi_cache_bypass $skip_cache;",
+            "fastcgi_no_cache $skip_cache;",
+            "add_header X-Cache-Status $upstream_cache_status always;",
+        ]
+    return _block("location ~ \\.php$", body)
+
+
+def _cache_rules() -> List[str]:
+    return [
+        "# Önbellek dışı istekler: POST, sorgu dizgisi, oturum çerezleri ve yönetim sayfaları",
+        "set $skip_cache 0;",
+        *_block("if ($request_method !~ ^(GET|HEAD)$)", ["set $skip_cache 1;"]),
+        *_block("if ($query_string != \"\")", ["set $skip_cache 1;"]),
+        *_block(f"if ($http_cookie ~* \"{CACHE_BYPASS_COOKIES}\")", ["set $skip_cache 1;"]),
+        *_block(f"if ($request_uri ~* \"{CACHE_BYPASS_URIS}\")", ["set $skip_cache 1;"]),
+    ]
+
+
+def render_log_format() -> str:
+    """http bağlamında bir kez tanımlanması gereken günlük biçimi"""
+    return f"log_format {LOG_FORMAT_NAME} '{LOG_FORMAT}';\n"
+
+
+def _static_location(options: Dict[str, Any]) -> List[str]:
+    extensions = "|".join(options["static_extensions"])
+    body = [
+        f"expires {options['static_expires']};",
+        "add_header Cache-Control \"public\";",
+        "access_log off;",
+        "try_files $uri =404;",
+    ]
+    return _block(f"location ~* \\.({extensions})$", body)
+
+
+def render_nginx_vhost(name: str, php_version: str, options: Optional[Dict[str, Any]] = None,
+                       stapling_include: Optional[str] = None,
+                       cache_root: str = "/var/cache/nginx/fastcgi",
+                       certificate: Optional[Tuple[str, str]] = None,
+                       acme_webroot: str = "/var/www/letsencrypt") -> str:
+    """Domain için nginx yapılandırmasını seçeneklere göre oluştur.
+
+    Upstream ve önbellek bölgesi http bağlamındaki yönergelerdir; vhost
+    dosyaları http bloğu içinden include edildiğinden aynı dosyada tanımlanır.
+    443 dinleyicisi ve SSL yönergeleri yalnızca `certificate` (zincir, anahtar)
+    verildiğinde yazılır: sertifika henüz alınmamışsa nginx yapılandırma
+    testini geçemez. ACME doğrulama yolu her zaman `acme_webroot` altından
+    sunulur, böylece ilk sertifika da bu vhost üzerinden alınabilir.
+    """
+    options = merge_options(options)
+    ident = identifier(name)
+    socket = f"/run/php/php{php_version}-fpm-{name}.sock"
+
+    upstream = [f"server unix:{socket};"]
+    if options["upstream_keepalive"]:
+        upstream.append(f"keepalive {options['upstream_keepalive']};")
+    lines = _block(f"upstream php_{ident}", upstream) + [""]
+
+    if options["fastcgi_cache"]:
+        lines += [
+            f"fastcgi_cache_path {cache_root}/{name} levels={FASTCGI_CACHE_LEVELS} keys_zone={ident}:10m "
+            f"max_size={options['fastcgi_cache_max_size']} inactive={options['fastcgi_cache_inactive']} "
+            "use_temp_path=off;",
+            ""
+        ]
+
+    server = [
+        "listen 80;",
+    ]
+    if certificate:
+        server.append("listen 443 ssl http2;" if options["http2"] else "listen 443 ssl;")
+    server += [
+        f"server_name {name} www.{name};",
+        f"root /var/www/{name}/public_html;",
+        "index index.php index.html index.htm;",
+        f"access_log /var/log/nginx/{name}-access.log {LOG_FORMAT_NAME};",
+        f"client_max_body_size {options['client_max_body_size']};",
+        "",
+    ]
+    if options["gzip"]:
+        server += [
+            "gzip on;",
+            "gzip_vary on;",
+            "gzip_comp_level 5;",
+            "gzip_min_length 256;",
+            "gzip_proxied any;",
+            f"gzip_types {GZIP_TYPES};",
+        ]
+    if options["gzip_static"]:
+        server.append("gzip_static on;")
+    if options["brotli_static"]:
+        server.append("brotli_static on;")
+    if options["fastcgi_cache"]:
+        server += [""] + _cache_rules() + [f"fastcgi_cache_key \"{FASTCGI_CACHE_KEY}\";"]
+
+    server += [""]
+    server += _block("location ^~ /.well-known/acme-challenge/", [
+        f"root {acme_webroot};",
+        "default_type \"text/plain\";",
+        "try_files $uri =404;",
+    ]) + [""]
+    server += _block("location /", ["try_files $uri $uri/ /index.php?$query_string;"]) + [""]
+    if options["static_expires"] != "off":
+        server += _static_location(options) + [""]
+    server += _php_location(name, options) + [""]
+    server += _block("location ~ /\\.ht", ["deny all;"])
+
+    if certificate:
+        fullchain, private_key = certificate
+        server += [
+            "",
+            "# SSL yapılandırması",
+            f"ssl_certificate {fullchain};",
+            f"ssl_certificate_key {private_key};",
+            "ssl_protocols TLSv1.2 TLSv1.3;",
+            "ssl_ciphers HIGH:!aNULL:!MD5;",
+            "ssl_session_cache shared:SSL:10m;",
+            "ssl_session_timeout 1h;",
+        ]
+    if certificate and stapling_include:
+        server += [
+            "",
+            "# OCSP stapling: yanıt panel tarafından önceden alınır, dosya yoksa desen boş kalır",
+            f"include {stapling_include};",
+        ]
+
+    lines += _block("server", server)
+    return "\n".join(lines) + "\n"
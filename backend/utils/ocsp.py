@@ -0,0 +1,247 @@
+import os
+import logging
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import requests
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+from cryptography.x509 import ocsp
+from cryptography.x509.oid import AuthorityInformationAccessOID, ExtendedKeyUsageOID, ExtensionOID
+
+logger = logging.getLogger(__name__)
+
+# Yanıt süresi dolmadan önce en az bu kadar erken yenilenir
+REFRESH_MARGIN = timedelta(hours=2)
+RETRY_INTERVAL = timedelta(minutes=30)
+
+
+class OCSPError(RuntimeError):
+    """OCSP yanıtı alınamadı ya da doğrulanamadı"""
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo else value
+
+
+def _response_time(response: ocsp.OCSPResponse, attribute: str) -> Optional[datetime]:
+    # cryptography 43+ saat dilimli `_utc` özelliklerini sunar
+    value = getattr(response, f"{attribute}_utc", None)
+    return _utc(value) if value is not None else getattr(response, attribute)
+
+
+def load_chain(data: bytes) -> List[x509.Certificate]:
+    """fullchain PEM dosyasındaki sertifikaları sırayla yükle"""
+    return x509.load_pem_x509_certificates(data)
+
+
+def ocsp_url(cert: x509.Certificate) -> Optional[str]:
+    """Sertifikanın AIA uzantısındaki OCSP adresi (yoksa None)"""
+    try:
+        aia = cert.extensions.get_extension_for_oid(ExtensionOID.AUTHORITY_INFORMATION_ACCESS).value
+    except x509.ExtensionNotFound:
+        return None
+    for description in aia:
+        if description.access_method == AuthorityInformationAccessOID.OCSP:
+            return description.access_location.value
+    return None
+
+
+def refresh_time(this_update: datetime, next_update: datetime) -> datetime:
+    """Yanıtın geçerlilik süresinin yarısında, en geç bitişten REFRESH_MARGIN önce yenile"""
+    midpoint = this_update + (next_update - this_update) / 2
+    return min(midpoint, next_update - REFRESH_MARGIN)
+
+
+def http_fetcher(url: str, request_der: bytes, timeout: float) -> bytes:
+    response = requests.post(
+        url,
+        data=request_der,
+        headers={"Content-Type": "application/ocsp-request", "Accept": "application/ocsp-response"},
+        timeout=timeout
+    )
+    response.raise_for_status()
+    return response.content
+
+
+def _verify_signature(public_key, signature: bytes, data: bytes, hash_algorithm) -> None:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        public_key.verify(signature, data, padding.PKCS1v15(), hash_algorithm)
+    elif isinstance(public_key, ec.EllipticCurvePublicKey):
+        public_key.verify(signature, data, ec.ECDSA(hash_algorithm))
+    else:
+        public_key.verify(signature, data)
+
+
+def _check_delegated_responder(responder: x509.Certificate, now: datetime) -> None:
+    """Yetkilendirilmiş yanıtlayıcı id-kp-OCSPSigning taşımalı ve geçerli olmalı (RFC 6960 4.2.2.2).
+
+    Aynı ara sertifikadan alınmış sıradan bir müşteri sertifikası da CA
+    tarafından imzalanmıştır; kullanım amacı kontrol edilmezse o anahtarla
+    sahte "good" yanıtları üretilebilir.
+    """
+    try:
+        usages = responder.extensions.get_extension_for_oid(ExtensionOID.EXTENDED_KEY_USAGE).value
+    except x509.ExtensionNotFound:
+        usages = []
+    if ExtendedKeyUsageOID.OCSP_SIGNING not in usages:
+        raise OCSPError("OCSP responder certificate is not authorized for OCSP signing")
+    if not _response_time(responder, "not_valid_before") <= now <= _response_time(responder, "not_valid_after"):
+        raise OCSPError("OCSP responder certificate is not valid at this time")
+
+
+def validate_response(data: bytes, cert: x509.Certificate, issuer: x509.Certificate,
+                      now: Optional[datetime] = None) -> Dict:
+    """OCSP yanıtını ayrıştır; imza, seri numarası ve geçerlilik süresini doğrula"""
+    response = ocsp.load_der_ocsp_response(data)
+    if response.response_status != ocsp.OCSPResponseStatus.SUCCESSFUL:
+        raise OCSPError(f"OCSP responder returned {response.response_status.name}")
+    if response.serial_number != cert.serial_number:
+        raise OCSPError("OCSP response is for a different certificate")
+    if response.certificate_status == ocsp.OCSPCertStatus.UNKNOWN:
+        raise OCSPError("OCSP responder does not know the certificate")
+
+    now = now or datetime.utcnow()
+    # Yanıt ya doğrudan CA ya da CA'nın yetkilendirdiği bir yanıtlayıcı tarafından imzalanır
+    responder = issuer
+    for candidate in response.certificates:
+        if candidate.subject != issuer.subject:
+            try:
+                candidate.verify_directly_issued_by(issuer)
+            except (ValueError, TypeError, InvalidSignature):
+                raise OCSPError("OCSP responder certificate is not issued by the CA")
+            _check_delegated_responder(candidate, now)
+            responder = candidate
+            break
+    try:
+        _verify_signature(responder.public_key(), response.signature,
+                          response.tbs_response_bytes, response.signature_hash_algorithm)
+    except InvalidSignature:
+        raise OCSPError("Invalid OCSP response signature")
+
+    this_update = _response_time(response, "this_update")
+    next_update = _response_time(response, "next_update")
+    if next_update is None:
+        raise OCSPError("OCSP response has no nextUpdate")
+    if next_update <= now:
+        raise OCSPError("OCSP response has already expired")
+
+    return {
+        "cert_status": response.certificate_status.name.lower(),
+        "this_update": this_update,
+        "next_update": next_update,
+        "refresh_at": refresh_time(this_update, next_update)
+    }
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class OCSPStapler:
+    """OCSP yanıtlarını önceden alıp nginx `ssl_stapling_file` için diske yazar.
+
+    Her domain için `<ad>.ocsp` (DER yanıt) ve `<ad>.stapling.conf` (nginx
+    yönergeleri) dosyaları oluşturulur; vhost'lar bu parçayı joker karakterli
+    `include` ile kullandığından dosya yokken yapılandırma bozulmaz. OCSP
+    adresi olmayan sertifikalar atlanır (Let's Encrypt 2025'te OCSP'yi
+    kapattı). Süresi dolmuş bir yanıt sunulmaz, parça silinir.
+    """
+
+    def __init__(self, stapling_dir: str, timeout: float = 10.0,
+                 fetcher: Callable[[str, bytes, float], bytes] = http_fetcher):
+        self.stapling_dir = stapling_dir
+        self.timeout = timeout
+        self.fetcher = fetcher
+        # domain adı -> sonraki yenileme zamanı
+        self._refresh_at: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def staple_path(self, name: str) -> str:
+        return os.path.join(self.stapling_dir, f"{name}.ocsp")
+
+    def snippet_path(self, name: str) -> str:
+        return os.path.join(self.stapling_dir, f"{name}.stapling.conf")
+
+    def include_pattern(self, name: str) -> str:
+        """Vhost yapılandırmasına eklenecek include deseni"""
+        return os.path.join(self.stapling_dir, f"{name}.stapling*.conf")
+
+    def _chain(self, cert_path: str) -> Tuple[x509.Certificate, Optional[x509.Certificate]]:
+        with open(cert_path, "rb") as f:
+            chain = load_chain(f.read())
+        return chain[0], chain[1] if len(chain) > 1 else None
+
+    def _existing(self, name: str, cert: x509.Certificate, issuer: x509.Certificate) -> Optional[Dict]:
+        try:
+            with open(self.staple_path(name), "rb") as f:
+                return validate_response(f.read(), cert, issuer)
+        except (OSError, ValueError, OCSPError):
+            return None
+
+    def remove(self, name: str) -> None:
+        for path in (self.snippet_path(name), self.staple_path(name)):
+            if os.path.exists(path):
+                os.remove(path)
+        with self._lock:
+            self._refresh_at.pop(name, None)
+
+    def refresh(self, name: str, cert_path: str, force: bool = False, now: Optional[datetime] = None) -> Dict:
+        """Yanıtı gerekiyorsa yenile; sonuç durumu: updated, fresh, skipped ya da failed"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            due = self._refresh_at.get(name)
+        if due is not None and due > now and not force:
+            return {"status": "fresh", "refresh_at": due}
+
+        cert, issuer = self._chain(cert_path)
+        url = ocsp_url(cert)
+        if not url or issuer is None:
+            self.remove(name)
+            return {"status": "skipped", "reason": "no OCSP responder" if not url else "issuer not in chain"}
+
+        existing = self._existing(name, cert, issuer)
+        if existing and existing["refresh_at"] > now and not force:
+            with self._lock:
+                self._refresh_at[name] = existing["refresh_at"]
+            return {"status": "fresh", "refresh_at": existing["refresh_at"]}
+
+        try:
+            request = ocsp.OCSPRequestBuilder().add_certificate(cert, issuer, hashes.SHA1()).build()
+            data = self.fetcher(url, request.public_bytes(serialization.Encoding.DER), self.timeout)
+            info = validate_response(data, cert, issuer, now)
+        except Exception as e:
+            logger.warning(f"OCSP refresh failed for {name}: {str(e)}")
+            if existing is None or existing["next_update"] <= now:
+                self.remove(name)
+            retry_at = now + RETRY_INTERVAL
+            if existing:
+                retry_at = min(retry_at, existing["next_update"])
+            with self._lock:
+                self._refresh_at[name] = retry_at
+            return {"status": "failed", "error": str(e), "refresh_at": retry_at}
+
+        os.makedirs(self.stapling_dir, exist_ok=True)
+        _write_atomic(self.staple_path(name), data)
+        snippet = f"ssl_stapling on;\nssl_stapling_file {self.staple_path(name)};\n"
+        snippet_existed = os.path.exists(self.snippet_path(name))
+        if not snippet_existed:
+            _write_atomic(self.snippet_path(name), snippet.encode())
+
+        with self._lock:
+            self._refresh_at[name] = info["refresh_at"]
+        return dict(info, status="updated", new=not snippet_existed)
@@ -0,0 +1,147 @@
+import os
+import json
+import math
+import logging
+from typing import Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# OPcache max_accelerated_files değerini bu asal sayılardan bir üstüne yuvarlar
+OPCACHE_KEY_PRIMES = (223, 463, 983, 1979, 3907, 7963, 16229, 32531, 65407,
+                      130987, 262237, 524521, 1048793)
+
+# validate_timestamps politikaları
+TIMESTAMP_POLICIES = {
+    # Her istekte dosya değişikliği kontrol edilir
+    "development": {"opcache.validate_timestamps": "1", "opcache.revalidate_freq": "0"},
+    # Değişiklikler en geç revalidate_freq saniye sonra görülür
+    "balanced": {"opcache.validate_timestamps": "1", "opcache.revalidate_freq": "60"},
+    # Dosyalar hiç kontrol edilmez; dağıtımdan sonra PHP-FPM reload edilmelidir
+    "immutable": {"opcache.validate_timestamps": "0", "opcache.revalidate_freq": "0"},
+}
+
+OPCACHE_STATUS_SCRIPT = """<?php
+header('Content-Type: application/json');
+$status = function_exists('opcache_get_status') ? opcache_get_status(false) : false;
+echo json_encode(array(
+    'status' => $status,
+    'realpath_cache_size' => realpath_cache_size(),
+    'realpath_cache_limit' => ini_get('realpath_cache_size'),
+));
+"""
+
+
+def count_php_files(roots: Iterable[str], extensions: Tuple[str, ...] = (".php", ".inc")) -> Dict[str, int]:
+    """Doküman köklerindeki PHP dosyalarını say (sembolik bağlar izlenmez)"""
+    files = 0
+    total_size = 0
+    stack = [root for root in roots if os.path.isdir(root)]
+    while stack:
+        path = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(extensions) and entry.is_file(follow_symlinks=False):
+                            files += 1
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return {"files": files, "bytes": total_size}
+
+
+def _round_up(value: int, step: int) -> int:
+    return int(math.ceil(value / step) * step)
+
+
+def max_accelerated_files(files: int, headroom: float = 1.5) -> int:
+    """Dosya sayısına göre OPcache anahtar sayısı (OPcache'in kullanacağı asal sayı)"""
+    wanted = max(10000, int(files * headroom))
+    for prime in OPCACHE_KEY_PRIMES:
+        if prime >= wanted:
+            return prime
+    return OPCACHE_KEY_PRIMES[-1]
+
+
+def compute_profile(files: int, total_size: int, policy: str = "balanced") -> Dict[str, str]:
+    """PHP sürümü için OPcache ve realpath cache ayarlarını hesapla.
+
+    Derlenmiş betikler kaynak boyutunun yaklaşık iki katı yer tutar;
+    üzerine yorumlayıcı sabit gideri ve %25 pay eklenir. Realpath cache her
+    dosya için yaklaşık 256 bayt gerektirir.
+    """
+    if policy not in TIMESTAMP_POLICIES:
+        raise ValueError(f"Unknown OPcache policy: {policy}")
+
+    memory = _round_up(int((total_size * 2 * 1.25) / MB) + 32, 32)
+    memory = min(max(memory, 128), 2048)
+    interned = min(max(_round_up(memory // 8, 8), 8), 256)
+    realpath = min(max(2 ** math.ceil(math.log2(max(files * 256 // 1024, 1))), 4096), 65536)
+
+    settings = {
+        "opcache.enable": "1",
+        "opcache.memory_consumption": str(memory),
+        "opcache.interned_strings_buffer": str(interned),
+        "opcache.max_accelerated_files": str(max_accelerated_files(files)),
+        "opcache.max_wasted_percentage": "10",
+        "opcache.save_comments": "1",
+    }
+    settings.update(TIMESTAMP_POLICIES[policy])
+    settings.update({
+        "realpath_cache_size": f"{realpath}K",
+        "realpath_cache_ttl": "600",
+    })
+    return settings
+
+
+def render_ini(settings: Dict[str, str]) -> str:
+    lines = ["; Panel tarafından oluşturuldu; elle yapılan değişiklikler üzerine yazılır"]
+    lines.extend(f"{key} = {value}" for key, value in settings.items())
+    return "\n".join(lines) + "\n"
+
+
+def summarize_status(data: Dict) -> Dict:
+    """opcache_get_status() çıktısından isabet oranı ve doluluk özetini çıkar"""
+    status = data.get("status")
+    if not status:
+        return {"enabled": False}
+
+    memory = status.get("memory_usage", {})
+    statistics = status.get("opcache_statistics", {})
+    interned = status.get("interned_strings_usage", {})
+
+    used = memory.get("used_memory", 0)
+    free = memory.get("free_memory", 0)
+    wasted = memory.get("wasted_memory", 0)
+    total = used + free + wasted
+    hits = statistics.get("hits", 0)
+    misses = statistics.get("misses", 0)
+    max_keys = statistics.get("max_cached_keys", 0)
+
+    return {
+        "enabled": bool(status.get("opcache_enabled")),
+        "hit_rate": round(hits / (hits + misses) * 100, 2) if hits + misses else None,
+        "hits": hits,
+        "misses": misses,
+        "memory_used_percent": round((used + wasted) / total * 100, 2) if total else None,
+        "memory_wasted_percent": round(wasted / total * 100, 2) if total else None,
+        "cached_scripts": statistics.get("num_cached_scripts", 0),
+        "keys_used_percent": round(statistics.get("num_cached_keys", 0) / max_keys * 100, 2) if max_keys else None,
+        "interned_strings_used_percent": round(
+            interned.get("used_memory", 0) / interned["buffer_size"] * 100, 2
+        ) if interned.get("buffer_size") else None,
+        "oom_restarts": statistics.get("oom_restarts", 0),
+        "hash_restarts": statistics.get("hash_restarts", 0),
+        "realpath_cache_used": data.get("realpath_cache_size"),
+        "realpath_cache_limit": data.get("realpath_cache_limit"),
+    }
+
+
+def parse_status_body(body: bytes) -> Dict:
+    return summarize_status(json.loads(body))
@@ -0,0 +1,151 @@
+import os
+import re
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# nginx önbellek dosyası başlığındaki anahtar satırı ("\nKEY: ...\n")
+_KEY_LINE = re.compile(rb"\nKEY: ([^\n]*)\n")
+_HEADER_BYTES = 4096
+
+CACHE_STATUSES = ("HIT", "MISS", "BYPASS", "EXPIRED", "STALE", "UPDATING", "REVALIDATED")
+
+# Access log satırının sonundaki panel alanları: "<cache status>" <request_time> <upstream_response_time>
+_CACHE_FIELD = re.compile(rb'"([A-Z]*|-)" [\d.]+ [\d.,: -]+$')
+
+
+def cache_key(scheme: str, method: str, host: str, request_uri: str) -> str:
+    """nginx_vhost.FASTCGI_CACHE_KEY ile aynı biçimde önbellek anahtarı"""
+    return f"{scheme}{method}{host.lower()}{request_uri}"
+
+
+def cache_path(root: str, key: str, levels: str = "1:2") -> str:
+    """Anahtarın önbellek dosya yolu: md5 özetinin sonundan alınan dizin seviyeleri"""
+    digest = hashlib.md5(key.encode()).hexdigest()
+    parts = []
+    end = len(digest)
+    for level in levels.split(":"):
+        size = int(level)
+        parts.append(digest[end - size:end])
+        end -= size
+    return os.path.join(root, *parts, digest)
+
+
+def url_keys(url: str, hosts: Iterable[str]) -> List[str]:
+    """Bir URL için olası tüm önbellek anahtarları (http/https, GET/HEAD, tüm host adları)"""
+    if not url.startswith("/") and "://" not in url:
+        url = f"//{url}"
+    parts = urlsplit(url)
+    request_uri = parts.path or "/"
+    if parts.query:
+        request_uri += f"?{parts.query}"
+    candidates = [parts.hostname] if parts.hostname else list(hosts)
+    return [
+        cache_key(scheme, method, host, request_uri)
+        for host in candidates
+        for scheme in ("http", "https")
+        for method in ("GET", "HEAD")
+    ]
+
+
+def read_cache_key(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            match = _KEY_LINE.search(f.read(_HEADER_BYTES))
+    except OSError:
+        return None
+    return match.group(1).decode(errors="replace") if match else None
+
+
+def purge_keys(root: str, keys: Iterable[str], levels: str = "1:2") -> int:
+    """Anahtarların dosyalarını sil; nginx reload gerekmez, eksik dosya MISS sayılır"""
+    removed = 0
+    for key in keys:
+        try:
+            os.remove(cache_path(root, key, levels))
+            removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def _split_key(key: str) -> Optional[Tuple[str, str]]:
+    match = re.match(r"^(https?)(GET|HEAD)([^/]*)(/.*)$", key)
+    return (match.group(3), match.group(4)) if match else None
+
+
+def purge_prefix(root: str, prefix: str) -> Dict[str, int]:
+    """Yolu `prefix` ile başlayan girdileri sil.
+
+    Önek için anahtar hesaplanamadığından önbellek dosyalarının başlığındaki
+    KEY satırı okunur; yalnızca ilk birkaç KB okunduğundan büyük sayfalar da
+    ucuzdur.
+    """
+    scanned = removed = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            key = read_cache_key(path)
+            scanned += 1
+            parts = _split_key(key) if key else None
+            if parts and parts[1].startswith(prefix):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return {"scanned": scanned, "removed": removed}
+
+
+def purge_all(root: str) -> None:
+    """Tüm bölgeyi boşalt: dizini anında yeniden adlandır, silmeyi arka planda yap.
+
+    nginx eksik seviye dizinlerini yazarken yeniden oluşturur; kök dizin
+    hemen yeniden yaratılır, böylece istekler hiç hata görmez.
+    """
+    if not os.path.isdir(root):
+        return
+    st = os.stat(root)
+    trash = f"{root}.purge-{int(time.time() * 1000)}"
+    os.rename(root, trash)
+    os.makedirs(root, exist_ok=True)
+    os.chmod(root, st.st_mode & 0o7777)
+    try:
+        os.chown(root, st.st_uid, st.st_gid)
+    except PermissionError:
+        pass
+    threading.Thread(target=shutil.rmtree, args=(trash, True), daemon=True).start()
+
+
+def cache_status_counts(path: str, max_bytes: int = 16 * 1024 * 1024) -> Dict[str, int]:
+    """Access log'un son `max_bytes` baytındaki önbellek durumlarını say"""
+    counts = {status: 0 for status in CACHE_STATUSES}
+    counts["NONE"] = 0
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return counts
+    with open(path, "rb") as f:
+        f.seek(max(0, size - max_bytes))
+        if size > max_bytes:
+            f.readline()  # yarım satırı atla
+        for line in f:
+            match = _CACHE_FIELD.search(line.rstrip())
+            if not match:
+                continue
+            status = match.group(1).decode()
+            counts[status if status in counts else "NONE"] += 1
+    return counts
+
+
+def hit_ratio(counts: Dict[str, int]) -> Optional[float]:
+    """Önbelleğe uygun isteklerde isabet oranı (BYPASS ve önbellek dışı istekler hariç)"""
+    hits = counts.get("HIT", 0) + counts.get("STALE", 0) + counts.get("UPDATING", 0) + counts.get("REVALIDATED", 0)
+    cacheable = hits + counts.get("MISS", 0) + counts.get("EXPIRED", 0)
+    return round(hits / cacheable * 100, 2) if cacheable else None
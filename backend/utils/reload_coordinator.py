@@ -0,0 +1,116 @@
+import os
+import time
+import logging
+import threading
+import subprocess
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+from .service_control import ConfigTestError, ServiceController, ServiceProfile, run_command, service_profile
+
+__all__ = ["ConfigTestError", "ReloadCoordinator", "get_reload_coordinator"]
+
+logger = logging.getLogger(__name__)
+
+
+class ReloadCoordinator:
+    """Bir servis için gelen yeniden yükleme isteklerini birleştirir.
+
+    İstekler `debounce` saniye boyunca toplanır (ilk istekten en fazla
+    `max_delay` saniye sonra işlem başlar). Toplanan grup için yapılandırma
+    bir kez test edilir ve tek bir graceful reload yapılır; sonuç ya da hata
+    gruptaki her isteğin Future nesnesine iletilir. Yeniden yükleme sürerken
+    gelen istekler bir sonraki gruba kalır, çünkü yapılandırma testten sonra
+    değişmiş olabilir.
+    """
+
+    def __init__(self, name: str, test_command: Optional[List[str]] = None,
+                 reload_command: Optional[List[str]] = None,
+                 debounce: float = 1.0, max_delay: float = 10.0,
+                 runner: Callable[[List[str]], subprocess.CompletedProcess] = run_command,
+                 profile: Optional[ServiceProfile] = None):
+        self.name = name
+        self.profile = profile or ServiceProfile(name, test_command, [reload_command] if reload_command else [])
+        self.controller = ServiceController(runner)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.runner = runner
+        self._pending: List[Future] = []
+        self._first_request = 0.0
+        self._deadline = 0.0
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {"requests": 0, "reloads": 0, "failures": 0}
+
+    def request(self, reason: str = "") -> Future:
+        """Yeniden yükleme iste; sonuç gruptaki reload bitince Future'a yazılır"""
+        future = Future()
+        now = time.monotonic()
+        with self._condition:
+            if not self._pending:
+                self._first_request = now
+            self._pending.append(future)
+            self.stats["requests"] += 1
+            self._deadline = min(now + self.debounce, self._first_request + self.max_delay)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"reload-{self.name}", daemon=True)
+                self._worker.start()
+            self._condition.notify()
+        if reason:
+            logger.debug(f"{self.name} reload requested: {reason}")
+        return future
+
+    def reload(self, reason: str = "", timeout: Optional[float] = None) -> Dict:
+        """İsteği gönder ve grubun sonucunu bekle"""
+        return self.request(reason).result(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                # Son istekten sonra `debounce` kadar yeni istek gelmezse grup kapanır
+                while True:
+                    if not self._pending:
+                        self._worker = None
+                        return
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch, self._pending = self._pending, []
+
+            self._execute(batch)
+
+    def _execute(self, batch: List[Future]) -> None:
+        try:
+            outcome = dict(self.controller.reload(self.profile), batch_size=len(batch))
+            self.stats["reloads"] += 1
+            logger.info(f"Reloaded {self.name} for {len(batch)} queued changes")
+            for future in batch:
+                future.set_result(outcome)
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error(str(e))
+            for future in batch:
+                future.set_exception(e)
+
+
+_coordinators: Dict[str, ReloadCoordinator] = {}
+_coordinators_lock = threading.Lock()
+
+
+def get_reload_coordinator(service: str) -> ReloadCoordinator:
+    """Servis için paylaşılan koordinatörü getir (nginx, apache, php8.1-fpm, ...)"""
+    try:
+        profile = service_profile(service)
+    except ValueError:
+        raise ValueError(f"Unsupported server type: {service}")
+    with _coordinators_lock:
+        coordinator = _coordinators.get(profile.name)
+        if coordinator is None:
+            coordinator = ReloadCoordinator(
+                profile.name,
+                debounce=float(os.getenv("WEB_RELOAD_DEBOUNCE", "1.0")),
+                max_delay=float(os.getenv("WEB_RELOAD_MAX_DELAY", "10")),
+                profile=profile
+            )
+            _coordinators[profile.name] = coordinator
+        return coordinator
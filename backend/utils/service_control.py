@@ -0,0 +1,196 @@
+import re
+import time
+import shlex
+import logging
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Runner = Callable[[List[str]], subprocess.CompletedProcess]
+
+# Komut bulunamadı (yerelde FileNotFoundError, kabukta 127)
+COMMAND_NOT_FOUND = 127
+
+
+class ConfigTestError(RuntimeError):
+    """Yapılandırma testi başarısız oldu; yeniden yükleme yapılmadı"""
+
+    def __init__(self, message: str, output: str = ""):
+        super().__init__(message)
+        self.output = output
+
+
+def run_command(command: List[str], timeout: int = 60) -> subprocess.CompletedProcess:
+    try:
+        return subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except FileNotFoundError as e:
+        return subprocess.CompletedProcess(command, COMMAND_NOT_FOUND, "", str(e))
+
+
+def ssh_runner(ssh) -> Runner:
+    """SSHManager üzerinden komut çalıştıran runner oluştur"""
+    def run(command: List[str]) -> subprocess.CompletedProcess:
+        exit_code, output, error = ssh.execute_command(" ".join(shlex.quote(part) for part in command))
+        return subprocess.CompletedProcess(command, exit_code, output, error)
+    return run
+
+
+def _output(result: subprocess.CompletedProcess) -> str:
+    return (result.stderr or result.stdout or "").strip()
+
+
+class ServiceProfile:
+    """Bir servisin test, reload ve restart komutları.
+
+    `reload_commands` sırayla denenir; ilki başarılı olan kullanılır.
+    `reload_commands` boşsa servis yapılandırmayı yalnızca yeniden
+    başlatılarak okur (ör. MySQL) ve restart tek yoldur.
+    """
+
+    def __init__(self, name: str, test_command: Optional[List[str]] = None,
+                 reload_commands: Optional[List[List[str]]] = None,
+                 restart_command: Optional[List[str]] = None,
+                 unit: Optional[str] = None):
+        self.name = name
+        self.test_command = test_command
+        self.reload_commands = reload_commands or []
+        self.restart_command = restart_command
+        self.unit = unit
+
+
+def service_profile(name: str) -> ServiceProfile:
+    """Servis adına göre profili oluştur (nginx, apache, php8.1-fpm, php-fpm, mysql)"""
+    if name == "nginx":
+        return ServiceProfile(
+            "nginx",
+            ["nginx", "-t"],
+            [["systemctl", "reload", "nginx"], ["nginx", "-s", "reload"]],
+            ["systemctl", "restart", "nginx"],
+            unit="nginx"
+        )
+    if name in ("apache", "apache2"):
+        return ServiceProfile(
+            "apache",
+            ["apachectl", "configtest"],
+            [["apachectl", "graceful"], ["systemctl", "reload", "apache2"]],
+            ["systemctl", "restart", "apache2"],
+            unit="apache2"
+        )
+    match = re.fullmatch(r"php(\d+\.\d+)?-?fpm", name)
+    if match:
+        version = match.group(1) or ""
+        unit = f"php{version}-fpm" if version else "php-fpm"
+        # Debian'da birim adı php8.1-fpm, ikili dosya php-fpm8.1; reload USR2 gönderir
+        return ServiceProfile(
+            unit,
+            [f"php-fpm{version}", "-t"],
+            [
+                ["systemctl", "reload", unit],
+                ["pkill", "-USR2", "-o", "-f", f"php-fpm: master process .*php/{version}" if version
+                 else "php-fpm: master process"]
+            ],
+            ["systemctl", "restart", unit],
+            unit=unit
+        )
+    if name in ("mysql", "mariadb"):
+        return ServiceProfile(name, None, [], ["systemctl", "restart", name], unit=name)
+    raise ValueError(f"Unsupported service: {name}")
+
+
+class ReloadTimings:
+    """Servis başına yeniden yükleme sürelerini tutar"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, action: str, duration: float, success: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(key, {
+                "count": 0, "failures": 0, "restarts": 0,
+                "total": 0.0, "max": 0.0, "last": None, "last_action": None
+            })
+            stats["count"] += 1
+            if not success:
+                stats["failures"] += 1
+            if action == "restart":
+                stats["restarts"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+            stats["last"] = duration
+            stats["last_action"] = action
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                key: dict(
+                    {k: v for k, v in stats.items() if k != "total"},
+                    average=round(stats["total"] / stats["count"], 3)
+                )
+                for key, stats in self._stats.items()
+            }
+
+
+reload_timings = ReloadTimings()
+
+
+class ServiceController:
+    """Servisleri graceful reload ile yeniden yükler.
+
+    Önce yapılandırma test edilir; test başarısızsa servis hiç
+    dokunulmadan ConfigTestError yükseltilir. Reload komutları sırayla
+    denenir. Restart yalnızca servisin reload desteği yoksa ya da reload
+    başarısız olup servis çalışmıyorsa yapılır; çalışan bir servis hiçbir
+    zaman restart ile düşürülmez.
+    """
+
+    def __init__(self, runner: Runner = run_command, host: str = "local",
+                 timings: ReloadTimings = reload_timings):
+        self.runner = runner
+        self.host = host
+        self.timings = timings
+
+    def test(self, profile: ServiceProfile) -> None:
+        if not profile.test_command:
+            return
+        result = self.runner(profile.test_command)
+        if result.returncode != 0:
+            output = _output(result)
+            raise ConfigTestError(f"{profile.name} configuration test failed: {output}", output)
+
+    def _is_active(self, profile: ServiceProfile) -> bool:
+        if not profile.unit:
+            return True
+        return self.runner(["systemctl", "is-active", "--quiet", profile.unit]).returncode == 0
+
+    def reload(self, service) -> Dict:
+        """Servisi yeniden yükle; kullanılan yolu ve süreyi döndür"""
+        profile = service if isinstance(service, ServiceProfile) else service_profile(service)
+        started = time.monotonic()
+        action = "reload"
+        try:
+            self.test(profile)
+
+            errors = []
+            for command in profile.reload_commands:
+                result = self.runner(command)
+                if result.returncode == 0:
+                    break
+                errors.append(f"{command[0]}: {_output(result)}")
+            else:
+                if not profile.restart_command or (profile.reload_commands and self._is_active(profile)):
+                    raise RuntimeError(f"{profile.name} reload failed: {'; '.join(errors)}")
+                action = "restart"
+                result = self.runner(profile.restart_command)
+                if result.returncode != 0:
+                    raise RuntimeError(f"{profile.name} restart failed: {_output(result)}")
+        except Exception:
+            self.timings.record(f"{self.host}/{profile.name}", action, time.monotonic() - started, False)
+            raise
+
+        duration = round(time.monotonic() - started, 3)
+        self.timings.record(f"{self.host}/{profile.name}", action, duration, True)
+        logger.info(f"{profile.name} on {self.host}: {action} took {duration}s")
+        return {"service": profile.name, "host": self.host, "action": action, "duration": duration}
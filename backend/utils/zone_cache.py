@@ -0,0 +1,171 @@
+import os
+import fcntl
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from .zone_file import DEFAULT_TTL, format_record, format_soa
+
+logger = logging.getLogger(__name__)
+
+
+class ZoneModel:
+    """Bir zone'un bellekteki hali.
+
+    Kayıtlar (isim, tür) kümeleri halinde tutulur ve her kümenin zone dosyası
+    metni bir kez oluşturulup saklanır. Bir küme değiştiğinde yalnızca onun
+    metni yeniden oluşturulur; dosyanın geri kalanı önbellekten birleştirilir.
+    """
+
+    def __init__(self, origin: str, records: Iterable[Dict] = (), serial: int = 0,
+                 default_ttl: int = DEFAULT_TTL):
+        self.origin = origin.rstrip(".").lower()
+        self.serial = serial
+        self.default_ttl = default_ttl
+        self.lock = threading.RLock()
+        # Modelin en son yazdığı ya da okuduğu zone dosyasının kimliği (file_stamp)
+        self.stamp: Optional[tuple] = None
+        self._rrsets: Dict[tuple, List[Dict]] = {}
+        self._rendered: Dict[tuple, str] = {}
+        for record in records:
+            self._rrsets.setdefault(self._key(record["name"], record["type"]), []).append(record)
+
+    @staticmethod
+    def _key(name: str, rdtype: str) -> tuple:
+        return (name.lower(), rdtype.upper())
+
+    def set_rrset(self, name: str, rdtype: str, records: List[Dict]) -> None:
+        """Kümeyi değiştir; boş liste kümeyi siler"""
+        key = self._key(name, rdtype)
+        if records:
+            self._rrsets[key] = list(records)
+        else:
+            self._rrsets.pop(key, None)
+        self._rendered.pop(key, None)
+
+    def has_rrset(self, name: str, rdtype: str) -> bool:
+        return self._key(name, rdtype) in self._rrsets
+
+    def bump_serial(self) -> int:
+        """Seri numarasını YYYYMMDDnn düzenine göre artır"""
+        today = int(date.today().strftime("%Y%m%d")) * 100
+        self.serial = max(self.serial + 1, today)
+        return self.serial
+
+    def _render_rrset(self, key: tuple) -> str:
+        text = self._rendered.get(key)
+        if text is None:
+            text = "".join(format_record(record) + "\n" for record in self._rrsets[key])
+            self._rendered[key] = text
+        return text
+
+    def render(self, primary_ns: str, hostmaster: str, nameservers: Iterable[str] = (),
+               refresh: int = 3600, retry: int = 900, expire: int = 1209600,
+               minimum: int = 300) -> Iterator[str]:
+        """Zone dosyasını satır grupları halinde üret"""
+        yield f"$ORIGIN {self.origin}.\n"
+        yield f"$TTL {self.default_ttl}\n"
+        soa = format_soa(primary_ns, hostmaster, self.serial, refresh, retry, expire, minimum)
+        yield f"@\t{self.default_ttl}\tIN\tSOA\t{soa}\n"
+        # Kök NS kaydı tanımlı değilse varsayılan isim sunucuları kullanılır
+        if not self.has_rrset("@", "NS"):
+            for ns in nameservers:
+                yield f"@\t{self.default_ttl}\tIN\tNS\t{ns}\n"
+        for key in sorted(self._rrsets):
+            yield self._render_rrset(key)
+
+
+class ZoneCache:
+    """Domain adına göre ZoneModel önbelleği (LRU)"""
+
+    def __init__(self, max_zones: int = 1024):
+        self.max_zones = max_zones
+        self._zones = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, origin: str, loader: Callable[[], ZoneModel], stamp: Optional[tuple] = None) -> ZoneModel:
+        """Zone'u önbellekten getir, yoksa loader ile yükle.
+
+        `stamp` verilirse diskteki dosyanın kimliğiyle karşılaştırılır; dosya
+        başka bir worker tarafından yeniden yazılmışsa model eskimiştir ve
+        yeniden yüklenir.
+        """
+        key = origin.rstrip(".").lower()
+        with self._lock:
+            zone = self._zones.get(key)
+            if zone is not None and (stamp is None or zone.stamp == stamp):
+                self._zones.move_to_end(key)
+                return zone
+
+        zone = loader()
+        zone.stamp = stamp
+        with self._lock:
+            # Aynı anda başka bir iş parçacığı yüklediyse onunki kullanılır
+            existing = self._zones.get(key)
+            if existing is not None and (stamp is None or existing.stamp == stamp):
+                return existing
+            self._zones[key] = zone
+            self._zones.move_to_end(key)
+            while len(self._zones) > self.max_zones:
+                self._zones.popitem(last=False)
+        return zone
+
+    def invalidate(self, origin: str) -> None:
+        with self._lock:
+            self._zones.pop(origin.rstrip(".").lower(), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._zones.clear()
+
+
+zone_cache = ZoneCache(max_zones=int(os.getenv("DNS_ZONE_CACHE_SIZE", "1024")))
+
+
+def file_stamp(path: str) -> Optional[tuple]:
+    """Dosyanın kimliği; atomik yazım her seferinde yeni bir inode oluşturur"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@contextmanager
+def zone_file_lock(path: str) -> Iterator[None]:
+    """Zone dosyasının okunup yeniden yazılmasını worker'lar arasında sırala"""
+    directory, name = os.path.split(path)
+    fd = os.open(os.path.join(directory, f".{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def write_zone_file(path: str, chunks: Iterable[str]) -> None:
+    """Zone dosyasını geçici dosyaya yazıp atomik olarak yerine taşı"""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(chunks)
+            f.flush()
+            os.fsync(f.fileno())
+        # İzinler ve sahiplik mevcut dosyadaki gibi kalır (named okuyabilmeli)
+        try:
+            st = os.stat(path)
+            os.chmod(tmp_path, st.st_mode & 0o7777)
+            os.chown(tmp_path, st.st_uid, st.st_gid)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        except PermissionError:
+            pass
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,314 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+DEFAULT_TTL = 3600
+TXT_CHUNK_SIZE = 255
+
+# Zone dosyasında desteklenen kayıt türleri; SOA sunucu tarafından yönetilir
+RECORD_TYPES = ("A", "AAAA", "CNAME", "MX", "TXT", "SPF", "NS", "SRV", "CAA", "PTR")
+PRIORITY_TYPES = ("MX", "SRV")
+# Kablo üzerinde TXT olarak yayınlanan kayıt türleri (RFC 7208 SPF RR türünü kullanımdan kaldırdı)
+TXT_LIKE_TYPES = ("TXT", "SPF", "DKIM", "DMARC")
+CLASSES = ("IN", "CH", "HS")
+
+_TTL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+# Her rakam grubundan sonra birim ya da satır sonu gelir; iç içe niceleyici yok (geri izleme doğrusal)
+_TTL_RE = re.compile(r"^\d+(?:[smhdw]\d+)*[smhdw]?$", re.IGNORECASE)
+_TTL_PART_RE = re.compile(r"(\d+)([smhdw]?)", re.IGNORECASE)
+
+
+class ZoneParseError(ValueError):
+    """Zone dosyası çözümlenemedi"""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+def parse_ttl(value: str) -> int:
+    """`3600`, `1h` ya da `1h30m` biçimindeki TTL değerini saniyeye çevir"""
+    if not _TTL_RE.match(value):
+        raise ValueError(f"Invalid TTL: {value}")
+    return sum(int(n) * _TTL_UNITS[(unit or "s").lower()] for n, unit in _TTL_PART_RE.findall(value))
+
+
+def wire_type(record_type) -> str:
+    """DNSType değerini DNS sunucusunda kullanılan kayıt türüne çevir"""
+    value = str(getattr(record_type, "value", record_type)).upper()
+    return "TXT" if value in TXT_LIKE_TYPES else value
+
+
+def quote_txt(content: str) -> str:
+    """TXT içeriğini 255 baytlık tırnaklı karakter dizilerine böl"""
+    escaped = content.replace("\\", "\\\\").replace('"', '\\"')
+    chunks = [escaped[i:i + TXT_CHUNK_SIZE] for i in range(0, len(escaped), TXT_CHUNK_SIZE)]
+    # Kaçış karakteri parça sınırında bölünmemeli
+    for i in range(len(chunks) - 1):
+        trailing = len(chunks[i]) - len(chunks[i].rstrip("\\"))
+        if trailing % 2:
+            chunks[i], chunks[i + 1] = chunks[i][:-1], "\\" + chunks[i + 1]
+    return " ".join(f'"{chunk}"' for chunk in chunks) or '""'
+
+
+def _tokenize(line: str, line_no: int) -> Iterator[tuple]:
+    """Satırı (değer, tırnaklı mı) çiftlerine ayır; yorumlar atılır"""
+    i = 0
+    length = len(line)
+    while i < length:
+        c = line[i]
+        if c == ";":
+            return
+        if c in " \t":
+            i += 1
+            continue
+        if c in "()":
+            yield c, False
+            i += 1
+            continue
+        if c == '"':
+            value = []
+            i += 1
+            while i < length and line[i] != '"':
+                if line[i] == "\\" and i + 1 < length:
+                    i += 1
+                value.append(line[i])
+                i += 1
+            if i >= length:
+                raise ZoneParseError("Unterminated quoted string", line_no)
+            yield "".join(value), True
+            i += 1
+            continue
+        start = i
+        while i < length and line[i] not in ' \t;()"':
+            i += 1
+        yield line[start:i], False
+
+
+def _logical_lines(lines: Iterable[str]) -> Iterator[tuple]:
+    """Parantezle birden fazla satıra yayılan kayıtları tek satırda birleştir"""
+    tokens = []
+    depth = 0
+    start_line = 0
+    starts_blank = False
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if depth == 0:
+            start_line = line_no
+            starts_blank = line[:1] in (" ", "\t")
+            tokens = []
+        for token, quoted in _tokenize(line, line_no):
+            if not quoted and token == "(":
+                depth += 1
+            elif not quoted and token == ")":
+                if depth == 0:
+                    raise ZoneParseError("Unbalanced parenthesis", line_no)
+                depth -= 1
+            else:
+                tokens.append((token, quoted))
+        if depth == 0 and tokens:
+            yield start_line, starts_blank, tokens
+    if depth:
+        raise ZoneParseError("Unbalanced parenthesis", start_line)
+
+
+def _relative_name(name: str, origin: str) -> Optional[str]:
+    """İsmi zone köküne göre göreli hale getir (`@` kök demektir); zone dışındaysa None"""
+    fqdn = name.lower()
+    if fqdn == origin:
+        return "@"
+    if fqdn.endswith("." + origin):
+        return name[:-(len(origin) + 1)]
+    return None
+
+
+def parse_zone(source: TextIO, origin: str, default_ttl: int = DEFAULT_TTL) -> Iterator[Dict]:
+    """BIND zone dosyasını satır satır çözümle ve kayıtları üret.
+
+    Dosya belleğe alınmaz; her kayıt okunduğu anda `{name, type, content,
+    ttl, priority}` sözlüğü olarak döner. İsimler zone köküne göre görelidir;
+    zone dışındaki bir isim (ör. başka bir domain) hata sayılır.
+    $ORIGIN ve $TTL yönergeleri, boş sahip alanı (önceki sahip), çok satırlı
+    parantezli kayıtlar ve 255 bayttan uzun TXT dizileri desteklenir.
+    SOA kayıtları ve $INCLUDE atlanır.
+    """
+    origin = origin.lower().rstrip(".") + "."
+    zone_origin = origin
+    ttl = default_ttl
+    last_name = origin
+
+    for line_no, starts_blank, tokens in _logical_lines(source):
+        first = tokens[0][0]
+        upper = first.upper()
+
+        if upper == "$ORIGIN":
+            if len(tokens) < 2:
+                raise ZoneParseError("$ORIGIN requires a value", line_no)
+            origin = tokens[1][0].lower()
+            if not origin.endswith("."):
+                origin = f"{origin}.{zone_origin}"
+            continue
+        if upper == "$TTL":
+            try:
+                ttl = parse_ttl(tokens[1][0])
+            except (IndexError, ValueError):
+                raise ZoneParseError("Invalid $TTL", line_no)
+            continue
+        if upper.startswith("$"):
+            # $INCLUDE ve $GENERATE desteklenmez
+            continue
+
+        if starts_blank:
+            name = last_name
+            fields = tokens
+        else:
+            # Sahip adı geçerli $ORIGIN'e göre tam isme çevrilir
+            if first == "@":
+                name = origin
+            elif first.endswith("."):
+                name = first
+            else:
+                name = f"{first}.{origin}"
+            fields = tokens[1:]
+
+        record_ttl = ttl
+        record_type = None
+        index = 0
+        # Sahipten sonra TTL ve sınıf herhangi bir sırada gelebilir
+        while index < len(fields):
+            value = fields[index][0]
+            if value.upper() in CLASSES:
+                index += 1
+            elif _TTL_RE.match(value):
+                record_ttl = parse_ttl(value)
+                index += 1
+            else:
+                record_type = value.upper()
+                index += 1
+                break
+
+        if not record_type:
+            raise ZoneParseError("Missing record type", line_no)
+
+        last_name = name
+        rdata = fields[index:]
+
+        if record_type == "SOA":
+            continue
+        relative = _relative_name(name, zone_origin)
+        if relative is None:
+            raise ZoneParseError(f"Name outside the zone: {name}", line_no)
+        if record_type not in RECORD_TYPES:
+            raise ZoneParseError(f"Unsupported record type: {record_type}", line_no)
+        if not rdata:
+            raise ZoneParseError(f"Missing data for {record_type} record", line_no)
+
+        priority = None
+        if record_type in ("TXT", "SPF"):
+            content = "".join(value for value, _ in rdata)
+        else:
+            values = [value for value, _ in rdata]
+            if record_type in PRIORITY_TYPES:
+                if len(values) < 2 or not values[0].isdigit():
+                    raise ZoneParseError(f"Invalid {record_type} record", line_no)
+                priority = int(values[0])
+                values = values[1:]
+            content = " ".join(values)
+
+        yield {
+            "name": relative,
+            "type": record_type,
+            "content": content,
+            "ttl": record_ttl,
+            "priority": priority
+        }
+
+
+def read_soa_serial(source: TextIO) -> Optional[int]:
+    """Zone dosyasındaki SOA kaydının seri numarasını oku"""
+    for line_no, starts_blank, tokens in _logical_lines(source):
+        values = [value.upper() for value, _ in tokens]
+        if "SOA" in values:
+            rdata = tokens[values.index("SOA") + 1:]
+            if len(rdata) >= 3 and rdata[2][0].isdigit():
+                return int(rdata[2][0])
+            return None
+    return None
+
+
+def format_record(record: Dict) -> str:
+    """Tek bir kaydı zone dosyası satırına çevir"""
+    record_type = record["type"]
+    if record_type in ("TXT", "SPF"):
+        rdata = quote_txt(record["content"])
+    elif record_type in PRIORITY_TYPES:
+        rdata = f"{record.get('priority') or 0} {record['content']}"
+    else:
+        rdata = record["content"]
+    return f"{record['name']}\t{record.get('ttl') or DEFAULT_TTL}\tIN\t{record_type}\t{rdata}"
+
+
+def format_soa(primary_ns: str, hostmaster: str, serial: int, refresh: int = 3600, retry: int = 900,
+               expire: int = 1209600, minimum: int = 300) -> str:
+    """SOA kaydının veri alanı"""
+    return f"{primary_ns} {hostmaster} {serial} {refresh} {retry} {expire} {minimum}"
+
+
+def render_zone(records: Iterable[Dict], origin: str, default_ttl: int = DEFAULT_TTL,
+                soa: Optional[str] = None) -> Iterator[str]:
+    """Kayıtlardan BIND zone dosyası satırları üret"""
+    yield f"$ORIGIN {origin.rstrip('.')}.\n"
+    yield f"$TTL {default_ttl}\n"
+    if soa:
+        yield f"@\t{default_ttl}\tIN\tSOA\t{soa}\n"
+    for record in records:
+        yield format_record(record) + "\n"
+
+
+def record_key(record: Dict) -> tuple:
+    """Kaydın kimliği: isim, kablo türü, içerik ve öncelik (TTL hariç).
+
+    Tür `wire_type` ile karşılaştırılır; dosyadaki SPF kaydı veritabanındaki
+    TXT kaydıyla (ya da tersi) aynı kayıt sayılır.
+    """
+    record_type = wire_type(record["type"])
+    return (
+        record["name"].lower(),
+        record_type,
+        record["content"],
+        record.get("priority") if record_type in PRIORITY_TYPES else None
+    )
+
+
+def diff_records(existing: Iterable[Dict], desired: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    """Mevcut kayıtlarla istenen kayıtlar arasındaki farkı hesapla.
+
+    Aynı anahtara sahip kayıtlar eşleşir; yalnızca TTL'i farklı olanlar
+    güncellenir, istenen listede olmayan mevcut kayıtlar silinecekler
+    listesine girer.
+    """
+    remaining = {}
+    for record in existing:
+        remaining.setdefault(record_key(record), []).append(record)
+
+    result = {"create": [], "update": [], "delete": [], "unchanged": 0}
+    seen = set()
+    for record in desired:
+        key = record_key(record)
+        if key in seen:
+            continue
+        seen.add(key)
+        matches = remaining.pop(key, None)
+        if not matches:
+            result["create"].append(record)
+            continue
+        current = matches[0]
+        if current.get("ttl") != record.get("ttl"):
+            result["update"].append(dict(current, ttl=record.get("ttl")))
+        else:
+            result["unchanged"] += 1
+        # Aynı kaydın veritabanındaki kopyaları temizlenir
+        result["delete"].extend(matches[1:])
+
+    for matches in remaining.values():
+        result["delete"].extend(matches)
+    return result